@@ -0,0 +1,430 @@
+# ==================================================================
+# JOURNAL HORS-LIGNE DES ACTIONS MANUELLES
+# ==================================================================
+# Journal append-only (JSON lines) des actions qui n'ont pas pu être
+# envoyées au serveur (serveur arrêté ou en redémarrage) :
+# ajustements de compteurs (+1 follow, -1 sub...) et changements de
+# configuration des overlays. Les actions sont compactées puis
+# rejouées dans l'ordre dès que le serveur redevient joignable.
+#
+# Format des enregistrements (une ligne JSON par enregistrement):
+#   {"seq": 1, "ts": ..., "type": "counter", "counter": "follows", "delta": 1}
+#   {"seq": 2, "ts": ..., "type": "overlay", "section": "font", "values": {...}}
+#   {"begin": "<clé>", "op": {...}}   opération figée avant envoi
+#   {"done": "<clé>"}                 opération confirmée par le serveur
+#   {"drop": [3, 4]}                  entrées annulées (delta nul)
+# ==================================================================
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Compteurs journalisables et sections de config overlay
+COUNTERS = ('follows', 'subs')
+OVERLAY_SECTIONS = ('font', 'colors', 'animation', 'layout')
+
+
+class ActionJournal:
+    """Journal durable des actions en attente avec rejeu ordonné
+
+    - Les écritures sont bufferisées puis synchronisées sur disque
+      (fsync) par lots : toutes les `fsync_interval` secondes ou toutes
+      les `fsync_batch` écritures.
+    - La compaction additionne les deltas successifs de même signe de
+      chaque compteur (le serveur borne les compteurs à 0 : -5 puis +3
+      depuis 1 donne 3, un net de -2 donnerait 0) et ne garde que la
+      dernière écriture de chaque section overlay.
+    - Chaque opération rejouée porte une clé d'idempotence persistée
+      avant l'envoi : un rejeu après échec partiel réutilise la même clé
+      et le serveur ne compte pas deux fois.
+    """
+
+    def __init__(self, path, fsync_interval=0.2, fsync_batch=64):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self._lock = threading.RLock()
+        self._replay_lock = threading.Lock()
+        self._entries = OrderedDict()   # seq -> entrée en attente
+        self._frozen = OrderedDict()    # clé -> opération figée (envoi en cours)
+        self._next_seq = 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        self._flush_timer = None
+        self._listeners = []
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    def record_counter(self, counter, delta, key=None):
+        """Journalise un ajustement de compteur
+
+        Args:
+            counter (str): 'follows' ou 'subs'
+            delta (int): Variation (+1, -1, ...)
+            key (str): Clé d'idempotence déjà envoyée par une tentative en
+                direct (peut-être appliquée par le serveur) : l'opération
+                est figée avec cette clé, sans compaction, et rejouée telle
+                quelle
+        """
+        if counter not in COUNTERS:
+            raise ValueError(f"Compteur invalide: '{counter}'")
+        entry = {'type': 'counter', 'counter': counter, 'delta': int(delta)}
+        if key is None:
+            return self._append(entry)
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._begin(dict(entry, seqs=[seq]), key)
+        self._notify()
+        return seq
+
+    def record_overlay(self, section, values):
+        """Journalise une écriture de config overlay (une section)
+
+        Args:
+            section (str): 'font', 'colors', 'animation' ou 'layout'
+            values (dict): Valeurs envoyées pour cette section
+        """
+        if section not in OVERLAY_SECTIONS:
+            raise ValueError(f"Section overlay invalide: '{section}'")
+        return self._append({'type': 'overlay', 'section': section, 'values': dict(values)})
+
+    def record_overlay_updates(self, updates):
+        """Journalise un payload overlay complet ({'font': {...}, ...})"""
+        for section, values in updates.items():
+            if values:
+                self.record_overlay(section, values)
+
+    def add_listener(self, callback):
+        """Enregistre un callback() appelé après chaque nouvelle action journalisée"""
+        self._listeners.append(callback)
+
+    def has_pending(self):
+        """True si des actions attendent d'être rejouées"""
+        with self._lock:
+            return bool(self._entries or self._frozen)
+
+    def pending_count(self):
+        """Nombre d'entrées brutes en attente (avant compaction)"""
+        with self._lock:
+            return len(self._entries) + sum(len(op['seqs']) for op in self._frozen.values())
+
+    # ------------------------------------------------------------------
+    # Compaction et rejeu
+    # ------------------------------------------------------------------
+
+    def pending_operations(self):
+        """Opérations compactées à rejouer, dans l'ordre
+
+        Les opérations figées (déjà tentées) passent en premier avec leur
+        clé d'origine. Les autres entrées sont compactées : deltas
+        successifs de même signe additionnés par compteur, dernière
+        écriture par section overlay. L'ordre suit la position de la
+        dernière entrée contribuant à chaque opération.
+
+        Returns:
+            list: Opérations (dict avec 'type', 'seqs', et 'key' si figée)
+        """
+        with self._lock:
+            operations = [dict(op) for op in self._frozen.values()]
+            operations.extend(self._compact())
+            return operations
+
+    def _compact(self):
+        """Compacte les entrées non figées (verrou tenu)"""
+        counters = []
+        runs = {}  # compteur -> opération en cours (même signe)
+        overlays = {}
+        for seq, entry in self._entries.items():
+            if entry['type'] == 'counter':
+                op = runs.get(entry['counter'])
+                if op is None or (op['delta'] < 0) != (entry['delta'] < 0):
+                    op = runs[entry['counter']] = {
+                        'type': 'counter', 'counter': entry['counter'], 'delta': 0, 'seqs': []
+                    }
+                    counters.append(op)
+                op['delta'] += entry['delta']
+            else:
+                op = overlays.setdefault(entry['section'], {
+                    'type': 'overlay', 'section': entry['section'], 'seqs': []
+                })
+                op['values'] = entry['values']
+            op['seqs'].append(seq)
+            op['last'] = seq
+
+        operations = sorted(counters + list(overlays.values()), key=lambda op: op['last'])
+        for op in operations:
+            del op['last']
+        return operations
+
+    def replay(self, send_op):
+        """Rejoue les opérations en attente dans l'ordre
+
+        Args:
+            send_op (callable): send_op(op) -> bool. Reçoit une opération
+                avec sa clé d'idempotence ('key'); retourne True si le
+                serveur l'a acceptée. Le rejeu s'arrête au premier échec.
+
+        Returns:
+            tuple: (opérations envoyées, opérations restantes)
+        """
+        # Un seul rejeu à la fois
+        if not self._replay_lock.acquire(blocking=False):
+            return 0, len(self.pending_operations())
+
+        sent = 0
+        try:
+            operations = self.pending_operations()
+            for index, op in enumerate(operations):
+                if 'key' not in op:
+                    if op['type'] == 'counter' and op['delta'] == 0:
+                        self._drop(op['seqs'])
+                        continue
+                    op = self._begin(op)
+
+                try:
+                    accepted = send_op(op)
+                except Exception as e:
+                    logger.error(f"Erreur rejeu action {op['key']}: {e}", exc_info=True)
+                    accepted = False
+
+                if not accepted:
+                    return sent, len(operations) - index
+                self._done(op['key'])
+                sent += 1
+            return sent, 0
+        finally:
+            self.sync()
+            self._replay_lock.release()
+
+    def _begin(self, op, key=None):
+        """Fige une opération avec une clé d'idempotence avant envoi"""
+        with self._lock:
+            op = dict(op, key=key or uuid.uuid4().hex)
+            for seq in op['seqs']:
+                self._entries.pop(seq, None)
+            self._frozen[op['key']] = op
+            self._write({'begin': op['key'], 'op': op})
+            return op
+
+    def _done(self, key):
+        """Marque une opération comme confirmée par le serveur"""
+        with self._lock:
+            self._frozen.pop(key, None)
+            self._write({'done': key})
+            self._maybe_truncate()
+
+    def _drop(self, seqs):
+        """Annule des entrées sans envoi (delta net nul)"""
+        with self._lock:
+            for seq in seqs:
+                self._entries.pop(seq, None)
+            self._write({'drop': list(seqs)})
+            self._maybe_truncate()
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def _append(self, entry):
+        """Ajoute une entrée au journal et retourne son numéro de séquence"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            entry['seq'] = seq
+            entry['ts'] = time.time()
+            self._entries[seq] = entry
+            self._write(entry)
+
+        self._notify()
+        return seq
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Erreur listener journal: {e}", exc_info=True)
+
+    def _write(self, record):
+        """Écrit un enregistrement (verrou tenu) avec fsync par lots"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+
+        if (self._unsynced >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self._fsync()
+        elif self._flush_timer is None:
+            # Garantir la synchronisation des dernières écritures
+            self._flush_timer = threading.Timer(self.fsync_interval, self.sync)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _fsync(self):
+        """Synchronise le fichier sur disque (verrou tenu)"""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Force la synchronisation des écritures en attente"""
+        with self._lock:
+            self._flush_timer = None
+            self._fsync()
+
+    def close(self):
+        """Synchronise et ferme le fichier du journal"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _maybe_truncate(self):
+        """Vide le fichier quand plus rien n'est en attente (verrou tenu)"""
+        if not self._entries and not self._frozen:
+            self._rewrite()
+
+    def _rewrite(self):
+        """Réécrit atomiquement le journal avec l'état en attente (verrou tenu)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.journal-', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for key, op in self._frozen.items():
+                f.write(json.dumps({'begin': key, 'op': op}, separators=(',', ':')) + '\n')
+            for entry in self._entries.values():
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self):
+        """Recharge le journal existant puis le compacte sur disque"""
+        if not os.path.exists(self.path):
+            return
+
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un crash : ignorée
+                        logger.warning("⚠️ Ligne de journal illisible ignorée")
+                        continue
+                    self._apply(record)
+
+            if self._entries or self._frozen:
+                logger.info(f"📝 {self.pending_count()} action(s) hors-ligne en attente de rejeu")
+            self._rewrite()
+
+    def _apply(self, record):
+        """Applique un enregistrement relu au rechargement (verrou tenu)"""
+        if 'seq' in record:
+            self._entries[record['seq']] = record
+            self._next_seq = max(self._next_seq, record['seq'] + 1)
+        elif 'begin' in record:
+            op = record['op']
+            for seq in op['seqs']:
+                self._entries.pop(seq, None)
+                self._next_seq = max(self._next_seq, seq + 1)
+            self._frozen[record['begin']] = op
+        elif 'done' in record:
+            self._frozen.pop(record['done'], None)
+        elif 'drop' in record:
+            for seq in record['drop']:
+                self._entries.pop(seq, None)
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def benchmark(count=100000, directory=None):
+    """Mesure la latence d'ajout et le débit de rejeu sur un gros backlog
+
+    Args:
+        count (int): Nombre d'actions journalisées
+        directory (str): Dossier de travail (temporaire par défaut)
+
+    Returns:
+        dict: Résultats (latences en microsecondes, débit en actions/s)
+    """
+    import random
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        journal = ActionJournal(os.path.join(tmp, 'bench.journal'))
+        latencies = []
+        rng = random.Random(42)
+        for i in range(count):
+            start = time.perf_counter()
+            if i % 10 == 0:
+                journal.record_overlay(rng.choice(OVERLAY_SECTIONS), {'value': i})
+            else:
+                journal.record_counter(rng.choice(COUNTERS), rng.choice((1, 1, 1, -1)))
+            latencies.append(time.perf_counter() - start)
+        journal.close()
+
+        # Rechargement à froid (crash simulé) puis rejeu
+        start = time.perf_counter()
+        journal = ActionJournal(journal.path)
+        load_time = time.perf_counter() - start
+
+        sent_ops = []
+        start = time.perf_counter()
+        sent, remaining = journal.replay(lambda op: sent_ops.append(op) or True)
+        replay_time = time.perf_counter() - start
+        journal.close()
+
+    latencies.sort()
+    return {
+        'entries': count,
+        'append_p50_us': latencies[len(latencies) // 2] * 1e6,
+        'append_p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'append_max_us': latencies[-1] * 1e6,
+        'load_s': load_time,
+        'replay_s': replay_time,
+        'replayed_ops': sent,
+        'remaining_ops': remaining,
+        'replay_entries_per_s': count / (load_time + replay_time) if (load_time + replay_time) else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"\n📝 Benchmark journal hors-ligne ({size} actions)")
+    results = benchmark(size)
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,183 @@
+# ==================================================================
+# PROFIL D'ACTIVITÉ : EN DIRECT / AU REPOS
+# ==================================================================
+# Health checks, synchros Twitch, rendu texte natif, résumé des
+# métriques et polling du serveur tournaient au même rythme que OBS
+# diffuse ou non. Pendant un stream, ils prennent du CPU et du réseau
+# à une machine qui encode de la vidéo ; hors direct, ils réveillent
+# le processus pour rien.
+#
+# ActivityProfile porte le profil courant (LIVE si OBS diffuse ou
+# enregistre, IDLE sinon) et prévient ses abonnés à chaque changement.
+# Chaque tâche périodique demande son intervalle au profil :
+#
+#     interval = activity.interval(10)        # 10 s en direct, 60 s au repos
+#     interval = activity.interval(60, None)  # en pause au repos
+#
+# ProfiledTimer applique la même règle à un timer OBS (timer_add ne
+# permet pas de changer la période : le timer est retiré puis remis).
+# ==================================================================
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+IDLE = "idle"
+PROFILES = (LIVE, IDLE)
+
+IDLE_FACTOR = 6.0  # Intervalles au repos = intervalles en direct × IDLE_FACTOR
+PAUSED = None      # Intervalle au repos d'une tâche suspendue hors direct
+
+
+class ActivityProfile:
+    """Profil courant et abonnés à ses changements (thread-safe)
+
+    Args:
+        profile (str): Profil initial (LIVE ou IDLE)
+        idle_factor (float): Étirement par défaut des intervalles au repos
+    """
+
+    def __init__(self, profile=IDLE, idle_factor=IDLE_FACTOR):
+        if profile not in PROFILES:
+            raise ValueError(f"Profil inconnu: {profile!r}")
+        self.idle_factor = max(1.0, float(idle_factor))
+        self._profile = profile
+        self._since = time.monotonic()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.changes = 0
+
+    @property
+    def current(self):
+        return self._profile
+
+    @property
+    def is_live(self):
+        return self._profile == LIVE
+
+    def seconds_in_profile(self):
+        """Temps passé dans le profil courant (s)"""
+        return time.monotonic() - self._since
+
+    def interval(self, live, idle=False):
+        """Intervalle d'une tâche périodique pour le profil courant
+
+        Args:
+            live (float): Intervalle en direct
+            idle (float): Intervalle au repos (défaut: live × idle_factor,
+                PAUSED = tâche suspendue)
+
+        Returns:
+            float: Intervalle, ou None si la tâche est suspendue
+        """
+        if self._profile == LIVE:
+            return live
+        if idle is False:
+            return live * self.idle_factor
+        return idle
+
+    def on_change(self, callback):
+        """Abonne callback(profile) aux changements de profil"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+        return callback
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def set(self, profile, reason=None):
+        """Change de profil ; les abonnés sont appelés dans ce thread
+
+        Returns:
+            bool: True si le profil a changé
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Profil inconnu: {profile!r}")
+        with self._lock:
+            if profile == self._profile:
+                return False
+            self._profile = profile
+            self._since = time.monotonic()
+            self.changes += 1
+            listeners = list(self._listeners)
+
+        suffix = f" ({reason})" if reason else ""
+        if profile == LIVE:
+            logger.info(f"🔴 Profil en direct{suffix} : tâches de fond au rythme normal")
+        else:
+            logger.info(f"💤 Profil au repos{suffix} : tâches de fond ralenties")
+        for callback in listeners:
+            try:
+                callback(profile)
+            except Exception as e:
+                logger.error(f"❌ Changement de profil ({getattr(callback, '__name__', callback)}): {e}")
+        return True
+
+    def update(self, streaming, recording, reason=None):
+        """LIVE si OBS diffuse ou enregistre, IDLE sinon"""
+        return self.set(LIVE if streaming or recording else IDLE, reason)
+
+
+class ProfiledTimer:
+    """Timer OBS dont la période suit le profil d'activité
+
+    Args:
+        obs_module: Module `obspython` (ou un stub pour les tests)
+        callback (callable): Fonction du timer (même objet pour timer_remove)
+        profile (ActivityProfile): Profil suivi
+        live_ms (int): Période en direct (ms)
+        idle_ms (int): Période au repos (ms, défaut: live_ms × idle_factor,
+            PAUSED = timer retiré hors direct)
+
+    À utiliser depuis le thread OBS (timer_add / timer_remove).
+    """
+
+    def __init__(self, obs_module, callback, profile, live_ms, idle_ms=False):
+        self.obs = obs_module
+        self.callback = callback
+        self.profile = profile
+        self.live_ms = live_ms
+        self.idle_ms = idle_ms
+        self.active = False     # Démarré (même en pause)
+        self.period_ms = None   # Période du timer OBS en place (None = aucun)
+
+    def start(self):
+        if not self.active:
+            self.active = True
+            self.profile.on_change(self._on_profile)
+        self._apply()
+
+    def stop(self):
+        if self.active:
+            self.active = False
+            self.profile.remove_listener(self._on_profile)
+        self._remove()
+
+    def _on_profile(self, profile):
+        if self.active:
+            self._apply()
+
+    def _apply(self):
+        period = self.profile.interval(self.live_ms, self.idle_ms)
+        if period is not None:
+            period = int(period)
+        if period == self.period_ms:
+            return
+        self._remove()
+        if period is not None:
+            self.obs.timer_add(self.callback, period)
+            self.period_ms = period
+
+    def _remove(self):
+        if self.period_ms is not None:
+            try:
+                self.obs.timer_remove(self.callback)
+            except Exception:
+                pass
+            self.period_ms = None
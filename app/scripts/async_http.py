@@ -0,0 +1,169 @@
+# ==================================================================
+# HTTP/1.1 MINIMAL SUR ASYNCIO
+# ==================================================================
+# Client keep-alive + lecture/écriture de messages HTTP, suffisant pour
+# parler JSON avec server.js sans dépendance externe (pas d'aiohttp
+# dans l'environnement Python d'OBS). Utilisé par
+# AsyncOverlayConfigManager et par les outils de obs/bench/.
+# ==================================================================
+
+import asyncio
+import json
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+# Taille maximale d'un corps accepté (protection du stub)
+MAX_BODY_SIZE = 1024 * 1024
+
+# Requêtes renvoyables après un échec sur une connexion réutilisée : le
+# serveur a pu lire (et appliquer) la première avant de fermer
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+IDEMPOTENCY_HEADER = 'idempotency-key'
+
+
+class HttpError(Exception):
+    """Réponse ou requête HTTP invalide"""
+
+
+# Réponse décodée (se déballe aussi en `status, body`)
+HttpResponse = namedtuple('HttpResponse', ['status_code', 'body'])
+
+
+async def read_message(reader):
+    """Lit un message HTTP (requête ou réponse)
+
+    Returns:
+        tuple: (ligne de départ, headers en minuscules, corps en bytes),
+        ou None si la connexion a été fermée proprement
+    """
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    start_line = start_line.decode('latin-1').rstrip('\r\n')
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise HttpError("Connexion fermée pendant les headers")
+        line = line.decode('latin-1').rstrip('\r\n')
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    else:
+        length = int(headers.get('content-length', '0') or 0)
+        if length > MAX_BODY_SIZE:
+            raise HttpError(f"Corps trop volumineux ({length} octets)")
+        body = await reader.readexactly(length) if length else b''
+
+    return start_line, headers, body
+
+
+def encode_message(start_line, headers, body=b''):
+    """Encode un message HTTP (Content-Length ajouté automatiquement)"""
+    lines = [start_line]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body
+
+
+def decode_json(body):
+    """Décode un corps JSON (None si vide ou invalide)"""
+    if not body:
+        return None
+    try:
+        return json.loads(body.decode('utf-8'))
+    except ValueError:
+        return None
+
+
+class HttpConnection:
+    """Connexion HTTP/1.1 persistante (une requête à la fois)
+
+    Args:
+        base_url (str): Ex. "http://localhost:8082"
+        timeout (float): Timeout par requête (secondes)
+    """
+
+    def __init__(self, base_url, timeout=10.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def request(self, method, path, payload=None, headers=None):
+        """Envoie une requête et retourne HttpResponse(status_code, corps JSON décodé)
+
+        Une connexion keep-alive fermée par le serveur est rouverte une
+        fois, et la requête renvoyée seulement si elle est idempotente
+        (méthode idempotente ou header Idempotency-Key) : un POST de
+        compteur sans clé pourrait sinon être appliqué deux fois.
+        """
+        body = b''
+        request_headers = {'Host': f"{self.host}:{self.port}", 'Connection': 'keep-alive'}
+        if payload is not None:
+            # bytes = corps JSON déjà sérialisé (presets)
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        if headers:
+            request_headers.update(headers)
+        message = encode_message(f"{method} {path} HTTP/1.1", request_headers, body)
+        resendable = method.upper() in IDEMPOTENT_METHODS or any(
+            name.lower() == IDEMPOTENCY_HEADER for name in request_headers
+        )
+
+        for attempt in (0, 1):
+            reused = self._writer is not None
+            if not reused:
+                await self._connect()
+            try:
+                return await asyncio.wait_for(self._roundtrip(message), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError, HttpError):
+                self.close()
+                # Seule une connexion réutilisée peut avoir été fermée entre-temps
+                if attempt or not reused or not resendable:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    async def _roundtrip(self, message):
+        self._writer.write(message)
+        await self._writer.drain()
+        response = await read_message(self._reader)
+        if response is None:
+            raise HttpError("Connexion fermée par le serveur")
+
+        status_line, headers, body = response
+        try:
+            status = int(status_line.split(' ', 2)[1])
+        except (IndexError, ValueError):
+            raise HttpError(f"Ligne de statut invalide: {status_line!r}")
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return HttpResponse(status, decode_json(body))
@@ -0,0 +1,314 @@
+# ==================================================================
+# CONFIGURATION DYNAMIQUE DES OVERLAYS - VERSION ASYNCIO
+# ==================================================================
+# Même API publique que OverlayConfigManager, mais chaque méthode est
+# une coroutine exécutée sur la boucle d'arrière-plan partagée :
+# - connexions HTTP keep-alive persistantes (pas de handshake par POST)
+# - au plus `max_in_flight` requêtes en vol
+# - une mise à jour en attente d'une section est fusionnée avec la
+#   suivante (l'ancienne est remplacée, un seul POST part)
+# - deux POST touchant la même section ne sont jamais en vol en même
+#   temps (l'ordre d'application est garanti)
+#
+# Depuis le thread OBS : manager.submit(manager.update_font(...))
+# retourne un concurrent.futures.Future sans bloquer l'interface.
+# ==================================================================
+
+import asyncio
+import functools
+import logging
+
+from async_http import HttpConnection
+from background_loop import get_background_loop
+from metrics import REGISTRY as METRICS
+from overlay_config_manager import (
+    build_animation_updates, build_color_updates, build_font_updates,
+    build_full_updates, build_layout_updates
+)
+from overlay_config_schema import COMPILED_SCHEMA
+from server_resilience import DEFAULT_RETRY_POLICY, get_circuit_breaker
+from tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = "/api/overlay-config"
+
+
+class _PendingUpdate:
+    """Appel en attente : résolu quand toutes ses sections sont envoyées"""
+
+    __slots__ = ('future', 'sections', 'remaining', 'ok', 'journal', 'body')
+
+    def __init__(self, future, sections, journal, body=None):
+        self.future = future
+        self.sections = frozenset(sections)
+        self.remaining = set(sections)
+        self.ok = True
+        self.journal = journal
+        self.body = body
+
+
+class AsyncOverlayConfigManager:
+    """Gestionnaire asyncio de la configuration des overlays
+
+    Args:
+        server_url (str): URL du serveur Node
+        timeout (float): Timeout par requête (secondes)
+        enable_cache (bool): Ne pas renvoyer une section identique
+        max_in_flight (int): Nombre maximal de requêtes simultanées
+        retry_policy (RetryPolicy): Politique partagée (défaut: DEFAULT_RETRY_POLICY)
+        journal (ActionJournal): Journal hors-ligne optionnel
+        background_loop (BackgroundLoop): Boucle d'exécution (défaut: boucle partagée)
+    """
+
+    def __init__(self, server_url="http://localhost:8082", timeout=5, enable_cache=True,
+                 max_in_flight=2, retry_policy=None, journal=None, background_loop=None):
+        self.server_url = server_url
+        self.timeout = timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.breaker = get_circuit_breaker(server_url)
+        self.journal = journal
+        self.background_loop = background_loop or get_background_loop()
+        self._cache = {} if enable_cache else None
+        self._idle_connections = []
+        self._pending = {}   # section -> valeurs fusionnées en attente d'envoi
+        self._waiters = {}   # section -> [_PendingUpdate]
+        self._busy = set()   # sections en vol
+        self._in_flight = 0
+        self.requests_sent = 0
+        self.updates_superseded = 0
+
+    # ------------------------------------------------------------------
+    # Soumission depuis un autre thread (OBS)
+    # ------------------------------------------------------------------
+
+    def submit(self, coro):
+        """Planifie une coroutine du gestionnaire sur la boucle d'arrière-plan
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return self.background_loop.submit(coro)
+
+    # ------------------------------------------------------------------
+    # API publique (coroutines)
+    # ------------------------------------------------------------------
+
+    async def get_config(self, use_cache=True):
+        """Récupérer la configuration actuelle"""
+        if use_cache and self._cache and 'full_config' in self._cache:
+            return self._cache['full_config']
+
+        connection = self._acquire()
+        try:
+            with METRICS.timed('subcount_overlay_request_seconds', "Latence des appels config overlay", operation='get'):
+                response = await self.retry_policy.run_async(
+                    lambda: connection.request('GET', CONFIG_PATH),
+                    breaker=self.breaker,
+                    label="Récupération config overlay",
+                    attempts=1
+                )
+        finally:
+            self._release(connection)
+
+        if response is None:
+            return None
+        if response.status_code != 200:
+            logger.warning(f"HTTP {response.status_code} lors de la récupération config")
+            return None
+        if self._cache is not None:
+            self._cache['full_config'] = response.body
+        return response.body
+
+    async def update_font(self, family=None, size=None, weight=None):
+        """Mettre à jour la police (voir OverlayConfigManager.update_font)"""
+        return await self._update_section('font', build_font_updates(family, size, weight))
+
+    async def update_colors(self, text=None, shadow=None, stroke=None):
+        """Mettre à jour les couleurs (voir OverlayConfigManager.update_colors)"""
+        return await self._update_section('colors', build_color_updates(text, shadow, stroke))
+
+    async def update_animation(self, duration=None, easing=None):
+        """Mettre à jour l'animation (voir OverlayConfigManager.update_animation)"""
+        return await self._update_section('animation', build_animation_updates(duration, easing))
+
+    async def update_layout(self, paddingLeft=None, gap=None):
+        """Mettre à jour la mise en page (voir OverlayConfigManager.update_layout)"""
+        return await self._update_section('layout', build_layout_updates(paddingLeft, gap))
+
+    async def update_full_config(self, font=None, colors=None, animation=None, layout=None):
+        """Mettre à jour plusieurs sections en une seule requête"""
+        config = COMPILED_SCHEMA.config(build_full_updates(font, colors, animation, layout))
+        if config:
+            return await self._send_update(config.updates, body=config.body)
+        return False
+
+    async def apply_preset(self, preset):
+        """Applique un OverlayPreset en une seule requête
+
+        Le corps pré-sérialisé du preset est envoyé tel quel, sauf s'il
+        doit être fusionné avec une mise à jour encore en attente.
+        """
+        self.clear_cache()
+        return await self._send_update(preset.updates, body=preset.body)
+
+    async def replay_operation(self, op):
+        """Rejoue une opération overlay issue du journal hors-ligne"""
+        return await self._send_update({op['section']: op['values']}, journal=False)
+
+    def clear_cache(self):
+        """Vide le cache"""
+        if self._cache is not None:
+            self._cache.clear()
+
+    async def close(self):
+        """Ferme les connexions persistantes"""
+        for connection in self._idle_connections:
+            connection.close()
+        self._idle_connections = []
+
+    # ------------------------------------------------------------------
+    # Envoi
+    # ------------------------------------------------------------------
+
+    async def _update_section(self, section, values):
+        if not values:
+            return False
+        # Config immuable et hashable : sert directement de clé de cache
+        config = COMPILED_SCHEMA.config({section: values})
+        if self._cache is not None and config in self._cache:
+            return True
+        if await self._send_update(config.updates, body=config.body):
+            if self._cache is not None:
+                self._cache[config] = True
+            return True
+        return False
+
+    async def _send_update(self, updates, journal=True, body=None):
+        """Met les sections en file et attend leur envoi
+
+        Une section déjà en attente (pas encore envoyée) est fusionnée :
+        les deux appels sont résolus par le même POST.
+
+        Args:
+            updates (dict): Sections à envoyer
+            journal (bool): Journaliser la mise à jour en cas d'échec
+            body (bytes): Corps JSON pré-sérialisé de `updates` (optionnel)
+        """
+        journal = journal and self.journal is not None
+
+        # Des actions plus anciennes attendent : conserver l'ordre
+        if journal and self.journal.has_pending():
+            self.journal.record_overlay_updates(updates)
+            logger.warning("📝 Config overlay mise en attente (rejeu en cours)")
+            return False
+
+        request = _PendingUpdate(asyncio.get_event_loop().create_future(), updates, journal, body)
+        for section, values in updates.items():
+            if section in self._pending:
+                self._pending[section].update(values)
+                self.updates_superseded += 1
+            else:
+                self._pending[section] = dict(values)
+            self._waiters.setdefault(section, []).append(request)
+
+        self._pump()
+        return await request.future
+
+    def _pump(self):
+        """Envoie les sections en attente tant que la limite le permet"""
+        while self._pending and self._in_flight < self.max_in_flight:
+            sections = [section for section in self._pending if section not in self._busy]
+            if not sections:
+                return
+
+            updates = {section: self._pending.pop(section) for section in sections}
+            requests = []
+            for section in sections:
+                for request in self._waiters.pop(section, []):
+                    if all(request is not other for other in requests):
+                        requests.append(request)
+
+            # Corps pré-sérialisé utilisable si rien n'a été fusionné
+            body = None
+            if len(requests) == 1 and requests[0].sections == frozenset(sections):
+                body = requests[0].body
+
+            self._busy.update(sections)
+            self._in_flight += 1
+            task = asyncio.ensure_future(self._post(updates, body))
+            task.add_done_callback(functools.partial(self._on_posted, updates, requests))
+
+    async def _post(self, updates, body=None):
+        """POST d'une mise à jour (`body` : JSON déjà sérialisé de `updates`)
+
+        Returns:
+            bool ou None: None si le serveur est injoignable
+        """
+        connection = self._acquire()
+        # Une trace par POST (les appels fusionnés la partagent)
+        trace_id, headers = TRACER.headers()
+        try:
+            with METRICS.timed('subcount_overlay_request_seconds', "Latence des appels config overlay", operation='post'):
+                with TRACER.request(trace_id):
+                    response = await self.retry_policy.run_async(
+                        lambda: connection.request('POST', CONFIG_PATH, body or updates, headers),
+                        breaker=self.breaker,
+                        label="Envoi config overlay"
+                    )
+        finally:
+            self._release(connection)
+        self.requests_sent += 1
+
+        METRICS.counter(
+            'subcount_overlay_requests_total', "Appels config overlay",
+            operation='post', outcome='ok' if response is not None and response.status_code == 200 else 'error'
+        ).inc()
+        if response is None:
+            return None
+        if response.status_code != 200:
+            logger.error(f"HTTP {response.status_code}")
+            return False
+        body = response.body if isinstance(response.body, dict) else {}
+        if body.get('success'):
+            return True
+        logger.error(f"Erreur serveur: {body.get('error')}")
+        return False
+
+    def _on_posted(self, updates, requests, task):
+        """Résout les appels couverts par un POST terminé"""
+        self._in_flight -= 1
+        self._busy.difference_update(updates)
+
+        if task.cancelled():
+            result = False
+        elif task.exception() is not None:
+            logger.error(f"Erreur envoi config: {task.exception()}")
+            result = False
+        else:
+            result = task.result()
+
+        if result is None:
+            # Jamais remise au serveur : journalisée même si le disjoncteur reste fermé
+            if any(request.journal for request in requests):
+                self.journal.record_overlay_updates(updates)
+                logger.warning("📝 Config overlay mise en attente (serveur injoignable)")
+            result = False
+
+        for request in requests:
+            request.remaining.difference_update(updates)
+            request.ok = request.ok and result
+            if not request.remaining and not request.future.done():
+                request.future.set_result(request.ok)
+
+        self._pump()
+
+    def _acquire(self):
+        """Connexion keep-alive libre (créée si besoin)"""
+        if self._idle_connections:
+            return self._idle_connections.pop()
+        return HttpConnection(self.server_url, self.timeout)
+
+    def _release(self, connection):
+        self._idle_connections.append(connection)
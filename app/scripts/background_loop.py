@@ -0,0 +1,115 @@
+# ==================================================================
+# BOUCLE ASYNCIO D'ARRIÈRE-PLAN PARTAGÉE
+# ==================================================================
+# Une seule boucle asyncio, dans un thread démon, à laquelle le script
+# OBS soumet des coroutines sans bloquer le thread de l'interface.
+# `submit()` retourne un concurrent.futures.Future (attendable depuis
+# n'importe quel thread, ou via add_done_callback).
+# ==================================================================
+
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _all_tasks(loop):
+    """Tâches de la boucle (asyncio.all_tasks n'existe qu'en 3.7+)"""
+    if hasattr(asyncio, 'all_tasks'):
+        return asyncio.all_tasks(loop)
+    return asyncio.Task.all_tasks(loop)
+
+
+def _current_task(loop):
+    """Tâche courante (asyncio.current_task n'existe qu'en 3.7+)"""
+    if hasattr(asyncio, 'current_task'):
+        return asyncio.current_task(loop)
+    return asyncio.Task.current_task(loop)
+
+
+class BackgroundLoop:
+    """Boucle asyncio exécutée dans un thread dédié"""
+
+    def __init__(self, name="subcount-async"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """Boucle asyncio (démarrée à la demande)"""
+        self.start()
+        return self._loop
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Démarre le thread de la boucle (idempotent)"""
+        with self._lock:
+            if self.is_running():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coro):
+        """Planifie une coroutine sur la boucle (thread-safe, non bloquant)
+
+        Returns:
+            concurrent.futures.Future: Résultat de la coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Exécute un callback sur le thread de la boucle"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout=2.0):
+        """Annule les tâches en cours puis arrête la boucle et son thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def cancel_pending():
+            current = _current_task(loop)
+            tasks = [task for task in _all_tasks(loop) if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Arrêt de la boucle asynchrone incomplet: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+# Boucle partagée du processus (script OBS)
+_shared_loop = None
+_shared_lock = threading.Lock()
+
+
+def get_background_loop():
+    """Retourne la boucle d'arrière-plan partagée (créée au premier appel)"""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            _shared_loop = BackgroundLoop()
+        return _shared_loop
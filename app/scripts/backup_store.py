@@ -0,0 +1,643 @@
+# ==================================================================
+# SAUVEGARDES INCRÉMENTALES DES DONNÉES UTILISATEUR
+# ==================================================================
+# Sauvegarde l'état du serveur (app/config/app_state.json), les
+# paliers (obs/data/*goal*_config.txt) et la config Twitch chiffrée
+# (obs/data/twitch_config.txt), instances nommées comprises, dans un
+# magasin adressé par contenu :
+#
+#   backups/objects/ab/abcdef...   morceau de fichier (sha256), zlib
+#   backups/snapshots/<id>.json    manifeste : fichier -> morceaux
+#
+# Les fichiers sont découpés en morceaux définis par leur contenu
+# (hachage glissant « gear ») : modifier une ligne d'un gros fichier de
+# paliers n'ajoute qu'un ou deux morceaux, et un morceau déjà présent
+# n'est jamais réécrit. Un fichier dont la taille et la date de
+# modification n'ont pas changé depuis le dernier instantané n'est pas
+# relu ; si rien n'a changé, aucun instantané n'est écrit.
+#
+# La config Twitch est copiée telle quelle (chiffrée avec la clé de la
+# machine) : une restauration ne fonctionne que sur la même machine.
+# ==================================================================
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Fichiers sauvegardés (relatifs à la racine du projet)
+DEFAULT_SOURCES = (
+    'app/config/app_state*.json',
+    'obs/data/followgoal_config*.txt',
+    'obs/data/subgoals_config*.txt',
+    'obs/data/twitch_config*.txt',
+)
+
+# Fichiers de l'instance principale (ceux des instances nommées sont suffixés .<nom>)
+PRIMARY_FILES = (
+    'app/config/app_state.json',
+    'obs/data/followgoal_config.txt',
+    'obs/data/subgoals_config.txt',
+    'obs/data/twitch_config.txt',
+)
+
+# Découpage : morceaux de 2 à 64 Ko, 8 Ko en moyenne
+MIN_CHUNK = 2 * 1024
+AVG_CHUNK_BITS = 13
+MAX_CHUNK = 64 * 1024
+_CHUNK_MASK = ((1 << AVG_CHUNK_BITS) - 1) << (32 - AVG_CHUNK_BITS)
+_GEAR = tuple(int.from_bytes(hashlib.sha256(bytes([value])).digest()[:4], 'little') for value in range(256))
+
+# Un fichier modifié moins de RACY_NS avant l'instantané est relu au
+# suivant même si taille et mtime sont identiques (résolution du mtime)
+RACY_NS = 2 * 10 ** 9
+
+# Objets : 1 octet de format puis le contenu
+_RAW = b'r'
+_ZLIB = b'z'
+
+# Rétention par défaut (prune)
+KEEP_LAST = 24
+KEEP_DAILY = 14
+KEEP_WEEKLY = 8
+KEEP_PRE_UPDATE = 5
+REASON_PRE_UPDATE = 'pre-update'
+
+
+class BackupError(Exception):
+    """Instantané introuvable ou magasin corrompu"""
+
+
+def chunk_boundaries(data, min_size=MIN_CHUNK, max_size=MAX_CHUNK, mask=_CHUNK_MASK):
+    """Fins des morceaux de `data` (découpage défini par le contenu)
+
+    Une coupure est placée quand les bits hauts du hachage glissant sont
+    nuls : une insertion ne décale que les coupures voisines.
+    """
+    length = len(data)
+    cuts = []
+    start = 0
+    gear = _GEAR
+    while start < length:
+        end = min(start + max_size, length)
+        cut = end
+        if start + min_size < end:
+            value = 0
+            for index in range(start + min_size, end):
+                value = ((value << 1) + gear[data[index]]) & 0xFFFFFFFF
+                if not value & mask:
+                    cut = index + 1
+                    break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def _snapshot_id(created):
+    return time.strftime('%Y%m%d-%H%M%S', time.localtime(created)) + f"-{int(created * 1e6) % 1000000:06d}"
+
+
+class BackupStore:
+    """Magasin de sauvegardes adressé par contenu
+
+    Args:
+        directory (str): Dossier du magasin (objects/, snapshots/)
+        root (str): Racine du projet (chemins des manifestes relatifs à elle)
+        sources (tuple): Motifs glob des fichiers sauvegardés
+        compression (int): Niveau zlib (0 = stocké tel quel)
+    """
+
+    def __init__(self, directory, root, sources=DEFAULT_SOURCES, compression=6):
+        self.directory = directory
+        self.root = root
+        self.sources = tuple(sources)
+        self.compression = compression
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.snapshots_dir = os.path.join(directory, 'snapshots')
+        self._lock = threading.RLock()
+        self._latest = None  # Dernier manifeste
+        self._scan = None    # (fichiers, heure ns) du dernier parcours : signatures taille/mtime
+
+    # ------------------------------------------------------------------
+    # Objets
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _put_object(self, data):
+        """Stocke un morceau s'il est absent
+
+        Returns:
+            tuple: (sha256, octets écrits sur disque, 0 si déjà présent)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        payload = _RAW + data
+        if self.compression:
+            compressed = zlib.compress(data, self.compression)
+            if len(compressed) < len(data):
+                payload = _ZLIB + compressed
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.obj-', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return digest, len(payload)
+
+    def _get_object(self, digest):
+        try:
+            with open(self._object_path(digest), 'rb') as f:
+                payload = f.read()
+        except OSError as e:
+            raise BackupError(f"Morceau {digest[:12]} manquant: {e}")
+        data = zlib.decompress(payload[1:]) if payload[:1] == _ZLIB else payload[1:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Morceau {digest[:12]} corrompu")
+        return data
+
+    # ------------------------------------------------------------------
+    # Manifestes
+    # ------------------------------------------------------------------
+
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+
+    def snapshot_ids(self):
+        """Identifiants des instantanés, du plus ancien au plus récent"""
+        try:
+            names = os.listdir(self.snapshots_dir)
+        except OSError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith('.json') and not name.startswith('.'))
+
+    def load(self, snapshot_id):
+        """Manifeste d'un instantané
+
+        Raises:
+            BackupError: Instantané introuvable ou illisible
+        """
+        try:
+            with open(self._manifest_path(snapshot_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise BackupError(f"Instantané '{snapshot_id}' illisible: {e}")
+
+    def latest(self):
+        """Manifeste le plus récent (None si aucun)"""
+        with self._lock:
+            if self._latest is None:
+                ids = self.snapshot_ids()
+                self._latest = self.load(ids[-1]) if ids else None
+            return self._latest
+
+    def snapshots(self):
+        """Résumés des instantanés, du plus récent au plus ancien"""
+        summaries = []
+        for snapshot_id in reversed(self.snapshot_ids()):
+            try:
+                manifest = self.load(snapshot_id)
+            except BackupError as e:
+                logger.warning(f"⚠️ {e}")
+                continue
+            summaries.append({
+                'id': snapshot_id,
+                'created': manifest['created'],
+                'reason': manifest.get('reason'),
+                'files': len(manifest['files']),
+                'bytes': sum(entry['size'] for entry in manifest['files'].values()),
+            })
+        return summaries
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.snap-', dir=self.snapshots_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, self._manifest_path(manifest['id']))
+
+    # ------------------------------------------------------------------
+    # Instantanés
+    # ------------------------------------------------------------------
+
+    def source_files(self):
+        """Fichiers à sauvegarder : {chemin relatif (/) : chemin absolu}"""
+        files = {}
+        for pattern in self.sources:
+            for path in glob.glob(os.path.join(self.root, pattern)):
+                if os.path.isfile(path):
+                    files[os.path.relpath(path, self.root).replace(os.sep, '/')] = path
+        return files
+
+    def _read_stable(self, path, attempts=3):
+        """Contenu et stat d'un fichier qui n'a pas changé pendant la lecture
+
+        Raises:
+            OSError: Fichier illisible ou modifié pendant chaque tentative
+        """
+        for attempt in range(attempts):
+            before = os.stat(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            after = os.stat(path)
+            if before.st_size == after.st_size == len(data) and before.st_mtime_ns == after.st_mtime_ns:
+                return data, after
+            time.sleep(0.05 * (attempt + 1))
+        raise OSError(f"fichier modifié pendant la lecture ({attempts} tentatives)")
+
+    def _store_file(self, data, stats):
+        chunks = []
+        start = 0
+        for end in chunk_boundaries(data):
+            digest, written = self._put_object(data[start:end])
+            chunks.append(digest)
+            stats['new_chunks'] += 1 if written else 0
+            stats['stored_bytes'] += written
+            start = end
+        stats['read_bytes'] += len(data)
+        return hashlib.sha256(data).hexdigest(), chunks
+
+    def snapshot(self, reason='manual', force=False):
+        """Sauvegarde les fichiers sources
+
+        Args:
+            reason (str): Origine ('schedule', 'pre-update', 'manual'...)
+            force (bool): Écrire un instantané même si rien n'a changé
+
+        Returns:
+            dict: id, unchanged (rien écrit), fichiers relus, morceaux et octets ajoutés
+        """
+        started = time.perf_counter()
+        with self._lock:
+            previous = self.latest()
+            previous_files = previous['files'] if previous else {}
+            if self._scan is None:
+                self._scan = (previous_files, previous['created_ns']) if previous else ({}, 0)
+            known_files, scanned_ns = self._scan
+            trusted_before = scanned_ns - RACY_NS
+            scan_ns = int(time.time() * 1e9)
+            stats = {'read_files': 0, 'read_bytes': 0, 'new_chunks': 0, 'stored_bytes': 0}
+
+            files = {}
+            for rel_path, path in sorted(self.source_files().items()):
+                try:
+                    stat = os.stat(path)
+                    known = known_files.get(rel_path)
+                    if (known is not None and known['size'] == stat.st_size
+                            and known['mtime_ns'] == stat.st_mtime_ns and stat.st_mtime_ns < trusted_before):
+                        files[rel_path] = known
+                        continue
+                    data, stat = self._read_stable(path)
+                    sha, chunks = self._store_file(data, stats)
+                except OSError as e:
+                    logger.warning(f"⚠️ Sauvegarde de {rel_path} impossible: {e}")
+                    if rel_path in known_files:
+                        files[rel_path] = known_files[rel_path]
+                    continue
+                stats['read_files'] += 1
+                files[rel_path] = {'size': len(data), 'mtime_ns': stat.st_mtime_ns, 'sha256': sha, 'chunks': chunks}
+
+            unchanged = previous is not None and {
+                name: entry['sha256'] for name, entry in files.items()
+            } == {name: entry['sha256'] for name, entry in previous_files.items()}
+
+            self._scan = (files, scan_ns)
+            if unchanged and not force:
+                snapshot_id = previous['id']
+            else:
+                created = time.time()
+                snapshot_id = _snapshot_id(created)
+                while os.path.exists(self._manifest_path(snapshot_id)):
+                    created += 1e-6
+                    snapshot_id = _snapshot_id(created)
+                manifest = {
+                    'version': MANIFEST_VERSION,
+                    'id': snapshot_id,
+                    'created': created,
+                    'created_ns': scan_ns,
+                    'reason': reason,
+                    'files': files,
+                }
+                self._write_manifest(manifest)
+                self._latest = manifest
+
+        stats.update({
+            'id': snapshot_id,
+            'unchanged': bool(unchanged and not force),
+            'files': len(files),
+            'seconds': round(time.perf_counter() - started, 6),
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Restauration
+    # ------------------------------------------------------------------
+
+    def restore(self, snapshot_id=None, paths=None, target_root=None):
+        """Restaure les fichiers d'un instantané (écriture atomique par fichier)
+
+        Les fichiers déjà identiques ne sont pas réécrits. Les fichiers
+        absents de l'instantané sont laissés en place.
+
+        Args:
+            snapshot_id (str): Instantané (défaut: le plus récent)
+            paths (list): Chemins relatifs à restaurer (défaut: tous)
+            target_root (str): Racine de destination (défaut: racine du projet)
+
+        Returns:
+            dict: Fichiers restaurés et fichiers déjà à jour
+
+        Raises:
+            BackupError: Instantané introuvable ou morceau manquant/corrompu
+        """
+        with self._lock:
+            manifest = self.load(snapshot_id) if snapshot_id else self.latest()
+            if manifest is None:
+                raise BackupError("Aucune sauvegarde")
+            target_root = target_root or self.root
+            wanted = set(paths) if paths else None
+            restored, current = [], []
+
+            for rel_path, entry in sorted(manifest['files'].items()):
+                if wanted is not None and rel_path not in wanted:
+                    continue
+                path = os.path.join(target_root, *rel_path.split('/'))
+                if self._matches(path, entry):
+                    current.append(rel_path)
+                    continue
+                # Tout relire et vérifier avant d'écrire : jamais de fichier à moitié restauré
+                data = b''.join(self._get_object(digest) for digest in entry['chunks'])
+                if hashlib.sha256(data).hexdigest() != entry['sha256']:
+                    raise BackupError(f"{rel_path}: contenu reconstruit invalide")
+                directory = os.path.dirname(path)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix='.restore-', dir=directory)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                restored.append(rel_path)
+
+        logger.info(f"♻️ Sauvegarde {manifest['id']} restaurée: {len(restored)} fichier(s), {len(current)} déjà à jour")
+        return {'id': manifest['id'], 'restored': restored, 'unchanged': current}
+
+    def _matches(self, path, entry):
+        try:
+            if os.path.getsize(path) != entry['size']:
+                return False
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == entry['sha256']
+        except OSError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Rétention
+    # ------------------------------------------------------------------
+
+    def prune(self, keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY,
+              keep_pre_update=KEEP_PRE_UPDATE):
+        """Supprime les instantanés hors rétention puis les morceaux orphelins
+
+        Conservés : les `keep_last` plus récents, le plus récent de chacun
+        des `keep_daily` derniers jours et des `keep_weekly` dernières
+        semaines, et les `keep_pre_update` derniers d'avant mise à jour.
+
+        Returns:
+            dict: Instantanés et morceaux supprimés, octets libérés
+        """
+        keep_last = max(1, keep_last)  # Le dernier instantané sert de base au suivant
+        with self._lock:
+            manifests = []
+            for snapshot_id in reversed(self.snapshot_ids()):
+                try:
+                    manifests.append(self.load(snapshot_id))
+                except BackupError as e:
+                    logger.warning(f"⚠️ {e}")
+
+            keep = {manifest['id'] for manifest in manifests[:keep_last]}
+            keep.update([m['id'] for m in manifests if m.get('reason') == REASON_PRE_UPDATE][:keep_pre_update])
+            for count, period in ((keep_daily, '%Y-%m-%d'), (keep_weekly, '%G-%V')):
+                seen = set()
+                for manifest in manifests:
+                    bucket = time.strftime(period, time.localtime(manifest['created']))
+                    if bucket not in seen and len(seen) < count:
+                        seen.add(bucket)
+                        keep.add(manifest['id'])
+
+            removed = []
+            for manifest in manifests:
+                if manifest['id'] not in keep:
+                    os.remove(self._manifest_path(manifest['id']))
+                    removed.append(manifest['id'])
+
+            referenced = set()
+            for manifest in manifests:
+                if manifest['id'] in keep:
+                    for entry in manifest['files'].values():
+                        referenced.update(entry['chunks'])
+            objects, freed = self._collect_garbage(referenced)
+
+        if removed:
+            logger.info(f"🧹 Sauvegardes: {len(removed)} instantané(s) et {objects} morceau(x) supprimés")
+        return {'removed_snapshots': removed, 'kept': len(keep), 'removed_objects': objects, 'freed_bytes': freed}
+
+    def _collect_garbage(self, referenced):
+        removed = freed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed, freed
+        for prefix in os.listdir(self.objects_dir):
+            directory = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(directory):
+                if prefix + name in referenced:
+                    continue
+                path = os.path.join(directory, name)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+    def disk_usage(self):
+        """Octets occupés par le magasin (objets + manifestes)"""
+        total = 0
+        for directory, _, names in os.walk(self.directory):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+        return total
+
+    def verify(self):
+        """Vérifie que chaque morceau référencé est présent et intact
+
+        Returns:
+            list: Problèmes trouvés (vide si le magasin est sain)
+        """
+        problems = []
+        checked = set()
+        for snapshot_id in self.snapshot_ids():
+            try:
+                manifest = self.load(snapshot_id)
+            except BackupError as e:
+                problems.append(str(e))
+                continue
+            for rel_path, entry in manifest['files'].items():
+                for digest in entry['chunks']:
+                    if digest in checked:
+                        continue
+                    checked.add(digest)
+                    try:
+                        self._get_object(digest)
+                    except BackupError as e:
+                        problems.append(f"{snapshot_id} {rel_path}: {e}")
+        return problems
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def _write(path, data, age=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    if age:
+        # Fichier ancien (hors de la fenêtre RACY_NS), comme en usage réel
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+
+def benchmark(snapshots=500, milestones=20000):
+    """Instantanés répétés d'un projet simulé
+
+    - `snapshots` instantanés planifiés dont 1 sur 10 suit une mise à jour
+      des compteurs (app_state.json) et 1 sur 50 une modification d'un
+      palier au milieu d'un gros fichier de paliers
+    - comparaison avec une copie complète par instantané
+    - restauration d'un ancien instantané vérifiée octet par octet
+    - prune avec la rétention par défaut
+    """
+    import random
+    import shutil
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'project')
+        state_path = os.path.join(root, 'app', 'config', 'app_state.json')
+        goals_path = os.path.join(root, 'obs', 'data', 'followgoal_config.txt')
+        state = {'counters': {'follows': 0, 'subs': 0}, 'overlay': {'font': {'family': 'Arial', 'size': '64px'}}}
+        goal_lines = [f"{index * 10}:Palier {index} atteint !" for index in range(1, milestones + 1)]
+        _write(state_path, json.dumps(state, indent=2).encode('utf-8'), age=3600)
+        _write(goals_path, '\n'.join(goal_lines).encode('utf-8'), age=3600)
+        _write(os.path.join(root, 'obs', 'data', 'subgoals_config.txt'), b'5:Objectif subs\n10:Double objectif\n', age=3600)
+        _write(os.path.join(root, 'obs', 'data', 'twitch_config.txt'), os.urandom(700).hex().encode('ascii'), age=3600)
+
+        store = BackupStore(os.path.join(tmp, 'backups'), root)
+        first = store.snapshot('initial')
+        project_bytes = sum(os.path.getsize(path) for path in store.source_files().values())
+
+        timings = {'unchanged': [], 'state': [], 'goals': []}
+        written = 0
+        history = []
+        for index in range(snapshots):
+            if index % 50 == 49:
+                position = rng.randrange(len(goal_lines))
+                goal_lines[position] = f"{position * 10}:Palier modifié {index}"
+                _write(goals_path, '\n'.join(goal_lines).encode('utf-8'), age=3600)
+                kind = 'goals'
+            elif index % 10 == 9:
+                state['counters']['follows'] += rng.randint(1, 20)
+                _write(state_path, json.dumps(state, indent=2).encode('utf-8'), age=3600)
+                kind = 'state'
+            else:
+                kind = 'unchanged'
+            result = store.snapshot('schedule')
+            timings[kind].append(result['seconds'])
+            written += 0 if result['unchanged'] else 1
+            if not result['unchanged']:
+                history.append((result['id'], state['counters']['follows'], list(goal_lines)))
+
+        usage = store.disk_usage()
+        full_copies = project_bytes * (written + 1)
+
+        # Restauration d'un instantané ancien vers un dossier vide
+        old_id, old_follows, old_goals = history[len(history) // 3]
+        restore_root = os.path.join(tmp, 'restore')
+        started = time.perf_counter()
+        store.restore(old_id, target_root=restore_root)
+        restore_s = time.perf_counter() - started
+        with open(os.path.join(restore_root, 'app', 'config', 'app_state.json'), 'rb') as f:
+            restored_follows = json.loads(f.read().decode('utf-8'))['counters']['follows']
+        with open(os.path.join(restore_root, 'obs', 'data', 'followgoal_config.txt'), 'rb') as f:
+            restored_goals = f.read().decode('utf-8').split('\n')
+
+        # Restauration en place quand rien n'a changé (aucune écriture)
+        started = time.perf_counter()
+        in_place = store.restore()
+        restore_noop_s = time.perf_counter() - started
+
+        pruned = store.prune()
+        problems = store.verify()
+        shutil.rmtree(restore_root)
+
+    def mean_ms(values):
+        return round(sum(values) / len(values) * 1000, 3) if values else None
+
+    return {
+        'snapshots_requested': snapshots,
+        'snapshots_written': written + 1,
+        'project_kb': round(project_bytes / 1024, 1),
+        'initial_snapshot_ms': round(first['seconds'] * 1000, 2),
+        'unchanged_snapshot_ms': mean_ms(timings['unchanged']),
+        'state_change_snapshot_ms': mean_ms(timings['state']),
+        'goals_change_snapshot_ms': mean_ms(timings['goals']),
+        'store_kb': round(usage / 1024, 1),
+        'full_copies_kb': round(full_copies / 1024, 1),
+        'restore_ms': round(restore_s * 1000, 2),
+        'restore_noop_ms': round(restore_noop_s * 1000, 2),
+        'restore_noop_rewrites': len(in_place['restored']),
+        'restore_consistent': restored_follows == old_follows and restored_goals == old_goals,
+        'pruned_snapshots': len(pruned['removed_snapshots']),
+        'pruned_objects': pruned['removed_objects'],
+        'verify_problems': problems[:5],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sauvegardes incrémentales des données SubCount Auto")
+    parser.add_argument('command', nargs='?', default='bench', choices=('bench', 'list', 'snapshot', 'restore', 'prune', 'verify'))
+    parser.add_argument('snapshot_id', nargs='?', help="Instantané à restaurer (défaut: le plus récent)")
+    parser.add_argument('--root', default=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    parser.add_argument('--store', help="Dossier du magasin (défaut: <root>/obs/data/backups)")
+    parser.add_argument('--snapshots', type=int, default=500)
+    parser.add_argument('--milestones', type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.command == 'bench':
+        print(f"\n💾 Benchmark sauvegardes ({args.snapshots} instantanés)")
+        print(json.dumps(benchmark(args.snapshots, args.milestones), indent=2))
+    else:
+        backup_store = BackupStore(args.store or os.path.join(args.root, 'obs', 'data', 'backups'), args.root)
+        if args.command == 'list':
+            for summary in backup_store.snapshots():
+                created = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['created']))
+                print(f"{summary['id']}  {created}  {summary['reason']:<10}  {summary['files']} fichier(s)")
+        elif args.command == 'snapshot':
+            print(json.dumps(backup_store.snapshot('manual'), indent=2))
+        elif args.command == 'restore':
+            print(json.dumps(backup_store.restore(args.snapshot_id), indent=2))
+        elif args.command == 'prune':
+            print(json.dumps(backup_store.prune(), indent=2))
+        else:
+            problems = backup_store.verify()
+            print('\n'.join(problems) if problems else "✅ Magasin de sauvegardes intact")
@@ -0,0 +1,179 @@
+# ==================================================================
+# TRANSACTIONS SERVEUR : PLUSIEURS MUTATIONS, UN SEUL POST /api/batch
+# ==================================================================
+# Préparer un stream enchaîne souvent set-follows, set-subs, les deux
+# objectifs, le mode de comptage et un ou deux changements de config
+# overlay : autant d'allers-retours, d'écritures de l'état et de
+# broadcasts. Une BatchTransaction collecte ces opérations et les
+# envoie en une requête ; le serveur valide tout le lot avant d'en
+# appliquer la moindre partie, écrit l'état une fois et diffuse une
+# fois par compteur / config touché.
+#
+#     with manager.transaction() as tx:
+#         tx.set_follows(120)
+#         tx.set_sub_counter_mode('session')
+#         manager.update_font(family='Arial')   # rejoint le lot
+#
+# Les opérations reprennent les corps des routes du même nom de
+# server.js (utils/batch-operations.js). Le lot porte une clé
+# d'idempotence : une tentative rejouée après une réponse perdue n'est
+# pas appliquée deux fois.
+# ==================================================================
+
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = "/api/batch"
+
+# LIMITS.MAX_BATCH_OPERATIONS (utils/constants.js)
+MAX_OPERATIONS = 50
+
+SUB_COUNTER_MODES = ('realtime', 'session')
+COUNTER_OPERATIONS = {
+    ('follows', 1): 'add-follows',
+    ('follows', -1): 'remove-follows',
+    ('subs', 1): 'add-subs',
+    ('subs', -1): 'remove-subs',
+}
+
+
+def _count(value, name):
+    """Entier positif ou nul (comme parseInt côté serveur, sans les surprises)
+
+    Raises:
+        ValueError: Si la valeur n'est pas un entier >= 0
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{name} doit être un entier >= 0 (reçu: {value!r})")
+    return value
+
+
+class BatchTransaction:
+    """Opérations collectées puis envoyées en un seul POST /api/batch
+
+    Args:
+        send (callable): send(payload, headers) -> dict réponse JSON, ou None
+            si le serveur n'a pas répondu
+
+    Les méthodes de collecte valident leurs arguments (ValueError) : une
+    erreur est signalée à l'appel, pas au commit. Utilisée comme context
+    manager, la transaction est envoyée à la sortie du bloc et abandonnée
+    si le bloc lève une exception.
+    """
+
+    def __init__(self, send):
+        self._send = send
+        self.operations = []
+        self._overlay = None   # Opération 'overlay-config' fusionnée (une seule par lot)
+        self.key = uuid.uuid4().hex
+        self.result = None
+        self.error = None
+        self.committed = False
+
+    # ------------------------------------------------------------------
+    # Collecte
+    # ------------------------------------------------------------------
+
+    def _add(self, operation):
+        if self.committed:
+            raise RuntimeError("Transaction déjà envoyée")
+        if len(self.operations) >= MAX_OPERATIONS:
+            raise ValueError(f"Trop d'opérations dans le lot (max {MAX_OPERATIONS})")
+        self.operations.append(operation)
+        return self
+
+    def set_follows(self, count):
+        return self._add({'op': 'set-follows', 'count': _count(count, 'count')})
+
+    def set_subs(self, count):
+        return self._add({'op': 'set-subs', 'count': _count(count, 'count')})
+
+    def add(self, counter, delta):
+        """Ajustement signé d'un compteur ('follows' ou 'subs'), ignoré si nul"""
+        if counter not in ('follows', 'subs'):
+            raise ValueError(f"Compteur inconnu: {counter!r}")
+        if delta == 0:
+            return self
+        op = COUNTER_OPERATIONS[(counter, 1 if delta > 0 else -1)]
+        return self._add({'op': op, 'amount': _count(abs(delta), 'delta')})
+
+    def set_follow_goal(self, goal):
+        return self._add({'op': 'set-follow-goal', 'goal': _count(goal, 'goal')})
+
+    def set_sub_goal(self, goal):
+        return self._add({'op': 'set-sub-goal', 'goal': _count(goal, 'goal')})
+
+    def set_sub_counter_mode(self, mode):
+        if mode not in SUB_COUNTER_MODES:
+            raise ValueError(f"Mode invalide: {mode!r} (realtime ou session)")
+        return self._add({'op': 'sub-counter-mode', 'mode': mode})
+
+    def update_overlay(self, updates):
+        """Sections de config overlay (déjà validées), fusionnées dans le lot
+
+        Plusieurs mises à jour partent en une seule opération : pour une
+        même section, les dernières valeurs l'emportent clé par clé.
+        """
+        if not updates:
+            return self
+        if self._overlay is None:
+            self._add({'op': 'overlay-config', 'config': {}})
+            self._overlay = self.operations[-1]['config']
+        for section, values in updates.items():
+            if isinstance(values, dict):
+                self._overlay.setdefault(section, {}).update(values)
+            else:
+                self._overlay[section] = values
+        return self
+
+    # ------------------------------------------------------------------
+    # Envoi
+    # ------------------------------------------------------------------
+
+    def payload(self):
+        return {'operations': self.operations}
+
+    @property
+    def ok(self):
+        return self.committed and self.error is None
+
+    def commit(self):
+        """Envoie le lot (une seule fois)
+
+        Returns:
+            bool: True si le serveur a appliqué tout le lot (lot vide compris)
+        """
+        if self.committed:
+            return self.error is None
+        self.committed = True
+        if not self.operations:
+            return True
+
+        response = self._send(self.payload(), {'Idempotency-Key': self.key})
+        if response is None:
+            self.error = "Serveur injoignable"
+        elif not response.get('success'):
+            index = response.get('index')
+            where = f" (opération {index}: {self.operations[index]['op']})" if isinstance(index, int) \
+                and 0 <= index < len(self.operations) else ""
+            self.error = f"{response.get('error', 'Lot refusé')}{where}"
+        else:
+            self.result = response
+
+        if self.error is not None:
+            logger.error(f"❌ Lot de {len(self.operations)} opération(s) non appliqué: {self.error}")
+            return False
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.committed = True
+            self.error = f"Abandonnée: {exc}"
+        return False
@@ -0,0 +1,430 @@
+# ==================================================================
+# DÉCOUVERTE DES POLICES INSTALLÉES (MULTIPLATEFORME)
+# ==================================================================
+# Sources de fichiers de police interchangeables :
+# - RegistryFontBackend : registre Windows (HKLM + HKCU), si winreg
+#   est disponible
+# - DirectoryFontBackend : arborescences de dossiers parcourues
+#   récursivement avec os.scandir, chaque dossier étant scanné dans un
+#   pool de threads (les appels système libèrent le GIL)
+#
+# default_backends() choisit les sources de la plateforme :
+#   Windows : registre + %WINDIR%\Fonts + %LOCALAPPDATA%\...\Fonts
+#   macOS   : /System/Library/Fonts, /Library/Fonts, ~/Library/Fonts
+#   Linux   : arborescences fontconfig (/usr/share/fonts,
+#             ~/.local/share/fonts, ~/.fonts...)
+#
+# Toutes les sources alimentent le même traitement : familles lues via
+# FontMetadataCache (repli sur le nom du fichier ou de la valeur de
+# registre), dédoublonnage, filtre des polices système et ordre de
+# priorité.
+# ==================================================================
+
+import logging
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from font_metadata import FONT_EXTENSIONS
+
+# Import optionnel de winreg (Windows uniquement)
+try:
+    import winreg
+    WINREG_AVAILABLE = True
+except ImportError:
+    WINREG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FONTS_KEY = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts"
+DEFAULT_SCAN_WORKERS = 8
+
+# Polices prioritaires en tête de liste
+PRIORITY_FONTS = ["SEA", "Arial", "Verdana", "Times New Roman", "Courier New", "Georgia", "Impact", "Comic Sans MS"]
+FALLBACK_FONTS = ["Arial", "Verdana", "Georgia", "Impact", "Courier New", "Times New Roman"]
+
+# Fichier de police trouvé par une source ; `hint` sert de nom de repli
+FontFile = namedtuple('FontFile', ['path', 'stat', 'hint'])
+
+
+# ==================================================================
+# NOMS DE REPLI (fichiers illisibles)
+# ==================================================================
+
+# Suffixes de variantes à retirer (ordre important: du plus long au plus court)
+VARIANT_SUFFIXES = [
+    # Composés (les plus longs d'abord)
+    '-BoldItalic', '-SemiBoldItalic', '-LightItalic', '-ExtraBoldItalic',
+    ' Bold Italic', ' Gras Italique', ' Extra Bold', ' Extra Light',
+    ' Semi Bold', ' Demi Bold', ' Ultra Bold', ' Ultra Light',
+    ' Bold Italique', ' Ext Condensed Bold', ' Ultra Bold Condensed',
+    # Simples
+    '-Bold', '-Italic', '-Light', '-Regular', '-Medium', '-Thin', '-Black',
+    '-SemiBold', '-DemiBold', '-ExtraBold', '-ExtraLight', '-Heavy',
+    ' Bold', ' Italic', ' Light', ' Regular', ' Medium', ' Thin', ' Black',
+    ' Heavy', ' SemiBold', ' Semibold', ' DemiBold', ' Demibold',
+    ' ExtraBold', ' ExtraLight', ' UltraLight', ' UltraBold',
+    ' Condensed', ' Extended', ' Narrow', ' Wide', ' Normal', ' Book', ' Roman',
+    ' Oblique', ' Semilight', ' SemiLight',
+    ' Gras', ' Italique', ' Léger', ' Maigre',
+    # Suffixes courts en dernier
+    ' MT', ' ITC', ' LT', ' UI'
+]
+
+# Mots qui indiquent une variante quand ils apparaissent
+VARIANT_WORDS = [
+    'bold', 'italic', 'oblique', 'light', 'thin', 'medium', 'black', 'heavy',
+    'semibold', 'demibold', 'extrabold', 'extralight', 'ultralight', 'ultrabold',
+    'semilight', 'condensed', 'extended', 'narrow', 'wide',
+    'gras', 'italique', 'léger', 'maigre'
+]
+
+# Polices bitmap/système connues
+EXCLUDED_PATTERNS = [
+    'vga', 'oem', 'fix', 'terminal', 'system', 'fixedsys', 'modern', 'roman', 'script',
+    'small fonts', 'ms sans serif', 'ms serif', 'courier', 'marlett', 'symbol',
+    'wingdings', 'webdings', 'holomdl2', 'segoe mdl2', 'segoe fluent'
+]
+
+
+def is_variant_name(name):
+    """Vérifie si le nom indique une variante"""
+    name_lower = name.lower()
+    for word in VARIANT_WORDS:
+        # Le mot doit être précédé d'un espace ou tiret (pas au début du nom)
+        if f' {word}' in name_lower or f'-{word}' in name_lower:
+            return True
+    return False
+
+
+def is_excluded_family(name):
+    """Polices système obsolètes ou bitmap/symboles connues"""
+    if len(name) <= 1:
+        return True
+    # Polices système obsolètes (commencent par des chiffres comme 8514fix, 8514oem)
+    if name[0].isdigit():
+        return True
+    name_lower = name.lower()
+    for pattern in EXCLUDED_PATTERNS:
+        if pattern in name_lower and len(name) < 15:  # Seulement les noms courts
+            return True
+    return False
+
+
+def guess_family(name):
+    """Nom de famille deviné d'un nom de valeur de registre ou de fichier
+
+    Returns:
+        str ou None: None si le nom désigne une variante ou une police exclue
+    """
+    clean = name.strip()
+
+    # Retirer ce qui est entre parenthèses (TrueType), (OpenType), etc.
+    if '(' in clean:
+        clean = clean.split('(')[0].strip()
+
+    # Retirer les & et ce qui suit
+    if ' & ' in clean:
+        clean = clean.split(' & ')[0].strip()
+
+    # Retirer les suffixes de variante
+    for suffix in VARIANT_SUFFIXES:
+        if clean.lower().endswith(suffix.lower()):
+            clean = clean[:-len(suffix)].strip()
+
+    # Retirer les suffixes comme -Regular, _Regular
+    clean = re.sub(r'[-_](Regular|Normal|Book|Roman)$', '', clean, flags=re.IGNORECASE)
+
+    # Retirer les patterns comme [wght] pour les polices variables
+    clean = re.sub(r'\[.*?\]', '', clean).strip()
+
+    if not clean or is_excluded_family(clean) or is_variant_name(clean):
+        return None
+    return clean
+
+
+# ==================================================================
+# SOURCES
+# ==================================================================
+
+class RegistryFontBackend:
+    """Polices déclarées dans le registre Windows (valeur = fichier)"""
+
+    name = "registre"
+
+    def __init__(self, fonts_dir=None, roots=None):
+        self.fonts_dir = fonts_dir or os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
+        self.roots = roots
+
+    def available(self):
+        return WINREG_AVAILABLE
+
+    def files(self):
+        roots = self.roots or [winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER]
+        found = []
+        for root in roots:
+            try:
+                key = winreg.OpenKey(root, REGISTRY_FONTS_KEY)
+            except OSError as e:
+                logger.debug(f"Clé de registre des polices absente: {e}")
+                continue
+            try:
+                index = 0
+                while True:
+                    try:
+                        font_name, font_file, _ = winreg.EnumValue(key, index)
+                    except OSError:
+                        break
+                    index += 1
+                    if isinstance(font_file, str) and font_file.lower().endswith(FONT_EXTENSIONS):
+                        # Chemin relatif = dossier système ; absolu pour les polices utilisateur
+                        found.append(FontFile(os.path.join(self.fonts_dir, font_file), None, font_name))
+                    else:
+                        found.append(FontFile(None, None, font_name))
+            finally:
+                winreg.CloseKey(key)
+        return found
+
+    def __repr__(self):
+        return "RegistryFontBackend()"
+
+
+class DirectoryFontBackend:
+    """Fichiers de police d'arborescences de dossiers (scan parallèle)
+
+    Args:
+        roots (list): Dossiers racines (les absents sont ignorés)
+        recursive (bool): Descendre dans les sous-dossiers
+        max_workers (int): Threads de scan (1 = séquentiel)
+    """
+
+    name = "dossiers"
+
+    def __init__(self, roots, recursive=True, max_workers=DEFAULT_SCAN_WORKERS):
+        self.roots = [root for root in roots if root]
+        self.recursive = recursive
+        self.max_workers = max(1, max_workers)
+        self.directories_scanned = 0
+
+    def available(self):
+        return any(os.path.isdir(root) for root in self.roots)
+
+    def _scan_directory(self, path):
+        """Fichiers de police et sous-dossiers d'un dossier"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(FONT_EXTENSIONS):
+                            files.append(FontFile(entry.path, entry.stat(), os.path.splitext(entry.name)[0]))
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Dossier de polices illisible {path}: {e}")
+        return files, subdirs
+
+    def files(self):
+        pending = [root for root in self.roots if os.path.isdir(root)]
+        found = []
+        self.directories_scanned = 0
+        if self.max_workers == 1:
+            while pending:
+                files, subdirs = self._scan_directory(pending.pop())
+                self.directories_scanned += 1
+                found.extend(files)
+                pending.extend(subdirs)
+            return found
+
+        # Chaque sous-dossier découvert est soumis dès qu'il est connu
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="subcount-fontscan") as pool:
+            running = {pool.submit(self._scan_directory, root) for root in pending}
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    self.directories_scanned += 1
+                    found.extend(files)
+                    running.update(pool.submit(self._scan_directory, subdir) for subdir in subdirs)
+        return found
+
+    def __repr__(self):
+        return f"DirectoryFontBackend({self.roots!r}, recursive={self.recursive})"
+
+
+def default_backends(platform=None, environ=None):
+    """Sources de polices de la plateforme courante"""
+    platform = platform or sys.platform
+    environ = os.environ if environ is None else environ
+    home = os.path.expanduser('~')
+
+    if platform.startswith('win'):
+        system_dir = os.path.join(environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
+        user_dir = os.path.join(environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts')
+        return [
+            RegistryFontBackend(system_dir),
+            DirectoryFontBackend([user_dir, system_dir], recursive=False),
+        ]
+    if platform == 'darwin':
+        return [DirectoryFontBackend([
+            '/System/Library/Fonts', '/Library/Fonts', os.path.join(home, 'Library', 'Fonts')
+        ])]
+
+    data_home = environ.get('XDG_DATA_HOME') or os.path.join(home, '.local', 'share')
+    roots = [os.path.join(data_home, 'fonts'), os.path.join(home, '.fonts')]
+    for data_dir in (environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':'):
+        if data_dir:
+            roots.append(os.path.join(data_dir, 'fonts'))
+    # Dédoublonnage en gardant l'ordre (XDG_DATA_DIRS peut répéter des dossiers)
+    unique = []
+    for root in roots:
+        if root not in unique:
+            unique.append(root)
+    return [DirectoryFontBackend(unique)]
+
+
+# ==================================================================
+# FAMILLES
+# ==================================================================
+
+def order_families(families, priority=PRIORITY_FONTS):
+    """Dédoublonne (sans casse), trie, met les polices prioritaires en tête
+
+    Arial est toujours présente.
+    """
+    unique = {}
+    for family in families:
+        unique.setdefault(family.lower(), family)
+
+    result = []
+    for font in priority:
+        match = unique.pop(font.lower(), None)
+        if match is not None:
+            result.append(match)
+    result.extend(sorted(unique.values(), key=str.lower))
+
+    if not any(font.lower() == 'arial' for font in result):
+        result.insert(0, 'Arial')
+    return result
+
+
+def discover_font_families(backends, metadata_cache, priority=PRIORITY_FONTS, stats=None):
+    """Familles de toutes les sources, dédoublonnées et ordonnées
+
+    Args:
+        backends (list): Sources (RegistryFontBackend, DirectoryFontBackend...)
+        metadata_cache (FontMetadataCache): Noms lus dans les fichiers
+        stats (dict): Rempli avec le nombre de fichiers par source (optionnel)
+
+    Returns:
+        list: Noms de familles
+    """
+    families = []
+    seen_paths = set()
+    for backend in backends:
+        if not backend.available():
+            continue
+        try:
+            font_files = backend.files()
+        except Exception as e:
+            logger.warning(f"⚠️ Source de polices '{backend.name}' en erreur: {e}")
+            continue
+        if stats is not None:
+            stats[backend.name] = len(font_files)
+
+        for font_file in font_files:
+            read = []
+            if font_file.path is not None:
+                key = os.path.normcase(font_file.path)
+                if key in seen_paths:
+                    continue
+                seen_paths.add(key)
+                read = metadata_cache.families(font_file.path, font_file.stat)
+            if read:
+                families.extend(family for family in read if not is_excluded_family(family))
+            else:
+                guessed = guess_family(font_file.hint or '')
+                if guessed:
+                    families.append(guessed)
+    return order_families(families, priority)
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def _write_font_tree(root, directories, files_per_directory, depth=3):
+    """Arborescence de type fontconfig (familles réparties dans des sous-dossiers)"""
+    from font_metadata import write_fixture_fonts
+
+    for index in range(directories):
+        parts = [f"foundry{index % 4}", f"type{index % 3}"][:max(0, depth - 1)] + [f"family{index}"]
+        directory = os.path.join(root, *parts)
+        write_fixture_fonts(directory, files_per_directory, padding=4096)
+
+
+def benchmark(directories=200, files_per_directory=25, workers=DEFAULT_SCAN_WORKERS):
+    """Scan d'une grande arborescence de polices générée (Linux/macOS/Windows)
+
+    Compare le scan séquentiel (un os.scandir après l'autre) au scan
+    parallèle, puis la découverte complète à froid et avec cache.
+    Mesure aussi les arborescences réelles de la machine si présentes.
+    """
+    import tempfile
+    import time
+    from font_metadata import FontMetadataCache
+
+    def timed(fn):
+        started = time.perf_counter()
+        result = fn()
+        return result, round(time.perf_counter() - started, 4)
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_font_tree(tmp, directories, files_per_directory)
+        sequential = DirectoryFontBackend([tmp], max_workers=1)
+        parallel = DirectoryFontBackend([tmp], max_workers=workers)
+        files, report['scan_sequential_s'] = timed(sequential.files)
+        _, report['scan_parallel_s'] = timed(parallel.files)
+        report['files'] = len(files)
+        report['directories'] = parallel.directories_scanned
+
+        cache = FontMetadataCache()
+        families, report['discover_cold_s'] = timed(lambda: discover_font_families([parallel], cache))
+        _, report['discover_cached_s'] = timed(lambda: discover_font_families([parallel], cache))
+        report['families'] = len(families)
+
+    system = default_backends()
+    if any(backend.available() for backend in system):
+        cache = FontMetadataCache()
+        stats = {}
+        families, report['system_discover_cold_s'] = timed(lambda: discover_font_families(system, cache, stats=stats))
+        report['system_files'] = stats
+        report['system_families'] = len(families)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Découverte des polices installées")
+    parser.add_argument('--list', action='store_true', help="Lister les familles de la machine")
+    parser.add_argument('--directories', type=int, default=200)
+    parser.add_argument('--files-per-directory', type=int, default=25)
+    parser.add_argument('--workers', type=int, default=DEFAULT_SCAN_WORKERS)
+    args = parser.parse_args()
+
+    if args.list:
+        from font_metadata import FontMetadataCache
+        for family in discover_font_families(default_backends(), FontMetadataCache()):
+            print(family)
+    else:
+        print("\n🔤 Benchmark découverte des polices")
+        print(json.dumps(benchmark(args.directories, args.files_per_directory, args.workers), indent=2))
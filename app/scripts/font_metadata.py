@@ -0,0 +1,479 @@
+# ==================================================================
+# LECTURE DES NOMS DE POLICES (TABLE 'name' TRUETYPE / OPENTYPE)
+# ==================================================================
+# Les noms de famille sont lus dans les fichiers de police eux-mêmes
+# au lieu d'être devinés depuis les noms de fichier ("arialbd",
+# "seguisb") : chaque fichier TTF/OTF/TTC est projeté en mémoire
+# (mmap) et seuls l'en-tête, le répertoire des tables et la table
+# 'name' sont lus. Les collections .ttc donnent une entrée par police.
+#
+# Identifiants lus (spécification OpenType, table 'name') :
+#   1  famille               ex. "Segoe UI Semibold"
+#   2  sous-famille          ex. "Regular"
+#   16 famille typographique ex. "Segoe UI"
+#   17 sous-famille typo.    ex. "Semibold"
+#
+# FontMetadataCache mémorise les résultats par chemin, validés par
+# taille et date de modification, et peut être persisté en JSON.
+# ==================================================================
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc', '.otc')
+CACHE_VERSION = 1
+
+NAME_FAMILY = 1
+NAME_SUBFAMILY = 2
+NAME_TYPOGRAPHIC_FAMILY = 16
+NAME_TYPOGRAPHIC_SUBFAMILY = 17
+WANTED_NAME_IDS = (NAME_FAMILY, NAME_SUBFAMILY, NAME_TYPOGRAPHIC_FAMILY, NAME_TYPOGRAPHIC_SUBFAMILY)
+
+# Versions sfnt acceptées : TrueType, OpenType CFF, TrueType Apple
+SFNT_VERSIONS = (b'\x00\x01\x00\x00', b'OTTO', b'true')
+TTC_TAG = b'ttcf'
+MAX_COLLECTION_FONTS = 1024
+
+PLATFORM_UNICODE = 0
+PLATFORM_MAC = 1
+PLATFORM_WINDOWS = 3
+LANGUAGE_EN_US = 0x0409
+
+# Une police de la collection (ou du fichier)
+FontFace = namedtuple('FontFace', ['family', 'subfamily', 'typographic_family', 'typographic_subfamily'])
+
+
+def preferred_family(face):
+    """Famille « mère » : typographique (16) si présente, sinon famille (1)"""
+    return face.typographic_family or face.family
+
+
+class FontFormatError(ValueError):
+    """Fichier qui n'est pas une police sfnt lisible"""
+
+
+# ==================================================================
+# LECTURE
+# ==================================================================
+
+def _unpack(fmt, data, offset):
+    try:
+        return struct.unpack_from(fmt, data, offset)
+    except struct.error:
+        raise FontFormatError(f"Structure tronquée à l'offset {offset}")
+
+
+def _name_priority(platform_id, encoding_id, language_id):
+    """Rang d'un enregistrement (plus petit = préféré), None si illisible"""
+    if platform_id == PLATFORM_WINDOWS and encoding_id in (0, 1, 10):
+        if language_id == LANGUAGE_EN_US:
+            return 0
+        return 1 if language_id & 0xFF == 0x09 else 2
+    if platform_id == PLATFORM_UNICODE:
+        return 3
+    if platform_id == PLATFORM_MAC and encoding_id == 0:
+        return 4 if language_id == 0 else 5
+    return None
+
+
+def _decode_name(platform_id, raw):
+    if platform_id == PLATFORM_MAC:
+        return raw.decode('mac_roman', 'replace')
+    return raw.decode('utf-16-be', 'replace')
+
+
+def _read_face(data, offset):
+    """Noms d'une police dont le répertoire de tables commence à `offset`"""
+    if data[offset:offset + 4] not in SFNT_VERSIONS:
+        raise FontFormatError("Version sfnt inconnue")
+    num_tables, = _unpack('>H', data, offset + 4)
+
+    name_offset = name_length = None
+    for index in range(num_tables):
+        tag, _, table_offset, table_length = _unpack('>4sIII', data, offset + 12 + index * 16)
+        if tag == b'name':
+            name_offset, name_length = table_offset, table_length
+            break
+    if name_offset is None:
+        raise FontFormatError("Table 'name' absente")
+    if name_offset + name_length > len(data):
+        raise FontFormatError("Table 'name' hors du fichier")
+
+    _, count, string_offset = _unpack('>HHH', data, name_offset)
+    storage = name_offset + string_offset
+    best = {}
+    for index in range(count):
+        platform_id, encoding_id, language_id, name_id, length, value_offset = _unpack(
+            '>HHHHHH', data, name_offset + 6 + index * 12
+        )
+        if name_id not in WANTED_NAME_IDS:
+            continue
+        priority = _name_priority(platform_id, encoding_id, language_id)
+        if priority is None or (name_id in best and best[name_id][0] <= priority):
+            continue
+        start = storage + value_offset
+        if start + length > len(data):
+            continue
+        best[name_id] = (priority, platform_id, start, length)
+
+    names = {}
+    for name_id, (_, platform_id, start, length) in best.items():
+        names[name_id] = _decode_name(platform_id, bytes(data[start:start + length])).strip('\x00 ') or None
+    if not names.get(NAME_FAMILY) and not names.get(NAME_TYPOGRAPHIC_FAMILY):
+        raise FontFormatError("Aucun nom de famille")
+    return FontFace(
+        names.get(NAME_FAMILY), names.get(NAME_SUBFAMILY),
+        names.get(NAME_TYPOGRAPHIC_FAMILY), names.get(NAME_TYPOGRAPHIC_SUBFAMILY)
+    )
+
+
+def parse_font_names(data):
+    """Polices décrites par un contenu sfnt/TTC (bytes, mmap...)
+
+    Returns:
+        list: FontFace (une par police de la collection)
+
+    Raises:
+        FontFormatError: Si le contenu n'est pas une police lisible
+    """
+    if data[:4] == TTC_TAG:
+        num_fonts, = _unpack('>I', data, 8)
+        if num_fonts > MAX_COLLECTION_FONTS:
+            raise FontFormatError(f"Collection invalide ({num_fonts} polices annoncées)")
+        offsets = _unpack(f'>{num_fonts}I', data, 12)
+        faces = []
+        for offset in offsets:
+            try:
+                faces.append(_read_face(data, offset))
+            except FontFormatError as e:
+                logger.debug(f"Police {offset} de la collection ignorée: {e}")
+        if not faces:
+            raise FontFormatError("Collection sans police lisible")
+        return faces
+    return [_read_face(data, 0)]
+
+
+def read_font_names(path):
+    """Lit les noms d'un fichier de police sans le charger entièrement
+
+    Raises:
+        FontFormatError: Fichier vide, tronqué ou qui n'est pas une police
+        OSError: Fichier illisible
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise FontFormatError("Fichier vide")
+        try:
+            return parse_font_names(data)
+        finally:
+            data.close()
+
+
+# ==================================================================
+# CACHE
+# ==================================================================
+
+class FontMetadataCache:
+    """Noms de polices par chemin, invalidés si taille ou mtime changent
+
+    Les fichiers illisibles sont aussi mémorisés (liste vide) pour ne
+    pas être relus à chaque scan.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path:
+            self.load()
+
+    def get(self, font_path, stat=None):
+        """Polices du fichier (lues si absentes du cache ou modifiées)
+
+        Args:
+            stat (os.stat_result): Résultat de stat déjà obtenu (ex. os.scandir)
+
+        Returns:
+            list: FontFace (vide si le fichier n'est pas une police lisible)
+        """
+        try:
+            stat = stat or os.stat(font_path)
+        except OSError:
+            return []
+        signature = (stat.st_size, stat.st_mtime_ns)
+        entry = self._entries.get(font_path)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        try:
+            faces = read_font_names(font_path)
+        except (FontFormatError, OSError) as e:
+            logger.debug(f"Police illisible {font_path}: {e}")
+            faces = []
+        with self._lock:
+            self._entries[font_path] = (signature, faces)
+            self._dirty = True
+        return faces
+
+    def families(self, font_path, stat=None):
+        """Familles « mères » distinctes du fichier"""
+        seen = []
+        for face in self.get(font_path, stat):
+            family = preferred_family(face)
+            if family and family not in seen:
+                seen.append(family)
+        return seen
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Charge le cache persisté (absent ou illisible = vide)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Cache des polices illisible ({e}) - reconstruction")
+            return
+        if data.get('version') != CACHE_VERSION:
+            return
+        entries = {}
+        for font_path, (size, mtime_ns, faces) in (data.get('fonts') or {}).items():
+            entries[font_path] = ((size, mtime_ns), [FontFace(*face) for face in faces])
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+
+    def save(self):
+        """Écriture atomique (seulement si le cache a changé)"""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = {
+                'version': CACHE_VERSION,
+                'fonts': {
+                    font_path: [size, mtime_ns, [list(face) for face in faces]]
+                    for font_path, ((size, mtime_ns), faces) in self._entries.items()
+                },
+            }
+            self._dirty = False
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.fonts-', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+# ==================================================================
+# POLICES DE TEST (fixtures générées)
+# ==================================================================
+
+def _name_table(names):
+    """Table 'name' format 0 : chaque nom en Windows/en-US et en Mac/anglais"""
+    records = []
+    storage = b''
+    for name_id, value in sorted(names.items()):
+        for platform_id, encoding_id, language_id, raw in (
+            (PLATFORM_MAC, 0, 0, value.encode('mac_roman', 'replace')),
+            (PLATFORM_WINDOWS, 1, LANGUAGE_EN_US, value.encode('utf-16-be')),
+        ):
+            records.append((platform_id, encoding_id, language_id, name_id, len(raw), len(storage)))
+            storage += raw
+    records.sort()
+    header = struct.pack('>HHH', 0, len(records), 6 + 12 * len(records))
+    return header + b''.join(struct.pack('>HHHHHH', *record) for record in records) + storage
+
+
+def _sfnt(tables, sfnt_version, base_offset):
+    """Police sfnt dont les tables commencent après son répertoire"""
+    directory_size = 12 + 16 * len(tables)
+    offset = base_offset + directory_size
+    directory = struct.pack('>4sHHHH', sfnt_version, len(tables), 0, 0, 0)
+    body = b''
+    for tag, data in tables:
+        directory += struct.pack('>4sIII', tag, 0, offset + len(body), len(data))
+        body += data + b'\x00' * (-len(data) % 4)
+    return directory + body
+
+
+def build_fixture_font(family, subfamily="Regular", typographic_family=None,
+                       typographic_subfamily=None, cff=False, padding=0):
+    """Police minimale (répertoire + table 'name' + table de remplissage)
+
+    Args:
+        padding (int): Taille d'une table 'glyf' factice (simule les glyphes)
+    """
+    names = {NAME_FAMILY: family, NAME_SUBFAMILY: subfamily}
+    if typographic_family:
+        names[NAME_TYPOGRAPHIC_FAMILY] = typographic_family
+    if typographic_subfamily:
+        names[NAME_TYPOGRAPHIC_SUBFAMILY] = typographic_subfamily
+    # Le remplissage précède 'name' : le lecteur doit sauter les glyphes
+    tables = [(b'glyf', b'\x00' * padding), (b'name', _name_table(names))]
+    return _sfnt(tables, b'OTTO' if cff else b'\x00\x01\x00\x00', 0)
+
+
+def build_fixture_collection(faces, padding=0):
+    """Collection .ttc : `faces` = liste de dicts d'arguments de build_fixture_font"""
+    header_size = 12 + 4 * len(faces)
+    fonts = []
+    offset = header_size
+    for face in faces:
+        names = {NAME_FAMILY: face['family'], NAME_SUBFAMILY: face.get('subfamily', 'Regular')}
+        if face.get('typographic_family'):
+            names[NAME_TYPOGRAPHIC_FAMILY] = face['typographic_family']
+        if face.get('typographic_subfamily'):
+            names[NAME_TYPOGRAPHIC_SUBFAMILY] = face['typographic_subfamily']
+        font = _sfnt([(b'glyf', b'\x00' * padding), (b'name', _name_table(names))], b'\x00\x01\x00\x00', offset)
+        fonts.append((offset, font))
+        offset += len(font)
+    header = struct.pack('>4sHHI', TTC_TAG, 1, 0, len(faces))
+    header += b''.join(struct.pack('>I', font_offset) for font_offset, _ in fonts)
+    return header + b''.join(font for _, font in fonts)
+
+
+def write_fixture_fonts(directory, count, padding=64 * 1024):
+    """Écrit `count` polices variées (TTF, OTF, TTC, fichiers invalides)
+
+    Returns:
+        dict: nom de fichier -> familles attendues
+    """
+    os.makedirs(directory, exist_ok=True)
+    expected = {}
+    weights = ['Regular', 'Bold', 'Semibold', 'Light', 'Italic']
+    for index in range(count):
+        family = f"Fixture Sans {index // len(weights)}"
+        weight = weights[index % len(weights)]
+        kind = index % 10
+        if kind == 9:
+            name, data = f"broken{index}.ttf", b'\x00\x01\x00\x00' + b'\xff' * 32
+            families = []
+        elif kind == 8:
+            name = f"fixcol{index}.ttc"
+            data = build_fixture_collection([
+                {'family': family, 'subfamily': 'Regular'},
+                {'family': f"{family} UI", 'subfamily': 'Regular'},
+            ], padding=padding // 2)
+            families = [family, f"{family} UI"]
+        elif weight in ('Regular', 'Bold', 'Italic'):
+            name = f"fix{index}{weight[0].lower()}.{'otf' if kind % 2 else 'ttf'}"
+            data = build_fixture_font(family, weight, cff=bool(kind % 2), padding=padding)
+            families = [family]
+        else:
+            # Style hors des 4 de base : famille 1 suffixée, famille typographique 16
+            name = f"fix{index}{weight[:2].lower()}.ttf"
+            data = build_fixture_font(f"{family} {weight}", "Regular", family, weight, padding=padding)
+            families = [family]
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(data)
+        expected[name] = families
+    return expected
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def _read_names_full(path):
+    """Lecture complète du fichier en mémoire (référence du benchmark)"""
+    with open(path, 'rb') as f:
+        return parse_font_names(f.read())
+
+
+def benchmark(files=3000, padding=256 * 1024):
+    """Lecture des familles de `files` polices générées (~`padding` octets chacune)
+
+    Compare lecture complète (read()), mmap à froid, cache mémoire à
+    chaud et cache rechargé depuis le disque (nouvelle session OBS).
+    """
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fonts_dir = os.path.join(tmp, 'fonts')
+        expected = write_fixture_fonts(fonts_dir, files, padding)
+        entries = [(entry.path, entry.name, entry.stat()) for entry in os.scandir(fonts_dir)]
+        total_mb = sum(stat.st_size for _, _, stat in entries) / (1024 * 1024)
+
+        def run(read):
+            started = time.perf_counter()
+            for path, _, stat in entries:
+                try:
+                    read(path, stat)
+                except FontFormatError:
+                    pass
+            return round(time.perf_counter() - started, 4)
+
+        full = run(lambda path, stat: _read_names_full(path))
+        mapped = run(lambda path, stat: read_font_names(path))
+
+        cache_path = os.path.join(tmp, 'font_cache.json')
+        cache = FontMetadataCache(cache_path)
+        cold = run(cache.get)
+        warm = run(cache.get)
+        cache.save()
+        reloaded_cache = FontMetadataCache(cache_path)
+        reloaded = run(reloaded_cache.get)
+
+        mismatches = [
+            name for path, name, stat in entries
+            if reloaded_cache.families(path, stat) != expected[name]
+        ]
+
+    return {
+        'files': files,
+        'total_mb': round(total_mb, 1),
+        'full_read_s': full,
+        'mmap_s': mapped,
+        'cache_cold_s': cold,
+        'cache_warm_s': warm,
+        'cache_reloaded_s': reloaded,
+        'reloaded_hits': reloaded_cache.hits,
+        'family_mismatches': mismatches[:10],
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        # python font_metadata.py <police ou dossier>...
+        for target in sys.argv[1:]:
+            paths = [target]
+            if os.path.isdir(target):
+                paths = sorted(entry.path for entry in os.scandir(target) if entry.name.lower().endswith(FONT_EXTENSIONS))
+            for path in paths:
+                try:
+                    for face in read_font_names(path):
+                        print(f"{os.path.basename(path)}: {preferred_family(face)} ({face.typographic_subfamily or face.subfamily})")
+                except (FontFormatError, OSError) as e:
+                    print(f"{os.path.basename(path)}: ⚠️ {e}")
+    else:
+        print("\n🔤 Benchmark lecture des noms de polices")
+        print(json.dumps(benchmark(), indent=2))
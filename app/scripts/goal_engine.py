@@ -0,0 +1,334 @@
+# ==================================================================
+# MOTEUR D'OBJECTIFS (PALIERS FOLLOWS / SUBS)
+# ==================================================================
+# Lit obs/data/followgoal_config.txt et subgoals_config.txt (format
+# "N: message") et calcule l'objectif courant/suivant localement,
+# sans appel HTTP, avec la même sémantique que goals-factory.js.
+#
+# Les paliers sont gardés dans un tableau trié : chaque recherche est
+# une bisection O(log n), même avec des dizaines de milliers de paliers.
+# Les fichiers ne sont relus que si leur mtime/taille change.
+#
+# Le rendu texte natif (obs/native_overlay) en tire le message du
+# palier, rechargé à chaud à chaque tick de rendu.
+# ==================================================================
+
+import logging
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+logger = logging.getLogger(__name__)
+
+# Même découpage et même regex que parseGoalsFile() côté serveur
+LINE_SPLIT_PATTERN = re.compile(r'\r?\n')
+GOAL_LINE_PATTERN = re.compile(r'^(\d+):\s*(.*?)\s*$')
+
+# Plus grand palier représentable (entier sûr JavaScript)
+MAX_GOAL = 2 ** 53 - 1
+
+# Objectif par défaut si aucun palier n'est configuré (goals-factory.js)
+DEFAULT_TARGETS = {'follow': 100, 'sub': 10}
+
+# Fichiers d'objectifs relatifs à la racine du projet
+GOAL_FILES = {
+    'follow': os.path.join('obs', 'data', 'followgoal_config.txt'),
+    'sub': os.path.join('obs', 'data', 'subgoals_config.txt'),
+}
+
+
+def parse_goals(content):
+    """Parse le contenu d'un fichier d'objectifs
+
+    Args:
+        content (str): Lignes "N: message"
+
+    Returns:
+        dict: {palier (int): message (str)} - un palier dupliqué garde
+        le dernier message, comme la Map du serveur
+    """
+    goals = {}
+    for line in LINE_SPLIT_PATTERN.split(content):
+        if not line.strip():
+            continue
+        match = GOAL_LINE_PATTERN.match(line)
+        if match:
+            target = int(match.group(1))
+            if target <= MAX_GOAL:
+                goals[target] = match.group(2) or ''
+    return goals
+
+
+def _js_round(value):
+    """Math.round() JavaScript (arrondi .5 vers +infini)"""
+    return int(math.floor(value + 0.5))
+
+
+class GoalTrack:
+    """Paliers triés d'un type d'objectif avec recherche par bisection"""
+
+    def __init__(self, goals=None, default_target=100):
+        self.default_target = default_target
+        self.targets = array('q')
+        self.messages = []
+        if goals:
+            self.load(goals)
+
+    def load(self, goals):
+        """Remplace les paliers ({palier: message})"""
+        ordered = sorted(goals.items())
+        self.targets = array('q', (target for target, _ in ordered))
+        self.messages = [message for _, message in ordered]
+
+    def __len__(self):
+        return len(self.targets)
+
+    def next_index(self, value):
+        """Index du premier palier strictement supérieur à `value`"""
+        return bisect_right(self.targets, value)
+
+    def message_for(self, target):
+        """Message associé à un palier exact ('' si absent)"""
+        index = bisect_left(self.targets, target)
+        if index < len(self.targets) and self.targets[index] == target:
+            return self.messages[index]
+        return ''
+
+    def goal_info(self, value):
+        """Objectif courant au format du serveur (getCurrentGoalInfo)
+
+        Returns:
+            dict: {'goal': {current, target, message, isMaxReached}, 'progress': int}
+        """
+        index = self.next_index(value)
+        next_goal = self.targets[index] if index < len(self.targets) else None
+        max_goal = self.targets[-1] if self.targets else None
+
+        # Sémantique JS : 0 est "falsy" (nextGoal || maxGoal || défaut)
+        is_max_reached = not next_goal and max_goal is not None and value >= max_goal
+        target = next_goal or max_goal or self.default_target
+
+        return {
+            'goal': {
+                'current': value,
+                'target': target,
+                'message': self.message_for(target),
+                'isMaxReached': is_max_reached,
+            },
+            'progress': min(100, _js_round(value / target * 100)) if target > 0 else 100,
+        }
+
+    def milestones(self, value):
+        """Dernier palier atteint et palier suivant
+
+        Returns:
+            tuple: ((palier, message) ou None, (palier, message) ou None)
+        """
+        index = self.next_index(value)
+        reached = (self.targets[index - 1], self.messages[index - 1]) if index > 0 else None
+        upcoming = (self.targets[index], self.messages[index]) if index < len(self.targets) else None
+        return reached, upcoming
+
+    def progress_ratio(self, value):
+        """Progression (0.0 - 1.0) entre le dernier palier atteint et le suivant"""
+        reached, upcoming = self.milestones(value)
+        if upcoming is None:
+            return 1.0
+        start = reached[0] if reached else 0
+        span = upcoming[0] - start
+        if span <= 0:
+            return 1.0
+        return max(0.0, min(1.0, (value - start) / span))
+
+
+class GoalFile:
+    """Fichier d'objectifs rechargé uniquement si modifié (mtime/taille)"""
+
+    def __init__(self, path, default_target=100):
+        self.path = path
+        self.track = GoalTrack(default_target=default_target)
+        self._signature = None
+
+    def refresh(self):
+        """Recharge le fichier s'il a changé depuis la dernière lecture
+
+        Returns:
+            bool: True si les paliers ont été rechargés
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self._signature is not None:
+                # Fichier supprimé : plus aucun palier
+                self._signature = None
+                self.track.load({})
+                return True
+            return False
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                goals = parse_goals(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"❌ Erreur lecture objectifs {self.path}: {e}")
+            return False
+
+        self.track.load(goals)
+        self._signature = signature
+        logger.info(f"✅ Objectifs chargés: {len(goals)} paliers ({os.path.basename(self.path)})")
+        return True
+
+
+class GoalEngine:
+    """Objectifs follows et subs du projet"""
+
+    def __init__(self, project_root):
+        self.files = {
+            kind: GoalFile(os.path.join(project_root, relative), DEFAULT_TARGETS[kind])
+            for kind, relative in GOAL_FILES.items()
+        }
+
+    def refresh(self):
+        """Recharge les fichiers modifiés
+
+        Returns:
+            bool: True si au moins un type de paliers a été rechargé
+        """
+        reloaded = False
+        for goal_file in self.files.values():
+            reloaded = goal_file.refresh() or reloaded
+        return reloaded
+
+    def track(self, kind, refresh=True):
+        """Paliers pour 'follow' ou 'sub' (rechargés si modifiés, sauf refresh=False)"""
+        goal_file = self.files[kind]
+        if refresh:
+            goal_file.refresh()
+        return goal_file.track
+
+    def goal_info(self, kind, value):
+        """Objectif courant ('follow' ou 'sub') au format du serveur"""
+        return self.track(kind).goal_info(value)
+
+    def milestones(self, kind, value):
+        """(palier atteint, palier suivant) pour 'follow' ou 'sub'"""
+        return self.track(kind).milestones(value)
+
+
+# ==================================================================
+# VÉRIFICATION ET BENCHMARK
+# ==================================================================
+
+def reference_goal_info(goals, value, default_target=100):
+    """Transcription directe de getCurrentGoalInfo() (goals-factory.js)
+
+    Parcours linéaire, sans index : sert de référence à GoalTrack.
+    """
+    sorted_goals = sorted(goals)
+    next_goal = next((g for g in sorted_goals if g > value), None)
+    max_goal = sorted_goals[-1] if sorted_goals else None
+    # !nextGoal && currentValue >= maxGoal (undefined -> false)
+    is_max_reached = not next_goal and max_goal is not None and value >= max_goal
+    target = next_goal or max_goal or default_target
+    return {
+        'goal': {
+            'current': value,
+            'target': target,
+            'message': goals.get(target) or '',
+            'isMaxReached': is_max_reached,
+        },
+        'progress': min(100, _js_round(value / target * 100)) if target > 0 else 100,
+    }
+
+
+def check(cases=2000, seed=1):
+    """Compare GoalTrack à reference_goal_info sur des paliers aléatoires
+
+    Fichiers générés avec doublons, palier 0, lignes invalides, espaces
+    et fins de ligne CRLF ; valeurs autour de chaque palier.
+
+    Returns:
+        list: Écarts (fichier, valeur, attendu, obtenu) - vide si conforme
+    """
+    import random
+
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(cases):
+        lines = []
+        for _ in range(rng.randint(0, 12)):
+            target = rng.choice([0, rng.randint(1, 20), rng.randint(1, 1000)])
+            message = rng.choice(['', 'Palier', '  espacé  ', 'a: b'])
+            lines.append(rng.choice([f"{target}: {message}", f"{target}:{message}", f"x{target}: invalide", "   "]))
+        content = rng.choice(['\n', '\r\n']).join(lines)
+
+        goals = parse_goals(content)
+        default_target = rng.choice(list(DEFAULT_TARGETS.values()))
+        track = GoalTrack(goals, default_target)
+        values = {0, 1, rng.randint(0, 1100)}
+        for target in goals:
+            values.update((target - 1, target, target + 1))
+
+        for value in sorted(v for v in values if v >= 0):
+            expected = reference_goal_info(goals, value, default_target)
+            actual = track.goal_info(value)
+            if actual != expected:
+                mismatches.append((content, value, expected, actual))
+    return mismatches
+
+
+def benchmark(tiers=50000, lookups=200000):
+    """Mesure le parsing et la recherche sur un fichier de `tiers` paliers
+
+    Returns:
+        dict: Temps de parsing (s) et coût moyen d'une recherche (µs)
+    """
+    import random
+    import time
+
+    content = "\n".join(f"{i * 7}: Palier numéro {i}" for i in range(1, tiers + 1))
+
+    start = time.perf_counter()
+    track = GoalTrack(parse_goals(content))
+    parse_time = time.perf_counter() - start
+
+    rng = random.Random(42)
+    values = [rng.randint(0, tiers * 7 + 100) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for value in values:
+        track.goal_info(value)
+    lookup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in values:
+        track.milestones(value)
+    milestone_time = time.perf_counter() - start
+
+    return {
+        'tiers': tiers,
+        'parse_s': parse_time,
+        'goal_info_us': lookup_time / lookups * 1e6,
+        'milestones_us': milestone_time / lookups * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    if sys.argv[1:] == ['--check']:
+        errors = check()
+        print(f"🔎 Vérification contre goals-factory.js : {len(errors)} écart(s)")
+        for error in errors[:5]:
+            print(error)
+        sys.exit(1 if errors else 0)
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"\n🎯 Benchmark moteur d'objectifs ({size} paliers)")
+    print(json.dumps(benchmark(size), indent=2))
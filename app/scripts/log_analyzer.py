@@ -0,0 +1,410 @@
+# ==================================================================
+# ANALYSEUR DES LOGS SERVEUR ET OBS
+# ==================================================================
+# Parcourt app/logs/subcount_logs.txt (serveur Node) et
+# app/logs/obs_subcount_auto.log (script OBS) en une seule passe
+# chacun, via mmap (ou lecture par blocs), sans charger les fichiers en
+# mémoire : la mémoire utilisée ne dépend que du nombre de minutes
+# couvertes, pas de la taille des logs.
+#
+# Par minute : lignes, erreurs, avertissements, retries
+# ("tentative 2/3"), timeouts, rate limits (429) et (re)démarrages du
+# serveur. Les deux logs sont ramenés sur une même chronologie UTC
+# (le log Node est en UTC, le log OBS en heure locale).
+#
+# Usage:
+#   python app/scripts/log_analyzer.py                       # logs du projet
+#   python app/scripts/log_analyzer.py --bucket 15 --json
+#   python app/scripts/log_analyzer.py --benchmark 500       # logs générés (Mo)
+# ==================================================================
+
+import calendar
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LOGS = {
+    'server': os.path.join(PROJECT_ROOT, 'app', 'logs', 'subcount_logs.txt'),
+    'obs': os.path.join(PROJECT_ROOT, 'app', 'logs', 'obs_subcount_auto.log'),
+}
+
+# Lignes d'en-tête : (minute, niveau, message)
+#   serveur : [2025-01-01T12:34:56.789Z] [WARN] message      (utils/logger.js)
+#   OBS     : 2025-01-01 12:34:56,789 - WARNING - message    (logging Python)
+LINE_PATTERNS = {
+    'server': re.compile(rb'^\[(\d{4}-\d\d-\d\dT\d\d:\d\d):\d\d(?:\.\d+)?Z?\] \[([^\]\r\n]+)\] ([^\r\n]*)', re.M),
+    'obs': re.compile(rb'^(\d{4}-\d\d-\d\d \d\d:\d\d):\d\d,\d+ - ([A-Z]+) - ([^\r\n]*)', re.M),
+}
+MINUTE_FORMATS = {
+    'server': '%Y-%m-%dT%H:%M',
+    'obs': '%Y-%m-%d %H:%M',
+}
+
+# Événements reconnus dans les messages (une seule recherche par ligne).
+# L'anticipation sur la première lettre évite d'essayer chaque
+# alternative à chaque position (~3x plus rapide).
+EVENT_PATTERN = re.compile(('(?=[TtRrDCa4])(?:' + '|'.join([
+    r'(?P<retries>[Tt]entative (?:[2-9]|\d\d+)/\d+|[Tt]entative de reconnexion)',
+    r'(?P<timeouts>[Tt]ime-?out|[Tt]imed out)',
+    r'(?P<rate_limits>[Rr]ate.?limit|\b429\b)',
+    r'(?P<restarts>DÉMARRAGE DU SERVEUR|Redémarrage|Container initialisé|arrêté de manière inattendue)',
+]) + ')').encode('utf-8'))
+# "ReadTimeout, tentative 2/3" : le retry l'emporte sur le timeout qui l'a causé
+RETRY_PATTERN = re.compile(rb'[Tt]entative (?:[2-9]|\d\d+)/\d+')
+
+CATEGORIES = ('lines', 'errors', 'warnings', 'retries', 'timeouts', 'rate_limits', 'restarts')
+_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+ERROR_LEVELS = frozenset([b'ERROR', b'CRITICAL'])
+WARNING_LEVELS = frozenset([b'WARN', b'WARNING'])
+
+# Messages d'erreur distincts conservés (normalisés, chiffres masqués)
+MAX_ERROR_KINDS = 1000
+_NUMBERS = re.compile(rb'\d+')
+
+# Taille des blocs en mode lecture (fichiers non mappables)
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class LogStats:
+    """Compteurs par minute d'un fichier de log"""
+
+    def __init__(self, name, kind, path=None):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.bytes = 0
+        self.buckets = {}          # minute (bytes) -> [compteur par catégorie]
+        self.top_errors = Counter()
+        self.elapsed = 0.0
+
+    def scan(self, buffer):
+        """Analyse un tampon de lignes complètes (bytes, mmap ou memoryview)"""
+        buckets = self.buckets
+        search_event = EVENT_PATTERN.search
+        search_retry = RETRY_PATTERN.search
+        top_errors = self.top_errors
+        for match in LINE_PATTERNS[self.kind].finditer(buffer):
+            minute, level, message = match.groups()
+            row = buckets.get(minute)
+            if row is None:
+                row = buckets[minute] = [0] * len(CATEGORIES)
+            row[0] += 1
+            if level in ERROR_LEVELS:
+                row[1] += 1
+                kind = _NUMBERS.sub(b'#', message[:160])
+                if kind in top_errors or len(top_errors) < MAX_ERROR_KINDS:
+                    top_errors[kind] += 1
+            elif level in WARNING_LEVELS:
+                row[2] += 1
+            event = search_event(message)
+            if event is not None:
+                category = event.lastgroup
+                if category == 'timeouts' and search_retry(message, event.end()):
+                    category = 'retries'
+                row[_INDEX[category]] += 1
+
+    def totals(self):
+        totals = [0] * len(CATEGORIES)
+        for row in self.buckets.values():
+            for i, value in enumerate(row):
+                totals[i] += value
+        return dict(zip(CATEGORIES, totals))
+
+    def epoch_buckets(self, utc_offset=0):
+        """Minutes converties en secondes UTC : {epoch: ligne}
+
+        Args:
+            utc_offset (int): Décalage de l'heure du log par rapport à UTC (s)
+        """
+        fmt = MINUTE_FORMATS[self.kind]
+        result = {}
+        for minute, row in self.buckets.items():
+            try:
+                epoch = calendar.timegm(time.strptime(minute.decode('ascii'), fmt)) - utc_offset
+            except ValueError:
+                continue
+            result[epoch] = row
+        return result
+
+
+def analyze_file(path, kind, name=None, stream=False, chunk_size=CHUNK_SIZE):
+    """Analyse un fichier de log en une passe
+
+    Le fichier est mappé en mémoire (mmap) ; avec `stream=True`, ou si
+    le mmap est impossible, il est lu par blocs découpés aux fins de ligne.
+    """
+    stats = LogStats(name or kind, kind, path)
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        stats.bytes = size
+        mapped = None
+        if size and not stream:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+
+        if mapped is not None:
+            try:
+                stats.scan(mapped)
+            finally:
+                mapped.close()
+        else:
+            tail = b''
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                chunk = tail + chunk
+                cut = chunk.rfind(b'\n') + 1
+                if cut:
+                    stats.scan(chunk[:cut])
+                    tail = chunk[cut:]
+                else:
+                    tail = chunk
+            if tail:
+                stats.scan(tail)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def local_utc_offset():
+    """Décalage de l'heure locale par rapport à UTC (secondes)"""
+    return -(time.altzone if time.localtime().tm_isdst > 0 else time.timezone)
+
+
+def build_timeline(stats_list, bucket_seconds=300, offsets=None):
+    """Chronologie commune : [(début UTC, {nom: {catégorie: n}})] triée
+
+    Args:
+        stats_list (list): LogStats à fusionner
+        bucket_seconds (int): Largeur d'un intervalle
+        offsets (dict): nom -> décalage UTC de l'horodatage du log (s)
+    """
+    offsets = offsets or {}
+    timeline = {}
+    for stats in stats_list:
+        for epoch, row in stats.epoch_buckets(offsets.get(stats.name, 0)).items():
+            start = epoch - epoch % bucket_seconds
+            slot = timeline.setdefault(start, {}).setdefault(stats.name, [0] * len(CATEGORIES))
+            for i, value in enumerate(row):
+                slot[i] += value
+    return [
+        (start, {name: dict(zip(CATEGORIES, row)) for name, row in sorted(entry.items())})
+        for start, entry in sorted(timeline.items())
+    ]
+
+
+def incidents(timeline, categories=('errors', 'retries', 'timeouts', 'rate_limits', 'restarts')):
+    """Intervalles où au moins un des logs signale un problème"""
+    return [
+        (start, entry) for start, entry in timeline
+        if any(counts[category] for counts in entry.values() for category in categories)
+    ]
+
+
+def build_report(stats_list, bucket_seconds=300, offsets=None, top=10):
+    """Rapport JSON-sérialisable"""
+    timeline = build_timeline(stats_list, bucket_seconds, offsets)
+    return {
+        'bucket_seconds': bucket_seconds,
+        'logs': {
+            stats.name: {
+                'path': stats.path,
+                'bytes': stats.bytes,
+                'scan_s': round(stats.elapsed, 3),
+                'mb_per_s': round(stats.bytes / stats.elapsed / 1e6, 1) if stats.elapsed else None,
+                'totals': stats.totals(),
+                'top_errors': [
+                    {'message': message.decode('utf-8', 'replace'), 'count': count}
+                    for message, count in stats.top_errors.most_common(top)
+                ],
+            }
+            for stats in stats_list
+        },
+        'timeline': [
+            {'start': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(start)), 'logs': entry}
+            for start, entry in incidents(timeline)
+        ],
+    }
+
+
+def format_report(report, max_rows=40):
+    """Résumé texte du rapport"""
+    lines = []
+    for name, info in report['logs'].items():
+        totals = info['totals']
+        lines.append(
+            f"📄 {name}: {totals['lines']} lignes ({info['bytes'] / 1e6:.1f} Mo, {info['mb_per_s']} Mo/s) | "
+            f"❌ {totals['errors']} erreurs | ⚠️ {totals['warnings']} avertissements | "
+            f"🔁 {totals['retries']} retries | ⏱️ {totals['timeouts']} timeouts | "
+            f"⏳ {totals['rate_limits']} rate limits | 🚀 {totals['restarts']} démarrages"
+        )
+        for error in info['top_errors'][:5]:
+            lines.append(f"     {error['count']:>6} × {error['message']}")
+
+    rows = report['timeline']
+    lines.append("")
+    lines.append(f"🕒 Intervalles avec incidents ({len(rows)}, {report['bucket_seconds'] // 60} min, UTC) :")
+    names = list(report['logs'])
+    for row in rows[-max_rows:]:
+        cells = []
+        for name in names:
+            counts = row['logs'].get(name)
+            if not counts:
+                continue
+            flags = [
+                f"{label}{counts[category]}"
+                for category, label in (('errors', '❌'), ('retries', '🔁'), ('timeouts', '⏱️'),
+                                        ('rate_limits', '⏳'), ('restarts', '🚀'))
+                if counts[category]
+            ]
+            if flags:
+                cells.append(f"{name}: {' '.join(flags)}")
+        lines.append(f"  {row['start']}  " + " | ".join(cells))
+    if len(rows) > max_rows:
+        lines.append(f"  ... {len(rows) - max_rows} intervalle(s) plus ancien(s) (voir --json)")
+    return "\n".join(lines)
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def generate_logs(directory, megabytes=100, seed=42):
+    """Génère un log serveur et un log OBS réalistes d'environ `megabytes` Mo chacun
+
+    Returns:
+        dict: {'server': chemin, 'obs': chemin}
+    """
+    import random
+
+    rng = random.Random(seed)
+    server_messages = [
+        ('INFO', "📊 Sync Twitch: 1234 follows, 56 subs"),
+        ('INFO', "🎉 Nouveau follow: viewer{n}"),
+        ('SUCCESS', "✅ Broadcast envoyé à 3 clients"),
+        ('WARN', "⚠️ Rate limit atteint, attente 12s"),
+        ('ERROR', "❌ Erreur API Twitch: timeout après 5000ms"),
+        ('INFO', "✅ Container initialisé avec tous les services"),
+    ]
+    obs_messages = [
+        ('INFO', "[OBS SubCount Auto] ✅ Police appliquée"),
+        ('WARNING', "[OBS SubCount Auto] ⚠️ Envoi config overlay: ReadTimeout, tentative 2/3 dans 0.5s"),
+        ('ERROR', "[OBS SubCount Auto] ❌ Erreur sync Twitch: Read timed out"),
+        ('INFO', "[OBS SubCount Auto] 🚀 DÉMARRAGE DU SERVEUR SUBCOUNT AUTO"),
+        ('INFO', "[OBS SubCount Auto] 📈 follows: 1234/1300"),
+    ]
+    weights_server = [60, 25, 10, 2, 2, 1]
+    weights_obs = [70, 10, 5, 1, 14]
+    paths = {
+        'server': os.path.join(directory, 'subcount_logs.txt'),
+        'obs': os.path.join(directory, 'obs_subcount_auto.log'),
+    }
+    target = int(megabytes * 1e6)
+    start_epoch = 1735689600  # 2025-01-01 00:00 UTC
+
+    for kind, messages, weights in (('server', server_messages, weights_server), ('obs', obs_messages, weights_obs)):
+        with open(paths[kind], 'wb') as f:
+            written = 0
+            second = 0.0
+            stamp_second = None
+            stamp_format = '%Y-%m-%dT%H:%M:%S' if kind == 'server' else '%Y-%m-%d %H:%M:%S'
+            batch = []
+            while written < target:
+                second += rng.random() * 0.05
+                level, message = rng.choices(messages, weights)[0]
+                message = message.replace('{n}', str(rng.randint(1, 99999)))
+                if int(second) != stamp_second:
+                    stamp_second = int(second)
+                    stamp = time.strftime(stamp_format, time.gmtime(start_epoch + stamp_second))
+                millis = int((second % 1) * 1000)
+                if kind == 'server':
+                    line = f"[{stamp}.{millis:03d}Z] [{level}] {message}\n"
+                    if level == 'ERROR':
+                        line += '  Données: {"error":"timeout"}\n'
+                else:
+                    line = f"{stamp},{millis:03d} - {level} - {message}\n"
+                data = line.encode('utf-8')
+                batch.append(data)
+                written += len(data)
+                if len(batch) >= 10000:
+                    f.write(b''.join(batch))
+                    batch = []
+            f.write(b''.join(batch))
+    return paths
+
+
+def benchmark(megabytes=50, directory=None):
+    """Génère deux logs de `megabytes` Mo puis mesure mmap et lecture par blocs"""
+    import tempfile
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        paths = generate_logs(tmp, megabytes)
+        results = {}
+        for mode, stream in (('mmap', False), ('stream', True)):
+            stats_list = [analyze_file(path, kind, stream=stream) for kind, path in paths.items()]
+            total_bytes = sum(stats.bytes for stats in stats_list)
+            total_time = sum(stats.elapsed for stats in stats_list)
+            results[mode] = {
+                'mb': round(total_bytes / 1e6, 1),
+                'seconds': round(total_time, 3),
+                'mb_per_s': round(total_bytes / total_time / 1e6, 1),
+                'lines_per_s': round(sum(stats.totals()['lines'] for stats in stats_list) / total_time),
+            }
+
+            # Pic mémoire Python mesuré à part (tracemalloc ralentit l'analyse)
+            tracemalloc.start()
+            analyze_file(paths['server'], 'server', stream=stream)
+            results[mode]['peak_python_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+            tracemalloc.stop()
+        results['totals'] = {stats.name: stats.totals() for stats in stats_list}
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyse des logs serveur (Node) et OBS")
+    parser.add_argument('--server-log', default=DEFAULT_LOGS['server'])
+    parser.add_argument('--obs-log', default=DEFAULT_LOGS['obs'])
+    parser.add_argument('--bucket', type=int, default=5, help="Largeur des intervalles (minutes)")
+    parser.add_argument('--obs-utc-offset', type=float, default=None,
+                        help="Décalage UTC du log OBS en heures (défaut: fuseau local)")
+    parser.add_argument('--stream', action='store_true', help="Lecture par blocs au lieu de mmap")
+    parser.add_argument('--json', action='store_true', help="Rapport JSON complet")
+    parser.add_argument('--benchmark', type=float, metavar='MO', help="Benchmark sur des logs générés")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print(f"\n📜 Benchmark analyseur de logs (2 × {args.benchmark:g} Mo)")
+        print(json.dumps(benchmark(args.benchmark), indent=2))
+        return 0
+
+    stats_list = []
+    for name, path in (('server', args.server_log), ('obs', args.obs_log)):
+        if os.path.exists(path):
+            stats_list.append(analyze_file(path, name, stream=args.stream))
+        else:
+            print(f"⚠️ Log introuvable: {path}")
+    if not stats_list:
+        return 1
+
+    obs_offset = local_utc_offset() if args.obs_utc_offset is None else int(args.obs_utc_offset * 3600)
+    report = build_report(stats_list, max(1, args.bucket) * 60, offsets={'obs': obs_offset})
+    print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
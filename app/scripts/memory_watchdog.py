@@ -0,0 +1,323 @@
+# ==================================================================
+# SURVEILLANCE MÉMOIRE DES LONGUES SESSIONS (OPTIONNELLE)
+# ==================================================================
+# Le script vit dans OBS pendant des sessions de 10 h et plus : une
+# fuite lente (cache global qui grossit, thread relancé sans fin,
+# release OBS oublié) ne se voit qu'en fin de stream. Le watchdog,
+# activé depuis les paramètres, relève périodiquement :
+# - un instantané tracemalloc (allocations Python par ligne source),
+#   comparé au précédent et au premier : lignes qui grossissent
+# - la RSS du processus OBS (psutil, optionnel) : fuites natives,
+#   invisibles pour tracemalloc (obs_data / listes de sources)
+# - les threads vivants, regroupés par nom
+# - la taille de conteneurs surveillés (caches du script)
+#
+# Une ligne qui grossit à chaque relevé (SUSPECT_STREAK relevés de
+# suite) est signalée comme fuite probable dans le log.
+#
+# Coût : tracemalloc ralentit nettement le code qui alloue beaucoup
+# (x7 sur une boucle json.dumps/loads, voir benchmark()) et garde une
+# trace par bloc vivant : c'est un outil de diagnostic, démarré
+# seulement si le watchdog est activé et arrêté avec lui. Un relevé
+# prend ~10 ms.
+# ==================================================================
+
+import logging
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from metrics import REGISTRY as METRICS
+from service_manager import current_token
+
+# Import optionnel de psutil (RSS du processus)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300.0  # Entre deux relevés (s)
+DEFAULT_TOP = 10          # Lignes rapportées par relevé
+DEFAULT_FRAMES = 1        # Profondeur des traces (1 = ligne d'allocation)
+SUSPECT_STREAK = 3        # Relevés de croissance consécutifs avant alerte
+MIN_GROWTH_BYTES = 1024   # Croissance ignorée en dessous (bruit)
+HISTORY_SIZE = 288        # Relevés conservés (24 h à 5 min)
+
+# Allocations de tracemalloc lui-même et du mécanisme d'import
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+_THREAD_SUFFIX = re.compile(r'[-_ ]?\(?\d+\)?$')
+
+
+def thread_groups(threads=None):
+    """Threads vivants regroupés par nom sans numéro (Thread-12 -> Thread)"""
+    threads = threading.enumerate() if threads is None else threads
+    return dict(Counter(_THREAD_SUFFIX.sub('', thread.name) or thread.name for thread in threads))
+
+
+def _site(stat):
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def _format_bytes(size):
+    for unit in ('o', 'Ko', 'Mo'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'o' else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} Go"
+
+
+class MemoryWatchdog:
+    """Relevés périodiques : tracemalloc, RSS, threads, tailles surveillées
+
+    Args:
+        interval (float): Secondes entre deux relevés (run)
+        top (int): Lignes d'allocation rapportées
+        frames (int): Profondeur des traces tracemalloc
+        clock (callable): Horloge monotone
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, top=DEFAULT_TOP, frames=DEFAULT_FRAMES, clock=time.monotonic):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.clock = clock
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.last_report = None
+        self._sizes = {}
+        self._streaks = {}
+        self._baseline = None
+        self._previous = None
+        self._baseline_rss = None
+        self._baseline_threads = None
+        self._started_at = None
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._baseline is not None
+
+    def watch_size(self, name, getter):
+        """Surveille la taille d'un conteneur (getter() -> int ou objet avec len)"""
+        self._sizes[name] = getter
+
+    def _rss(self):
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return None
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def _measure_sizes(self):
+        sizes = {}
+        for name, getter in self._sizes.items():
+            try:
+                value = getter()
+                sizes[name] = value if isinstance(value, int) else len(value or ())
+            except Exception as e:
+                sizes[name] = f"erreur: {e}"
+        return sizes
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre tracemalloc (si besoin) et prend l'instantané de référence"""
+        with self._lock:
+            if self.running:
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+            self._baseline = self._previous = self._snapshot()
+            self._baseline_rss = self._rss()
+            self._baseline_threads = threading.active_count()
+            self._started_at = self.clock()
+            self._streaks = {}
+        logger.info("🩺 Surveillance mémoire démarrée")
+
+    def stop(self):
+        """Libère les instantanés et arrête tracemalloc s'il a été démarré ici"""
+        with self._lock:
+            self._baseline = self._previous = None
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def run(self):
+        """Boucle de relevés (tâche ServiceManager, s'arrête à l'annulation)"""
+        token = current_token()
+        self.start()
+        try:
+            while not token.wait(self.interval):
+                self.log_report(self.check())
+        finally:
+            self.stop()
+
+    # ------------------------------------------------------------------
+    # Relevés
+    # ------------------------------------------------------------------
+
+    def check(self):
+        """Relevé : croissance depuis le précédent et depuis le démarrage
+
+        Returns:
+            dict: Rapport (RSS, mémoire tracée, threads, lignes qui grossissent, suspects)
+        """
+        if not self.running:
+            self.start()
+        started = time.perf_counter()
+        with self._lock:
+            snapshot = self._snapshot()
+            since_last = snapshot.compare_to(self._previous, 'lineno')
+            since_start = {_site(stat): stat for stat in snapshot.compare_to(self._baseline, 'lineno')}
+            self._previous = snapshot
+
+            growing = [stat for stat in since_last if stat.size_diff >= MIN_GROWTH_BYTES]
+            grown_sites = {_site(stat) for stat in growing}
+            self._streaks = {site: self._streaks.get(site, 0) + 1 for site in grown_sites}
+
+        traced, peak = tracemalloc.get_traced_memory()
+        rss = self._rss()
+        threads = threading.active_count()
+
+        suspects = []
+        for site, streak in sorted(self._streaks.items(), key=lambda item: -item[1]):
+            total = since_start.get(site)
+            if streak >= SUSPECT_STREAK and total is not None and total.size_diff > 0:
+                suspects.append({'site': site, 'checks': streak, 'growth_bytes': total.size_diff, 'size_bytes': total.size})
+
+        report = {
+            'uptime_s': round(self.clock() - self._started_at, 1),
+            'rss_bytes': rss,
+            'rss_growth_bytes': rss - self._baseline_rss if rss is not None and self._baseline_rss is not None else None,
+            'traced_bytes': traced,
+            'traced_peak_bytes': peak,
+            'threads': threads,
+            'threads_growth': threads - self._baseline_threads,
+            'thread_groups': thread_groups(),
+            'growing': [
+                {'site': _site(stat), 'growth_bytes': stat.size_diff, 'blocks': stat.count_diff, 'size_bytes': stat.size}
+                for stat in growing[:self.top]
+            ],
+            'suspects': suspects[:self.top],
+            'sizes': self._measure_sizes(),
+            'check_seconds': round(time.perf_counter() - started, 4),
+        }
+        self.history.append((report['uptime_s'], rss, traced, threads))
+        self.last_report = report
+
+        if rss is not None:
+            METRICS.gauge('subcount_process_rss_bytes', "RSS du processus OBS").set(rss)
+        METRICS.gauge('subcount_python_traced_bytes', "Mémoire Python tracée (tracemalloc)").set(traced)
+        METRICS.gauge('subcount_threads', "Threads vivants du processus").set(threads)
+        return report
+
+    def log_report(self, report, log=None):
+        """Écrit le rapport dans le log (alerte si fuites probables)"""
+        log = log or logger.info
+        rss = _format_bytes(report['rss_bytes']) if report['rss_bytes'] is not None else "n/d"
+        growth = report['rss_growth_bytes']
+        rss_growth = f" ({'+' if growth >= 0 else ''}{_format_bytes(growth)})" if growth is not None else ""
+        log(
+            f"🩺 Mémoire: RSS {rss}{rss_growth}, Python {_format_bytes(report['traced_bytes'])}, "
+            f"{report['threads']} threads ({report['threads_growth']:+d}) après {report['uptime_s'] / 60:.0f} min"
+        )
+        for entry in report['growing'][:3]:
+            log(f"   ↗ {entry['site']}: +{_format_bytes(entry['growth_bytes'])} ({entry['blocks']:+d} blocs)")
+        if report['sizes']:
+            log("   📦 " + ", ".join(f"{name}={value}" for name, value in sorted(report['sizes'].items())))
+        for suspect in report['suspects']:
+            logger.warning(
+                f"⚠️ Fuite probable: {suspect['site']} grossit depuis {suspect['checks']} relevés "
+                f"(+{_format_bytes(suspect['growth_bytes'])} depuis le démarrage)"
+            )
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+_LEAK = []
+
+
+def _leaky_tick(size):
+    """Cache qui n'est jamais vidé (fuite simulée)"""
+    _LEAK.append(bytearray(size))
+
+
+def _noisy_tick(count):
+    """Allocations temporaires libérées (bruit à ne pas signaler)"""
+    return sum(len(str(index) * 8) for index in range(count))
+
+
+def benchmark(checks=6, leak_bytes=64 * 1024, noise=20000):
+    """Fuite simulée détectée parmi du bruit + coût d'un relevé et de tracemalloc
+
+    Chaque cycle ajoute `leak_bytes` à un cache global et alloue
+    temporairement `noise` chaînes ; le watchdog doit désigner la ligne
+    du cache (et elle seule) comme suspecte.
+    """
+    import json
+
+    # Surcoût de tracemalloc sur un travail qui alloue beaucoup
+    payload = {'font': {'family': 'Arial', 'size': '64px'}, 'colors': {'text': '#FFFFFF'}}
+
+    def workload():
+        started = time.perf_counter()
+        for _ in range(20000):
+            json.loads(json.dumps(payload))
+        return time.perf_counter() - started
+
+    plain = workload()
+    watchdog = MemoryWatchdog(interval=0)
+    watchdog.watch_size('leak_cache', lambda: _LEAK)
+    watchdog.start()
+    traced = workload()
+
+    reports = []
+    try:
+        for _ in range(checks):
+            _leaky_tick(leak_bytes)
+            _noisy_tick(noise)
+            reports.append(watchdog.check())
+    finally:
+        watchdog.stop()
+        del _LEAK[:]
+
+    final = reports[-1]
+    leak_line = _leaky_tick.__code__.co_firstlineno + 2
+    return {
+        'checks': checks,
+        'tracemalloc_overhead': round(traced / plain, 2) if plain else None,
+        'check_ms': round(max(report['check_seconds'] for report in reports) * 1000, 2),
+        'suspects': final['suspects'],
+        'leak_detected': any(s['site'].endswith(f"memory_watchdog.py:{leak_line}") for s in final['suspects']),
+        'false_positives': [s['site'] for s in final['suspects'] if not s['site'].endswith(f":{leak_line}")],
+        'threads': final['threads'],
+        'sizes': final['sizes'],
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    print("\n🩺 Benchmark surveillance mémoire")
+    print(json.dumps(benchmark(), indent=2))
@@ -0,0 +1,438 @@
+# ==================================================================
+# MÉTRIQUES EN PROCESSUS (COMPTEURS / JAUGES / HISTOGRAMMES)
+# ==================================================================
+# Registre léger partagé par le script OBS et OverlayConfigManager :
+# - compteurs et jauges (valeur simple protégée par un verrou)
+# - histogrammes de latence à buckets fixes (bisection, sans allocation)
+# - export texte Prometheus via un petit serveur HTTP localhost optionnel
+# - ligne de résumé périodique pour le log
+#
+# Coût d'une observation : ~1 µs (verrou + bisection sur 13 bornes).
+# ==================================================================
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+logger = logging.getLogger(__name__)
+
+# Bornes (secondes) des histogrammes de latence : 1 ms -> 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Port par défaut de l'endpoint Prometheus (localhost uniquement)
+DEFAULT_METRICS_PORT = 9464
+
+TYPE_COUNTER = "counter"
+TYPE_GAUGE = "gauge"
+TYPE_HISTOGRAM = "histogram"
+
+
+def _escape_label(value):
+    """Échappe une valeur de label (format texte Prometheus)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    """Formate des labels triés: {a="1",b="2"} ('' si aucun)"""
+    items = list(labels)
+    if extra:
+        items.append(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in items) + '}'
+
+
+def _format_value(value):
+    """Formate un nombre pour Prometheus (+Inf, entiers sans décimale)"""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Compteur monotone"""
+
+    __slots__ = ('labels', 'value', '_lock')
+
+    def __init__(self, labels=()):
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Valeur instantanée (peut monter et descendre)"""
+
+    __slots__ = ('labels', 'value', '_lock')
+
+    def __init__(self, labels=()):
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class Histogram:
+    """Histogramme à buckets fixes (bornes supérieures inclusives)"""
+
+    __slots__ = ('labels', 'bounds', 'counts', 'sum', 'count', 'max', '_lock')
+
+    def __init__(self, labels=(), bounds=DEFAULT_BUCKETS):
+        self.labels = labels
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Dernier = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def time(self):
+        """Context manager qui observe la durée du bloc"""
+        return _Timer(self)
+
+    def quantile(self, q):
+        """Estimation d'un quantile (interpolation linéaire dans le bucket,
+        bornée par le maximum observé)
+
+        Returns:
+            float: Valeur estimée, ou None si aucune observation
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+            maximum = self.max
+        if total == 0:
+            return None
+
+        rank = q * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else maximum
+                estimate = lower + (upper - lower) * ((rank - cumulative) / bucket_count)
+                return min(estimate, maximum)
+            cumulative += bucket_count
+        return maximum
+
+
+class _Timer:
+    """Mesure la durée d'un bloc (context manager ou décorateur)"""
+
+    __slots__ = ('histogram', 'error_counter', '_start')
+
+    def __init__(self, histogram, error_counter=None):
+        self.histogram = histogram
+        self.error_counter = error_counter
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._start)
+        if exc_type is not None and self.error_counter is not None:
+            self.error_counter.inc()
+        return False
+
+    def __call__(self, func):
+        def wrapper(*args, **kwargs):
+            with _Timer(self.histogram, self.error_counter):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+
+class MetricsRegistry:
+    """Registre des métriques, indexées par (nom, labels)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}  # nom -> {'type', 'help', 'metrics': {labels: métrique}}
+
+    def _get(self, name, metric_type, help_text, labels, factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            metric = family['metrics'].get(key)
+            if metric is not None:
+                return metric
+
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = {'type': metric_type, 'help': help_text, 'metrics': {}}
+                self._families[name] = family
+            elif family['type'] != metric_type:
+                raise ValueError(f"Métrique '{name}' déjà déclarée comme {family['type']}")
+            if help_text and not family['help']:
+                family['help'] = help_text
+            metric = family['metrics'].get(key)
+            if metric is None:
+                metric = factory(key)
+                family['metrics'][key] = metric
+            return metric
+
+    def counter(self, name, help_text='', **labels):
+        """Compteur `name` pour ces labels (créé au premier appel)"""
+        return self._get(name, TYPE_COUNTER, help_text, labels, Counter)
+
+    def gauge(self, name, help_text='', **labels):
+        """Jauge `name` pour ces labels (créée au premier appel)"""
+        return self._get(name, TYPE_GAUGE, help_text, labels, Gauge)
+
+    def histogram(self, name, help_text='', buckets=DEFAULT_BUCKETS, **labels):
+        """Histogramme `name` pour ces labels (créé au premier appel)"""
+        return self._get(name, TYPE_HISTOGRAM, help_text, labels,
+                         lambda key: Histogram(key, buckets))
+
+    def timed(self, name, help_text='', **labels):
+        """Mesure un bloc ou une fonction dans l'histogramme `name`
+
+        Les exceptions sont comptées dans `<name sans _seconds>_errors_total`.
+
+        Exemple:
+            with METRICS.timed('subcount_http_request_seconds', endpoint='/api/current'):
+                ...
+        """
+        base = name[:-len('_seconds')] if name.endswith('_seconds') else name
+        return _Timer(
+            self.histogram(name, help_text, **labels),
+            self.counter(f"{base}_errors_total", **labels)
+        )
+
+    def track_callback(self, name):
+        """Décorateur pour les callbacks OBS (durée + erreurs par callback)"""
+        return self.timed(
+            'subcount_obs_callback_seconds',
+            "Durée des callbacks OBS",
+            callback=name
+        )
+
+    def clear(self):
+        """Supprime toutes les métriques"""
+        with self._lock:
+            self._families.clear()
+
+    def _snapshot(self):
+        with self._lock:
+            return [
+                (name, family['type'], family['help'], list(family['metrics'].values()))
+                for name, family in sorted(self._families.items())
+            ]
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def render_prometheus(self):
+        """Retourne toutes les métriques au format texte Prometheus 0.0.4"""
+        lines = []
+        for name, metric_type, help_text, metrics in self._snapshot():
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            for metric in metrics:
+                if metric_type != TYPE_HISTOGRAM:
+                    lines.append(f"{name}{_format_labels(metric.labels)} {_format_value(metric.value)}")
+                    continue
+
+                with metric._lock:
+                    counts = list(metric.counts)
+                    total_sum = metric.sum
+                    total = metric.count
+                cumulative = 0
+                for bound, bucket_count in zip(metric.bounds + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(metric.labels, ('le', _format_value(float(bound))))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(metric.labels)} {_format_value(total_sum)}")
+                lines.append(f"{name}_count{_format_labels(metric.labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, limit=8):
+        """Résumé sur une ligne des histogrammes les plus coûteux
+
+        Exemple: "📊 POST /admin/add-follows n=12 p50=8.1ms p95=23.0ms | ..."
+        """
+        entries = []
+        for name, metric_type, _, metrics in self._snapshot():
+            if metric_type != TYPE_HISTOGRAM:
+                continue
+            for metric in metrics:
+                if metric.count:
+                    entries.append((metric.sum, name, metric))
+
+        if not entries:
+            return "📊 Aucune mesure"
+
+        parts = []
+        for _, name, metric in sorted(entries, key=lambda entry: entry[0], reverse=True)[:limit]:
+            label = ' '.join(str(value) for _, value in metric.labels) or name
+            p50 = metric.quantile(0.5) * 1000
+            p95 = metric.quantile(0.95) * 1000
+            parts.append(f"{label} n={metric.count} p50={p50:.1f}ms p95={p95:.1f}ms")
+        return "📊 " + " | ".join(parts)
+
+
+# ==================================================================
+# ENDPOINT HTTP (localhost)
+# ==================================================================
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """Expose un registre en texte Prometheus sur http://127.0.0.1:<port>/metrics"""
+
+    def __init__(self, registry, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    def start(self):
+        """Démarre le serveur en arrière-plan
+
+        Returns:
+            bool: False si le port est indisponible
+        """
+        if self._server is not None:
+            return True
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Pas de log par requête
+
+        try:
+            self._server = _ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            logger.warning(f"⚠️ Endpoint métriques indisponible sur le port {self.port}: {e}")
+            return False
+
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="subcount-metrics",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"📊 Métriques: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        """Arrête le serveur"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+
+
+# Registre partagé du processus (script OBS + OverlayConfigManager)
+REGISTRY = MetricsRegistry()
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def benchmark(iterations=200000):
+    """Mesure le coût d'une observation (µs)
+
+    Returns:
+        dict: Coût moyen par opération
+    """
+    registry = MetricsRegistry()
+    histogram = registry.histogram('bench_seconds', endpoint='/api/current')
+    counter = registry.counter('bench_total', endpoint='/api/current')
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe((i % 1000) / 10000.0)
+    observe_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        counter.inc()
+    inc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with registry.timed('bench_timed_seconds', endpoint='/api/current'):
+            pass
+    timed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    registry.render_prometheus()
+    render_time = time.perf_counter() - start
+
+    return {
+        'iterations': iterations,
+        'observe_us': observe_time / iterations * 1e6,
+        'counter_inc_us': inc_time / iterations * 1e6,
+        'timed_block_us': timed_time / iterations * 1e6,
+        'render_ms': render_time * 1000,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"\n📊 Benchmark métriques ({count} observations)")
+    print(json.dumps(benchmark(count), indent=2))
@@ -0,0 +1,193 @@
+# ==================================================================
+# LANCEMENT DIRECT DU SERVEUR NODE (SANS cmd.exe NI START_SERVER.bat)
+# ==================================================================
+# `node server.js` est lancé directement (cwd app/server, ports et
+# fichiers d'état de l'instance dans l'environnement). Sa sortie
+# (stdout + stderr) est lue par un thread dans un tampon circulaire
+# borné : le script voit ce que le serveur affiche, et la fin de la
+# sortie d'un serveur qui plante est journalisée au lieu de disparaître
+# avec la console.
+#
+# Le serveur est déclaré prêt dès qu'il a affiché ses lignes d'écoute
+# (HTTP, WebSocket compteurs, WebSocket config — bannière de start()
+# dans server.js). Si elles n'apparaissent pas à temps (format changé,
+# sortie inattendue), l'appelant retombe sur les health checks HTTP.
+#
+# Testable sans Node : `node` accepte une commande complète, par
+# exemple [sys.executable, "faux_node.py"] (voir bench/launch_ready.py).
+# ==================================================================
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SERVER_SCRIPT = "server.js"
+OUTPUT_LINES = 500  # Lignes conservées dans le tampon circulaire
+
+# Lignes affichées par server.js quand les trois ports écoutent
+READY_PATTERNS = (
+    re.compile(r"Serveur HTTP: http://\S+"),
+    re.compile(r"WebSocket Compteurs: ws://\S+"),
+    re.compile(r"WebSocket Config: ws://\S+"),
+)
+
+# Pas de console pour node.exe lancé depuis OBS (application graphique)
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0x08000000)
+
+
+class OutputBuffer:
+    """Dernières lignes d'un processus (tampon circulaire, thread-safe)
+
+    Args:
+        max_lines (int): Lignes conservées (les plus anciennes sont oubliées)
+    """
+
+    def __init__(self, max_lines=OUTPUT_LINES):
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self.total = 0  # Lignes reçues depuis le lancement
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append((time.time(), line))
+            self.total += 1
+
+    def lines(self):
+        with self._lock:
+            return [line for _, line in self._lines]
+
+    def tail(self, count=20):
+        """Les `count` dernières lignes"""
+        with self._lock:
+            return [line for _, line in list(self._lines)[-count:]]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._lines)
+
+
+class ServerProcess(subprocess.Popen):
+    """Processus Node dont la sortie est lue en continu
+
+    S'utilise comme un Popen (poll, wait, terminate, kill, pid). En plus :
+    - `output` : OutputBuffer des lignes stdout/stderr (entrelacées)
+    - `wait_ready(timeout)` : attend les lignes d'écoute
+
+    Args:
+        args (list): Commande
+        ready_patterns (tuple): Regex à voir toutes au moins une fois
+        output_lines (int): Taille du tampon circulaire
+        on_line (callable): on_line(line) pour chaque ligne (thread lecteur)
+        **kwargs: Arguments de subprocess.Popen (cwd, env...)
+    """
+
+    def __init__(self, args, ready_patterns=READY_PATTERNS, output_lines=OUTPUT_LINES, on_line=None, **kwargs):
+        kwargs.update(stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        super().__init__(args, **kwargs)
+        self.output = OutputBuffer(output_lines)
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self._on_line = on_line
+        self._pending = list(ready_patterns)
+        self._ready = threading.Event()
+        self._finished = threading.Event()  # Sortie fermée (processus terminé)
+        if not self._pending:
+            self._set_ready()
+        self._reader = threading.Thread(target=self._read, name=f"node-output-{self.pid}", daemon=True)
+        self._reader.start()
+
+    def _set_ready(self):
+        self.ready_at = time.monotonic()
+        self._ready.set()
+
+    def _read(self):
+        try:
+            for raw in iter(self.stdout.readline, b''):
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                self.output.append(line)
+                if self._pending:
+                    self._pending = [pattern for pattern in self._pending if not pattern.search(line)]
+                    if not self._pending:
+                        self._set_ready()
+                if self._on_line is not None:
+                    try:
+                        self._on_line(line)
+                    except Exception as e:
+                        logger.debug(f"on_line: {e}")
+        except (OSError, ValueError):
+            pass  # Pipe fermé pendant l'arrêt
+        finally:
+            self._finished.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @property
+    def startup_seconds(self):
+        """Délai lancement -> lignes d'écoute (None si pas encore prêt)"""
+        return None if self.ready_at is None else self.ready_at - self.started_at
+
+    def wait_ready(self, timeout=None):
+        """Attend les lignes d'écoute
+
+        Returns:
+            bool: True si prêt ; False si le délai expire ou si le processus
+            s'est arrêté avant (voir poll())
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.is_set():
+            if self._finished.is_set():
+                return self._ready.is_set()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            # Réveil régulier pour voir la fin du processus
+            self._ready.wait(0.1 if remaining is None else min(0.1, remaining))
+        return True
+
+    def wait_output_closed(self, timeout=None):
+        """Attend que le lecteur ait consommé toute la sortie (après la fin du processus)"""
+        return self._finished.wait(timeout)
+
+
+def find_node():
+    """Chemin de l'exécutable node (None si absent du PATH)"""
+    return shutil.which('node')
+
+
+def launch_node_server(server_dir, env=None, node=None, script=SERVER_SCRIPT, **kwargs):
+    """Lance `node server.js` directement
+
+    Args:
+        server_dir (str): Dossier du serveur (cwd, contient server.js)
+        env (dict): Environnement complet du processus (défaut: os.environ)
+        node (str|list): Exécutable node ou commande complète (défaut: node du PATH)
+        script (str): Script lancé
+        **kwargs: Arguments de ServerProcess (ready_patterns, output_lines, on_line)
+
+    Returns:
+        ServerProcess
+
+    Raises:
+        FileNotFoundError: Si node ou le script sont introuvables
+    """
+    if node is None:
+        node = find_node()
+        if node is None:
+            raise FileNotFoundError("Node.js introuvable dans le PATH")
+    command = list(node) if isinstance(node, (list, tuple)) else [node]
+    if not os.path.exists(os.path.join(server_dir, script)):
+        raise FileNotFoundError(f"{script} introuvable dans {server_dir}")
+
+    if sys.platform == 'win32':
+        kwargs.setdefault('creationflags', CREATE_NO_WINDOW)
+    return ServerProcess(command + [script], cwd=server_dir, env=env, **kwargs)
@@ -7,9 +7,14 @@
 
 import json
 import os
-import time
-import re
 import logging
+from contextlib import contextmanager
+
+from batch_client import BATCH_PATH, BatchTransaction
+from overlay_config_schema import COMPILED_SCHEMA, is_valid_color
+from server_resilience import DEFAULT_RETRY_POLICY, get_circuit_breaker
+from metrics import REGISTRY as METRICS
+from tracing import TRACER
 
 # Import optionnel de requests
 try:
@@ -19,10 +24,55 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     print("⚠️ Module 'requests' non disponible - OverlayConfigManager désactivé")
 
+def build_font_updates(family=None, size=None, weight=None):
+    """Section 'font' validée (dict vide si rien à changer)
+
+    Raises:
+        ValueError: Si la police, la taille ou le poids sont invalides
+    """
+    return COMPILED_SCHEMA.build('font', family=family, size=size, weight=weight)
+
+
+def build_color_updates(text=None, shadow=None, stroke=None):
+    """Section 'colors' validée (dict vide si rien à changer)
+
+    Raises:
+        ValueError: Si un format couleur est invalide
+    """
+    return COMPILED_SCHEMA.build('colors', text=text, shadow=shadow, stroke=stroke)
+
+
+def build_animation_updates(duration=None, easing=None):
+    """Section 'animation' validée (dict vide si rien à changer)
+
+    Raises:
+        ValueError: Si la durée ou l'easing sont invalides
+    """
+    return COMPILED_SCHEMA.build('animation', duration=duration, easing=easing)
+
+
+def build_layout_updates(paddingLeft=None, gap=None):
+    """Section 'layout' validée (dict vide si rien à changer)
+
+    Raises:
+        ValueError: Si une longueur CSS est invalide
+    """
+    return COMPILED_SCHEMA.build('layout', paddingLeft=paddingLeft, gap=gap)
+
+
+def build_full_updates(font=None, colors=None, animation=None, layout=None):
+    """Regroupe les sections non vides en une seule mise à jour"""
+    updates = {}
+    for section, values in (('font', font), ('colors', colors), ('animation', animation), ('layout', layout)):
+        if values:
+            updates[section] = values
+    return updates
+
+
 class OverlayConfigManager:
     """Gestionnaire de configuration dynamique des overlays"""
     
-    def __init__(self, server_url="http://localhost:8082", timeout=5, enable_cache=True):
+    def __init__(self, server_url="http://localhost:8082", timeout=5, enable_cache=True, retry_policy=None, journal=None):
         if not REQUESTS_AVAILABLE:
             raise ImportError("Le module 'requests' est requis pour OverlayConfigManager")
         
@@ -32,6 +82,13 @@ class OverlayConfigManager:
         self.enable_cache = enable_cache
         self._cache = {} if enable_cache else None
         self.logger = logging.getLogger(__name__)
+        # Politique de retry et disjoncteur partagés avec le script OBS
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.breaker = get_circuit_breaker(server_url)
+        # Journal hors-ligne optionnel (ActionJournal) pour les mises à jour non envoyées
+        self.journal = journal
+        # Transaction en cours (transaction()) : les mises à jour y sont collectées
+        self._transaction = None
     
     def get_config(self, use_cache=True):
         """Récupérer la configuration actuelle
@@ -43,8 +100,17 @@ class OverlayConfigManager:
         if use_cache and self._cache and 'full_config' in self._cache:
             return self._cache['full_config']
         
+        with METRICS.timed('subcount_overlay_request_seconds', "Latence des appels config overlay", operation='get'):
+            response = self.retry_policy.run(
+                lambda: requests.get(self.config_endpoint, timeout=self.timeout),
+                breaker=self.breaker,
+                label="Récupération config overlay",
+                attempts=1
+            )
+        if response is None:
+            return None
+        
         try:
-            response = requests.get(self.config_endpoint, timeout=self.timeout)
             if response.status_code == 200:
                 config = response.json()
                 if self._cache is not None:
@@ -53,9 +119,6 @@ class OverlayConfigManager:
             else:
                 self.logger.warning(f"HTTP {response.status_code} lors de la récupération config")
             return None
-        except requests.exceptions.ConnectionError:
-            self.logger.error("Impossible de se connecter au serveur")
-            return None
         except Exception as e:
             self.logger.error(f"Erreur récupération config: {e}", exc_info=True)
             return None
@@ -72,34 +135,7 @@ class OverlayConfigManager:
         Raises:
             ValueError: Si les paramètres sont invalides
         """
-        font_updates = {}
-        
-        if family is not None:
-            font_updates['family'] = family
-        
-        if size is not None:
-            # Valider le format CSS (px, em, rem, %)
-            if not re.match(r'^\d+(\.\d+)?(px|em|rem|%|pt)$', str(size)):
-                raise ValueError(f"Format taille invalide: '{size}'. Attendu: '64px', '2em', etc.")
-            font_updates['size'] = size
-        
-        if weight is not None:
-            # Valider le poids (normal, bold, 100-900)
-            valid_weights = ['normal', 'bold', 'lighter', 'bolder'] + [str(i) for i in range(100, 1000, 100)]
-            if str(weight) not in valid_weights:
-                raise ValueError(f"Poids invalide: '{weight}'. Attendu: normal, bold, 100-900")
-            font_updates['weight'] = weight
-        
-        if font_updates:
-            # Vérifier le cache avant envoi
-            cache_key = f"font_{json.dumps(font_updates, sort_keys=True)}"
-            if self._is_cached(cache_key):
-                return True
-            
-            if self._send_update({'font': font_updates}):
-                self._set_cache(cache_key, True)
-                return True
-        return False
+        return self._update_section('font', build_font_updates(family, size, weight))
     
     def update_colors(self, text=None, shadow=None, stroke=None):
         """
@@ -113,32 +149,7 @@ class OverlayConfigManager:
         Raises:
             ValueError: Si le format couleur est invalide
         """
-        color_updates = {}
-        
-        if text is not None:
-            if not self._is_valid_color(text):
-                raise ValueError(f"Format couleur invalide: '{text}'")
-            color_updates['text'] = text
-        
-        if shadow is not None:
-            if not self._is_valid_color(shadow):
-                raise ValueError(f"Format couleur invalide: '{shadow}'")
-            color_updates['shadow'] = shadow
-        
-        if stroke is not None:
-            if not self._is_valid_color(stroke):
-                raise ValueError(f"Format couleur invalide: '{stroke}'")
-            color_updates['stroke'] = stroke
-        
-        if color_updates:
-            cache_key = f"colors_{json.dumps(color_updates, sort_keys=True)}"
-            if self._is_cached(cache_key):
-                return True
-            
-            if self._send_update({'colors': color_updates}):
-                self._set_cache(cache_key, True)
-                return True
-        return False
+        return self._update_section('colors', build_color_updates(text, shadow, stroke))
     
     def update_animation(self, duration=None, easing=None):
         """
@@ -146,28 +157,12 @@ class OverlayConfigManager:
         
         Args:
             duration (str): Durée (ex: '1s', '500ms')
-            easing (str): Fonction d'easing (ex: 'ease-in-out', 'linear')
-        """
-        anim_updates = {}
-        
-        if duration is not None:
-            # Valider format durée
-            if not re.match(r'^\d+(\.\d+)?(s|ms)$', str(duration)):
-                raise ValueError(f"Format durée invalide: '{duration}'. Attendu: '1s', '500ms'")
-            anim_updates['duration'] = duration
+            easing (str): Fonction d'easing (ex: 'ease-in-out', 'cubic-bezier(0.25, 0.1, 0.25, 1)')
         
-        if easing is not None:
-            anim_updates['easing'] = easing
-        
-        if anim_updates:
-            cache_key = f"animation_{json.dumps(anim_updates, sort_keys=True)}"
-            if self._is_cached(cache_key):
-                return True
-            
-            if self._send_update({'animation': anim_updates}):
-                self._set_cache(cache_key, True)
-                return True
-        return False
+        Raises:
+            ValueError: Si la durée ou l'easing sont invalides
+        """
+        return self._update_section('animation', build_animation_updates(duration, easing))
     
     def update_layout(self, paddingLeft=None, gap=None):
         """
@@ -176,22 +171,11 @@ class OverlayConfigManager:
         Args:
             paddingLeft (str): Padding gauche (ex: '20px')
             gap (str): Espacement (ex: '10px', '0')
-        """
-        layout_updates = {}
-        if paddingLeft is not None:
-            layout_updates['paddingLeft'] = paddingLeft
-        if gap is not None:
-            layout_updates['gap'] = gap
         
-        if layout_updates:
-            cache_key = f"layout_{json.dumps(layout_updates, sort_keys=True)}"
-            if self._is_cached(cache_key):
-                return True
-            
-            if self._send_update({'layout': layout_updates}):
-                self._set_cache(cache_key, True)
-                return True
-        return False
+        Raises:
+            ValueError: Si une longueur est invalide
+        """
+        return self._update_section('layout', build_layout_updates(paddingLeft, gap))
     
     def update_full_config(self, font=None, colors=None, animation=None, layout=None):
         """
@@ -202,131 +186,171 @@ class OverlayConfigManager:
             colors (dict): {'text': 'white', 'shadow': 'rgba(0,0,0,0.5)', 'stroke': 'black'}
             animation (dict): {'duration': '1s', 'easing': 'ease-in-out'}
             layout (dict): {'paddingLeft': '20px', 'gap': '0'}
+        
+        Raises:
+            ValueError: Si une section, une clé ou une valeur est invalide
         """
-        updates = {}
-        if font:
-            updates['font'] = font
-        if colors:
-            updates['colors'] = colors
-        if animation:
-            updates['animation'] = animation
-        if layout:
-            updates['layout'] = layout
+        config = COMPILED_SCHEMA.config(build_full_updates(font, colors, animation, layout))
         
-        if updates:
-            return self._send_update(updates)
+        if config:
+            return self._send_update(config.updates, body=config.body)
         return False
     
-    def _send_update(self, updates, retries=3):
-        """Envoyer la mise à jour au serveur avec retry automatique
+    @contextmanager
+    def transaction(self):
+        """Regroupe mises à jour overlay et mutations serveur en un POST /api/batch
+        
+        Dans le bloc, les update_* rejoignent le lot au lieu de partir une
+        par une ; la transaction produite expose aussi set_follows,
+        set_subs, set_follow_goal, set_sub_goal, set_sub_counter_mode et add.
+        Le lot part à la sortie du bloc (rien n'est envoyé si le bloc lève
+        une exception) ; son résultat est dans `tx.ok` / `tx.error`.
+        
+        Yields:
+            BatchTransaction: Lot en cours (le même si transaction() est imbriqué)
+        """
+        if self._transaction is not None:
+            yield self._transaction
+            return
         
-        Args:
-            updates (dict): Mises à jour à envoyer
-            retries (int): Nombre de tentatives (défaut: 3)
+        transaction = self._transaction = BatchTransaction(self._post_batch)
+        try:
+            yield transaction
+        finally:
+            self._transaction = None
+        if not transaction.commit():
+            # Les sections mises en cache dans le bloc n'ont pas été appliquées
+            self.clear_cache()
+    
+    def _post_batch(self, payload, headers):
+        """Envoie un lot à POST /api/batch (voir BatchTransaction)
         
         Returns:
-            bool: True si succès, False sinon
+            dict: Réponse JSON du serveur (None si injoignable)
         """
-        for attempt in range(retries):
-            try:
-                response = requests.post(
-                    self.config_endpoint,
-                    json=updates,
-                    headers={'Content-Type': 'application/json'},
-                    timeout=self.timeout
+        trace_id, headers = TRACER.headers(headers=dict(headers, **{'Content-Type': 'application/json'}))
+        with METRICS.timed('subcount_overlay_request_seconds', "Latence des appels config overlay", operation='batch'):
+            with TRACER.request(trace_id):
+                response = self.retry_policy.run(
+                    lambda: requests.post(
+                        f"{self.server_url}{BATCH_PATH}",
+                        data=json.dumps(payload),
+                        headers=headers,
+                        timeout=self.timeout
+                    ),
+                    breaker=self.breaker,
+                    label="Envoi lot /api/batch"
                 )
-                
-                # Succès
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get('success'):
-                        return True
-                    else:
-                        self.logger.error(f"Erreur serveur: {result.get('error')}")
-                        return False
-                
-                # Erreur serveur (5xx) -> retry
-                elif response.status_code >= 500:
-                    if attempt < retries - 1:
-                        wait_time = 2 ** attempt  # Backoff exponentiel: 1s, 2s, 4s
-                        self.logger.warning(f"HTTP {response.status_code}, retry {attempt + 2}/{retries} dans {wait_time}s")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        self.logger.error(f"HTTP {response.status_code} après {retries} tentatives")
-                        return False
-                
-                # Erreur client (4xx) -> pas de retry
-                else:
-                    self.logger.error(f"HTTP {response.status_code}")
-                    return False
-                    
-            except requests.exceptions.Timeout:
-                if attempt < retries - 1:
-                    wait_time = 2 ** attempt
-                    self.logger.warning(f"Timeout, retry {attempt + 2}/{retries} dans {wait_time}s")
-                    time.sleep(wait_time)
-                else:
-                    self.logger.error(f"Timeout après {retries} tentatives")
-                    return False
-                    
-            except requests.exceptions.ConnectionError:
-                if attempt < retries - 1:
-                    wait_time = 2 ** attempt
-                    self.logger.warning(f"Connexion refusée, retry {attempt + 2}/{retries} dans {wait_time}s")
-                    time.sleep(wait_time)
-                else:
-                    self.logger.error("Impossible de se connecter au serveur")
-                    return False
-                    
-            except Exception as e:
-                self.logger.error(f"Erreur envoi config: {e}", exc_info=True)
-                return False
-        
-        return False
+        METRICS.counter(
+            'subcount_overlay_requests_total', "Appels config overlay",
+            operation='batch', outcome='ok' if response is not None and response.status_code == 200 else 'error'
+        ).inc()
+        if response is None:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return {'success': False, 'error': f"HTTP {response.status_code}"}
     
-    def _is_valid_color(self, color):
-        """Valide un code couleur CSS
+    def replay_operation(self, op):
+        """Rejoue une opération overlay issue du journal hors-ligne
         
         Args:
-            color (str): Couleur à valider
+            op (dict): Opération compactée ({'section': ..., 'values': ...})
         
         Returns:
-            bool: True si valide
+            bool: True si le serveur a accepté la mise à jour
         """
-        if not color or not isinstance(color, str):
+        return self._send_update({op['section']: op['values']}, journal=False)
+    
+    def _update_section(self, section, values):
+        """Envoie une section validée, sauf si elle l'a déjà été (cache)"""
+        if not values:
             return False
+        # Config immuable et hashable : sert directement de clé de cache
+        config = COMPILED_SCHEMA.config({section: values})
+        if self._is_cached(config):
+            return True
+        if self._send_update(config.updates, body=config.body):
+            self._set_cache(config, True)
+            return True
+        return False
+    
+    def _send_update(self, updates, retries=None, journal=True, body=None):
+        """Envoyer la mise à jour au serveur avec retry automatique
         
-        color = color.strip()
+        Les tentatives suivent la politique partagée (RetryPolicy) et
+        échouent immédiatement si le disjoncteur du serveur est ouvert.
+        Si un journal est configuré, les mises à jour non envoyées faute
+        de serveur y sont conservées pour être rejouées plus tard.
         
-        # Noms de couleurs CSS
-        css_colors = [
-            'white', 'black', 'red', 'green', 'blue', 'yellow', 'cyan', 'magenta',
-            'orange', 'purple', 'pink', 'brown', 'gray', 'grey', 'transparent'
-        ]
-        if color.lower() in css_colors:
+        Args:
+            updates (dict): Mises à jour à envoyer
+            retries (int): Nombre de tentatives (défaut: celui de la politique)
+            journal (bool): Journaliser la mise à jour en cas d'échec
+            body (bytes): Corps JSON pré-sérialisé de `updates` (optionnel)
+        
+        Returns:
+            bool: True si succès, False sinon
+        """
+        if self._transaction is not None:
+            self._transaction.update_overlay(updates)
             return True
         
-        # Patterns CSS
-        patterns = [
-            r'^#[0-9A-Fa-f]{3}$',  # #RGB
-            r'^#[0-9A-Fa-f]{6}$',  # #RRGGBB
-            r'^#[0-9A-Fa-f]{8}$',  # #RRGGBBAA
-            r'^rgb\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*\)$',
-            r'^rgba\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*[\d.]+\s*\)$'
-        ]
+        journal = journal and self.journal is not None
+        
+        # Des actions plus anciennes attendent : conserver l'ordre
+        if journal and self.journal.has_pending():
+            self.journal.record_overlay_updates(updates)
+            self.logger.warning("📝 Config overlay mise en attente (rejeu en cours)")
+            return False
         
-        for pattern in patterns:
-            if re.match(pattern, color):
-                # Valider RGB values <= 255
-                if 'rgb' in color:
-                    numbers = re.findall(r'\d{1,3}', color)
-                    if any(int(n) > 255 for n in numbers[:3]):
-                        return False
-                return True
+        # X-Trace-Id : recopié dans le broadcast config_update (tracing.py)
+        trace_id, headers = TRACER.headers(headers={'Content-Type': 'application/json'})
+        with METRICS.timed('subcount_overlay_request_seconds', "Latence des appels config overlay", operation='post'):
+            with TRACER.request(trace_id):
+                response = self.retry_policy.run(
+                    lambda: requests.post(
+                        self.config_endpoint,
+                        data=body if body is not None else json.dumps(updates),
+                        headers=headers,
+                        timeout=self.timeout
+                    ),
+                    breaker=self.breaker,
+                    label="Envoi config overlay",
+                    attempts=retries
+                )
+        METRICS.counter(
+            'subcount_overlay_requests_total', "Appels config overlay",
+            operation='post', outcome='ok' if response is not None and response.status_code == 200 else 'error'
+        ).inc()
+        if response is None:
+            # Jamais remise au serveur (injoignable, 502/503/504, disjoncteur ouvert)
+            if journal:
+                self.journal.record_overlay_updates(updates)
+                self.logger.warning("📝 Config overlay mise en attente (serveur injoignable)")
+            return False
         
+        # Erreur client (4xx) -> pas de retry
+        if response.status_code != 200:
+            self.logger.error(f"HTTP {response.status_code}")
+            return False
+        
+        try:
+            result = response.json()
+        except Exception as e:
+            self.logger.error(f"Erreur envoi config: {e}", exc_info=True)
+            return False
+        
+        if result.get('success'):
+            return True
+        self.logger.error(f"Erreur serveur: {result.get('error')}")
         return False
     
+    def _is_valid_color(self, color):
+        """Valide un code couleur CSS (voir is_valid_color)"""
+        return is_valid_color(color)
+    
     def _is_cached(self, key):
         """Vérifie si une valeur est en cache"""
         return self._cache is not None and key in self._cache
@@ -0,0 +1,554 @@
+# ==================================================================
+# SCHÉMA DE LA CONFIGURATION DES OVERLAYS
+# ==================================================================
+# Description déclarative de toute la config overlay (police,
+# couleurs, animation, mise en page), compilée une seule fois en
+# validateurs : expressions régulières précompilées, ensembles figés,
+# sections mémorisées. Les valeurs invalides sont refusées localement
+# (ValueError) au lieu d'échouer après un aller-retour serveur.
+#
+# OverlayConfig est le résultat validé : immuable, hashable (clé de
+# cache directe) et son corps JSON canonique n'est sérialisé qu'une
+# fois, puis renvoyé tel quel.
+#
+# Usage :
+#     config = OverlayConfig.from_sections(font={'family': 'Arial', 'size': '64px'})
+#     requests.post(url, data=config.body, headers=...)
+#
+# CompiledSchema.config() réutilise l'instance d'une config déjà vue
+# (body compris) : réappliquer un style ne coûte qu'une recherche.
+#
+# Benchmark + fuzzing : python overlay_config_schema.py [--fuzz N]
+# ==================================================================
+
+import json
+import random
+import re
+import string
+from collections import OrderedDict
+
+# Noms de couleurs CSS acceptés
+CSS_COLOR_NAMES = frozenset([
+    'white', 'black', 'red', 'green', 'blue', 'yellow', 'cyan', 'magenta',
+    'orange', 'purple', 'pink', 'brown', 'gray', 'grey', 'transparent'
+])
+
+# Poids de police acceptés (CSS)
+FONT_WEIGHTS = frozenset(['normal', 'bold', 'lighter', 'bolder'] + [str(i) for i in range(100, 1000, 100)])
+
+# Fonctions d'easing nommées (CSS)
+EASING_KEYWORDS = frozenset(['linear', 'ease', 'ease-in', 'ease-out', 'ease-in-out', 'step-start', 'step-end'])
+STEP_POSITIONS = frozenset(['jump-start', 'jump-end', 'jump-none', 'jump-both', 'start', 'end'])
+
+FONT_FAMILY_MAX_LENGTH = 128
+MEMO_SIZE = 1024  # Sections validées mémorisées par schéma
+
+_NUMBER = r'\d+(?:\.\d+)?'
+_SIGNED_NUMBER = r'-?(?:\d+(?:\.\d*)?|\.\d+)'
+_HEX_COLOR = re.compile(r'#(?:[0-9A-Fa-f]{3}|[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})$')
+_RGB_COLOR = re.compile(
+    r'rgb(a?)\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*(?:,\s*([\d.]+)\s*)?\)$'
+)
+_FONT_SIZE = re.compile(_NUMBER + r'(?:px|em|rem|%|pt)$')
+_CSS_LENGTH = re.compile(r'(?:0|-?' + _NUMBER + r'(?:px|em|rem|%|pt|vw|vh))$')
+_DURATION = re.compile(_NUMBER + r'(?:s|ms)$')
+_CUBIC_BEZIER = re.compile(
+    r'cubic-bezier\(\s*({0})\s*,\s*({0})\s*,\s*({0})\s*,\s*({0})\s*\)$'.format(_SIGNED_NUMBER)
+)
+_STEPS = re.compile(r'steps\(\s*(\d+)\s*(?:,\s*([a-z-]+)\s*)?\)$')
+_FONT_FAMILY_FORBIDDEN = re.compile(r'[;{}<>\\\x00-\x1f\x7f]')
+
+
+# ==================================================================
+# VALIDATEURS DE CHAMP
+# ==================================================================
+# Chaque validateur reçoit la valeur brute et renvoie sa forme
+# normalisée (str) ou lève ValueError.
+
+def _as_text(value):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"Valeur invalide: {value!r} (texte attendu)")
+    return str(value).strip()
+
+
+def validate_font_family(value):
+    family = _as_text(value)
+    if not family or len(family) > FONT_FAMILY_MAX_LENGTH or _FONT_FAMILY_FORBIDDEN.search(family):
+        raise ValueError(f"Police invalide: '{value}'")
+    return family
+
+
+def validate_font_size(value):
+    size = _as_text(value)
+    if not _FONT_SIZE.match(size):
+        raise ValueError(f"Format taille invalide: '{value}'. Attendu: '64px', '2em', etc.")
+    return size
+
+
+def validate_font_weight(value):
+    weight = _as_text(value)
+    if weight not in FONT_WEIGHTS:
+        raise ValueError(f"Poids invalide: '{value}'. Attendu: normal, bold, 100-900")
+    return weight
+
+
+def validate_color(value):
+    color = value.strip() if isinstance(value, str) else ''
+    if color.lower() in CSS_COLOR_NAMES or _HEX_COLOR.match(color):
+        return color
+    match = _RGB_COLOR.match(color)
+    if match:
+        has_alpha, red, green, blue, alpha = match.groups()
+        if bool(has_alpha) == (alpha is not None) and max(int(red), int(green), int(blue)) <= 255:
+            if alpha is None:
+                return color
+            try:
+                if 0.0 <= float(alpha) <= 1.0:
+                    return color
+            except ValueError:
+                pass
+    raise ValueError(f"Format couleur invalide: '{value}'")
+
+
+def validate_duration(value):
+    duration = _as_text(value)
+    if not _DURATION.match(duration):
+        raise ValueError(f"Format durée invalide: '{value}'. Attendu: '1s', '500ms'")
+    return duration
+
+
+def validate_easing(value):
+    easing = _as_text(value)
+    if easing in EASING_KEYWORDS:
+        return easing
+    match = _CUBIC_BEZIER.match(easing)
+    if match:
+        x1, _, x2, _ = (float(n) for n in match.groups())
+        if 0.0 <= x1 <= 1.0 and 0.0 <= x2 <= 1.0:
+            return easing
+    match = _STEPS.match(easing)
+    if match and int(match.group(1)) > 0 and (match.group(2) is None or match.group(2) in STEP_POSITIONS):
+        return easing
+    raise ValueError(
+        f"Easing invalide: '{value}'. Attendu: linear, ease-in-out, cubic-bezier(x1, y1, x2, y2), steps(n)"
+    )
+
+
+def validate_css_length(value):
+    length = _as_text(value)
+    if not _CSS_LENGTH.match(length):
+        raise ValueError(f"Longueur invalide: '{value}'. Attendu: '20px', '1.5em', '0'")
+    return length
+
+
+# Type de champ -> validateur
+FIELD_TYPES = {
+    'font_family': validate_font_family,
+    'font_size': validate_font_size,
+    'font_weight': validate_font_weight,
+    'color': validate_color,
+    'duration': validate_duration,
+    'easing': validate_easing,
+    'css_length': validate_css_length,
+}
+
+# Schéma déclaratif : section -> champ -> type
+SCHEMA = OrderedDict([
+    ('font', OrderedDict([('family', 'font_family'), ('size', 'font_size'), ('weight', 'font_weight')])),
+    ('colors', OrderedDict([('text', 'color'), ('shadow', 'color'), ('stroke', 'color')])),
+    ('animation', OrderedDict([('duration', 'duration'), ('easing', 'easing')])),
+    ('layout', OrderedDict([('paddingLeft', 'css_length'), ('gap', 'css_length')])),
+])
+
+
+def is_valid_color(color):
+    """Valide un code couleur CSS (nom, #RGB[A], rgb(), rgba())"""
+    try:
+        validate_color(color)
+        return True
+    except ValueError:
+        return False
+
+
+# ==================================================================
+# SCHÉMA COMPILÉ
+# ==================================================================
+
+class CompiledSchema:
+    """Schéma résolu en validateurs, avec mémoire des sections déjà vues
+
+    Une section validée est représentée par un tuple trié de paires
+    (champ, valeur) : hashable et indépendant de l'ordre des clés.
+    """
+
+    def __init__(self, schema=SCHEMA, field_types=FIELD_TYPES, memo_size=MEMO_SIZE):
+        """
+        Args:
+            memo_size (int): Sections mémorisées (0 = pas de mémoire)
+        """
+        self.sections = OrderedDict(
+            (section, {field: field_types[kind] for field, kind in fields.items()})
+            for section, fields in schema.items()
+        )
+        self.memo_size = memo_size
+        self._memo = {}
+        self._configs = {}
+
+    def validate_section(self, section, values):
+        """Valide les valeurs d'une section (les None sont ignorés)
+
+        Returns:
+            tuple: Paires (champ, valeur normalisée) triées
+
+        Raises:
+            ValueError: Section, champ ou valeur invalide
+        """
+        if not isinstance(values, dict):
+            raise ValueError(f"Section '{section}' invalide: objet attendu")
+        try:
+            key = (section, tuple(sorted(values.items())))
+            cached = self._memo.get(key)
+        except TypeError:
+            # Valeur non hashable (liste, dict...) : refusée par les validateurs
+            key = cached = None
+        if cached is not None:
+            return cached
+
+        validators = self.sections.get(section)
+        if validators is None:
+            raise ValueError(f"Section inconnue: '{section}'")
+        fields = []
+        for field, value in values.items():
+            validator = validators.get(field)
+            if validator is None:
+                raise ValueError(f"Clé inconnue dans la section '{section}': '{field}'")
+            if value is not None:
+                fields.append((field, validator(value)))
+        fields = tuple(sorted(fields))
+
+        if key is not None and self.memo_size:
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[key] = fields
+        return fields
+
+    def build(self, section, **values):
+        """Section validée sous forme de dict (vide si rien à changer)"""
+        return dict(self.validate_section(section, values))
+
+    def validate(self, updates):
+        """Valide une mise à jour complète {section: {champ: valeur}}
+
+        Returns:
+            tuple: Paires (section, champs) triées, sections vides exclues
+        """
+        if not isinstance(updates, dict):
+            raise ValueError("Configuration invalide: objet attendu")
+        sections = []
+        for section, values in updates.items():
+            if values is None:
+                continue
+            fields = self.validate_section(section, values)
+            if fields:
+                sections.append((section, fields))
+        return tuple(sorted(sections))
+
+    def config(self, updates):
+        """OverlayConfig validée, partagée entre appels identiques
+
+        La même instance (et donc le même body déjà sérialisé) est
+        renvoyée tant que la mémoire n'est pas pleine.
+        """
+        try:
+            key = tuple(
+                (section, tuple(sorted(values.items())) if isinstance(values, dict) else values)
+                for section, values in updates.items()
+            )
+            cached = self._configs.get(key)
+        except (AttributeError, TypeError):
+            key = cached = None
+        if cached is not None:
+            return cached
+
+        config = OverlayConfig(updates, schema=self)
+        if key is not None and self.memo_size:
+            if len(self._configs) >= self.memo_size:
+                self._configs.clear()
+            self._configs[key] = config
+        return config
+
+
+COMPILED_SCHEMA = CompiledSchema()
+
+
+# ==================================================================
+# CONFIG VALIDÉE
+# ==================================================================
+
+class OverlayConfig:
+    """Configuration overlay validée, immuable et hashable
+
+    `body` (JSON canonique en bytes) est calculé au premier accès puis
+    réutilisé à chaque renvoi.
+    """
+
+    __slots__ = ('_sections', '_hash', '_body')
+
+    def __init__(self, updates=None, schema=COMPILED_SCHEMA):
+        """
+        Args:
+            updates (dict): {section: {champ: valeur}} (None ignorés)
+
+        Raises:
+            ValueError: Si une section, un champ ou une valeur est invalide
+        """
+        object.__setattr__(self, '_sections', schema.validate(updates or {}))
+        object.__setattr__(self, '_hash', hash(self._sections))
+        object.__setattr__(self, '_body', None)
+
+    @classmethod
+    def from_sections(cls, font=None, colors=None, animation=None, layout=None, schema=COMPILED_SCHEMA):
+        return schema.config({'font': font, 'colors': colors, 'animation': animation, 'layout': layout})
+
+    @property
+    def updates(self):
+        """Copie modifiable sous forme {section: {champ: valeur}}"""
+        return {section: dict(fields) for section, fields in self._sections}
+
+    @property
+    def body(self):
+        """Corps JSON canonique (bytes, mis en cache)"""
+        if self._body is None:
+            body = json.dumps(self.updates, separators=(',', ':'), sort_keys=True).encode('utf-8')
+            object.__setattr__(self, '_body', body)
+        return self._body
+
+    def sections(self):
+        return [section for section, _ in self._sections]
+
+    def section(self, name):
+        for section, fields in self._sections:
+            if section == name:
+                return dict(fields)
+        return {}
+
+    def merge(self, other):
+        """Nouvelle config : `other` l'emporte champ par champ"""
+        updates = self.updates
+        for section, fields in other._sections:
+            updates.setdefault(section, {}).update(fields)
+        return OverlayConfig(updates)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("OverlayConfig est immuable")
+
+    def __delattr__(self, name):
+        raise AttributeError("OverlayConfig est immuable")
+
+    def __eq__(self, other):
+        return isinstance(other, OverlayConfig) and self._sections == other._sections
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __bool__(self):
+        return bool(self._sections)
+
+    def __repr__(self):
+        return f"OverlayConfig({self.updates!r})"
+
+
+# ==================================================================
+# FUZZING ET BENCHMARK
+# ==================================================================
+
+VALID_SAMPLES = {
+    'font_family': ['Arial', 'Courier New', "'Segoe UI', sans-serif", 'SEA', 'Noto Sans JP'],
+    'font_size': ['64px', '2em', '1.5rem', '100%', '12pt'],
+    'font_weight': ['normal', 'bold', '700', 400],
+    'color': ['white', '#FFF', '#ff0000', '#00000080', 'rgb(255, 0, 0)', 'rgba(0,0,0,0.5)'],
+    'duration': ['1s', '500ms', '0.25s'],
+    'easing': ['linear', 'ease-in-out', 'cubic-bezier(0.25, 0.46, 0.45, 0.94)', 'cubic-bezier(0,-1.5,1,2.5)', 'steps(4, jump-end)'],
+    'css_length': ['0', '20px', '-4px', '1.5em', '10%'],
+}
+
+_FUZZ_ALPHABET = string.ascii_letters + string.digits + ' #%().,-;{}<>\\\'"\t\n' + 'éà中'
+
+
+def _mutate(rng, text):
+    """Variante aléatoire d'un échantillon (insertion, suppression, substitution, troncature)"""
+    text = str(text)
+    operation = rng.randrange(5)
+    position = rng.randint(0, len(text))
+    if operation == 0:
+        return text[:position] + rng.choice(_FUZZ_ALPHABET) + text[position:]
+    if operation == 1:
+        return text[:position] + text[position + 1:]
+    if operation == 2:
+        return text[:position] + rng.choice(_FUZZ_ALPHABET) + text[position + 1:]
+    if operation == 3:
+        return text[:position]
+    return ''.join(rng.choice(_FUZZ_ALPHABET) for _ in range(rng.randint(0, 24)))
+
+
+def _random_value(rng, kind):
+    if rng.random() < 0.05:
+        return rng.choice([None, True, 3.5, -1, [], {}, b'64px', object()])
+    sample = rng.choice(VALID_SAMPLES[kind])
+    return sample if rng.random() < 0.3 else _mutate(rng, sample)
+
+
+def _random_updates(rng, schema=SCHEMA):
+    updates = {}
+    for section, fields in schema.items():
+        if rng.random() < 0.7:
+            values = {field: _random_value(rng, kind) for field, kind in fields.items() if rng.random() < 0.8}
+            if rng.random() < 0.02:
+                values['inconnu'] = 'x'
+            updates[section] = values
+    if rng.random() < 0.02:
+        updates['inconnue'] = {}
+    return updates
+
+
+def fuzz(iterations=20000, seed=0):
+    """Vérifie les invariants du schéma sur des entrées aléatoires
+
+    - un validateur renvoie une chaîne ou lève ValueError, rien d'autre
+    - une valeur acceptée est stable (revalider donne la même valeur)
+    - une config acceptée : body == JSON canonique de updates, relire body
+      redonne la même config, même contenu => même hash
+    - l'ordre des clés n'influe ni sur l'égalité ni sur body
+
+    Raises:
+        AssertionError: Au premier invariant violé (avec l'entrée en cause)
+    """
+    rng = random.Random(seed)
+    accepted = rejected = 0
+    for _ in range(iterations):
+        kind = rng.choice(sorted(FIELD_TYPES))
+        value = _random_value(rng, kind)
+        validator = FIELD_TYPES[kind]
+        try:
+            normalized = validator(value)
+        except ValueError:
+            rejected += 1
+        except Exception as e:
+            raise AssertionError(f"{kind}({value!r}) a levé {type(e).__name__}: {e}")
+        else:
+            accepted += 1
+            assert isinstance(normalized, str), (kind, value, normalized)
+            assert validator(normalized) == normalized, (kind, value, normalized)
+
+        updates = _random_updates(rng)
+        try:
+            config = OverlayConfig(updates)
+        except ValueError:
+            continue
+        except Exception as e:
+            raise AssertionError(f"OverlayConfig({updates!r}) a levé {type(e).__name__}: {e}")
+        assert config.body == json.dumps(config.updates, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        reloaded = OverlayConfig(json.loads(config.body.decode('utf-8')))
+        assert reloaded == config and hash(reloaded) == hash(config), updates
+        shuffled = {}
+        for section in reversed(list(updates)):
+            values = updates[section]
+            shuffled[section] = dict(reversed(list(values.items()))) if isinstance(values, dict) else values
+        assert OverlayConfig(shuffled).body == config.body, updates
+        assert COMPILED_SCHEMA.config(updates) == config, updates
+    return {'iterations': iterations, 'values_accepted': accepted, 'values_rejected': rejected}
+
+
+def _legacy_validate(updates):
+    """Validation d'avant le schéma (regex et listes reconstruites à chaque appel)"""
+    font, colors, animation = updates['font'], updates['colors'], updates['animation']
+    if not re.match(r'^\d+(\.\d+)?(px|em|rem|%|pt)$', str(font['size'])):
+        raise ValueError(font['size'])
+    if str(font['weight']) not in ['normal', 'bold', 'lighter', 'bolder'] + [str(i) for i in range(100, 1000, 100)]:
+        raise ValueError(font['weight'])
+    for color in colors.values():
+        names = ['white', 'black', 'red', 'green', 'blue', 'yellow', 'cyan', 'magenta',
+                 'orange', 'purple', 'pink', 'brown', 'gray', 'grey', 'transparent']
+        if color.lower() in names:
+            continue
+        patterns = [r'^#[0-9A-Fa-f]{3}$', r'^#[0-9A-Fa-f]{6}$', r'^#[0-9A-Fa-f]{8}$',
+                    r'^rgb\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*\)$',
+                    r'^rgba\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*[\d.]+\s*\)$']
+        if not any(re.match(pattern, color) for pattern in patterns):
+            raise ValueError(color)
+    if not re.match(r'^\d+(\.\d+)?(s|ms)$', str(animation['duration'])):
+        raise ValueError(animation['duration'])
+    return json.dumps(updates).encode('utf-8')
+
+
+def benchmark(configs=20000, distinct=200, seed=0):
+    """Débit de validation d'une config complète + coût des renvois
+
+    `distinct` configs différentes tournent en boucle (cas réel : quelques
+    styles appliqués et réappliqués). Compare validation d'avant le schéma
+    (sans easing ni layout), schéma compilé à froid (mémoire vidée) et à
+    chaud, puis renvoi avec JSON re-sérialisé contre body en cache.
+    """
+    import time
+
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        pool.append({
+            'font': {'family': rng.choice(VALID_SAMPLES['font_family']), 'size': f"{rng.randint(20, 120)}px",
+                     'weight': rng.choice(['normal', 'bold', '700'])},
+            'colors': {'text': f"#{rng.randrange(1 << 24):06x}", 'shadow': f"rgba(0,0,0,{rng.randint(0, 10) / 10})",
+                       'stroke': rng.choice(['black', 'white', '#000'])},
+            'animation': {'duration': f"{rng.randint(100, 2000)}ms", 'easing': rng.choice(VALID_SAMPLES['easing'])},
+            'layout': {'paddingLeft': f"{rng.randint(0, 80)}px", 'gap': rng.choice(['0', '5px', '10px'])},
+        })
+    workload = [pool[i % distinct] for i in range(configs)]
+
+    def rate(fn):
+        start = time.perf_counter()
+        for updates in workload:
+            fn(updates)
+        elapsed = time.perf_counter() - start
+        return {'configs_per_s': round(configs / elapsed), 'us_per_config': round(elapsed / configs * 1e6, 2)}
+
+    cold = CompiledSchema(memo_size=0)
+    warm = CompiledSchema()
+    report = {
+        'configs': configs,
+        'distinct': distinct,
+        'legacy_validate_and_serialize': rate(_legacy_validate),
+        'schema_cold': rate(lambda updates: OverlayConfig(updates, schema=cold).body),
+        'schema_warm': rate(lambda updates: warm.config(updates).body),
+    }
+
+    config = OverlayConfig(pool[0])
+    start = time.perf_counter()
+    for _ in range(configs):
+        json.dumps(config.updates, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    reserialize = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(configs):
+        config.body
+    cached = time.perf_counter() - start
+    report['resend_reserialize_us'] = round(reserialize / configs * 1e6, 3)
+    report['resend_cached_body_us'] = round(cached / configs * 1e6, 3)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark et fuzzing du schéma de config overlay")
+    parser.add_argument('--configs', type=int, default=20000)
+    parser.add_argument('--fuzz', type=int, default=20000, help="Itérations de fuzzing (0 = désactivé)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = {}
+    if args.fuzz:
+        report['fuzz'] = fuzz(args.fuzz, args.seed)
+    report['benchmark'] = benchmark(args.configs, seed=args.seed)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,250 @@
+# ==================================================================
+# PRESETS DE STYLE DES OVERLAYS
+# ==================================================================
+# Presets nommés (police, couleurs, animation, mise en page) stockés
+# localement en JSON, éventuellement liés à des scènes OBS.
+#
+# Chaque preset est validé une seule fois au chargement (schéma de
+# overlay_config_schema, comme OverlayConfigManager) et son corps de
+# requête JSON est pré-sérialisé : l'appliquer = un seul POST /api/overlay-config, donc
+# une seule diffusion config_update et un seul rafraîchissement overlay.
+#
+# Format du fichier :
+#   {"version": 1,
+#    "presets": {"Jeu": {"font": {...}, "colors": {...}}, ...},
+#    "scenes": {"Scène Jeu": "Jeu", ...}}
+# ==================================================================
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from overlay_config_schema import SCHEMA, OverlayConfig
+
+logger = logging.getLogger(__name__)
+
+PRESETS_VERSION = 1
+
+class OverlayPreset:
+    """Preset validé et pré-sérialisé (immuable)
+
+    Raises:
+        ValueError: Si le nom ou une valeur de section est invalide
+    """
+
+    __slots__ = ('name', 'config')
+
+    def __init__(self, name, font=None, colors=None, animation=None, layout=None):
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("Nom de preset vide")
+
+        config = OverlayConfig.from_sections(font=font, colors=colors, animation=animation, layout=layout)
+        if not config:
+            raise ValueError(f"Preset '{name}' vide")
+
+        self.name = name.strip()
+        self.config = config
+
+    @property
+    def updates(self):
+        return self.config.updates
+
+    @property
+    def body(self):
+        return self.config.body
+
+    @classmethod
+    def from_dict(cls, name, data):
+        """Construit un preset depuis sa forme stockée"""
+        if not isinstance(data, dict):
+            raise ValueError(f"Preset '{name}' invalide: objet attendu")
+        unknown = set(data) - set(SCHEMA)
+        if unknown:
+            raise ValueError(f"Section(s) inconnue(s) dans '{name}': {sorted(unknown)}")
+        return cls(name, **data)
+
+    def to_dict(self):
+        return self.config.updates
+
+    def __eq__(self, other):
+        return isinstance(other, OverlayPreset) and self.name == other.name and self.config == other.config
+
+    def __hash__(self):
+        return hash((self.name, self.config))
+
+    def __repr__(self):
+        return f"OverlayPreset({self.name!r}, sections={self.config.sections()})"
+
+
+class PresetStore:
+    """Presets et liaisons scène -> preset persistés dans un fichier JSON
+
+    Les presets invalides du fichier sont ignorés (avec un avertissement)
+    sans empêcher le chargement des autres.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._presets = OrderedDict()
+        self._scenes = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Presets
+    # ------------------------------------------------------------------
+
+    def get(self, name):
+        return self._presets.get(name)
+
+    def names(self):
+        return list(self._presets)
+
+    def add(self, preset):
+        """Ajoute ou remplace un preset puis sauvegarde"""
+        with self._lock:
+            self._presets[preset.name] = preset
+            self._save()
+
+    def remove(self, name):
+        """Supprime un preset et ses liaisons de scènes
+
+        Returns:
+            bool: True si le preset existait
+        """
+        with self._lock:
+            if self._presets.pop(name, None) is None:
+                return False
+            self._scenes = {scene: preset for scene, preset in self._scenes.items() if preset != name}
+            self._save()
+            return True
+
+    # ------------------------------------------------------------------
+    # Scènes
+    # ------------------------------------------------------------------
+
+    def bind_scene(self, scene, name):
+        """Lie une scène à un preset (name=None pour délier)
+
+        Raises:
+            KeyError: Si le preset n'existe pas
+        """
+        with self._lock:
+            if name is None:
+                self._scenes.pop(scene, None)
+            else:
+                if name not in self._presets:
+                    raise KeyError(name)
+                self._scenes[scene] = name
+            self._save()
+
+    def preset_for_scene(self, scene):
+        """Preset lié à une scène (None si aucun)"""
+        name = self._scenes.get(scene)
+        return self._presets.get(name) if name else None
+
+    def scene_bindings(self):
+        return dict(self._scenes)
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """(Re)charge le fichier ; absent = aucun preset"""
+        presets = OrderedDict()
+        scenes = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Fichier de presets illisible ({e}) - aucun preset chargé")
+                data = {}
+
+            for name, values in (data.get('presets') or {}).items():
+                try:
+                    presets[name] = OverlayPreset.from_dict(name, values)
+                except ValueError as e:
+                    logger.warning(f"⚠️ Preset ignoré: {e}")
+            for scene, name in (data.get('scenes') or {}).items():
+                if name in presets:
+                    scenes[scene] = name
+
+        with self._lock:
+            self._presets = presets
+            self._scenes = scenes
+
+    def _save(self):
+        """Écriture atomique du fichier (verrou tenu)"""
+        data = {
+            'version': PRESETS_VERSION,
+            'presets': {name: preset.to_dict() for name, preset in self._presets.items()},
+            'scenes': self._scenes,
+        }
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.presets-', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def benchmark(presets=200, switches=2000):
+    """Mesure la validation au chargement et le coût de sérialisation évité
+
+    Returns:
+        dict: Résultats (microsecondes)
+    """
+    import time
+
+    definitions = {
+        f"preset-{i}": {
+            'font': {'family': 'Arial', 'size': f"{24 + i % 100}px", 'weight': 'bold'},
+            'colors': {'text': f"#{i % 256:02x}40ff", 'shadow': 'rgba(0,0,0,0.5)'},
+            'animation': {'duration': '800ms', 'easing': 'ease-out'},
+            'layout': {'paddingLeft': '20px', 'gap': '0'},
+        }
+        for i in range(presets)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'overlay_presets.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': PRESETS_VERSION, 'presets': definitions, 'scenes': {}}, f)
+
+        start = time.perf_counter()
+        store = PresetStore(path)
+        load_time = time.perf_counter() - start
+
+    names = store.names()
+    start = time.perf_counter()
+    for i in range(switches):
+        store.get(names[i % len(names)]).body
+    cached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(switches):
+        name = names[i % len(names)]
+        json.dumps(OverlayConfig(definitions[name]).updates).encode('utf-8')
+    rebuild_time = time.perf_counter() - start
+
+    return {
+        'presets': presets,
+        'load_ms': load_time * 1000,
+        'load_per_preset_us': load_time / presets * 1e6,
+        'body_cached_us': cached_time / switches * 1e6,
+        'body_validate_and_serialize_us': rebuild_time / switches * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    print("\n🎭 Benchmark presets overlay")
+    print(json.dumps(benchmark(), indent=2))
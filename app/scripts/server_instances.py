@@ -0,0 +1,539 @@
+# ==================================================================
+# INSTANCES MULTIPLES DU SERVEUR SUBCOUNT
+# ==================================================================
+# Un ServerInstance regroupe tout ce qui était global dans le script
+# OBS pour un serveur : ports (HTTP, WebSocket compteurs, WebSocket
+# config), processus, supervision, disjoncteur et gestionnaire de
+# config overlay. InstanceRegistry permet de piloter plusieurs chaînes
+# (double chaîne, co-stream) depuis un seul OBS :
+# - démarrage de toutes les instances puis health checks concurrents
+# - actions ciblant une instance ou diffusées à toutes en parallèle
+#
+# Côté Node, les ports et les fichiers d'état d'une instance sont
+# choisis via les variables d'environnement SUBCOUNT_* (voir
+# app/server/utils/constants.js).
+#
+# Format des instances dans les paramètres OBS (une par ligne) :
+#   nom:port_http      ex. "duo:8092"
+# La chaîne Twitch d'une instance est celle du compte connecté sur son
+# serveur (config Twitch suffixée par le nom de l'instance).
+# Les WebSockets utilisent port_http+1 (compteurs) et port_http+2 (config).
+# ==================================================================
+
+import asyncio
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from async_http import HttpConnection
+from background_loop import get_background_loop
+from server_resilience import DEFAULT_RETRY_POLICY, get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_PORT = 8082
+PRIMARY_INSTANCE = "principal"
+ALL_INSTANCES = "*"
+
+# Caractères gardés par INSTANCE_NAME dans constants.js ([\w-] ASCII) : un
+# autre nom y serait tronqué, voire vidé (fichiers de l'instance principale)
+INSTANCE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+HEALTH_CHECK_INTERVAL = 0.25  # Entre deux sondes pendant le démarrage (s)
+READY_TIMEOUT = 10.0          # Attente des lignes d'écoute avant de sonder en HTTP (s)
+SUPERVISE_INTERVAL = 10       # Entre deux contrôles du superviseur (s)
+SUPERVISE_IDLE_INTERVAL = 60  # Idem hors direct (profil d'activité IDLE)
+ACTIVITY_PROFILE_PATH = "/api/activity-profile"
+OVERLAY_PATH = "/obs/overlays/overlay.html"
+
+
+class InstancePorts:
+    """Ports d'une instance (HTTP, WebSocket compteurs, WebSocket config)"""
+
+    __slots__ = ('http', 'ws_counter', 'ws_config')
+
+    def __init__(self, http, ws_counter=None, ws_config=None):
+        self.http = int(http)
+        self.ws_counter = int(ws_counter) if ws_counter is not None else self.http + 1
+        self.ws_config = int(ws_config) if ws_config is not None else self.http + 2
+
+    def as_tuple(self):
+        return (self.http, self.ws_counter, self.ws_config)
+
+    def environment(self):
+        """Variables lues par utils/constants.js"""
+        return {
+            'SUBCOUNT_HTTP_PORT': str(self.http),
+            'SUBCOUNT_WS_COUNTER_PORT': str(self.ws_counter),
+            'SUBCOUNT_WS_CONFIG_PORT': str(self.ws_config),
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, InstancePorts) and self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"InstancePorts({self.http}, {self.ws_counter}, {self.ws_config})"
+
+
+class ServerInstance:
+    """Un serveur SubCount (processus + clients) identifié par son nom
+
+    Args:
+        name (str): Nom unique ("principal" pour le serveur historique)
+        ports (InstancePorts): Ports (défaut: 8082/8083/8084)
+        host (str): Hôte du serveur
+        journal (ActionJournal): Journal hors-ligne du gestionnaire overlay
+    """
+
+    def __init__(self, name, ports=None, host="localhost", journal=None):
+        self.name = name
+        self.ports = ports or InstancePorts(DEFAULT_HTTP_PORT)
+        self.host = host
+        self.journal = journal
+        self.breaker = get_circuit_breaker(self.url)
+        self.process = None
+        self.running = False
+        self.healthy = False
+        self._overlay_config = None
+        self._supervisor = None
+        self._stop_supervisor = threading.Event()
+        self._wake_supervisor = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Adresses
+    # ------------------------------------------------------------------
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.ports.http}"
+
+    @property
+    def ws_counter_url(self):
+        return f"ws://{self.host}:{self.ports.ws_counter}"
+
+    @property
+    def ws_config_url(self):
+        return f"ws://{self.host}:{self.ports.ws_config}"
+
+    def page_url(self, path="/", **params):
+        """URL d'une page servie par l'instance
+
+        Les pages prennent le port HTTP dans leur adresse ; les ports
+        WebSocket sont passés en paramètres (wsCounterPort, wsConfigPort).
+        """
+        params.update(wsCounterPort=self.ports.ws_counter, wsConfigPort=self.ports.ws_config)
+        return f"{self.url}{path}?{urlencode(params)}"
+
+    def overlay_url(self, kind, align="left"):
+        """URL de l'overlay ('follow' ou 'sub') pour une source navigateur OBS"""
+        return self.page_url(OVERLAY_PATH, type=kind, align=align)
+
+    @property
+    def is_primary(self):
+        return self.name == PRIMARY_INSTANCE
+
+    def environment(self, base=None):
+        """Environnement du processus Node de cette instance
+
+        L'instance principale garde les fichiers d'état historiques ;
+        les autres utilisent des fichiers suffixés par leur nom.
+        """
+        env = dict(os.environ if base is None else base)
+        env.update(self.ports.environment())
+        if not self.is_primary:
+            env['SUBCOUNT_INSTANCE'] = self.name
+        return env
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+
+    @property
+    def overlay_config(self):
+        """AsyncOverlayConfigManager de l'instance (créé au premier usage)"""
+        if self._overlay_config is None:
+            from async_overlay_config_manager import AsyncOverlayConfigManager
+            self._overlay_config = AsyncOverlayConfigManager(server_url=self.url, journal=self.journal)
+        return self._overlay_config
+
+    async def request_async(self, method, path, payload=None, headers=None, timeout=5.0, attempts=None):
+        """Appel HTTP via la politique de retry partagée et le disjoncteur de l'instance
+
+        Returns:
+            HttpResponse ou None si le serveur est injoignable (ou disjoncteur ouvert)
+        """
+        connection = HttpConnection(self.url, timeout)
+        try:
+            return await DEFAULT_RETRY_POLICY.run_async(
+                lambda: connection.request(method, path, payload, headers),
+                breaker=self.breaker,
+                label=f"{method} {path} [{self.name}]",
+                attempts=attempts
+            )
+        finally:
+            connection.close()
+
+    async def check_health_async(self, timeout=2.0, report_failure=True):
+        """GET / sur le serveur ; alimente le disjoncteur de l'instance
+
+        Args:
+            report_failure (bool): Ouvrir le disjoncteur si le serveur ne répond pas
+        """
+        connection = HttpConnection(self.url, timeout)
+        try:
+            response = await connection.request('GET', '/')
+            healthy = response.status_code == 200
+        except (OSError, asyncio.TimeoutError, ValueError):
+            healthy = False
+        except Exception as e:
+            logger.debug(f"Health check {self.name}: {e}")
+            healthy = False
+        finally:
+            connection.close()
+        self.healthy = healthy
+        if healthy or report_failure:
+            self.breaker.report_health(healthy)
+        return healthy
+
+    def check_health(self, timeout=2.0):
+        """Health check bloquant (exécuté sur la boucle d'arrière-plan)"""
+        return get_background_loop().submit(self.check_health_async(timeout)).result(timeout + 1)
+
+    async def set_activity_profile_async(self, profile, timeout=2.0):
+        """POST /api/activity-profile : le serveur adapte son polling Twitch
+
+        Returns:
+            bool: True si le serveur a pris le profil en compte
+        """
+        connection = HttpConnection(self.url, timeout)
+        try:
+            response = await connection.request('POST', ACTIVITY_PROFILE_PATH, {'profile': profile})
+            return response.status_code == 200
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            logger.debug(f"Profil d'activité {self.name}: {e}")
+            return False
+        finally:
+            connection.close()
+
+    def set_activity_profile(self, profile, timeout=2.0):
+        """Envoi bloquant du profil (exécuté sur la boucle d'arrière-plan)"""
+        return get_background_loop().submit(self.set_activity_profile_async(profile, timeout)).result(timeout + 1)
+
+    async def wait_healthy_async(self, timeout=30.0, ready_timeout=READY_TIMEOUT):
+        """Attend que le serveur réponde
+
+        Si le processus annonce son écoute (ServerProcess.wait_ready), une
+        seule sonde confirme dès la ligne affichée ; sinon, ou si la ligne
+        n'arrive pas dans `ready_timeout`, le serveur est sondé en boucle.
+
+        Returns:
+            bool: False si le délai expire ou si le processus s'arrête
+        """
+        deadline = time.monotonic() + timeout
+        wait_ready = getattr(self.process, 'wait_ready', None)
+        if wait_ready is not None:
+            loop = asyncio.get_event_loop()
+            if await loop.run_in_executor(None, wait_ready, min(ready_timeout, timeout)):
+                if await self.check_health_async(min(2.0, timeout), report_failure=False):
+                    return True
+            elif self.process.poll() is not None:
+                self._log_exit_output("pendant le démarrage")
+                return False
+            else:
+                logger.warning(f"⏳ [{self.name}] Lignes d'écoute non vues en {ready_timeout:.0f}s, sondes HTTP")
+        while True:
+            # Un serveur qui démarre ne répond pas encore : pas d'ouverture du disjoncteur
+            timeout_left = min(2.0, max(0.1, deadline - time.monotonic()))
+            if await self.check_health_async(timeout_left, report_failure=False):
+                return True
+            if self.process is not None and self.process.poll() is not None:
+                self._log_exit_output("pendant le démarrage")
+                return False
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    def output_tail(self, count=20):
+        """Dernières lignes affichées par le serveur (lancement direct uniquement)"""
+        output = getattr(self.process, 'output', None)
+        return output.tail(count) if output is not None else []
+
+    def _log_exit_output(self, when):
+        """Journalise l'arrêt du processus et la fin de sa sortie"""
+        process = self.process
+        if process is None:
+            return
+        if hasattr(process, 'wait_output_closed'):
+            process.wait_output_closed(1.0)
+        logger.error(f"❌ [{self.name}] Le serveur s'est arrêté {when} (code {process.returncode})")
+        for line in self.output_tail():
+            logger.error(f"   [{self.name}] {line}")
+
+    # ------------------------------------------------------------------
+    # Processus
+    # ------------------------------------------------------------------
+
+    def spawn(self, launcher):
+        """Lance le processus via `launcher(instance) -> Popen`"""
+        self.process = launcher(self)
+        self.running = True
+        logger.info(f"✅ [{self.name}] Serveur démarré (PID: {self.process.pid}, port {self.ports.http})")
+        return self.process
+
+    def stop(self, timeout=5):
+        """Arrête le processus et le superviseur"""
+        self._stop_supervisor.set()
+        self._wake_supervisor.set()
+        process, self.process = self.process, None
+        self.running = False
+        self.healthy = False
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"💥 [{self.name}] Force l'arrêt du processus {process.pid}")
+                process.kill()
+            except OSError as e:
+                logger.error(f"❌ [{self.name}] Erreur arrêt processus: {e}")
+        # Serveur arrêté volontairement : rejeter immédiatement les appels suivants
+        self.breaker.trip()
+
+    def supervise(self, on_exit=None, health_check=None, interval=SUPERVISE_INTERVAL):
+        """Surveille le processus dans un thread (health check périodique)
+
+        Args:
+            on_exit (callable): Appelé avec l'instance si le processus meurt
+            health_check (callable): Remplace check_health (appelé avec l'instance)
+            interval (float|callable): Secondes entre deux contrôles, ou
+                fonction relue à chaque contrôle (profil d'activité)
+        """
+        self._stop_supervisor.set()
+        self._wake_supervisor.set()
+        self._stop_supervisor = threading.Event()
+        self._wake_supervisor = threading.Event()
+        stop_event = self._stop_supervisor
+        wake_event = self._wake_supervisor
+        next_interval = interval if callable(interval) else (lambda: interval)
+
+        def run():
+            while self.running and not stop_event.is_set():
+                if self.process is not None and self.process.poll() is not None:
+                    self._log_exit_output("de manière inattendue")
+                    self.running = False
+                    self.healthy = False
+                    self.breaker.trip()
+                    if on_exit is not None:
+                        on_exit(self)
+                    break
+                try:
+                    if health_check is not None:
+                        health_check(self)
+                    else:
+                        self.check_health()
+                except Exception as e:
+                    logger.debug(f"Supervision {self.name}: {e}")
+                wake_event.wait(next_interval())
+                wake_event.clear()
+
+        self._supervisor = threading.Thread(target=run, name=f"subcount-supervisor-{self.name}", daemon=True)
+        self._supervisor.start()
+        return self._supervisor
+
+    def wake_supervisor(self):
+        """Contrôle immédiat puis reprise au nouvel intervalle (changement de profil)"""
+        self._wake_supervisor.set()
+
+    def __repr__(self):
+        return f"ServerInstance({self.name!r}, {self.ports!r})"
+
+
+class InstanceRegistry:
+    """Instances connues, dans l'ordre d'ajout (la première est la cible par défaut)"""
+
+    def __init__(self):
+        self._instances = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, instance):
+        """Ajoute une instance
+
+        Raises:
+            ValueError: Si le nom ou un port est déjà utilisé
+        """
+        with self._lock:
+            if instance.name in self._instances:
+                raise ValueError(f"Instance déjà enregistrée: {instance.name}")
+            used = {port for other in self._instances.values() for port in other.ports.as_tuple()}
+            clash = used.intersection(instance.ports.as_tuple())
+            if clash:
+                raise ValueError(f"Port(s) déjà utilisé(s) par une autre instance: {sorted(clash)}")
+            self._instances[instance.name] = instance
+        return instance
+
+    def remove(self, name):
+        with self._lock:
+            return self._instances.pop(name, None)
+
+    def get(self, name):
+        return self._instances.get(name)
+
+    def names(self):
+        return list(self._instances)
+
+    @property
+    def default(self):
+        return next(iter(self._instances.values()), None)
+
+    def __iter__(self):
+        return iter(list(self._instances.values()))
+
+    def __len__(self):
+        return len(self._instances)
+
+    def targets(self, target=None):
+        """Instances visées : None = défaut, "*" = toutes, un nom ou une liste de noms
+
+        Raises:
+            KeyError: Si une instance nommée est inconnue
+        """
+        if target == ALL_INSTANCES:
+            return list(self)
+        if target is None:
+            default = self.default
+            return [default] if default is not None else []
+        names = [target] if isinstance(target, str) else list(target)
+        instances = []
+        for name in names:
+            instance = self._instances.get(name)
+            if instance is None:
+                raise KeyError(name)
+            instances.append(instance)
+        return instances
+
+    # ------------------------------------------------------------------
+    # Diffusion des actions
+    # ------------------------------------------------------------------
+
+    def fan_out(self, action, target=ALL_INSTANCES, timeout=None):
+        """Exécute `action(instance)` (bloquante) sur les instances en parallèle
+
+        Returns:
+            OrderedDict: nom -> résultat (l'exception levée en cas d'échec)
+        """
+        instances = self.targets(target)
+        results = OrderedDict()
+        if len(instances) <= 1:
+            for instance in instances:
+                try:
+                    results[instance.name] = action(instance)
+                except Exception as e:
+                    results[instance.name] = e
+            return results
+
+        with ThreadPoolExecutor(max_workers=len(instances), thread_name_prefix="subcount-fanout") as pool:
+            futures = [(instance.name, pool.submit(action, instance)) for instance in instances]
+            for name, future in futures:
+                try:
+                    results[name] = future.result(timeout)
+                except Exception as e:
+                    results[name] = e
+        return results
+
+    async def fan_out_async(self, action, target=ALL_INSTANCES):
+        """Exécute la coroutine `action(instance)` sur les instances de façon concurrente"""
+        instances = self.targets(target)
+        outcomes = await asyncio.gather(*(action(instance) for instance in instances), return_exceptions=True)
+        return OrderedDict((instance.name, outcome) for instance, outcome in zip(instances, outcomes))
+
+    def submit(self, action, target=ALL_INSTANCES):
+        """fan_out_async planifié sur la boucle d'arrière-plan (non bloquant)
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return get_background_loop().submit(self.fan_out_async(action, target))
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start_all(self, launcher, timeout=30.0, target=ALL_INSTANCES):
+        """Lance les instances puis attend qu'elles répondent, en parallèle
+
+        Les processus sont tous lancés avant le premier health check :
+        le temps de démarrage total est celui de l'instance la plus lente.
+
+        Returns:
+            OrderedDict: nom -> True si l'instance répond
+        """
+        instances = self.targets(target)
+        started = OrderedDict()
+        for instance in instances:
+            try:
+                instance.spawn(launcher)
+                started[instance.name] = instance
+            except Exception as e:
+                logger.error(f"❌ [{instance.name}] Erreur démarrage serveur: {e}")
+                instance.running = False
+
+        async def wait_all():
+            outcomes = await asyncio.gather(*(instance.wait_healthy_async(timeout) for instance in started.values()))
+            return dict(zip(started, outcomes))
+
+        healthy = get_background_loop().submit(wait_all()).result(timeout + 5) if started else {}
+        return OrderedDict((instance.name, healthy.get(instance.name, False)) for instance in instances)
+
+    def stop_all(self, timeout=5, target=ALL_INSTANCES):
+        """Arrête les instances en parallèle"""
+        return self.fan_out(lambda instance: instance.stop(timeout), target)
+
+    def close_overlay_managers(self, timeout=2.0):
+        """Ferme les connexions des gestionnaires overlay créés"""
+        for instance in self:
+            manager = instance._overlay_config
+            if manager is not None:
+                try:
+                    manager.submit(manager.close()).result(timeout)
+                except Exception as e:
+                    logger.debug(f"Fermeture gestionnaire overlay {instance.name}: {e}")
+
+
+def parse_instance_specs(text, journal=None):
+    """Instances supplémentaires décrites dans les paramètres OBS
+
+    Une instance par ligne, "nom:port_http" ; lignes vides et
+    commentaires (#) ignorés.
+
+    Raises:
+        ValueError: Si une ligne est invalide
+    """
+    instances = []
+    for number, line in enumerate((text or "").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = [part.strip() for part in line.split(':')]
+        if len(parts) != 2 or not parts[0]:
+            raise ValueError(f"Ligne {number}: format attendu nom:port")
+        if parts[0] in (PRIMARY_INSTANCE, ALL_INSTANCES):
+            raise ValueError(f"Ligne {number}: nom réservé '{parts[0]}'")
+        if not INSTANCE_NAME_PATTERN.match(parts[0]):
+            raise ValueError(f"Ligne {number}: nom invalide '{parts[0]}' (lettres ASCII, chiffres, _ et -)")
+        try:
+            port = int(parts[1])
+        except ValueError:
+            raise ValueError(f"Ligne {number}: port invalide '{parts[1]}'")
+        if not 1024 <= port <= 65533:
+            raise ValueError(f"Ligne {number}: port hors limites ({port})")
+        instances.append(ServerInstance(parts[0], InstancePorts(port), journal=journal))
+    return instances
@@ -0,0 +1,313 @@
+# ==================================================================
+# MODULE DE RÉSILIENCE DES APPELS SERVEUR
+# ==================================================================
+# Disjoncteur (circuit breaker) partagé par URL de serveur et
+# politique unique de retry/backoff. Quand le serveur Node est
+# arrêté, les appels échouent immédiatement au lieu de bloquer
+# l'interface OBS pendant toute la série de tentatives.
+# ==================================================================
+
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+# États du disjoncteur
+STATE_CLOSED = "closed"        # Appels autorisés
+STATE_OPEN = "open"            # Appels rejetés immédiatement
+STATE_HALF_OPEN = "half_open"  # Un seul appel de test autorisé
+
+# Réponses d'un serveur indisponible (proxy, surcharge, timeout amont) :
+# retentées et comptées comme échecs. Les autres statuts (dont les 500
+# applicatifs de server.js) prouvent que le serveur répond et sont
+# rendus tels quels à l'appelant.
+RETRYABLE_STATUSES = frozenset((502, 503, 504))
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Disjoncteur closed/open/half-open pour un serveur donné
+
+    Le disjoncteur s'ouvre après `failure_threshold` échecs consécutifs
+    (ou sur signal du superviseur de santé). Une fois ouvert, les appels
+    sont rejetés sans réseau jusqu'à `reset_timeout` secondes, puis un
+    unique appel de test (half-open) décide de la réouverture ou non.
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=10.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._listeners = []
+
+    @property
+    def state(self):
+        """État courant (l'expiration du délai open est prise en compte)"""
+        with self._lock:
+            if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def is_open(self):
+        """True si les appels sont actuellement rejetés"""
+        return self.state == STATE_OPEN
+
+    def retry_after(self):
+        """Secondes restantes avant le prochain appel de test (0 si fermé)"""
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow_request(self):
+        """Indique si un appel peut partir maintenant
+
+        Returns:
+            bool: False si le disjoncteur est ouvert (ou si un appel de
+            test half-open est déjà en cours)
+        """
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                transition = self._set_state(STATE_HALF_OPEN)
+            else:
+                transition = None
+            # Half-open: un seul appel de test à la fois
+            if self._probe_in_flight:
+                allowed = False
+            else:
+                self._probe_in_flight = True
+                allowed = True
+        self._notify(transition)
+        return allowed
+
+    def record_success(self):
+        """Signale un appel réussi (le serveur a répondu)"""
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            transition = self._set_state(STATE_CLOSED)
+        self._notify(transition)
+
+    def record_failure(self):
+        """Signale un appel échoué (timeout, connexion refusée, 502/503/504)"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                transition = self._set_state(STATE_OPEN)
+            else:
+                transition = None
+        self._notify(transition)
+
+    def report_health(self, healthy):
+        """Alimente le disjoncteur depuis le superviseur de santé
+
+        Args:
+            healthy (bool): Résultat du dernier health check
+        """
+        if healthy:
+            self.record_success()
+        else:
+            self.trip()
+
+    def trip(self):
+        """Ouvre immédiatement le disjoncteur (serveur connu comme arrêté)"""
+        with self._lock:
+            self._failures = max(self._failures, self.failure_threshold)
+            self._probe_in_flight = False
+            self._opened_at = self._clock()
+            transition = self._set_state(STATE_OPEN)
+        self._notify(transition)
+
+    def reset(self):
+        """Referme le disjoncteur et oublie les échecs"""
+        self.record_success()
+
+    def add_listener(self, callback):
+        """Enregistre un callback(old_state, new_state) appelé à chaque transition"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Retire un callback enregistré avec add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _set_state(self, new_state):
+        """Change l'état (verrou tenu) et retourne la transition à notifier"""
+        old_state = self._state
+        if old_state == new_state:
+            return None
+        self._state = new_state
+        return (old_state, new_state, list(self._listeners))
+
+    def _notify(self, transition):
+        """Appelle les listeners hors verrou"""
+        if not transition:
+            return
+        old_state, new_state, listeners = transition
+        if new_state == STATE_OPEN:
+            logger.warning(f"⛔ Serveur {self.name} indisponible - appels suspendus {self.reset_timeout:g}s")
+        elif new_state == STATE_CLOSED and old_state != STATE_CLOSED:
+            logger.info(f"✅ Serveur {self.name} de nouveau joignable")
+        for callback in listeners:
+            try:
+                callback(old_state, new_state)
+            except Exception as e:
+                logger.error(f"Erreur listener disjoncteur: {e}", exc_info=True)
+
+
+class RetryPolicy:
+    """Politique unique de retry avec backoff exponentiel
+
+    Remplace les boucles de retry de `api_call_with_retry` (script OBS)
+    et de `OverlayConfigManager._send_update`.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, factor=2.0, max_delay=2.0, sleep=time.sleep):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    def delay_for(self, attempt):
+        """Délai avant la tentative suivante (attempt commence à 0)"""
+        return min(self.max_delay, self.base_delay * (self.factor ** attempt))
+
+    def run(self, send, breaker=None, label="appel serveur", attempts=None):
+        """Exécute `send()` avec retry, backoff et disjoncteur
+
+        Args:
+            send (callable): Effectue l'appel et retourne un objet réponse
+                (avec `status_code`). Les exceptions sont traitées comme
+                des échecs réseau.
+            breaker (CircuitBreaker): Disjoncteur du serveur ciblé (optionnel)
+            label (str): Libellé utilisé dans les logs
+            attempts (int): Nombre de tentatives (défaut: self.attempts)
+
+        Returns:
+            La réponse (tout statut hors RETRYABLE_STATUSES) ou None si
+            échec réseau / serveur indisponible / disjoncteur ouvert
+        """
+        attempts = attempts or self.attempts
+
+        for attempt in range(attempts):
+            if not self._allow(breaker, label):
+                return None
+            try:
+                response, error = send(), None
+            except Exception as e:
+                response, error = None, e
+
+            done, result, wait_time = self._outcome(attempt, attempts, breaker, label, response, error)
+            if done:
+                return result
+            self._sleep(wait_time)
+
+        return None
+
+    async def run_async(self, send, breaker=None, label="appel serveur", attempts=None):
+        """Équivalent asyncio de `run()` : `send` est une coroutine function
+        et le backoff utilise asyncio.sleep (la boucle n'est jamais bloquée)
+        """
+        attempts = attempts or self.attempts
+
+        for attempt in range(attempts):
+            if not self._allow(breaker, label):
+                return None
+            try:
+                response, error = await send(), None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                response, error = None, e
+
+            done, result, wait_time = self._outcome(attempt, attempts, breaker, label, response, error)
+            if done:
+                return result
+            await asyncio.sleep(wait_time)
+
+        return None
+
+    def _allow(self, breaker, label):
+        """Vérifie le disjoncteur avant une tentative"""
+        if breaker is not None and not breaker.allow_request():
+            logger.warning(
+                f"⛔ {label} ignoré - serveur indisponible "
+                f"(nouvel essai possible dans {breaker.retry_after():.0f}s)"
+            )
+            return False
+        return True
+
+    def _outcome(self, attempt, attempts, breaker, label, response, error):
+        """Traite le résultat d'une tentative
+
+        Returns:
+            tuple: (terminé, réponse ou None, délai avant la tentative suivante)
+        """
+        if error is None:
+            if response.status_code not in RETRYABLE_STATUSES:
+                if breaker is not None:
+                    breaker.record_success()
+                return True, response, 0
+            reason = f"HTTP {response.status_code}"
+        else:
+            reason = f"{type(error).__name__}: {error}"
+        if breaker is not None:
+            breaker.record_failure()
+
+        # Échec: arrêter tout de suite si le disjoncteur vient de s'ouvrir
+        if attempt >= attempts - 1 or (breaker is not None and breaker.is_open()):
+            logger.error(f"❌ {label} échoué après {attempt + 1} tentative(s) ({reason})")
+            return True, None, 0
+
+        wait_time = self.delay_for(attempt)
+        logger.warning(f"⚠️ {label}: {reason}, tentative {attempt + 2}/{attempts} dans {wait_time:g}s")
+        return False, None, wait_time
+
+
+# Politique partagée par défaut
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# Registre des disjoncteurs par serveur
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def _server_key(url):
+    """Réduit une URL à son origine (scheme://host:port)"""
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url.rstrip('/')
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_circuit_breaker(url, **kwargs):
+    """Retourne le disjoncteur partagé du serveur ciblé par `url`
+
+    Args:
+        url (str): URL du serveur ou d'un endpoint du serveur
+        **kwargs: Paramètres du CircuitBreaker (utilisés à la création)
+    """
+    key = _server_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, **kwargs)
+            _breakers[key] = breaker
+        return breaker
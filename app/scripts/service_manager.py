@@ -0,0 +1,365 @@
+# ==================================================================
+# CYCLE DE VIE DES TÂCHES D'ARRIÈRE-PLAN DU SCRIPT OBS
+# ==================================================================
+# ServiceManager possède chaque thread lancé par le script (démarrage
+# du serveur, vérification des mises à jour, rejeu du journal...) et
+# les arrêts à exécuter à la fermeture (processus serveur,
+# planificateurs, endpoint...). Chaque tâche reçoit un
+# CancellationToken : ses attentes passent par token.wait() et se
+# terminent dès l'arrêt.
+#
+# shutdown() (script_unload) :
+# 1. annule tous les jetons
+# 2. exécute les arrêts enregistrés en parallèle (les processus sont
+#    terminés ensemble via terminate_processes, pas un par un)
+# 3. joint les threads ; tout est borné par un délai ferme, une tâche
+#    qui ne rend pas la main est abandonnée (thread démon) et signalée
+#
+# Une tâche relancée sous le même nom (ex. redémarrage du serveur)
+# annule la précédente et attend sa fin avant de s'exécuter.
+# ==================================================================
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import REGISTRY as METRICS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHUTDOWN_DEADLINE = 3.0  # Délai ferme de shutdown() (s)
+REPLACE_JOIN_TIMEOUT = 10.0      # Attente de la tâche remplacée (s)
+KILL_GRACE = 0.5                 # Attente après kill() (s)
+
+
+class CancellationToken:
+    """Signal d'annulation partagé entre le gestionnaire et une tâche"""
+
+    def __init__(self, parent=None):
+        self._event = threading.Event()
+        self._children = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._adopt(self)
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Annule le jeton et ses enfants (idempotent)"""
+        self._event.set()
+        with self._lock:
+            children, self._children = self._children, []
+        for child in children:
+            child.cancel()
+
+    def wait(self, timeout=None):
+        """Attente interrompue par l'annulation
+
+        Returns:
+            bool: True si le jeton a été annulé
+        """
+        return self._event.wait(timeout)
+
+    def child(self):
+        """Jeton annulé en même temps que celui-ci"""
+        return CancellationToken(parent=self)
+
+    def _adopt(self, child):
+        with self._lock:
+            if not self.cancelled:
+                self._children.append(child)
+                return
+        child.cancel()
+
+
+# Jeton jamais annulé (code exécuté hors d'une tâche gérée)
+_NEVER = CancellationToken()
+_local = threading.local()
+
+
+def current_token():
+    """Jeton de la tâche gérée en cours (ou un jeton jamais annulé)"""
+    return getattr(_local, 'token', _NEVER)
+
+
+class ServiceTask:
+    """Thread démon géré, avec son jeton d'annulation"""
+
+    def __init__(self, name, target, args=(), kwargs=None, token=None, previous=None):
+        self.name = name
+        self.token = token or CancellationToken()
+        self.error = None
+        self._target = target
+        self._args = args
+        self._kwargs = kwargs or {}
+        self._previous = previous
+        self.thread = threading.Thread(target=self._run, name=f"subcount-{name}", daemon=True)
+
+    def _run(self):
+        _local.token = self.token
+        try:
+            # Tâche remplacée : attendre sa fin (bornée) avant de démarrer
+            previous, self._previous = self._previous, None
+            if previous is not None and not previous.join(REPLACE_JOIN_TIMEOUT):
+                logger.warning(f"⚠️ Tâche '{previous.name}' toujours active, démarrage de la remplaçante")
+            if not self.token.cancelled:
+                self._target(*self._args, **self._kwargs)
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ Tâche '{self.name}' interrompue: {e}", exc_info=True)
+        finally:
+            _local.token = _NEVER
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.token.cancel()
+
+    def is_alive(self):
+        return self.thread.is_alive()
+
+    def join(self, timeout=None):
+        """Returns: bool: True si la tâche est terminée"""
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def __repr__(self):
+        state = "active" if self.is_alive() else "terminée"
+        return f"ServiceTask({self.name!r}, {state})"
+
+
+def terminate_processes(processes, timeout=3.0):
+    """Termine des processus en parallèle (terminate, attente commune, kill)
+
+    Accepte des subprocess.Popen ou des psutil.Process : tous reçoivent
+    terminate() avant la première attente, le délai est donc partagé et
+    non cumulé processus par processus.
+
+    Returns:
+        list: Processus qu'il a fallu tuer
+    """
+    processes = list(processes)
+    for process in processes:
+        try:
+            process.terminate()
+        except Exception as e:
+            logger.debug(f"terminate {getattr(process, 'pid', '?')}: {e}")
+
+    deadline = time.monotonic() + timeout
+    killed = []
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception:
+            # subprocess.TimeoutExpired / psutil.TimeoutExpired / processus disparu
+            if _is_alive(process):
+                killed.append(process)
+    for process in killed:
+        try:
+            process.kill()
+        except Exception as e:
+            logger.debug(f"kill {getattr(process, 'pid', '?')}: {e}")
+    for process in killed:
+        try:
+            process.wait(timeout=KILL_GRACE)
+        except Exception:
+            pass
+    return killed
+
+
+def _is_alive(process):
+    if hasattr(process, 'poll'):
+        return process.poll() is None
+    try:
+        return process.is_running()
+    except Exception:
+        return False
+
+
+class ServiceManager:
+    """Propriétaire des tâches, processus et arrêts du script OBS"""
+
+    def __init__(self):
+        self._tasks = OrderedDict()
+        self._stop_hooks = OrderedDict()
+        self._lock = threading.Lock()
+        self.last_shutdown = None
+
+    # ------------------------------------------------------------------
+    # Tâches
+    # ------------------------------------------------------------------
+
+    def spawn(self, name, target, *args, **kwargs):
+        """Lance `target(*args, **kwargs)` dans un thread géré
+
+        Une tâche encore active du même nom est annulée ; la nouvelle
+        attend sa fin avant de démarrer (sans bloquer l'appelant).
+
+        Returns:
+            ServiceTask
+        """
+        with self._lock:
+            previous = self._tasks.pop(name, None)
+            if previous is not None and not previous.is_alive():
+                previous = None
+            if previous is not None:
+                previous.cancel()
+            task = ServiceTask(name, target, args, kwargs, previous=previous)
+            self._tasks[name] = task
+        return task.start()
+
+    def get(self, name):
+        return self._tasks.get(name)
+
+    def tasks(self):
+        """Tâches encore actives (les terminées sont oubliées)"""
+        with self._lock:
+            for name in [name for name, task in self._tasks.items() if not task.is_alive()]:
+                del self._tasks[name]
+            return list(self._tasks.values())
+
+    def cancel(self, name):
+        task = self._tasks.get(name)
+        if task is not None:
+            task.cancel()
+
+    def on_shutdown(self, name, callback):
+        """Arrêt exécuté (en parallèle des autres) par shutdown()"""
+        with self._lock:
+            self._stop_hooks[name] = callback
+
+    # ------------------------------------------------------------------
+    # Arrêt
+    # ------------------------------------------------------------------
+
+    def shutdown(self, deadline=DEFAULT_SHUTDOWN_DEADLINE):
+        """Annule tout, arrête en parallèle et joint dans un délai ferme
+
+        Returns:
+            dict: Rapport (durée, tâches et arrêts, ceux abandonnés au délai)
+        """
+        started = time.monotonic()
+        limit = started + deadline
+        with self._lock:
+            tasks = list(self._tasks.values())
+            hooks = list(self._stop_hooks.items())
+            self._tasks.clear()
+            self._stop_hooks.clear()
+
+        for task in tasks:
+            task.cancel()
+
+        # Arrêts enregistrés dans des threads parallèles
+        workers = [ServiceTask(f"stop-{name}", callback) for name, callback in hooks]
+        for worker in workers:
+            worker.start()
+
+        abandoned = []
+        for task in workers + tasks:
+            if not task.join(max(0.0, limit - time.monotonic())):
+                abandoned.append(task.name)
+
+        elapsed = time.monotonic() - started
+        METRICS.histogram('subcount_shutdown_seconds', "Durée de l'arrêt des tâches du script").observe(elapsed)
+        self.last_shutdown = {
+            'seconds': round(elapsed, 3),
+            'tasks': len(tasks),
+            'stop_hooks': len(hooks),
+            'abandoned': abandoned,
+        }
+        if abandoned:
+            logger.warning(f"⚠️ Arrêt: délai de {deadline:.1f}s dépassé, abandonné(s): {', '.join(abandoned)}")
+        return self.last_shutdown
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+# Serveur simulé : ~`delay` s de nettoyage après SIGTERM
+_FAKE_SERVER = (
+    "import signal, sys, time\n"
+    "delay = float(sys.argv[1])\n"
+    "def stop(*_):\n"
+    "    time.sleep(delay)\n"
+    "    sys.exit(0)\n"
+    "signal.signal(signal.SIGTERM, stop)\n"
+    "while True:\n"
+    "    time.sleep(0.05)\n"
+)
+
+
+def _spawn_fake_servers(count, delay):
+    import subprocess
+    import sys
+    processes = [subprocess.Popen([sys.executable, '-c', _FAKE_SERVER, str(delay)]) for _ in range(count)]
+    time.sleep(0.3)  # Laisser les gestionnaires de signal s'installer
+    return processes
+
+
+def _legacy_unload(processes, poll_threads):
+    """Arrêt d'avant : processus un par un (wait 3 s chacun), sleep 1 s, threads non joints"""
+    for process in processes:
+        process.terminate()
+        try:
+            process.wait(timeout=3)
+        except Exception:
+            process.kill()
+    time.sleep(1)
+    return poll_threads
+
+
+def benchmark(servers=3, cleanup_delay=0.8, tasks=5, deadline=DEFAULT_SHUTDOWN_DEADLINE):
+    """Durée d'un script_unload simulé : arrêt d'avant contre ServiceManager
+
+    `servers` processus mettent `cleanup_delay` s à s'arrêter après
+    SIGTERM ; `tasks` tâches attendent en boucle (health checks, rejeu).
+    Le second scénario géré ajoute une tâche qui ignore l'annulation
+    (appel bloquant de 30 s) : l'arrêt est alors borné par `deadline`.
+    """
+    def polling_task():
+        token = current_token()
+        while not token.wait(0.5):
+            pass
+
+    # Avant : threads démons non suivis, processus arrêtés en série
+    processes = _spawn_fake_servers(servers, cleanup_delay)
+    threads = [threading.Thread(target=time.sleep, args=(30,), daemon=True) for _ in range(tasks)]
+    for thread in threads:
+        thread.start()
+    started = time.monotonic()
+    _legacy_unload(processes, threads)
+    legacy = time.monotonic() - started
+
+    def managed(blocking):
+        manager = ServiceManager()
+        processes = _spawn_fake_servers(servers, cleanup_delay)
+        manager.on_shutdown("servers", lambda: terminate_processes(processes, deadline - KILL_GRACE))
+        for index in range(tasks):
+            manager.spawn(f"poll-{index}", polling_task)
+        if blocking:
+            manager.spawn("blocking", time.sleep, 30)
+        manager.on_shutdown("scheduler", lambda: time.sleep(0.2))
+        return manager.shutdown(deadline)
+
+    return {
+        'servers': servers,
+        'cleanup_delay_s': cleanup_delay,
+        'legacy_unload_s': round(legacy, 3),
+        'legacy_threads_left_running': sum(1 for thread in threads if thread.is_alive()),
+        'managed': managed(blocking=False),
+        'managed_with_blocking_task': managed(blocking=True),
+        'deadline_s': deadline,
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    print("\n⏱️ Benchmark arrêt du script (script_unload)")
+    print(json.dumps(benchmark(), indent=2))
@@ -0,0 +1,478 @@
+# ==================================================================
+# SÉRIE TEMPORELLE DE SESSION (FOLLOWS / SUBS)
+# ==================================================================
+# Historique compact des compteurs pendant un stream, alimenté par les
+# mises à jour du serveur (WebSocket 8083) :
+# - tampon circulaire à taille fixe (array 'd' + array 'q', 16 octets
+#   par échantillon), résolution 1 s : plusieurs changements dans la
+#   même seconde ne gardent que la dernière valeur
+# - 12 h à 1 Hz = 43 200 échantillons par compteur (~0,7 Mo)
+# - débits glissants (par minute, sur 1 ou 5 minutes) en O(1) amorti :
+#   chaque fenêtre garde un curseur qui ne fait qu'avancer
+# - ETA jusqu'à l'objectif, pic de rafale (plus forte hausse sur 10 s)
+# - export/import binaire de toute la session
+#
+# Format binaire (little-endian) :
+#   en-tête   "SCSR" | version (B) | flags (B) | compteurs (H) | résolution (d)
+#   compteur  nom (B + utf-8) | objectif (q, -1 = aucun)
+#             | pic: delta (q, 0 = aucun), début (d), fin (d) | échantillons (I)
+#             | horodatages (d * n) | valeurs (q * n)
+#   flags & 1 : tout ce qui suit l'en-tête est compressé (zlib)
+# ==================================================================
+
+import logging
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# 12 h à 1 Hz
+DEFAULT_CAPACITY = 12 * 3600
+DEFAULT_RESOLUTION = 1.0
+# Fenêtres des débits glissants (secondes)
+RATE_WINDOWS = (60, 300)
+# Fenêtre de détection des rafales (secondes)
+BURST_WINDOW = 10
+
+SERIES_MAGIC = b'SCSR'
+SERIES_VERSION = 1
+FLAG_COMPRESSED = 1
+_HEADER = struct.Struct('<4sBBHd')
+_COUNTER_HEADER = struct.Struct('<qqddI')
+
+
+def _to_little_endian(values):
+    """Copie little-endian d'un array (no-op sur x86/ARM)"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class CounterSeries:
+    """Tampon circulaire des échantillons (horodatage, valeur) d'un compteur
+
+    Les indices internes sont des numéros de séquence absolus ; la case
+    d'un échantillon est `seq % capacity`.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, resolution=DEFAULT_RESOLUTION,
+                 windows=RATE_WINDOWS, burst_window=BURST_WINDOW):
+        self.capacity = capacity
+        self.resolution = resolution
+        self.burst_window = burst_window
+        self._times = array('d')
+        self._values = array('q')
+        self._count = 0
+        # Curseurs des fenêtres : fenêtre -> séquence du dernier échantillon <= borne
+        self._cursors = {window: 0 for window in tuple(windows) + (burst_window,)}
+        # Plus forte hausse sur `burst_window` : (delta, début, fin)
+        self.peak = None
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def first_seq(self):
+        return max(0, self._count - self.capacity)
+
+    def _time(self, seq):
+        return self._times[seq % self.capacity]
+
+    def _value(self, seq):
+        return self._values[seq % self.capacity]
+
+    def last(self):
+        """Dernier échantillon (horodatage, valeur) ou None"""
+        if not self._count:
+            return None
+        seq = self._count - 1
+        return self._time(seq), self._value(seq)
+
+    # ------------------------------------------------------------------
+    # Insertion
+    # ------------------------------------------------------------------
+
+    def append(self, value, timestamp):
+        """Ajoute un échantillon (horodatages croissants, en secondes)"""
+        if self._count:
+            last_seq = self._count - 1
+            last_time = self._time(last_seq)
+            if timestamp < last_time:
+                timestamp = last_time
+            # Même seconde : on ne garde que la dernière valeur
+            if int(timestamp / self.resolution) == int(last_time / self.resolution):
+                self._values[last_seq % self.capacity] = value
+                self._track_burst(timestamp, value)
+                return
+
+        slot = self._count % self.capacity
+        if self._count < self.capacity:
+            self._times.append(timestamp)
+            self._values.append(value)
+        else:
+            self._times[slot] = timestamp
+            self._values[slot] = value
+        self._count += 1
+        self._track_burst(timestamp, value)
+
+    def _track_burst(self, timestamp, value):
+        start = self._seek(self.burst_window, timestamp - self.burst_window)
+        delta = value - self._value(start)
+        if delta > 0 and (self.peak is None or delta > self.peak[0]):
+            self.peak = (delta, self._time(start), timestamp)
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def _seek(self, window, bound):
+        """Séquence du dernier échantillon <= bound (le plus ancien sinon)
+
+        Avance le curseur de la fenêtre (O(1) amorti pour des bornes
+        croissantes) ; une borne antérieure au curseur, ou window=None,
+        passe par une bisection.
+        """
+        first = self.first_seq
+        last = self._count - 1
+        cursor = self._cursors.get(window)
+
+        if cursor is None or cursor < first or self._time(cursor) > bound:
+            # Pas de curseur ou borne dans le passé : bisection
+            lo, hi = first, last
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._time(mid) <= bound:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            # Curseur sorti du tampon circulaire : repositionné
+            if cursor is not None and cursor < first:
+                self._cursors[window] = lo
+            return lo
+
+        while cursor < last and self._time(cursor + 1) <= bound:
+            cursor += 1
+        self._cursors[window] = cursor
+        return cursor
+
+    def value_at(self, timestamp):
+        """Valeur du compteur à un instant (None si aucun échantillon)"""
+        if not self._count:
+            return None
+        return self._value(self._seek(None, timestamp))
+
+    def rate(self, window, now=None):
+        """Variation nette par minute sur les `window` dernières secondes
+
+        Si la série couvre moins que la fenêtre, le débit est calculé
+        depuis le premier échantillon.
+        """
+        if self._count < 2:
+            return 0.0
+        now = time.time() if now is None else now
+        start = self._seek(window, now - window)
+        elapsed = min(window, now - self._time(self.first_seq))
+        if elapsed <= 0:
+            return 0.0
+        current = self._value(self._count - 1)
+        return (current - self._value(start)) / elapsed * 60.0
+
+    def samples(self):
+        """Échantillons chronologiques : (array horodatages, array valeurs)"""
+        first = self.first_seq
+        if self._count <= self.capacity:
+            return array('d', self._times), array('q', self._values)
+        split = first % self.capacity
+        return (self._times[split:] + self._times[:split],
+                self._values[split:] + self._values[:split])
+
+    def memory_bytes(self):
+        return (self._times.buffer_info()[1] * self._times.itemsize
+                + self._values.buffer_info()[1] * self._values.itemsize)
+
+
+class SessionSeries:
+    """Séries follows/subs d'une session, thread-safe
+
+    Alimentée par CounterFeed (`on_counter_update`) depuis son thread,
+    lue depuis le thread OBS.
+    """
+
+    def __init__(self, counters=('follows', 'subs'), capacity=DEFAULT_CAPACITY,
+                 resolution=DEFAULT_RESOLUTION, windows=RATE_WINDOWS):
+        self.capacity = capacity
+        self.resolution = resolution
+        self.windows = tuple(windows)
+        self.series = {
+            counter: CounterSeries(capacity, resolution, self.windows)
+            for counter in counters
+        }
+        self.targets = {counter: None for counter in counters}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Alimentation
+    # ------------------------------------------------------------------
+
+    def record(self, counter, value, timestamp=None, target=None):
+        """Enregistre une valeur de compteur (compteur inconnu : ignoré)"""
+        series = self.series.get(counter)
+        if series is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            series.append(int(value), timestamp)
+            if target is not None:
+                self.targets[counter] = int(target)
+
+    def on_counter_update(self, counter, goal):
+        """Listener CounterFeed : goal = {current, target, ...}"""
+        current = goal.get('current')
+        if isinstance(current, (int, float)):
+            target = goal.get('target')
+            self.record(counter, current, target=target if isinstance(target, (int, float)) else None)
+
+    # ------------------------------------------------------------------
+    # Statistiques
+    # ------------------------------------------------------------------
+
+    def rate(self, counter, window=60, now=None):
+        """Variation par minute sur la fenêtre (secondes)"""
+        with self._lock:
+            return self.series[counter].rate(window, now)
+
+    def eta(self, counter, target=None, window=300, now=None):
+        """Secondes estimées avant d'atteindre l'objectif
+
+        Returns:
+            float ou None: 0 si déjà atteint, None si pas de progression
+        """
+        with self._lock:
+            series = self.series[counter]
+            last = series.last()
+            target = self.targets[counter] if target is None else target
+            if last is None or target is None:
+                return None
+            remaining = target - last[1]
+            if remaining <= 0:
+                return 0.0
+            per_minute = series.rate(window, now)
+        if per_minute <= 0:
+            return None
+        return remaining / per_minute * 60.0
+
+    def peak_burst(self, counter):
+        """Plus forte hausse sur BURST_WINDOW s : {'delta', 'start', 'end'} ou None"""
+        with self._lock:
+            peak = self.series[counter].peak
+        if peak is None:
+            return None
+        return {'delta': peak[0], 'start': peak[1], 'end': peak[2]}
+
+    def summary(self, now=None):
+        """Résumé par compteur : valeur, objectif, débits, ETA, pic"""
+        now = time.time() if now is None else now
+        result = {}
+        for counter, series in self.series.items():
+            with self._lock:
+                last = series.last()
+                samples = len(series)
+            if last is None:
+                continue
+            result[counter] = {
+                'current': last[1],
+                'target': self.targets[counter],
+                'samples': samples,
+                'rates_per_min': {f"{window}s": round(self.rate(counter, window, now), 2) for window in self.windows},
+                'eta_s': self.eta(counter, now=now),
+                'peak_burst': self.peak_burst(counter),
+            }
+        return result
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(series.memory_bytes() for series in self.series.values())
+
+    # ------------------------------------------------------------------
+    # Export / import binaire
+    # ------------------------------------------------------------------
+
+    def to_bytes(self, compress=True):
+        """Sérialise toute la session (voir le format en tête de module)"""
+        chunks = []
+        with self._lock:
+            for counter, series in self.series.items():
+                times, values = series.samples()
+                name = counter.encode('utf-8')
+                target = self.targets[counter]
+                peak = series.peak or (0, 0.0, 0.0)
+                chunks.append(struct.pack('<B', len(name)) + name)
+                chunks.append(_COUNTER_HEADER.pack(-1 if target is None else target, *peak, len(times)))
+                chunks.append(_to_little_endian(times).tobytes())
+                chunks.append(_to_little_endian(values).tobytes())
+
+        payload = b''.join(chunks)
+        flags = 0
+        if compress:
+            payload = zlib.compress(payload, 6)
+            flags |= FLAG_COMPRESSED
+        header = _HEADER.pack(SERIES_MAGIC, SERIES_VERSION, flags, len(self.series), self.resolution)
+        return header + payload
+
+    @classmethod
+    def from_bytes(cls, data, capacity=DEFAULT_CAPACITY):
+        """Reconstruit une session exportée par to_bytes()
+
+        Raises:
+            ValueError: Si les données sont invalides
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Données de session tronquées")
+        magic, version, flags, counter_count, resolution = _HEADER.unpack_from(data, 0)
+        if magic != SERIES_MAGIC:
+            raise ValueError("Pas un export de session SubCount")
+        if version != SERIES_VERSION:
+            raise ValueError(f"Version d'export non supportée: {version}")
+
+        payload = memoryview(data)[_HEADER.size:]
+        if flags & FLAG_COMPRESSED:
+            try:
+                payload = memoryview(zlib.decompress(payload))
+            except zlib.error as e:
+                raise ValueError(f"Données compressées invalides: {e}")
+
+        decoded = []
+        offset = 0
+        try:
+            for _ in range(counter_count):
+                name_length = payload[offset]
+                name = bytes(payload[offset + 1:offset + 1 + name_length]).decode('utf-8')
+                offset += 1 + name_length
+                target, peak_delta, peak_start, peak_end, count = _COUNTER_HEADER.unpack_from(payload, offset)
+                offset += _COUNTER_HEADER.size
+
+                times = array('d')
+                times.frombytes(payload[offset:offset + count * 8])
+                offset += count * 8
+                values = array('q')
+                values.frombytes(payload[offset:offset + count * 8])
+                offset += count * 8
+                if len(times) != count or len(values) != count:
+                    raise ValueError("Données de session tronquées")
+                if sys.byteorder == 'big':
+                    times.byteswap()
+                    values.byteswap()
+                peak = (peak_delta, peak_start, peak_end) if peak_delta > 0 else None
+                decoded.append((name, None if target < 0 else target, peak, times, values))
+        except (IndexError, struct.error):
+            raise ValueError("Données de session tronquées")
+
+        session = cls(counters=[entry[0] for entry in decoded], capacity=capacity, resolution=resolution)
+        for name, target, peak, times, values in decoded:
+            series = session.series[name]
+            for timestamp, value in zip(times, values):
+                series.append(value, timestamp)
+            # Le pic peut dater d'échantillons sortis du tampon
+            if peak is not None and (series.peak is None or peak[0] >= series.peak[0]):
+                series.peak = peak
+            session.targets[name] = target
+        return session
+
+    def save(self, path, compress=True):
+        """Écrit l'export binaire dans un fichier"""
+        data = self.to_bytes(compress)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+    @classmethod
+    def load(cls, path, capacity=DEFAULT_CAPACITY):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read(), capacity)
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+def benchmark(hours=12, queries=100000):
+    """Remplit une session de `hours` heures à 1 Hz puis mesure
+
+    Returns:
+        dict: Coûts moyens (µs), mémoire et taille d'export
+    """
+    import random
+
+    rng = random.Random(42)
+    seconds = int(hours * 3600)
+    session = SessionSeries(capacity=max(seconds, 1))
+    start_ts = 1700000000.0
+    follows = subs = 0
+
+    start = time.perf_counter()
+    for i in range(seconds):
+        follows += rng.choice((0, 0, 0, 1, 1, 2)) + (25 if rng.random() < 0.0005 else 0)
+        subs += 1 if rng.random() < 0.05 else 0
+        session.record('follows', follows, start_ts + i, target=follows + 500)
+        session.record('subs', subs, start_ts + i, target=subs + 50)
+    insert_time = time.perf_counter() - start
+    end_ts = start_ts + seconds
+
+    # Requêtes "temps réel" (bornes croissantes : curseurs)
+    start = time.perf_counter()
+    for i in range(queries):
+        session.rate('follows', 60, end_ts + i * 0.001)
+        session.rate('follows', 300, end_ts + i * 0.001)
+    rate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(queries):
+        session.eta('follows', now=end_ts + i * 0.001)
+    eta_time = time.perf_counter() - start
+
+    # Requêtes historiques (bornes aléatoires : bisection)
+    series = session.series['follows']
+    bounds = [start_ts + rng.random() * seconds for _ in range(queries)]
+    start = time.perf_counter()
+    for bound in bounds:
+        series.value_at(bound)
+    historic_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw = session.to_bytes(compress=False)
+    export_raw_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compressed = session.to_bytes(compress=True)
+    export_time = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = SessionSeries.from_bytes(compressed, capacity=max(seconds, 1))
+    import_time = time.perf_counter() - start
+    assert restored.summary(end_ts) == session.summary(end_ts)
+
+    return {
+        'samples_per_counter': len(series),
+        'memory_mb': session.memory_bytes() / 1e6,
+        'insert_us': insert_time / (seconds * 2) * 1e6,
+        'rate_query_us': rate_time / (queries * 2) * 1e6,
+        'eta_query_us': eta_time / queries * 1e6,
+        'historic_value_at_us': historic_time / queries * 1e6,
+        'export_raw_mb': len(raw) / 1e6,
+        'export_compressed_mb': len(compressed) / 1e6,
+        'export_raw_ms': export_raw_time * 1000,
+        'export_compressed_ms': export_time * 1000,
+        'import_ms': import_time * 1000,
+        'peak_burst': session.peak_burst('follows'),
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 12
+    print(f"\n📈 Benchmark série de session ({hours} h à 1 Hz)")
+    print(json.dumps(benchmark(hours), indent=2))
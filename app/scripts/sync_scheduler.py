@@ -0,0 +1,391 @@
+# ==================================================================
+# SYNCHRONISATION TWITCH EN ARRIÈRE-PLAN
+# ==================================================================
+# TwitchSyncScheduler appelle /admin/sync-twitch depuis la boucle
+# d'arrière-plan partagée, sans jamais bloquer le thread OBS :
+# - intervalle adaptatif : après `idle_after` synchros consécutives sans
+#   différence, l'intervalle est multiplié par `backoff` (jusqu'à
+#   `max_interval`) ; la première différence le ramène à la base
+# - HTTP 429 : la synchro suivante part exactement à l'expiration de la
+#   fenêtre du rate limiter (nextResetInMs), pas avant ; une demande
+#   manuelle refusée est relancée automatiquement à ce moment-là
+# - les demandes concurrentes (bouton, timer, autre instance du script)
+#   sont fusionnées : un seul appel en vol, tous les demandeurs reçoivent
+#   son résultat ; pendant un 429, elles attendent la même reprise
+# - métriques : durée et issue de chaque synchro, intervalle courant,
+#   demandes fusionnées
+# ==================================================================
+
+import asyncio
+import logging
+import time
+from collections import namedtuple
+
+from async_http import HttpConnection
+from background_loop import get_background_loop
+from metrics import REGISTRY as METRICS
+from server_resilience import get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+SYNC_PATH = "/admin/sync-twitch?source=scheduler"
+
+OUTCOME_UPDATED = "updated"              # Différences appliquées
+OUTCOME_UNCHANGED = "unchanged"          # Déjà à jour (ou ignorée en mode session)
+OUTCOME_RATE_LIMITED = "rate_limited"    # HTTP 429
+OUTCOME_UNAUTHENTICATED = "unauthenticated"
+OUTCOME_ERROR = "error"                  # Réponse invalide ou serveur injoignable
+
+# Marge ajoutée à nextResetInMs (horloges et arrondis du serveur)
+RESET_MARGIN = 0.05
+
+# Relances automatiques d'une demande manuelle refusée par le rate limiter
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Résultat d'une synchro (data = corps JSON du serveur ou None)
+SyncResult = namedtuple('SyncResult', ['outcome', 'follows_diff', 'subs_diff', 'data', 'retry_after'])
+
+
+def parse_sync_response(status_code, body):
+    """Convertit une réponse de /admin/sync-twitch en SyncResult"""
+    body = body if isinstance(body, dict) else {}
+    if status_code == 429:
+        if body.get('nextResetInMs') is not None:
+            retry_after = float(body['nextResetInMs']) / 1000.0
+        else:
+            retry_after = float(body.get('nextResetIn', 60))
+        return SyncResult(OUTCOME_RATE_LIMITED, 0, 0, body, max(0.0, retry_after))
+    if status_code == 401:
+        return SyncResult(OUTCOME_UNAUTHENTICATED, 0, 0, body, None)
+    if status_code != 200 or not body.get('success'):
+        return SyncResult(OUTCOME_ERROR, 0, 0, body or None, None)
+
+    follows_diff = int(body.get('followsDiff') or 0)
+    subs_diff = int(body.get('subsDiff') or 0)
+    outcome = OUTCOME_UPDATED if follows_diff or subs_diff else OUTCOME_UNCHANGED
+    return SyncResult(outcome, follows_diff, subs_diff, body, None)
+
+
+class TwitchSyncScheduler:
+    """Synchros Twitch périodiques et à la demande pour un serveur
+
+    Args:
+        server_url (str): URL du serveur Node
+        base_interval (float): Intervalle nominal entre deux synchros (s)
+        max_interval (float): Intervalle maximal après recul (s)
+        idle_after (int): Synchros sans différence avant de reculer
+        backoff (float): Facteur de recul
+        timeout (float): Timeout HTTP d'une synchro (s)
+        on_result (callable): Appelé avec (trigger, SyncResult) après chaque synchro
+        background_loop (BackgroundLoop): Boucle d'exécution (défaut: boucle partagée)
+        fetch (coroutine function): Remplace l'appel HTTP, () -> (status, corps)
+    """
+
+    def __init__(self, server_url="http://localhost:8082", base_interval=120.0, max_interval=900.0,
+                 idle_after=3, backoff=2.0, timeout=15.0, on_result=None, background_loop=None, fetch=None):
+        self.server_url = server_url
+        self.base_interval = float(base_interval)
+        self.max_interval = max(float(max_interval), self.base_interval)
+        self.idle_after = max(1, int(idle_after))
+        self.backoff = max(1.0, float(backoff))
+        self.timeout = timeout
+        self.on_result = on_result
+        self.background_loop = background_loop or get_background_loop()
+        self.breaker = get_circuit_breaker(server_url)
+        self._fetch = fetch or self._http_fetch
+        self._connection = None
+
+        self.interval = self.base_interval
+        self.unchanged_streak = 0
+        self.error_streak = 0
+        self.blocked_until = 0.0     # loop.time() de fin du rate limit
+        self.next_run_at = None      # loop.time() de la prochaine synchro automatique
+        self.last_result = None
+
+        self.syncs = 0
+        self.merged = 0
+        self.rate_limited = 0
+
+        self._in_flight = None       # asyncio.Future de la synchro en cours (ou en attente d'un 429)
+        self._wake = None
+        self._task = None
+        self._stopped = False
+
+    # ------------------------------------------------------------------
+    # Depuis le thread OBS
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre la boucle de synchro automatique (non bloquant)"""
+        self._stopped = False
+        return self.background_loop.submit(self._start())
+
+    def stop(self, timeout=2.0):
+        """Arrête la synchro automatique (les appels en vol se terminent)"""
+        self._stopped = True
+        try:
+            self.background_loop.submit(self._stop()).result(timeout)
+        except Exception as e:
+            logger.debug(f"Arrêt planificateur de synchro: {e}")
+
+    def request_sync(self, trigger="manual"):
+        """Demande une synchro ; fusionnée avec celle en cours s'il y en a une
+
+        Returns:
+            concurrent.futures.Future: SyncResult
+        """
+        return self.background_loop.submit(self.sync(trigger))
+
+    def reconfigure(self, base_interval=None, max_interval=None):
+        """Change les intervalles (appliqué à la prochaine échéance)"""
+        if ((base_interval is None or float(base_interval) == self.base_interval)
+                and (max_interval is None or float(max_interval) == self.max_interval)):
+            return
+
+        def apply():
+            if base_interval is not None:
+                self.base_interval = float(base_interval)
+            if max_interval is not None:
+                self.max_interval = float(max_interval)
+            self.max_interval = max(self.max_interval, self.base_interval)
+            self.interval = min(max(self.interval, self.base_interval), self.max_interval)
+            if not self.unchanged_streak:
+                self.interval = self.base_interval
+            self._schedule_next(self.interval)
+        self.background_loop.call_soon(apply)
+
+    # ------------------------------------------------------------------
+    # Boucle (coroutines)
+    # ------------------------------------------------------------------
+
+    async def _start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._schedule_next(self.interval)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while not self._stopped:
+            delay = max(0.0, self.next_run_at - loop.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            if self._wake.is_set():
+                # Échéance modifiée (synchro manuelle, 429, reconfiguration)
+                self._wake.clear()
+                continue
+            try:
+                await self.sync("timer")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur synchro automatique: {e}")
+                self._schedule_next(self.interval)
+
+    async def sync(self, trigger="manual"):
+        """Synchro unique ; les appels concurrents partagent son résultat"""
+        if self._in_flight is not None:
+            self.merged += 1
+            METRICS.counter('subcount_twitch_sync_merged_total', "Demandes de synchro fusionnées",
+                            trigger=trigger).inc()
+            return await asyncio.shield(self._in_flight)
+
+        self._in_flight = asyncio.ensure_future(self._perform(trigger))
+        self._in_flight.add_done_callback(self._on_done)
+        return await asyncio.shield(self._in_flight)
+
+    def _on_done(self, future):
+        self._in_flight = None
+
+    async def _perform(self, trigger):
+        # Une demande manuelle refusée (429) est relancée à la reprise
+        retries = 0 if trigger == "timer" else MAX_RATE_LIMIT_RETRIES
+        for _ in range(retries + 1):
+            result = await self._attempt(trigger)
+            if result.outcome != OUTCOME_RATE_LIMITED:
+                break
+        return result
+
+    async def _attempt(self, trigger):
+        loop = asyncio.get_event_loop()
+
+        # Fenêtre du rate limiter pas encore expirée : attendre la reprise
+        wait = self.blocked_until - loop.time()
+        if wait > 0:
+            logger.info(f"⏳ Synchro Twitch planifiée dans {wait:.1f}s (rate limit)")
+            await asyncio.sleep(wait)
+
+        started = time.perf_counter()
+        try:
+            status, body = await self._fetch()
+            result = parse_sync_response(status, body)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            logger.debug(f"Synchro Twitch échouée: {e}")
+            result = SyncResult(OUTCOME_ERROR, 0, 0, None, None)
+        elapsed = time.perf_counter() - started
+
+        self.syncs += 1
+        self.last_result = result
+        METRICS.histogram('subcount_twitch_sync_seconds', "Durée des synchros Twitch",
+                          outcome=result.outcome).observe(elapsed)
+        METRICS.counter('subcount_twitch_sync_total', "Synchros Twitch",
+                        trigger=trigger, outcome=result.outcome).inc()
+        self._adapt(result, loop)
+
+        if self.on_result is not None:
+            try:
+                self.on_result(trigger, result)
+            except Exception as e:
+                logger.error(f"❌ Erreur callback synchro: {e}")
+        return result
+
+    def _adapt(self, result, loop):
+        """Ajuste l'intervalle et l'échéance suivante selon le résultat"""
+        if result.outcome == OUTCOME_RATE_LIMITED:
+            self.rate_limited += 1
+            self.blocked_until = loop.time() + result.retry_after + RESET_MARGIN
+            # Pas de changement d'intervalle : simple report jusqu'à la reprise
+            self._schedule_next(max(result.retry_after + RESET_MARGIN, self.interval))
+            return
+
+        if result.outcome == OUTCOME_UPDATED:
+            self.unchanged_streak = 0
+            self.error_streak = 0
+            self.interval = self.base_interval
+        elif result.outcome == OUTCOME_UNCHANGED:
+            self.error_streak = 0
+            self.unchanged_streak += 1
+            if self.unchanged_streak >= self.idle_after:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+        elif result.outcome == OUTCOME_UNAUTHENTICATED:
+            # Rien à synchroniser avant la connexion Twitch
+            self.interval = self.max_interval
+        else:
+            self.error_streak += 1
+            self.interval = min(self.max_interval, self.base_interval * self.backoff ** self.error_streak)
+
+        METRICS.gauge('subcount_twitch_sync_interval_seconds', "Intervalle courant des synchros Twitch").set(self.interval)
+        self._schedule_next(self.interval)
+
+    def _schedule_next(self, delay):
+        try:
+            loop_time = asyncio.get_event_loop().time()
+        except RuntimeError:
+            return
+        self.next_run_at = loop_time + delay
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _http_fetch(self):
+        """GET /admin/sync-twitch (disjoncteur respecté, connexion keep-alive)"""
+        if not self.breaker.allow_request():
+            raise ConnectionError("serveur indisponible")
+        if self._connection is None:
+            self._connection = HttpConnection(self.server_url, self.timeout)
+        try:
+            response = await self._connection.request('GET', SYNC_PATH)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response.status_code, response.body
+
+    def status(self):
+        """État courant (pour le diagnostic)"""
+        next_in = None
+        if self.next_run_at is not None:
+            next_in = max(0.0, self.next_run_at - self.background_loop.loop.time())
+        return {
+            'interval_s': self.interval,
+            'next_in_s': next_in,
+            'unchanged_streak': self.unchanged_streak,
+            'syncs': self.syncs,
+            'merged': self.merged,
+            'rate_limited': self.rate_limited,
+            'last_outcome': self.last_result.outcome if self.last_result else None,
+        }
+
+
+# ==================================================================
+# BENCHMARK
+# ==================================================================
+
+class _SimulatedServer:
+    """Serveur de synchro simulé : rate limiter à fenêtre glissante + activité"""
+
+    def __init__(self, max_requests=10, window=60.0, change_every=0, latency=0.05, clock=time.monotonic):
+        self.max_requests = max_requests
+        self.window = window
+        self.change_every = change_every
+        self.latency = latency
+        self.clock = clock
+        self.requests = []
+        self.calls = 0
+        self.rejected = 0
+
+    async def fetch(self):
+        now = self.clock()
+        self.requests = [t for t in self.requests if now - t < self.window]
+        if len(self.requests) >= self.max_requests:
+            self.rejected += 1
+            reset_ms = (min(self.requests) + self.window - now) * 1000
+            return 429, {'success': False, 'nextResetInMs': reset_ms, 'nextResetIn': -(-reset_ms // 1000)}
+        self.requests.append(now)
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        changed = self.change_every and self.calls % self.change_every == 0
+        return 200, {'success': True, 'followsDiff': 1 if changed else 0, 'subsDiff': 0}
+
+
+def benchmark(clicks=200, concurrency=20):
+    """Fusion des demandes concurrentes et respect du rate limit (fenêtre réduite)
+
+    `clicks` demandes manuelles sont envoyées par vagues de `concurrency`
+    contre un serveur simulé limité à 3 synchros / 0,5 s.
+    """
+    from background_loop import BackgroundLoop
+
+    background_loop = BackgroundLoop(name="sync-bench")
+    server = _SimulatedServer(max_requests=3, window=0.5, latency=0.02)
+    scheduler = TwitchSyncScheduler(
+        base_interval=3600, background_loop=background_loop, fetch=server.fetch
+    )
+    try:
+        started = time.perf_counter()
+        for _ in range(0, clicks, concurrency):
+            futures = [scheduler.request_sync("manual") for _ in range(concurrency)]
+            for future in futures:
+                future.result(10)
+        duration = time.perf_counter() - started
+    finally:
+        background_loop.stop()
+
+    return {
+        'requests': clicks,
+        'http_calls': server.calls + server.rejected,
+        'merged': scheduler.merged,
+        'rejected_429': server.rejected,
+        'duration_s': round(duration, 3),
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    print("\n🔄 Benchmark planificateur de synchro Twitch")
+    print(json.dumps(benchmark(), indent=2))
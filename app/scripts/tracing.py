@@ -0,0 +1,340 @@
+# ==================================================================
+# TRACES DE BOUT EN BOUT (ACTION OBS -> RÉCEPTION PAR L'OVERLAY)
+# ==================================================================
+# Chaque action (clic follow, changement de police...) reçoit un
+# identifiant de trace envoyé au serveur dans le header X-Trace-Id.
+# server.js le recopie dans les broadcasts WebSocket qui en découlent
+# (`traces`: receivedAt / appliedAt / broadcastAt, en ms epoch), y
+# compris après le batching des add/remove. TraceListener reçoit ces
+# broadcasts et ferme les traces : on obtient des étapes contiguës
+#
+#   obs.callback     début de l'action -> envoi de la requête HTTP
+#   http.to_server   envoi -> réception par le serveur
+#   server.queue     réception -> état modifié (batching compris)
+#   server.broadcast état modifié -> envoi WebSocket
+#   ws.delivery      envoi WebSocket -> réception par l'écouteur
+#
+# plus `http.request` (aller-retour complet, en recouvrement). Les
+# étapes entre processus supposent des horloges communes (même
+# machine) : l'horloge locale est perf_counter recalé sur l'epoch.
+# ==================================================================
+
+import binascii
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = 'X-Trace-Id'
+DEFAULT_MAX_SPANS = 10000
+
+# Étapes contiguës du budget de latence (ordre chronologique)
+STAGES = ('obs.callback', 'http.to_server', 'server.queue', 'server.broadcast', 'ws.delivery')
+REQUEST_SPAN = 'http.request'
+SEND_MARK = 'http.send'  # Instant de l'envoi (span de durée nulle)
+END_TO_END = 'end_to_end'
+_INTERNAL_SPANS = frozenset(STAGES + (REQUEST_SPAN, SEND_MARK))
+
+# Horloge haute résolution exprimée en secondes epoch
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+
+def now():
+    """Secondes epoch, résolution de perf_counter"""
+    return time.perf_counter() + _EPOCH_OFFSET
+
+
+def new_trace_id():
+    """Identifiant de trace (16 caractères hexadécimaux)"""
+    return binascii.hexlify(os.urandom(8)).decode('ascii')
+
+
+Span = namedtuple('Span', ['trace_id', 'name', 'start', 'end'])
+
+
+def _span_dict(span):
+    return {
+        'trace_id': span.trace_id,
+        'name': span.name,
+        'start': round(span.start, 6),
+        'end': round(span.end, 6),
+        'duration_ms': round((span.end - span.start) * 1000, 3),
+    }
+
+
+class Tracer:
+    """Traces actives (par thread) et spans terminés (tampon borné)
+
+    Args:
+        max_spans (int): Spans conservés (les plus anciens sont oubliés)
+    """
+
+    def __init__(self, max_spans=DEFAULT_MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current_trace_id(self):
+        """Trace active dans ce thread (ou None)"""
+        return getattr(self._local, 'trace_id', None)
+
+    @contextmanager
+    def activate(self, trace_id):
+        """Rend `trace_id` actif dans ce thread (ex. threads de fan_out)"""
+        previous = self.current_trace_id()
+        self._local.trace_id = trace_id
+        try:
+            yield trace_id
+        finally:
+            self._local.trace_id = previous
+
+    @contextmanager
+    def trace(self, name):
+        """Démarre une trace (ou rejoint celle déjà active) et mesure le bloc
+
+        Yields:
+            str: Identifiant de la trace
+        """
+        trace_id = self.current_trace_id() or new_trace_id()
+        start = now()
+        with self.activate(trace_id):
+            try:
+                yield trace_id
+            finally:
+                self.record(trace_id, name, start, now())
+
+    def traced(self, name):
+        """Décorateur : la fonction s'exécute dans une trace `name`"""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                with self.trace(name):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def span(self, name, trace_id=None):
+        """Mesure un bloc dans la trace donnée (défaut: trace active)"""
+        trace_id = trace_id or self.current_trace_id()
+        start = now()
+        try:
+            yield trace_id
+        finally:
+            if trace_id:
+                self.record(trace_id, name, start, now())
+
+    @contextmanager
+    def request(self, trace_id):
+        """Mesure un appel HTTP : instant d'envoi puis aller-retour complet
+
+        L'instant d'envoi est enregistré avant la requête : le broadcast
+        peut arriver avant la réponse. Sans trace (None), ne mesure rien.
+        """
+        if trace_id is None:
+            yield None
+            return
+        start = now()
+        self.record(trace_id, SEND_MARK, start, start)
+        try:
+            yield trace_id
+        finally:
+            self.record(trace_id, REQUEST_SPAN, start, now())
+
+    def headers(self, trace_id=None, headers=None):
+        """Headers d'une requête complétés de X-Trace-Id
+
+        Returns:
+            tuple: (trace_id, headers) — nouvelle trace si aucune n'est active
+        """
+        trace_id = trace_id or self.current_trace_id() or new_trace_id()
+        headers = dict(headers or {})
+        headers[TRACE_HEADER] = trace_id
+        return trace_id, headers
+
+    def record(self, trace_id, name, start, end):
+        with self._lock:
+            self._spans.append(Span(trace_id, name, start, end))
+
+    def spans(self, trace_id=None):
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def export_json(self, path, trace_ids=None):
+        """Écrit les spans (et le résumé) dans un fichier JSON"""
+        spans = self.spans()
+        if trace_ids is not None:
+            wanted = set(trace_ids)
+            spans = [span for span in spans if span.trace_id in wanted]
+        document = {'spans': [_span_dict(span) for span in spans], 'summary': summarize(spans)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        return document
+
+
+# Traceur partagé (script OBS, OverlayConfigManager)
+TRACER = Tracer()
+
+
+class TraceListener:
+    """Ferme les traces à la réception des broadcasts qui les portent
+
+    `handle_message` reçoit chaque message WebSocket brut (8083 ou 8084) ;
+    seule la première réception d'une trace est retenue (le serveur peut
+    diffuser plusieurs messages pour une même action).
+
+    Args:
+        tracer (Tracer): Destination des spans serveur et de livraison
+        clock (callable): Horloge (secondes epoch)
+        max_traces (int): Traces reçues mémorisées (dédoublonnage)
+    """
+
+    def __init__(self, tracer=TRACER, clock=now, max_traces=DEFAULT_MAX_SPANS):
+        self.tracer = tracer
+        self.clock = clock
+        self.max_traces = max_traces
+        self._delivered = OrderedDict()
+        self._condition = threading.Condition()
+
+    def handle_message(self, raw, received_at=None):
+        """Returns: list: Traces fermées par ce message"""
+        received_at = self.clock() if received_at is None else received_at
+        try:
+            message = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            return []
+        traces = message.get('traces') if isinstance(message, dict) else None
+        if not traces:
+            return []
+
+        closed = []
+        with self._condition:
+            for echo in traces:
+                trace_id = echo.get('id') if isinstance(echo, dict) else None
+                if not trace_id or trace_id in self._delivered:
+                    continue
+                self._delivered[trace_id] = received_at
+                closed.append(trace_id)
+            while len(self._delivered) > self.max_traces:
+                self._delivered.popitem(last=False)
+            if closed:
+                self._condition.notify_all()
+
+        for echo in traces:
+            if isinstance(echo, dict) and echo.get('id') in closed:
+                self._record_echo(echo, received_at)
+        return closed
+
+    def _record_echo(self, echo, received_at):
+        trace_id = echo['id']
+        marks = [(name, echo.get(key)) for name, key in
+                 (('http.to_server', 'receivedAt'), ('server.queue', 'appliedAt'), ('server.broadcast', 'broadcastAt'))]
+        if any(value is None for _, value in marks):
+            return
+        # Début de http.to_server : envoi de la requête (côté client)
+        sends = [span for span in self.tracer.spans(trace_id) if span.name == SEND_MARK]
+        previous = sends[0].start if sends else None
+        for name, value in marks:
+            value = value / 1000.0
+            if previous is not None:
+                self.tracer.record(trace_id, name, previous, value)
+            previous = value
+        self.tracer.record(trace_id, 'ws.delivery', previous, received_at)
+
+    def delivered(self, trace_id):
+        return trace_id in self._delivered
+
+    def wait(self, trace_id, timeout=None):
+        """Attend la réception d'une trace
+
+        Returns:
+            bool: True si la trace a été reçue
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: trace_id in self._delivered, timeout)
+
+
+def _stats(values):
+    values = sorted(values)
+    if not values:
+        return None
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'p50_ms': round(pick(0.50) * 1000, 3),
+        'p95_ms': round(pick(0.95) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+    }
+
+
+def summarize(spans):
+    """Répartition du budget de latence sur les traces complètes
+
+    `obs.callback` va du début de la trace au premier envoi HTTP. Une trace est complète quand `ws.delivery`
+    est connu ; les autres sont comptées dans `incomplete`.
+
+    Returns:
+        dict: Par étape (moyenne, p50, p95, max, part du total moyen)
+    """
+    by_trace = {}
+    for span in spans:
+        by_trace.setdefault(span.trace_id, []).append(span)
+
+    durations = {name: [] for name in STAGES + (REQUEST_SPAN, END_TO_END)}
+    by_action = {}
+    incomplete = 0
+    for trace_spans in by_trace.values():
+        named = {}
+        for span in trace_spans:
+            named.setdefault(span.name, span)
+        delivery = named.get('ws.delivery')
+        if delivery is None:
+            incomplete += 1
+            continue
+
+        send = named.get(SEND_MARK)
+        start = min(span.start for span in trace_spans)
+        if send is not None and send.start > start:
+            durations['obs.callback'].append(send.start - start)
+        for name in STAGES[1:] + (REQUEST_SPAN,):
+            if name in named:
+                durations[name].append(named[name].end - named[name].start)
+        durations[END_TO_END].append(delivery.end - start)
+        # Action d'origine : span racine (ex. obs.add_follow), sinon requête seule
+        roots = [span for span in trace_spans if span.name not in _INTERNAL_SPANS]
+        action = min(roots, key=lambda span: span.start).name if roots else REQUEST_SPAN
+        by_action.setdefault(action, []).append(delivery.end - start)
+
+    total = _stats(durations[END_TO_END])
+    stages = {}
+    for name in STAGES + (REQUEST_SPAN,):
+        stats = _stats(durations[name])
+        if stats is None:
+            continue
+        if name in STAGES and total:
+            stats['share'] = round(sum(durations[name]) / sum(durations[END_TO_END]), 3)
+        stages[name] = stats
+    return {
+        'traces': len(by_trace),
+        'complete': len(durations[END_TO_END]),
+        'incomplete': incomplete,
+        END_TO_END: total,
+        'stages': stages,
+        'by_action': {action: _stats(values) for action, values in sorted(by_action.items())},
+    }
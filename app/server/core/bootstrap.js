@@ -14,10 +14,12 @@ const path = require('path');
 const fs = require('fs');
 const { DependencyContainer } = require('./dependency-container');
 const { StateManager, STATE_EVENTS } = require('./state-manager');
+const { instanceFile } = require('../utils/constants');
+const { markApplied } = require('../utils/trace-context');
 
 // Chemin racine du projet
 const ROOT_DIR = path.join(__dirname, '..', '..', '..');
-const APP_STATE_FILE = path.join(ROOT_DIR, 'app', 'config', 'app_state.json');
+const APP_STATE_FILE = instanceFile(path.join(ROOT_DIR, 'app', 'config', 'app_state.json'));
 
 // ═══════════════════════════════════════════════════════════════════════════
 // FONCTIONS UTILITAIRES - Persistance État
@@ -51,8 +53,11 @@ function saveAppState(state) {
             fs.mkdirSync(dir, { recursive: true });
         }
         
-        // Sauvegarder avec indentation
-        fs.writeFileSync(APP_STATE_FILE, JSON.stringify(state, null, 2), 'utf8');
+        // Sauvegarder avec indentation (fichier temporaire puis renommage :
+        // une sauvegarde ou un crash ne voient jamais un fichier à moitié écrit)
+        const tmpFile = `${APP_STATE_FILE}.${process.pid}.tmp`;
+        fs.writeFileSync(tmpFile, JSON.stringify(state, null, 2), 'utf8');
+        fs.renameSync(tmpFile, APP_STATE_FILE);
     } catch (error) {
         console.error('Erreur sauvegarde app_state.json:', error.message);
     }
@@ -274,12 +279,15 @@ function setupEventListeners(container) {
     // Compteurs → Broadcast
     // ─────────────────────────────────────────────────────────────────────────
     
+    // markApplied : fin de l'étape « état modifié » des requêtes tracées (X-Trace-Id)
     stateManager.on(STATE_EVENTS.FOLLOWS_UPDATED, (data) => {
+        markApplied();
         logEvent('INFO', `📊 Follows: ${data.oldValue} → ${data.newValue} (${data.diff > 0 ? '+' : ''}${data.diff})`);
         broadcastService.broadcastFollowUpdate(data.diff);
     });
     
     stateManager.on(STATE_EVENTS.SUBS_UPDATED, (data) => {
+        markApplied();
         logEvent('INFO', `📊 Subs: ${data.oldValue} → ${data.newValue} (${data.diff > 0 ? '+' : ''}${data.diff})`);
         broadcastService.broadcastSubUpdate(data.diff);
     });
@@ -299,10 +307,29 @@ function setupEventListeners(container) {
     // ─────────────────────────────────────────────────────────────────────────
     
     stateManager.on(STATE_EVENTS.OVERLAY_CONFIG_CHANGED, (config) => {
+        markApplied();
         logEvent('INFO', '🎨 Configuration overlay mise à jour');
         broadcastService.broadcastConfigUpdate();
     });
     
+    // ─────────────────────────────────────────────────────────────────────────
+    // Transactions (POST /api/batch) → un broadcast par compteur / config touché
+    // ─────────────────────────────────────────────────────────────────────────
+    
+    stateManager.on(STATE_EVENTS.BATCH_APPLIED, ({ changes, operations }) => {
+        markApplied();
+        logEvent('INFO', `📦 Lot appliqué: ${operations} changement(s)`);
+        if (changes.follows || changes.goals.includes('follow')) {
+            broadcastService.broadcastFollowUpdate(changes.follows ? changes.follows.diff : null);
+        }
+        if (changes.subs || changes.goals.includes('sub')) {
+            broadcastService.broadcastSubUpdate(changes.subs ? changes.subs.diff : null);
+        }
+        if (changes.overlay) {
+            broadcastService.broadcastConfigUpdate();
+        }
+    });
+    
     // ─────────────────────────────────────────────────────────────────────────
     // Connexions
     // ─────────────────────────────────────────────────────────────────────────
@@ -8,6 +8,8 @@
  * avec les animations overlay
  */
 
+const { activeTraces, runWithTraces } = require('../../utils/trace-context');
+
 /**
  * Crée le service de batching
  * @param {Object} deps - Dépendances injectées
@@ -25,6 +27,20 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
     const BATCH_DELAY = LIMITS.BATCH_DELAY || 300;
     const ANIMATION_DURATION = LIMITS.ANIMATION_DURATION || 1500;
     
+    // Traces (X-Trace-Id) des actions accumulées, rattachées au broadcast du flush
+    const pendingTraces = { follow: [], followRemove: [], sub: [], subEnd: [] };
+    
+    function holdTraces(type) {
+        const traces = activeTraces();
+        if (traces.length > 0) pendingTraces[type].push(...traces);
+    }
+    
+    function takeTraces(type) {
+        const traces = pendingTraces[type];
+        pendingTraces[type] = [];
+        return traces;
+    }
+    
     // ═══════════════════════════════════════════════════════════════════════════
     // BATCHING FOLLOWS - AJOUT
     // ═══════════════════════════════════════════════════════════════════════════
@@ -36,6 +52,7 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
     function addFollowToBatch(count = 1) {
         const batch = stateManager.getBatch('follow');
         stateManager.addToBatch('follow', count);
+        holdTraces('follow');
         
         // Si animation en cours, juste accumuler
         if (batch.isAnimating) {
@@ -57,6 +74,10 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
      * Traite et envoie le batch de follows accumulés
      */
     function flushFollowBatch() {
+        runWithTraces(takeTraces('follow'), applyFollowBatch);
+    }
+    
+    function applyFollowBatch() {
         const batch = stateManager.getBatch('follow');
         if (batch.count === 0) return;
         
@@ -98,6 +119,7 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
     function addFollowRemoveToBatch(count = 1) {
         const batch = stateManager.getBatch('followRemove');
         stateManager.addToBatch('followRemove', count);
+        holdTraces('followRemove');
         
         if (batch.isAnimating) {
             logEvent('INFO', `⏳ Animation en cours - Accumulation unfollows: ${stateManager.getBatch('followRemove').count}`);
@@ -117,6 +139,10 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
      * Traite le batch d'unfollows
      */
     function flushFollowRemoveBatch() {
+        runWithTraces(takeTraces('followRemove'), applyFollowRemoveBatch);
+    }
+    
+    function applyFollowRemoveBatch() {
         const batch = stateManager.getBatch('followRemove');
         if (batch.count === 0) return;
         
@@ -150,6 +176,7 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
     function addSubToBatch(count = 1) {
         const batch = stateManager.getBatch('sub');
         stateManager.addToBatch('sub', count);
+        holdTraces('sub');
         
         if (batch.isAnimating) {
             logEvent('INFO', `⏳ Animation en cours - Accumulation subs: ${stateManager.getBatch('sub').count}`);
@@ -169,6 +196,10 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
      * Traite le batch de subs
      */
     function flushSubBatch() {
+        runWithTraces(takeTraces('sub'), applySubBatch);
+    }
+    
+    function applySubBatch() {
         const batch = stateManager.getBatch('sub');
         if (batch.count === 0) return;
         
@@ -202,6 +233,7 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
     function addSubEndToBatch(count = 1) {
         const batch = stateManager.getBatch('subEnd');
         stateManager.addToBatch('subEnd', count);
+        holdTraces('subEnd');
         
         if (batch.isAnimating) {
             logEvent('INFO', `⏳ Animation en cours - Accumulation fin subs: ${stateManager.getBatch('subEnd').count}`);
@@ -221,6 +253,10 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
      * Traite le batch de fins de sub
      */
     function flushSubEndBatch() {
+        runWithTraces(takeTraces('subEnd'), applySubEndBatch);
+    }
+    
+    function applySubEndBatch() {
         const batch = stateManager.getBatch('subEnd');
         if (batch.count === 0) return;
         
@@ -265,6 +301,7 @@ function createBatchingService({ stateManager, timerRegistry, broadcastService,
         stateManager.resetBatch('followRemove');
         stateManager.resetBatch('sub');
         stateManager.resetBatch('subEnd');
+        Object.keys(pendingTraces).forEach((type) => takeTraces(type));
         
         timerRegistry.clearTimeout('followBatch');
         timerRegistry.clearTimeout('followRemoveBatch');
@@ -8,6 +8,7 @@
  */
 
 const WebSocket = require('ws');
+const { broadcastFields } = require('../../utils/trace-context');
 
 /**
  * Crée le service de diffusion WebSocket
@@ -175,7 +176,8 @@ function createBroadcastService({ stateManager, goalsService, logger, constants
             goal: goalInfo.goal, // Format attendu par overlay.html: { current, target, message, isMaxReached }
             batchCount: batchCount,
             isBatch: batchCount > 1,
-            timestamp: new Date().toISOString()
+            timestamp: new Date().toISOString(),
+            ...broadcastFields()
         });
         
         let sentCount = 0;
@@ -212,7 +214,8 @@ function createBroadcastService({ stateManager, goalsService, logger, constants
             goal: goalInfo.goal, // Format attendu par overlay.html: { current, target, message, isMaxReached }
             batchCount: batchCount,
             isBatch: batchCount > 1,
-            timestamp: new Date().toISOString()
+            timestamp: new Date().toISOString(),
+            ...broadcastFields()
         });
         
         let sentCount = 0;
@@ -247,7 +250,8 @@ function createBroadcastService({ stateManager, goalsService, logger, constants
         const message = JSON.stringify({
             type: 'config_update',
             config: config,
-            timestamp: new Date().toISOString()
+            timestamp: new Date().toISOString(),
+            ...broadcastFields()
         });
         
         let sentCount = 0;
@@ -9,6 +9,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { instanceFile } = require('../../utils/constants');
 
 /**
  * Crée le service de gestion des objectifs
@@ -22,8 +23,8 @@ function createGoalsService({ stateManager, logger, ROOT_DIR }) {
     const { logEvent } = logger;
     
     const GOALS_PATH = {
-        follow: path.join(ROOT_DIR, 'obs', 'data', 'followgoal_config.txt'),
-        sub: path.join(ROOT_DIR, 'obs', 'data', 'subgoals_config.txt')
+        follow: instanceFile(path.join(ROOT_DIR, 'obs', 'data', 'followgoal_config.txt')),
+        sub: instanceFile(path.join(ROOT_DIR, 'obs', 'data', 'subgoals_config.txt'))
     };
     
     let watchers = {};
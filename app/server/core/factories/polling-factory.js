@@ -9,6 +9,7 @@
  * Stratégie:
  * - Follows: Polling toutes les 10s (pas d'événement unfollow dans EventSub)
  * - Subs: Polling toutes les 60s (EventSub gère les événements temps réel)
+ * - Hors direct (profil 'idle', envoyé par le script OBS) : 60s / 5min
  */
 
 /**
@@ -30,7 +31,17 @@ function createPollingService({ stateManager, twitchApiService, timerRegistry, l
     const POLLING_INTERVAL_SUBS = LIMITS.POLLING_INTERVAL_SUBS || 60000;       // 60s pour subs (EventSub gère le temps réel)
     const INITIAL_SYNC_DELAY = 5000; // 5 secondes après démarrage
     
+    // Intervalles par profil d'activité : en direct ou au repos (OBS ne diffuse ni n'enregistre)
+    const PROFILE_INTERVALS = Object.freeze({
+        live: { follows: POLLING_INTERVAL_FOLLOWS, subs: POLLING_INTERVAL_SUBS },
+        idle: {
+            follows: LIMITS.POLLING_IDLE_INTERVAL_FOLLOWS || POLLING_INTERVAL_FOLLOWS * 6,
+            subs: LIMITS.POLLING_IDLE_INTERVAL_SUBS || POLLING_INTERVAL_SUBS * 5
+        }
+    });
+    
     let isPolling = false;
+    let profile = 'live'; // Sans script OBS, le serveur garde le rythme d'origine
     
     // ═══════════════════════════════════════════════════════════════════════════
     // POLLING
@@ -58,17 +69,27 @@ function createPollingService({ stateManager, twitchApiService, timerRegistry, l
             await syncAll('initial');
         }, INITIAL_SYNC_DELAY);
         
-        // Polling follows toutes les 10 secondes (pour détecter unfollows)
+        scheduleIntervals();
+        
+        const intervals = PROFILE_INTERVALS[profile];
+        logEvent('INFO', `✅ Polling démarré (follows: ${intervals.follows/1000}s, subs: ${intervals.subs/1000}s, profil: ${profile})`);
+    }
+    
+    /**
+     * (Ré)arme les intervalles de polling selon le profil courant
+     */
+    function scheduleIntervals() {
+        const intervals = PROFILE_INTERVALS[profile];
+        
+        // Polling follows (pour détecter unfollows)
         timerRegistry.setInterval('pollingFollows', async () => {
             await syncFollowsOnly('polling');
-        }, POLLING_INTERVAL_FOLLOWS);
+        }, intervals.follows);
         
-        // Polling subs toutes les 60 secondes (backup pour EventSub)
+        // Polling subs (backup pour EventSub)
         timerRegistry.setInterval('pollingSubs', async () => {
             await syncSubsOnly('polling');
-        }, POLLING_INTERVAL_SUBS);
-        
-        logEvent('INFO', `✅ Polling démarré (follows: ${POLLING_INTERVAL_FOLLOWS/1000}s, subs: ${POLLING_INTERVAL_SUBS/1000}s)`);
+        }, intervals.subs);
     }
     
     /**
@@ -87,6 +108,33 @@ function createPollingService({ stateManager, twitchApiService, timerRegistry, l
         logEvent('INFO', '🛑 Polling arrêté');
     }
     
+    /**
+     * Change le profil d'activité (le polling en cours est réarmé)
+     * @param {string} newProfile - 'live' ou 'idle'
+     * @returns {boolean} true si le profil a changé
+     */
+    function setProfile(newProfile) {
+        if (!PROFILE_INTERVALS[newProfile]) {
+            throw new Error(`Profil invalide: ${newProfile}`);
+        }
+        if (newProfile === profile) return false;
+        
+        profile = newProfile;
+        if (isPolling) {
+            scheduleIntervals();
+        }
+        const intervals = PROFILE_INTERVALS[profile];
+        logEvent('INFO', `${profile === 'live' ? '🔴' : '💤'} Profil ${profile} - polling follows: ${intervals.follows/1000}s, subs: ${intervals.subs/1000}s`);
+        return true;
+    }
+    
+    /**
+     * @returns {string} Profil d'activité courant ('live' ou 'idle')
+     */
+    function getProfile() {
+        return profile;
+    }
+    
     /**
      * Redémarre le polling
      */
@@ -285,10 +333,8 @@ function createPollingService({ stateManager, twitchApiService, timerRegistry, l
     function getStatus() {
         return {
             active: isPolling,
-            intervals: {
-                follows: POLLING_INTERVAL_FOLLOWS,
-                subs: POLLING_INTERVAL_SUBS
-            },
+            profile,
+            intervals: { ...PROFILE_INTERVALS[profile] },
             authenticated: twitchApiService.isAuthenticated(),
             lastFollows: stateManager.getLastKnownFollowCount(),
             lastSubs: stateManager.getLastKnownSubCount()
@@ -313,6 +359,8 @@ function createPollingService({ stateManager, twitchApiService, timerRegistry, l
         stop,
         restart,
         isActive,
+        setProfile,
+        getProfile,
         
         // Synchronisation
         syncAll,
@@ -23,9 +23,9 @@ const path = require('path');
  */
 function createTwitchApiService({ stateManager, configCrypto, logger, constants, ROOT_DIR }) {
     const { logEvent } = logger;
-    const { TWITCH_CLIENT_ID, LIMITS } = constants;
+    const { TWITCH_CLIENT_ID, LIMITS, instanceFile } = constants;
     
-    const CONFIG_PATH = path.join(ROOT_DIR, 'obs', 'data', 'twitch_config.txt');
+    const CONFIG_PATH = instanceFile(path.join(ROOT_DIR, 'obs', 'data', 'twitch_config.txt'));
     const API_TIMEOUT = LIMITS.API_TIMEOUT || 10000;
     
     // ═══════════════════════════════════════════════════════════════════════════
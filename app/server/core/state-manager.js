@@ -48,6 +48,9 @@ const STATE_EVENTS = Object.freeze({
     TWITCH_TOKEN_REFRESHED: 'twitch:token:refreshed',
     TWITCH_DISCONNECTED: 'twitch:disconnected',
     
+    // Transactions (POST /api/batch) : un seul événement pour tout le lot
+    BATCH_APPLIED: 'state:batch:applied',
+    
     // Erreurs
     ERROR: 'state:error'
 });
@@ -61,6 +64,7 @@ class StateManager extends EventEmitter {
     #persistDebounceTimer;
     #persistFn;
     #persistDelay;
+    #transaction;
     
     /**
      * @param {Object} initialState - État initial (depuis app_state.json)
@@ -76,6 +80,7 @@ class StateManager extends EventEmitter {
         this.#persistFn = options.persistFn || (() => {});
         this.#persistDelay = options.persistDelay || 1000;
         this.#persistDebounceTimer = null;
+        this.#transaction = null;
     }
     
     /**
@@ -348,13 +353,13 @@ class StateManager extends EventEmitter {
         this.#state.settings.subCounterMode = mode;
         
         // Émettre un événement spécifique pour le changement de mode
-        this.emit(STATE_EVENTS.MODE_CHANGED, {
+        this.#emitChange(STATE_EVENTS.MODE_CHANGED, {
             oldMode: oldMode,
             newMode: mode,
             isSession: mode === 'session'
         });
         
-        this.emit(STATE_EVENTS.CONFIG_CHANGED, {
+        this.#emitChange(STATE_EVENTS.CONFIG_CHANGED, {
             setting: 'subCounterMode',
             oldValue: oldMode,
             newValue: mode
@@ -416,7 +421,7 @@ class StateManager extends EventEmitter {
         this.#state.counters.follows = value;
         this.#state.counters.lastUpdated = new Date().toISOString();
         
-        this.emit(STATE_EVENTS.FOLLOWS_UPDATED, {
+        this.#emitChange(STATE_EVENTS.FOLLOWS_UPDATED, {
             oldValue,
             newValue: value,
             diff: value - oldValue,
@@ -443,7 +448,7 @@ class StateManager extends EventEmitter {
         this.#state.counters.subs = value;
         this.#state.counters.lastUpdated = new Date().toISOString();
         
-        this.emit(STATE_EVENTS.SUBS_UPDATED, {
+        this.#emitChange(STATE_EVENTS.SUBS_UPDATED, {
             oldValue,
             newValue: value,
             diff: value - oldValue,
@@ -479,8 +484,8 @@ class StateManager extends EventEmitter {
             goalsMap = new Map(Object.entries(goalsMap));
         }
         this.#state.goals.follow = goalsMap;
-        this.emit(STATE_EVENTS.FOLLOW_GOALS_LOADED, { count: goalsMap.size });
-        this.emit(STATE_EVENTS.GOALS_CHANGED, { type: 'follow', count: goalsMap.size });
+        this.#emitChange(STATE_EVENTS.FOLLOW_GOALS_LOADED, { count: goalsMap.size });
+        this.#emitChange(STATE_EVENTS.GOALS_CHANGED, { type: 'follow', count: goalsMap.size });
     }
     
     setSubGoals(goalsMap) {
@@ -488,8 +493,8 @@ class StateManager extends EventEmitter {
             goalsMap = new Map(Object.entries(goalsMap));
         }
         this.#state.goals.sub = goalsMap;
-        this.emit(STATE_EVENTS.SUB_GOALS_LOADED, { count: goalsMap.size });
-        this.emit(STATE_EVENTS.GOALS_CHANGED, { type: 'sub', count: goalsMap.size });
+        this.#emitChange(STATE_EVENTS.SUB_GOALS_LOADED, { count: goalsMap.size });
+        this.#emitChange(STATE_EVENTS.GOALS_CHANGED, { type: 'sub', count: goalsMap.size });
     }
     
     // ═══════════════════════════════════════════════════════════════════════════
@@ -590,13 +595,13 @@ class StateManager extends EventEmitter {
     
     setOverlayConfig(config) {
         this.#state.overlay = JSON.parse(JSON.stringify(config));
-        this.emit(STATE_EVENTS.OVERLAY_CONFIG_CHANGED, config);
+        this.#emitChange(STATE_EVENTS.OVERLAY_CONFIG_CHANGED, config);
         this.#schedulePersist();
     }
     
     updateOverlayConfig(updates) {
         Object.assign(this.#state.overlay, updates);
-        this.emit(STATE_EVENTS.OVERLAY_CONFIG_CHANGED, this.#state.overlay);
+        this.#emitChange(STATE_EVENTS.OVERLAY_CONFIG_CHANGED, this.#state.overlay);
         this.#schedulePersist();
     }
     
@@ -665,11 +670,126 @@ class StateManager extends EventEmitter {
         this.#state.deviceCode.data = null;
     }
     
+    // ═══════════════════════════════════════════════════════════════════════════
+    // TRANSACTIONS
+    // ═══════════════════════════════════════════════════════════════════════════
+    
+    /**
+     * Applique plusieurs mutations comme une seule
+     * 
+     * Pendant `fn`, les événements de changement sont retenus et la
+     * persistance est suspendue. Au succès : un seul BATCH_APPLIED (les
+     * listeners diffusent une fois par compteur / config touchés), puis
+     * une seule écriture de l'état. Si `fn` lève une exception, l'état est
+     * restauré et aucun événement n'est émis.
+     * 
+     * Les transactions imbriquées rejoignent la transaction en cours.
+     * 
+     * @param {Function} fn - Mutations à appliquer (synchrones)
+     * @param {string} source - Origine (logs)
+     * @returns {*} Valeur retournée par fn
+     */
+    transaction(fn, source = 'batch') {
+        if (this.#transaction) {
+            return fn();
+        }
+        
+        const snapshot = {
+            counters: { ...this.#state.counters },
+            tracking: { ...this.#state.tracking },
+            settings: { ...this.#state.settings },
+            overlay: JSON.parse(JSON.stringify(this.#state.overlay)),
+            goals: { follow: new Map(this.#state.goals.follow), sub: new Map(this.#state.goals.sub) }
+        };
+        this.#transaction = { events: [], dirty: false };
+        
+        let result;
+        let transaction;
+        try {
+            result = fn();
+        } catch (error) {
+            Object.assign(this.#state, snapshot);
+            throw error;
+        } finally {
+            transaction = this.#transaction;
+            this.#transaction = null;
+        }
+        
+        this.#commitTransaction(transaction, source);
+        return result;
+    }
+    
+    /**
+     * Vrai pendant une transaction
+     */
+    inTransaction() {
+        return this.#transaction !== null;
+    }
+    
+    /**
+     * Émet un événement de changement, ou le retient pendant une transaction
+     * @private
+     */
+    #emitChange(event, data) {
+        if (this.#transaction) {
+            this.#transaction.events.push([event, data]);
+            return;
+        }
+        this.emit(event, data);
+    }
+    
+    /**
+     * Fusionne les événements retenus et émet BATCH_APPLIED
+     * @private
+     */
+    #commitTransaction(transaction, source) {
+        const changes = { goals: [], overlay: false };
+        const first = {};
+        
+        for (const [event, data] of transaction.events) {
+            if (!(event in first)) first[event] = data;
+            if (event === STATE_EVENTS.GOALS_CHANGED && !changes.goals.includes(data.type)) {
+                changes.goals.push(data.type);
+            } else if (event === STATE_EVENTS.OVERLAY_CONFIG_CHANGED) {
+                changes.overlay = true;
+            }
+        }
+        
+        // Compteurs : valeur avant le lot -> valeur finale (rien si inchangée)
+        for (const [key, event] of [['follows', STATE_EVENTS.FOLLOWS_UPDATED], ['subs', STATE_EVENTS.SUBS_UPDATED]]) {
+            const oldValue = first[event]?.oldValue;
+            const newValue = this.#state.counters[key];
+            if (oldValue !== undefined && oldValue !== newValue) {
+                changes[key] = { oldValue, newValue, diff: newValue - oldValue, source };
+            }
+        }
+        
+        // Mode : réémis une fois s'il a réellement changé
+        const oldMode = first[STATE_EVENTS.MODE_CHANGED]?.oldMode;
+        const newMode = this.#state.settings.subCounterMode;
+        if (oldMode !== undefined && oldMode !== newMode) {
+            changes.mode = { oldMode, newMode };
+            this.emit(STATE_EVENTS.MODE_CHANGED, { oldMode, newMode, isSession: newMode === 'session' });
+            this.emit(STATE_EVENTS.CONFIG_CHANGED, { setting: 'subCounterMode', oldValue: oldMode, newValue: newMode });
+        }
+        
+        this.emit(STATE_EVENTS.BATCH_APPLIED, { changes, source, operations: transaction.events.length });
+        
+        if (transaction.dirty) {
+            this.forcePersist();
+        }
+    }
+    
     // ═══════════════════════════════════════════════════════════════════════════
     // PERSISTANCE
     // ═══════════════════════════════════════════════════════════════════════════
     
     #schedulePersist() {
+        if (this.#transaction) {
+            this.#transaction.dirty = true;
+            return;
+        }
+        
         if (this.#persistDebounceTimer) {
             clearTimeout(this.#persistDebounceTimer);
         }
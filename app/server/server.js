@@ -74,12 +74,21 @@ console.log('   • Tokens Twitch chiffrés AES-256-GCM');
 app.use(cors({
     origin: true, // Accepte toutes les origines (nécessaire pour OBS)
     methods: ['GET', 'POST', 'OPTIONS'],
-    allowedHeaders: ['Content-Type', 'x-admin-password'],
+    allowedHeaders: ['Content-Type', 'x-admin-password', 'Idempotency-Key', 'X-Trace-Id'],
     credentials: true
 }));
 
 app.use(express.json());
 
+// Traces de bout en bout : X-Trace-Id recopié dans les broadcasts WebSocket
+const traceContext = require('./utils/trace-context');
+app.use(traceContext.middleware());
+
+// Idempotence des mutations rejouées par le journal hors-ligne du script OBS
+const { IdempotencyCache } = require('./utils/idempotency-cache');
+const idempotencyCache = new IdempotencyCache();
+app.use(idempotencyCache.middleware());
+
 // Servir les fichiers statiques
 app.use(express.static(path.join(__dirname, '..', 'web')));
 app.use('/obs', express.static(path.join(ROOT_DIR, 'obs')));
@@ -247,6 +256,34 @@ app.post('/api/sub-counter-mode', (req, res) => {
     });
 });
 
+/**
+ * GET /api/activity-profile - Profil d'activité du polling Twitch
+ */
+app.get('/api/activity-profile', (req, res) => {
+    const { profile, intervals } = pollingService.getStatus();
+    res.json({ success: true, profile, intervals });
+});
+
+/**
+ * POST /api/activity-profile - Profil envoyé par le script OBS
+ * Body: { profile: 'live' | 'idle' }
+ * Hors direct ('idle'), le polling Twitch ralentit (follows 60s, subs 5min)
+ */
+app.post('/api/activity-profile', (req, res) => {
+    const { profile } = req.body;
+
+    if (profile !== 'live' && profile !== 'idle') {
+        return res.status(400).json({
+            error: 'Profil invalide. Utilisez "live" ou "idle"'
+        });
+    }
+
+    const changed = pollingService.setProfile(profile);
+    const { intervals } = pollingService.getStatus();
+
+    res.json({ success: true, profile, changed, intervals });
+});
+
 // ─────────────────────────────────────────────────────────────────────────────
 // API Admin - Mise à jour compteurs
 // ─────────────────────────────────────────────────────────────────────────────
@@ -280,17 +317,36 @@ app.post('/api/update-subs', (req, res) => {
 app.get('/admin/sync-twitch', async (req, res) => {
     // Rate limiting
     if (!rateLimiters.sync.allow()) {
+        const resetMs = rateLimiters.sync.nextResetIn();
+        res.set('Retry-After', String(Math.ceil(resetMs / 1000)));
         return res.status(429).json({
             success: false,
             error: 'Rate limited',
             message: 'Attendez avant la prochaine synchro',
-            nextResetIn: Math.ceil(rateLimiters.sync.nextResetIn() / 1000)
+            nextResetIn: Math.ceil(resetMs / 1000),
+            nextResetInMs: resetMs
         });
     }
     
+    // Synchro automatique du script OBS : respecte le mode session
+    const scheduled = req.query.source === 'scheduler';
+    
     try {
         // Force la sync même en mode session (admin override)
-        const result = await pollingService.syncAll('admin', true);
+        const result = await pollingService.syncAll(scheduled ? 'scheduler' : 'admin', !scheduled);
+        
+        if (result.skipped) {
+            return res.json({
+                success: true,
+                skipped: true,
+                reason: result.reason,
+                twitchFollows: stateManager.getFollows(),
+                twitchSubs: stateManager.getSubs(),
+                followsDiff: 0,
+                subsDiff: 0,
+                updated: false
+            });
+        }
         
         // Si non authentifié
         if (!result.success && result.reason === 'not_authenticated') {
@@ -400,6 +456,42 @@ app.post('/admin/set-sub-goal', (req, res) => {
     res.json({ success: true, goal: goal });
 });
 
+// ─────────────────────────────────────────────────────────────────────────────
+// API Batch - Plusieurs mutations, un aller-retour
+// ─────────────────────────────────────────────────────────────────────────────
+
+const { parseBatch, applyBatch } = require('./utils/batch-operations');
+
+/**
+ * POST /api/batch - Applique un lot de mutations de façon atomique
+ * Body: { operations: [{ op: 'set-follows', count: 120 }, { op: 'sub-counter-mode', mode: 'session' }, ...] }
+ * 
+ * Tout le lot est validé avant application (400 + index de l'opération
+ * fautive, rien n'est appliqué) ; une seule écriture de l'état et un
+ * broadcast par compteur / config touché.
+ */
+app.post('/api/batch', (req, res) => {
+    const batch = parseBatch(req.body && req.body.operations);
+    if (batch.error) {
+        return res.status(400).json({ success: false, error: batch.error, index: batch.index });
+    }
+    
+    try {
+        const results = applyBatch(stateManager, batch.operations);
+        res.json({
+            success: true,
+            applied: results.length,
+            results,
+            follows: stateManager.getFollows(),
+            subs: stateManager.getSubs(),
+            mode: stateManager.getSubCounterMode()
+        });
+    } catch (error) {
+        logEvent('ERROR', '❌ Lot annulé', { error: error.message });
+        res.status(500).json({ success: false, error: error.message });
+    }
+});
+
 // Routes diagnostic
 app.get('/admin/test-twitch-api', async (req, res) => {
     try {
@@ -690,7 +782,7 @@ async function start() {
         pollingService.start();
     } else {
         logEvent('INFO', '⚙️ Configuration Twitch requise');
-        console.log('   → Ouvrez http://localhost:8082/ pour vous connecter');
+        console.log(`   → Ouvrez http://localhost:${PORT}/ pour vous connecter`);
     }
     
     // 6. Démarrer le serveur HTTP
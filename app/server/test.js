@@ -216,6 +216,60 @@ async function testValidation() {
         logTest('set-sub-goal rejette string', false, e.message);
     }
 
+    // Test validation: /api/batch atomique (une opération invalide -> rien n'est appliqué)
+    try {
+        total++;
+        const before = await httpRequest('/api/current');
+        const res = await httpRequest('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: { operations: [
+                { op: 'set-follows', count: (before.data.follows || 0) + 1000 },
+                { op: 'sub-counter-mode', mode: 'invalide' }
+            ] }
+        });
+        const after = await httpRequest('/api/current');
+        const ok = res.status === 400 && res.data.index === 1 && after.data.follows === before.data.follows;
+        if (logTest('batch rejette le lot entier si une opération est invalide (400)', ok, `status: ${res.status}`)) passed++;
+    } catch (e) {
+        logTest('batch rejette le lot entier', false, e.message);
+    }
+
+    // Test validation: profil d'activité inconnu
+    try {
+        total++;
+        const res = await httpRequest('/api/activity-profile', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: { profile: 'sleep' }
+        });
+        const ok = res.status === 400;
+        if (logTest('activity-profile rejette un profil inconnu (400)', ok, `status: ${res.status}`)) passed++;
+    } catch (e) {
+        logTest('activity-profile rejette un profil inconnu', false, e.message);
+    }
+
+    // Test: profil 'idle' puis retour à 'live' (intervalles de polling allongés puis rétablis)
+    try {
+        total++;
+        const idle = await httpRequest('/api/activity-profile', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: { profile: 'idle' }
+        });
+        const live = await httpRequest('/api/activity-profile', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: { profile: 'live' }
+        });
+        const ok = idle.status === 200 && live.status === 200
+            && idle.data.intervals.follows > live.data.intervals.follows;
+        if (logTest('activity-profile allonge le polling hors direct', ok,
+            `idle: ${idle.data.intervals && idle.data.intervals.follows}ms, live: ${live.data.intervals && live.data.intervals.follows}ms`)) passed++;
+    } catch (e) {
+        logTest('activity-profile allonge le polling hors direct', false, e.message);
+    }
+
     return { passed, total };
 }
 
@@ -0,0 +1,157 @@
+/**
+ * @file batch-operations.js
+ * @description Opérations de POST /api/batch (plusieurs mutations, un seul aller-retour)
+ * @version 3.1.2
+ * 
+ * Chaque opération reprend le corps et les règles de validation de la
+ * route du même nom (ex: { op: 'set-follows', count: 120 } comme
+ * POST /admin/set-follows). Tout le lot est validé avant d'appliquer
+ * quoi que ce soit, puis appliqué dans une transaction du StateManager :
+ * une seule écriture de l'état et un broadcast par compteur / config.
+ */
+
+const { LIMITS } = require('./constants');
+
+const SUB_COUNTER_MODES = ['realtime', 'session'];
+
+/**
+ * parseInt(value) positif ou nul (comme les routes /admin/set-*)
+ * @returns {number|null} null si invalide
+ */
+function parseCount(value) {
+    const count = parseInt(value);
+    return isNaN(count) || count < 0 ? null : count;
+}
+
+/**
+ * Opérations supportées : op -> { parse(body) -> args | { error }, apply(stateManager, args) -> résultat }
+ */
+const OPERATIONS = Object.freeze({
+    'set-follows': {
+        parse: (body) => {
+            const count = parseCount(body.count);
+            return count === null ? { error: 'Invalid count' } : { count };
+        },
+        apply: (stateManager, { count }) => {
+            stateManager.setFollows(count, 'batch');
+            return { total: count };
+        }
+    },
+    'set-subs': {
+        parse: (body) => {
+            const count = parseCount(body.count);
+            return count === null ? { error: 'Invalid count' } : { count };
+        },
+        apply: (stateManager, { count }) => {
+            stateManager.setSubs(count, 'batch');
+            return { total: count };
+        }
+    },
+    'add-follows': {
+        parse: (body) => ({ amount: parseInt(body.amount) || 1 }),
+        apply: (stateManager, { amount }) => {
+            stateManager.incrementFollows(amount, 'batch');
+            return { total: stateManager.getFollows() };
+        }
+    },
+    'remove-follows': {
+        parse: (body) => ({ amount: parseInt(body.amount) || 1 }),
+        apply: (stateManager, { amount }) => {
+            stateManager.decrementFollows(amount, 'batch');
+            return { total: stateManager.getFollows() };
+        }
+    },
+    'add-subs': {
+        parse: (body) => ({ amount: parseInt(body.amount) || 1 }),
+        apply: (stateManager, { amount }) => {
+            stateManager.incrementSubs(amount, 'batch');
+            return { total: stateManager.getSubs() };
+        }
+    },
+    'remove-subs': {
+        parse: (body) => ({ amount: parseInt(body.amount) || 1 }),
+        apply: (stateManager, { amount }) => {
+            stateManager.decrementSubs(amount, 'batch');
+            return { total: stateManager.getSubs() };
+        }
+    },
+    // Comme /admin/set-follow-goal et /admin/set-sub-goal : validés et acquittés,
+    // les objectifs restant définis par les fichiers followgoal/subgoals_config.txt
+    'set-follow-goal': {
+        parse: (body) => {
+            const goal = parseCount(body.goal);
+            return goal === null ? { error: 'Invalid goal' } : { goal };
+        },
+        apply: (stateManager, { goal }) => ({ goal })
+    },
+    'set-sub-goal': {
+        parse: (body) => {
+            const goal = parseCount(body.goal);
+            return goal === null ? { error: 'Invalid goal' } : { goal };
+        },
+        apply: (stateManager, { goal }) => ({ goal })
+    },
+    'sub-counter-mode': {
+        parse: (body) => SUB_COUNTER_MODES.includes(body.mode)
+            ? { mode: body.mode }
+            : { error: 'Mode invalide. Utilisez "realtime" ou "session"' },
+        apply: (stateManager, { mode }) => ({ mode, changed: stateManager.setSubCounterMode(mode) })
+    },
+    'overlay-config': {
+        parse: (body) => body.config && typeof body.config === 'object' && !Array.isArray(body.config)
+            ? { config: body.config }
+            : { error: 'Invalid overlay config' },
+        apply: (stateManager, { config }) => {
+            stateManager.setOverlayConfig(config);
+            return {};
+        }
+    }
+});
+
+/**
+ * Valide un lot complet sans rien appliquer
+ * @param {*} operations - Corps.operations de la requête
+ * @returns {{ operations: Array } | { error: string, index?: number }}
+ */
+function parseBatch(operations) {
+    if (!Array.isArray(operations) || operations.length === 0) {
+        return { error: 'operations doit être une liste non vide' };
+    }
+    if (operations.length > LIMITS.MAX_BATCH_OPERATIONS) {
+        return { error: `Trop d'opérations (max ${LIMITS.MAX_BATCH_OPERATIONS})` };
+    }
+    
+    const parsed = [];
+    for (let index = 0; index < operations.length; index++) {
+        const body = operations[index];
+        const operation = body && OPERATIONS[body.op];
+        if (!operation) {
+            return { error: `Opération inconnue: ${body && body.op}`, index };
+        }
+        const args = operation.parse(body);
+        if (args.error) {
+            return { error: args.error, index };
+        }
+        parsed.push({ op: body.op, args });
+    }
+    return { operations: parsed };
+}
+
+/**
+ * Applique un lot déjà validé dans une transaction
+ * @param {StateManager} stateManager
+ * @param {Array} operations - Résultat de parseBatch
+ * @returns {Array<Object>} Résultat par opération
+ */
+function applyBatch(stateManager, operations) {
+    return stateManager.transaction(
+        () => operations.map(({ op, args }) => ({ op, ...OPERATIONS[op].apply(stateManager, args) })),
+        'batch'
+    );
+}
+
+module.exports = {
+    OPERATIONS,
+    parseBatch,
+    applyBatch
+};
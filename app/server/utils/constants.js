@@ -4,6 +4,8 @@
  * @version 2.3.1
  */
 
+const path = require('path');
+
 /**
  * Types d'événements valides
  */
@@ -30,6 +32,9 @@ const LIMITS = Object.freeze({
     WEBSOCKET_BUFFER_LIMIT: 1024 * 1024, // 1MB
     POLLING_INTERVAL_FOLLOWS: 10000, // 10 secondes pour détecter les unfollows (pas d'événement EventSub)
     POLLING_INTERVAL_SUBS: 60000,    // 60 secondes pour les subs (EventSub gère les événements temps réel)
+    POLLING_IDLE_INTERVAL_FOLLOWS: 60000, // Hors direct (profil 'idle' envoyé par le script OBS)
+    POLLING_IDLE_INTERVAL_SUBS: 300000,
+    MAX_BATCH_OPERATIONS: 50,        // Opérations max par POST /api/batch
 });
 
 /**
@@ -43,15 +48,45 @@ const VALID_TIERS = Object.freeze(['1000', '2000', '3000']);
 const VALID_SOURCES = Object.freeze(['twitch', 'manual', 'api']);
 
 /**
- * Ports du serveur
+ * Lit un port depuis l'environnement (instances multiples lancées par le script OBS)
+ * @param {string} name - Variable d'environnement
+ * @param {number} fallback - Port par défaut
+ * @returns {number}
+ */
+function envPort(name, fallback) {
+    const port = parseInt(process.env[name], 10);
+    return port > 0 && port < 65536 ? port : fallback;
+}
+
+/**
+ * Ports du serveur (SUBCOUNT_HTTP_PORT, SUBCOUNT_WS_COUNTER_PORT, SUBCOUNT_WS_CONFIG_PORT)
  */
 const PORTS = Object.freeze({
-    HTTP: 8082,
-    WS_COUNTER: 8083,   // Alias: WS_DATA
-    WS_DATA: 8083,      // Legacy
-    WS_CONFIG: 8084,
+    HTTP: envPort('SUBCOUNT_HTTP_PORT', 8082),
+    WS_COUNTER: envPort('SUBCOUNT_WS_COUNTER_PORT', 8083),   // Alias: WS_DATA
+    WS_DATA: envPort('SUBCOUNT_WS_COUNTER_PORT', 8083),      // Legacy
+    WS_CONFIG: envPort('SUBCOUNT_WS_CONFIG_PORT', 8084),
 });
 
+/**
+ * Nom de l'instance (vide = instance principale)
+ * Les instances nommées utilisent leurs propres fichiers d'état et de config.
+ */
+const INSTANCE_NAME = (process.env.SUBCOUNT_INSTANCE || '').replace(/[^\w-]/g, '');
+
+/**
+ * Chemin d'un fichier propre à l'instance : app_state.json -> app_state.duo.json
+ * @param {string} filePath - Chemin de l'instance principale
+ * @returns {string}
+ */
+function instanceFile(filePath) {
+    if (!INSTANCE_NAME) {
+        return filePath;
+    }
+    const ext = path.extname(filePath);
+    return `${filePath.slice(0, filePath.length - ext.length)}.${INSTANCE_NAME}${ext}`;
+}
+
 /**
  * ID Client Twitch
  */
@@ -63,5 +98,7 @@ module.exports = {
     VALID_TIERS,
     VALID_SOURCES,
     PORTS,
+    INSTANCE_NAME,
+    instanceFile,
     TWITCH_CLIENT_ID,
 };
@@ -0,0 +1,93 @@
+/**
+ * @file idempotency-cache.js
+ * @description Cache des clés d'idempotence pour les mutations rejouées
+ * @version 3.1.2
+ */
+
+/**
+ * IdempotencyCache - Mémorise les réponses déjà envoyées par clé
+ *
+ * Le journal hors-ligne du script OBS rejoue les actions avec un header
+ * `Idempotency-Key`. Si une requête a été appliquée mais que la réponse
+ * s'est perdue, le rejeu renvoie la réponse mémorisée sans réappliquer
+ * la mutation (pas de double comptage).
+ */
+class IdempotencyCache {
+    constructor(maxEntries = 1000, ttlMs = 3600000) {
+        this.maxEntries = maxEntries;
+        this.ttlMs = ttlMs;
+        this.entries = new Map(); // Ordre d'insertion = ordre LRU
+    }
+
+    /**
+     * Retourne la réponse mémorisée pour une clé (ou null)
+     */
+    get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return null;
+
+        if (Date.now() - entry.time > this.ttlMs) {
+            this.entries.delete(key);
+            return null;
+        }
+        return entry;
+    }
+
+    /**
+     * Mémorise la réponse d'une clé
+     */
+    set(key, status, body) {
+        this.entries.delete(key);
+        this.entries.set(key, { status, body, time: Date.now() });
+
+        // Éviction des plus anciennes
+        while (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value;
+            this.entries.delete(oldest);
+        }
+    }
+
+    /**
+     * Middleware Express: court-circuite les requêtes déjà traitées
+     */
+    middleware() {
+        return (req, res, next) => {
+            const key = req.get('Idempotency-Key');
+            if (!key || req.method !== 'POST') return next();
+
+            const cached = this.get(key);
+            if (cached) {
+                res.set('Idempotent-Replayed', 'true');
+                return res.status(cached.status).json(cached.body);
+            }
+
+            // Intercepter la réponse pour la mémoriser
+            const originalJson = res.json.bind(res);
+            res.json = (body) => {
+                if (res.statusCode < 500) {
+                    this.set(key, res.statusCode, body);
+                }
+                return originalJson(body);
+            };
+            next();
+        };
+    }
+
+    /**
+     * Nombre de clés mémorisées
+     */
+    size() {
+        return this.entries.size;
+    }
+
+    /**
+     * Vide le cache
+     */
+    clear() {
+        this.entries.clear();
+    }
+}
+
+module.exports = {
+    IdempotencyCache,
+};
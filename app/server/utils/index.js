@@ -30,6 +30,9 @@ const {
 const { EventQueue } = require('./event-queue');
 const { TimerRegistry } = require('./timer-registry');
 const { SimpleRateLimiter, TokenBucketLimiter } = require('./rate-limiter');
+const { IdempotencyCache } = require('./idempotency-cache');
+const { TraceContext, TRACE_HEADER } = require('./trace-context');
+const { parseBatch, applyBatch } = require('./batch-operations');
 
 module.exports = {
     // Logger
@@ -58,4 +61,11 @@ module.exports = {
     TimerRegistry,
     SimpleRateLimiter,
     TokenBucketLimiter,
+    IdempotencyCache,
+    TraceContext,
+    TRACE_HEADER,
+    
+    // Lots de mutations (POST /api/batch)
+    parseBatch,
+    applyBatch,
 };
@@ -6,6 +6,7 @@
 
 const fs = require('fs');
 const path = require('path');
+const { instanceFile } = require('./constants');
 
 // Dossier racine du projet
 const ROOT_DIR = path.join(__dirname, '..', '..', '..');
@@ -50,7 +51,7 @@ const ALLOWED_DATA_FIELDS = new Set([
 class Logger {
     constructor(options = {}) {
         this.minLevel = options.minLevel || 'DEBUG';
-        this.logPath = options.logPath || path.join(ROOT_DIR, 'app', 'logs', 'subcount_logs.txt');
+        this.logPath = options.logPath || instanceFile(path.join(ROOT_DIR, 'app', 'logs', 'subcount_logs.txt'));
         this.maxFileSizeMB = options.maxFileSizeMB || 2;
         this.keepLines = options.keepLines || 500;
         this.writeCounter = 0;
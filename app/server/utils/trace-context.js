@@ -0,0 +1,112 @@
+/**
+ * @file trace-context.js
+ * @description Propagation des identifiants de trace (header X-Trace-Id → broadcasts)
+ * @version 3.1.2
+ */
+
+const { AsyncLocalStorage } = require('async_hooks');
+const { performance } = require('perf_hooks');
+
+const TRACE_HEADER = 'X-Trace-Id';
+const TRACE_ID_PATTERN = /^[A-Za-z0-9_-]{1,64}$/;
+
+// Traces actives du traitement en cours (tableau de TraceContext)
+const storage = new AsyncLocalStorage();
+const NO_TRACES = Object.freeze([]);
+
+/**
+ * Horodatage epoch en millisecondes (fractionnaire, haute résolution)
+ */
+function now() {
+    return performance.timeOrigin + performance.now();
+}
+
+/**
+ * TraceContext - Étapes serveur d'une action tracée
+ *
+ * receivedAt  : requête reçue (après lecture du corps JSON)
+ * appliedAt   : état modifié (après le batching pour les add/remove)
+ * broadcastAt : premier broadcast WebSocket qui la porte
+ */
+class TraceContext {
+    constructor(id) {
+        this.id = id;
+        this.receivedAt = now();
+        this.appliedAt = null;
+        this.broadcastAt = null;
+    }
+
+    toJSON() {
+        return {
+            id: this.id,
+            receivedAt: this.receivedAt,
+            appliedAt: this.appliedAt,
+            broadcastAt: this.broadcastAt,
+        };
+    }
+}
+
+/**
+ * Middleware Express: exécute la requête dans le contexte de sa trace
+ * (à placer après express.json, qui perd le contexte asynchrone)
+ */
+function middleware() {
+    return (req, res, next) => {
+        const id = req.get(TRACE_HEADER);
+        if (!id || !TRACE_ID_PATTERN.test(id)) return next();
+
+        const trace = new TraceContext(id);
+        req.trace = trace;
+        res.set(TRACE_HEADER, id);
+        storage.run([trace], next);
+    };
+}
+
+/**
+ * Traces du traitement en cours (tableau vide hors requête tracée)
+ */
+function activeTraces() {
+    return storage.getStore() || NO_TRACES;
+}
+
+/**
+ * Exécute fn avec les traces données (ex. flush d'un batch différé)
+ */
+function runWithTraces(traces, fn) {
+    return storage.run(traces && traces.length ? traces : NO_TRACES, fn);
+}
+
+/**
+ * Marque l'état comme modifié pour les traces actives
+ */
+function markApplied(traces = activeTraces()) {
+    const time = now();
+    for (const trace of traces) {
+        if (trace.appliedAt === null) trace.appliedAt = time;
+    }
+}
+
+/**
+ * Champs à ajouter à un message broadcast ({} hors trace)
+ */
+function broadcastFields(traces = activeTraces()) {
+    if (traces.length === 0) return {};
+
+    const time = now();
+    for (const trace of traces) {
+        if (trace.appliedAt === null) trace.appliedAt = time;
+        if (trace.broadcastAt === null) trace.broadcastAt = time;
+    }
+    return { traces: traces.map((trace) => trace.toJSON()) };
+}
+
+module.exports = {
+    TRACE_HEADER,
+    TraceContext,
+    middleware,
+    activeTraces,
+    runWithTraces,
+    markApplied,
+    broadcastFields,
+    now,
+};
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Outils de benchmark de SubCount Auto
+
+Modules exécutables depuis le dossier obs/ (python -m bench.<module>) :
+- load_test   : charge HTTP sur les endpoints compteurs + vérification de cohérence
+- ws_fanout   : latence et pertes de diffusion WebSocket (1 à 1000 overlays)
+- overlay_storm : rafales de mises à jour de config overlay (AsyncOverlayConfigManager)
+- multi_instance : démarrage parallèle et diffusion d'actions sur plusieurs serveurs stub
+- stub_server : serveur en mémoire imitant server.js (HTTP + WebSockets, sans Node.js)
+- traffic     : enregistrement et rejeu (1×, N×, max) du trafic WebSocket + mutations HTTP
+- trace_report : traces de bout en bout (X-Trace-Id) et répartition du budget de latence
+- leak_check  : équilibre des références OBS (stub obspython) et croissance mémoire du script
+- batch_setup : préparation de stream, appels séparés vs un seul POST /api/batch
+- hotkey_storm : rafales de raccourcis clavier (coût des callbacks, regroupement des requêtes)
+- obs_stub    : module obspython simulé qui compte les acquisitions/libérations
+- launch_ready : délai de démarrage perçu (lignes d'écoute vs sondes HTTP) et plantage au lancement
+- fake_node   : faux `node server.js` (bannière d'écoute, plantage simulé) pour tester le lancement
+- idle_wakeups : réveils par minute des tâches de fond en direct et au repos (profil d'activité)
+
+Les sous-modules ne sont pas importés ici pour que `python -m` les
+exécute sans double import.
+"""
+
+import os
+import sys
+
+# Modules Python partagés (async_http, overlay_config_manager...)
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "app", "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
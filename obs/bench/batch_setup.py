@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Préparation d'un stream : appels séparés contre un seul POST /api/batch
+Compatible Python 3.6+
+
+Rejoue la même séquence de préparation (compteurs, objectifs, mode de
+comptage, police et couleurs des overlays) de deux façons :
+- une requête par route, comme aujourd'hui
+- un lot construit par BatchTransaction (batch_client), en une requête
+et compare allers-retours, durée, écritures de l'état et broadcasts
+reçus par un overlay compteur et un overlay config.
+
+Avec --stub, le serveur stub ajoute `--latency` secondes à chaque
+réponse (aller-retour simulé) et compte les écritures de l'état.
+
+Usage (depuis obs/):
+    python -m bench.batch_setup --stub
+    python -m bench.batch_setup --stub --latency 0.05 --rounds 20
+    python -m bench.batch_setup --url http://localhost:8082   # serveur réel (modifie l'état !)
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from async_http import HttpConnection
+from batch_client import BatchTransaction
+from overlay_config_manager import build_color_updates, build_font_updates
+
+from . import ws_protocol
+from .load_test import latency_summary
+from .stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+
+def setup_steps(round_index):
+    """Séquence de préparation : (route, corps) dans l'ordre, valeurs variant par tour"""
+    size = f"{48 + round_index % 32}px"
+    return [
+        ('/admin/set-follows', {'count': 1200 + round_index}),
+        ('/admin/set-subs', {'count': 80 + round_index}),
+        ('/admin/set-follow-goal', {'goal': 1500}),
+        ('/admin/set-sub-goal', {'goal': 100}),
+        ('/api/sub-counter-mode', {'mode': 'session' if round_index % 2 else 'realtime'}),
+        ('/api/overlay-config', {'font': build_font_updates(family='Arial', size=size)}),
+        ('/api/overlay-config', {'colors': build_color_updates(text='white', stroke='black')}),
+    ]
+
+
+def build_batch(round_index):
+    """Même séquence, collectée dans une BatchTransaction"""
+    steps = dict(enumerate(setup_steps(round_index)))
+    tx = BatchTransaction(send=None)
+    tx.set_follows(steps[0][1]['count'])
+    tx.set_subs(steps[1][1]['count'])
+    tx.set_follow_goal(steps[2][1]['goal'])
+    tx.set_sub_goal(steps[3][1]['goal'])
+    tx.set_sub_counter_mode(steps[4][1]['mode'])
+    tx.update_overlay(steps[5][1])
+    tx.update_overlay(steps[6][1])
+    return tx
+
+
+class BroadcastCounter:
+    """Compte les broadcasts reçus sur les WebSockets compteurs et config"""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.received = 0
+        self._connections = []
+        self._readers = []
+
+    async def _read(self, connection):
+        try:
+            while True:
+                data = json.loads(await connection.recv())
+                if not data.get('isInitial') and data.get('type') != 'config':
+                    self.received += 1
+        except ws_protocol.WebSocketClosed:
+            pass
+
+    async def connect(self):
+        loop = asyncio.get_event_loop()
+        for url in self.urls:
+            connection = await ws_protocol.connect(url)
+            self._connections.append(connection)
+            self._readers.append(loop.create_task(self._read(connection)))
+        await asyncio.sleep(0.1)  # Messages initiaux
+
+    async def take(self, settle=0.2):
+        """Broadcasts reçus depuis le dernier appel"""
+        await asyncio.sleep(settle)
+        received, self.received = self.received, 0
+        return received
+
+    async def close(self):
+        for connection in self._connections:
+            connection.close()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+
+
+async def _measure(connection, rounds, run_round, broadcasts, stub):
+    durations = []
+    requests = 0
+    received = 0
+    writes_before = stub.state_writes if stub else None
+    for index in range(rounds):
+        started = time.perf_counter()
+        requests += await run_round(connection, index)
+        durations.append(time.perf_counter() - started)
+        received += await broadcasts.take()
+    result = {
+        'requests': requests,
+        'requests_per_setup': requests / rounds,
+        'setup_ms': latency_summary(durations),
+        'broadcasts_per_setup': received / rounds,
+    }
+    if stub is not None:
+        result['state_writes_per_setup'] = (stub.state_writes - writes_before) / rounds
+    return result
+
+
+async def _sequential_round(connection, index):
+    steps = setup_steps(index)
+    for path, body in steps:
+        status, payload = await connection.request('POST', path, body)
+        if status != 200:
+            raise RuntimeError(f"{path} a répondu {status}: {payload}")
+    return len(steps)
+
+
+async def _batch_round(connection, index):
+    tx = build_batch(index)
+    status, payload = await connection.request('POST', '/api/batch', tx.payload(), {'Idempotency-Key': tx.key})
+    if status != 200 or not payload.get('success'):
+        raise RuntimeError(f"/api/batch a répondu {status}: {payload}")
+    return 1
+
+
+async def _run(args):
+    stub = None
+    url, counter_ws, config_ws = args.url, args.counter_ws, args.config_ws
+    if args.stub:
+        stub = StubServer(ws_counter_port=0, ws_config_port=0, latency=args.latency)
+        await stub.start()
+        url, counter_ws, config_ws = stub.url, stub.ws_counter_url, stub.ws_config_url
+
+    connection = HttpConnection(url)
+    broadcasts = BroadcastCounter([counter_ws, config_ws])
+    try:
+        await broadcasts.connect()
+        sequential = await _measure(connection, args.rounds, _sequential_round, broadcasts, stub)
+        batch = await _measure(connection, args.rounds, _batch_round, broadcasts, stub)
+
+        # Atomicité : une opération invalide en fin de lot -> rien d'appliqué
+        status, before = await connection.request('GET', '/api/current')
+        tx = build_batch(args.rounds)
+        tx.operations.append({'op': 'sub-counter-mode', 'mode': 'invalide'})
+        rejected, error = await connection.request('POST', '/api/batch', tx.payload())
+        status, after = await connection.request('GET', '/api/current')
+        atomic = rejected == 400 and error.get('index') == len(tx.operations) - 1 and before == after
+    finally:
+        connection.close()
+        await broadcasts.close()
+        if stub is not None:
+            await stub.stop()
+
+    return {
+        'target': url,
+        'stub': bool(stub),
+        'simulated_latency_ms': args.latency * 1000 if stub else None,
+        'rounds': args.rounds,
+        'steps_per_setup': len(setup_steps(0)),
+        'sequential': sequential,
+        'batch': batch,
+        'round_trips_saved_per_setup': sequential['requests_per_setup'] - batch['requests_per_setup'],
+        'speedup_p50': round(sequential['setup_ms']['p50'] / batch['setup_ms']['p50'], 1),
+        'invalid_batch_rejected_atomically': atomic,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Préparation de stream : appels séparés vs /api/batch")
+    parser.add_argument('--url', default="http://localhost:8082")
+    parser.add_argument('--counter-ws', default="ws://localhost:8083")
+    parser.add_argument('--config-ws', default="ws://localhost:8084")
+    parser.add_argument('--stub', action='store_true', help="Lancer un serveur stub en mémoire")
+    parser.add_argument('--latency', type=float, default=0.02, help="Aller-retour simulé par le stub (s)")
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(_run(args))
+    print(json.dumps(report, indent=2))
+    return 0 if report['invalid_batch_rejected_atomically'] else 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
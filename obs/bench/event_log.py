@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal binaire du trafic serveur (WebSockets 8083/8084 + mutations HTTP)
+Compatible Python 3.6+
+
+Format (little-endian), lisible en flux et pendant l'écriture :
+    en-tête   "SCEV" | version (B) | flags (B) | réservé (H) | début (d, time.time())
+    record    taille (I) | décalage (d, secondes monotones depuis le début)
+              | canal (B) | données (taille octets)
+    flags & 1 : tout ce qui suit l'en-tête est un flux zlib, vidé
+                (Z_SYNC_FLUSH) tous les `flush_every` records : un
+                lecteur peut suivre le fichier pendant l'enregistrement
+
+Les décalages viennent d'une horloge monotone et ne décroissent jamais.
+Un journal interrompu (crash, kill) se relit jusqu'au dernier record
+complet ; `EventLogReader.truncated` le signale.
+
+Données par canal :
+    CHANNEL_COUNTER / CHANNEL_CONFIG : message WebSocket tel que reçu (utf-8)
+    CHANNEL_HTTP : "MÉTHODE /chemin\\n" suivi du corps de la requête
+"""
+
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+LOG_MAGIC = b'SCEV'
+LOG_VERSION = 1
+FLAG_COMPRESSED = 1
+_HEADER = struct.Struct('<4sBBHd')
+_RECORD = struct.Struct('<IdB')
+
+CHANNEL_COUNTER = 1  # WebSocket compteurs (8083)
+CHANNEL_CONFIG = 2   # WebSocket config overlay (8084)
+CHANNEL_HTTP = 3     # Mutation HTTP (POST vers 8082)
+CHANNEL_NAMES = {CHANNEL_COUNTER: 'counter', CHANNEL_CONFIG: 'config', CHANNEL_HTTP: 'http'}
+
+# Taille maximale d'un record (protection contre un fichier corrompu)
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+Event = namedtuple('Event', ['offset', 'channel', 'data'])
+
+
+class EventLogError(ValueError):
+    """Fichier qui n'est pas un journal de trafic valide"""
+
+
+def encode_http(method, path, body=b''):
+    """Données d'un record CHANNEL_HTTP"""
+    return f"{method} {path}\n".encode('utf-8') + (body or b'')
+
+
+def decode_http(data):
+    """Returns: tuple: (méthode, chemin, corps en bytes)"""
+    line, _, body = data.partition(b'\n')
+    method, _, path = line.decode('utf-8').partition(' ')
+    return method, path, body
+
+
+class EventLogWriter:
+    """Écriture en flux d'un journal de trafic
+
+    Args:
+        fileobj: Fichier binaire ouvert en écriture
+        compress (bool): Compression zlib du flux de records
+        flush_every (int): Records entre deux vidages (lecture pendant l'écriture)
+        clock (callable): Horloge monotone (secondes)
+    """
+
+    def __init__(self, fileobj, compress=True, flush_every=64, clock=time.monotonic):
+        self._file = fileobj
+        self._clock = clock
+        self._compressor = zlib.compressobj(6) if compress else None
+        self.flush_every = max(1, flush_every)
+        self.started = clock()
+        self.last_offset = 0.0
+        self.records = 0
+        self.raw_bytes = _HEADER.size
+        self._pending = 0
+        self._file.write(_HEADER.pack(LOG_MAGIC, LOG_VERSION, FLAG_COMPRESSED if compress else 0, 0, time.time()))
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        return cls(open(path, 'wb'), **kwargs)
+
+    def write(self, channel, data, at=None):
+        """Ajoute un record horodaté maintenant (ou à `at`, même horloge)
+
+        Returns:
+            float: Décalage enregistré
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        at = self._clock() if at is None else at
+        offset = max(self.last_offset, at - self.started)
+        self.last_offset = offset
+
+        record = _RECORD.pack(len(data), offset, channel) + data
+        self.raw_bytes += len(record)
+        if self._compressor is not None:
+            record = self._compressor.compress(record)
+        self._file.write(record)
+
+        self.records += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return offset
+
+    def flush(self):
+        """Rend les records écrits lisibles par un autre lecteur"""
+        if self._compressor is not None:
+            self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._compressor is not None:
+            self._file.write(self._compressor.flush(zlib.Z_FINISH))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventLogReader:
+    """Lecture en flux d'un journal de trafic (itère sur des Event)
+
+    Args:
+        fileobj: Fichier binaire ouvert en lecture
+
+    Raises:
+        EventLogError: Magic ou version inconnus
+    """
+
+    def __init__(self, fileobj):
+        self._file = fileobj
+        header = fileobj.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise EventLogError("En-tête de journal incomplet")
+        magic, version, flags, _, started_at = _HEADER.unpack(header)
+        if magic != LOG_MAGIC:
+            raise EventLogError("Ce fichier n'est pas un journal de trafic")
+        if version > LOG_VERSION:
+            raise EventLogError(f"Version de journal non supportée: {version}")
+        self.version = version
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.started_at = started_at
+        self.truncated = False
+
+    @classmethod
+    def open(cls, path):
+        return cls(open(path, 'rb'))
+
+    def _chunks(self):
+        decompressor = zlib.decompressobj() if self.compressed else None
+        while True:
+            chunk = self._file.read(READ_CHUNK)
+            if not chunk:
+                break
+            if decompressor is not None:
+                try:
+                    chunk = decompressor.decompress(chunk)
+                except zlib.error:
+                    # Fin de flux corrompue : garder ce qui a été lu
+                    self.truncated = True
+                    return
+            if chunk:
+                yield chunk
+
+    def __iter__(self):
+        buffer = bytearray()
+        position = 0
+        for chunk in self._chunks():
+            if position:
+                del buffer[:position]
+                position = 0
+            buffer += chunk
+            while len(buffer) - position >= _RECORD.size:
+                size, offset, channel = _RECORD.unpack_from(buffer, position)
+                if size > MAX_RECORD_SIZE:
+                    raise EventLogError(f"Record invalide ({size} octets)")
+                end = position + _RECORD.size + size
+                if end > len(buffer):
+                    break
+                yield Event(offset, channel, bytes(buffer[position + _RECORD.size:end]))
+                position = end
+        if len(buffer) > position:
+            self.truncated = True
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_events(path):
+    """Tous les événements d'un journal (liste)"""
+    with EventLogReader.open(path) as reader:
+        return list(reader)
+
+
+def summarize(path):
+    """Résumé d'un journal : durée, records par canal, tailles"""
+    import os
+
+    counts = {name: 0 for name in CHANNEL_NAMES.values()}
+    raw_bytes = _HEADER.size
+    duration = 0.0
+    with EventLogReader.open(path) as reader:
+        for event in reader:
+            name = CHANNEL_NAMES.get(event.channel, str(event.channel))
+            counts[name] = counts.get(name, 0) + 1
+            raw_bytes += _RECORD.size + len(event.data)
+            duration = event.offset
+        info = {
+            'started_at': reader.started_at,
+            'compressed': reader.compressed,
+            'truncated': reader.truncated,
+        }
+    info.update({
+        'duration_s': round(duration, 3),
+        'records': sum(counts.values()),
+        'channels': counts,
+        'raw_bytes': raw_bytes,
+        'file_bytes': os.path.getsize(path),
+    })
+    return info
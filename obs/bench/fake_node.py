@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Faux `node server.js` pour tester le lancement sans Node.js
+Compatible Python 3.6+
+
+Lancé comme `python fake_node.py server.js` (voir node_launcher) :
+- attend FAKE_NODE_STARTUP secondes (démarrage simulé)
+- écoute en HTTP sur SUBCOUNT_HTTP_PORT (GET / -> 200)
+- affiche la bannière d'écoute de server.js puis sert jusqu'à l'arrêt
+Avec FAKE_NODE_CRASH=1, affiche quelques lignes puis une pile
+d'erreur Node sur stderr et s'arrête (code 1) sans écouter.
+
+Autonome : aucun import du projet.
+"""
+
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"status":"ok","fake":true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _print(line, stream=None):
+    stream = stream or sys.stdout
+    stream.buffer.write((line + "\n").encode('utf-8'))
+    stream.flush()
+
+
+def main():
+    port = int(os.environ.get('SUBCOUNT_HTTP_PORT', '8082'))
+    startup = float(os.environ.get('FAKE_NODE_STARTUP', '0.5'))
+
+    _print("┌─────────────────────────────────────────────────────────────────┐")
+    _print("│     🚀 SubCount Auto v3.1.2 - Architecture Modulaire          │")
+    _print("└─────────────────────────────────────────────────────────────────┘")
+    time.sleep(startup)
+
+    if os.environ.get('FAKE_NODE_CRASH') == '1':
+        _print("✅ Container initialisé avec tous les services")
+        _print(f"Error: listen EADDRINUSE: address already in use :::{port}", sys.stderr)
+        _print("    at Server.setupListenHandle [as _listen2] (node:net:1817:16)", sys.stderr)
+        _print("    at listenInCluster (node:net:1865:12)", sys.stderr)
+        return 1
+
+    server = HTTPServer(('127.0.0.1', port), _Handler)
+    _print("═══════════════════════════════════════════════════════════════════")
+    _print(f"   ✅ Serveur HTTP: http://localhost:{port}")
+    _print(f"   ✅ WebSocket Compteurs: ws://localhost:{port + 1}")
+    _print(f"   ✅ WebSocket Config: ws://localhost:{port + 2}")
+    _print("═══════════════════════════════════════════════════════════════════")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rafales de raccourcis clavier (raid) : coût côté OBS et requêtes envoyées
+Compatible Python 3.6+
+
+Enregistre les raccourcis SubCount sur le module obspython simulé
+(obs_stub), puis simule :
+- un raid : appuis répétés sur +1 follow, quelques +1 sub et -1 follow
+- une touche +1 follow maintenue (un seul +1 : pas de répétition)
+- des demandes de synchro et de preset en double
+avec un envoi qui prend `latency` secondes (requête HTTP simulée).
+
+Mesure la durée des callbacks (ce que subit le thread OBS), le nombre
+de requêtes réellement envoyées, et vérifie que les totaux appliqués
+sont exacts. Vérifie aussi la persistance des touches (script_save puis
+rechargement) et l'équilibre des obs_data_array.
+
+Usage (depuis obs/):
+    python -m bench.hotkey_storm
+    python -m bench.hotkey_storm --presses 300 --rate 40 --latency 0.12
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+from hotkeys import ActionSender, HotkeyBindings
+
+from .load_test import latency_summary
+from .obs_stub import ObsStub
+
+
+class SlowServer:
+    """Destination simulée : chaque envoi prend `latency` secondes"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.totals = Counter()
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, action, amount):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests[action] += 1
+            self.totals[action] += 1 if amount is None else amount
+
+
+def _press(stub, name, durations, hold=0.0):
+    started = time.perf_counter()
+    stub.press(name, True)
+    durations.append(time.perf_counter() - started)
+    if hold:
+        time.sleep(hold)
+    started = time.perf_counter()
+    stub.press(name, False)
+    durations.append(time.perf_counter() - started)
+
+
+def run(presses=200, rate=30.0, latency=0.08, hold=2.0):
+    stub = ObsStub().install()
+    server = SlowServer(latency)
+    sender = ActionSender(server.send)
+    bindings = HotkeyBindings(stub, sender)
+    settings = stub.obs_data_create()
+    bindings.register(settings)
+    sender.start()
+
+    # Raid : +1 follow à `rate` appuis/s, +1 sub tous les 7, -1 follow tous les 11
+    expected = Counter()
+    durations = []
+    started = time.perf_counter()
+    for index in range(presses):
+        if index % 11 == 10:
+            name, counter, amount = "subcount_follow_remove", "follows", -1
+        elif index % 7 == 6:
+            name, counter, amount = "subcount_sub_add", "subs", 1
+        else:
+            name, counter, amount = "subcount_follow_add", "follows", 1
+        _press(stub, name, durations)
+        expected[counter] += amount
+        time.sleep(max(0.0, started + (index + 1) / rate - time.perf_counter()))
+    raid_seconds = time.perf_counter() - started
+
+    # Synchro et preset demandés en boucle
+    for _ in range(20):
+        _press(stub, "subcount_sync", durations)
+        _press(stub, "subcount_apply_preset", durations)
+
+    _wait_idle(sender)
+    raid_requests = dict(server.requests)
+    raid_totals = dict(server.totals)
+
+    # Touche maintenue
+    server.totals.clear()
+    server.requests.clear()
+    _press(stub, "subcount_follow_add", durations, hold=hold)
+    _wait_idle(sender)
+    hold_result = {
+        'held_s': hold,
+        'applied': server.totals['follows'],
+        'expected': 1,
+        'requests': server.requests['follows'],
+    }
+    sender.stop()
+
+    # Persistance des touches : save puis rechargement par un nouvel enregistrement
+    stub.bind_key("subcount_follow_add", {'key': 'OBS_KEY_NUMPLUS'})
+    stub.bind_key("subcount_sub_add", {'key': 'OBS_KEY_NUMASTERISK', 'shift': True})
+    bindings.save(settings)
+    bindings.unregister()
+    reloaded = HotkeyBindings(stub, ActionSender(server.send))
+    reloaded.register(settings)
+    keys = {hotkey[0]: hotkey[3] for hotkey in stub.hotkeys.values() if hotkey[3]}
+    reloaded.unregister()
+    stub.obs_data_release(settings)
+
+    callbacks = latency_summary(durations)
+    return {
+        'raid': {
+            'presses': presses,
+            'seconds': round(raid_seconds, 2),
+            'requests': raid_requests,
+            'requests_without_coalescing': presses + 40,
+            'applied': raid_totals,
+            'expected': dict(expected, sync=1, preset=1),
+            'exact': all(raid_totals.get(counter) == total for counter, total in expected.items()),
+        },
+        'hold': hold_result,
+        'callback_us': {key: round(value * 1000, 1) for key, value in callbacks.items()},
+        'blocking_without_sender_s': round((presses + 40) * latency, 2),
+        'sender': dict(sender.stats, max_wait=round(sender.stats['max_wait'], 3)),
+        'persisted_keys': keys,
+        'unreleased_refs': sum(stub.outstanding().values()),
+    }
+
+
+def _wait_idle(sender, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not sender.idle() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rafales de raccourcis clavier (stub obspython)")
+    parser.add_argument('--presses', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=30.0, help="Appuis par seconde pendant le raid")
+    parser.add_argument('--latency', type=float, default=0.08, help="Durée simulée d'une requête (s)")
+    parser.add_argument('--hold', type=float, default=2.0, help="Durée de la touche maintenue (s)")
+    args = parser.parse_args(argv)
+
+    report = run(args.presses, args.rate, args.latency, args.hold)
+    print(json.dumps(report, indent=2))
+    exact = report['raid']['exact'] and report['hold']['applied'] == report['hold']['expected']
+    return 0 if exact and not report['unreleased_refs'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Réveils des tâches de fond en direct et au repos (profil d'activité)
+Compatible Python 3.6+
+
+Reconstitue les tâches périodiques du script avec leurs intervalles
+réels (constantes du script) et le profil d'activité :
+- superviseur : health check GET / sur un serveur stub
+- synchro Twitch automatique (TwitchSyncScheduler, réponse simulée avec
+  une différence : pas de recul adaptatif, intervalle de base mesuré)
+- timers OBS du rendu texte natif et du résumé des métriques (ProfiledTimer
+  sur le module obspython simulé, boucle des timers dans le thread principal)
+puis compte, pour chaque profil, les réveils par minute de chaque tâche
+et les changements de contexte volontaires du processus (Linux,
+/proc/self/task/*/status : un thread qui s'endort puis se réveille en
+coûte au moins un). Vérifie aussi que le profil est transmis au
+serveur (POST /api/activity-profile).
+
+Le temps est accéléré (--speedup) : intervalles divisés, résultats
+ramenés à la minute réelle.
+
+Usage (depuis obs/):
+    python -m bench.idle_wakeups
+    python -m bench.idle_wakeups --minutes 60 --speedup 240
+"""
+
+import glob
+import json
+import logging
+import sys
+import time
+from collections import Counter
+
+from activity_profile import IDLE, LIVE, PAUSED, ActivityProfile, ProfiledTimer
+from background_loop import get_background_loop
+from server_instances import SUPERVISE_IDLE_INTERVAL, SUPERVISE_INTERVAL, InstancePorts, ServerInstance
+from sync_scheduler import TwitchSyncScheduler
+
+from .leak_check import build_stub, load_script
+from .stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+
+def context_switches():
+    """Changements de contexte volontaires de tous les threads du processus (None hors Linux)"""
+    paths = glob.glob('/proc/self/task/*/status')
+    if not paths:
+        return None
+    total = 0
+    for path in paths:
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith('voluntary_ctxt_switches:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass  # Thread terminé entre-temps
+    return total
+
+
+def run(minutes=30.0, speedup=120.0):
+    stub = build_stub()
+    script = load_script()
+    logging.getLogger().setLevel(logging.ERROR)
+
+    activity = ActivityProfile(LIVE)
+    wakeups = Counter()
+    window = minutes * 60.0 / speedup
+
+    def native_overlay_tick():
+        wakeups['native_render'] += 1
+
+    def log_metrics_summary():
+        wakeups['metrics_summary'] += 1
+
+    def health_check(instance):
+        wakeups['health_check'] += 1
+        instance.check_health()
+
+    async def fetch():
+        wakeups['twitch_sync'] += 1
+        return 200, {'success': True, 'followsDiff': 1, 'subsDiff': 0}
+
+    server = StubServer()
+    loop = get_background_loop()
+    loop.submit(server.start()).result(5)
+
+    instance = ServerInstance("bench", InstancePorts(server.port), host="127.0.0.1")
+    instance.running = True
+    scheduler = TwitchSyncScheduler(server_url=instance.url, fetch=fetch)
+    sync_interval = script.AUTO_SYNC_DEFAULT_INTERVAL / speedup
+    sync_max = script.AUTO_SYNC_MAX_INTERVAL / speedup
+    timers = [
+        ProfiledTimer(stub, native_overlay_tick, activity, script.NATIVE_RENDER_INTERVAL_MS / speedup,
+                      script.NATIVE_RENDER_IDLE_INTERVAL_MS / speedup),
+        ProfiledTimer(stub, log_metrics_summary, activity, script.METRICS_SUMMARY_INTERVAL_MS / speedup, PAUSED),
+    ]
+
+    def configure_scheduler():
+        scheduler.reconfigure(base_interval=activity.interval(sync_interval),
+                              max_interval=activity.interval(sync_max))
+
+    # Même réaction que apply_activity_profile() dans le script
+    def on_profile(profile):
+        instance.wake_supervisor()
+        configure_scheduler()
+        instance.set_activity_profile(profile)
+
+    activity.on_change(on_profile)
+    instance.supervise(
+        health_check=health_check,
+        interval=lambda: activity.interval(SUPERVISE_INTERVAL / speedup, SUPERVISE_IDLE_INTERVAL / speedup)
+    )
+    configure_scheduler()
+    scheduler.start().result(5)
+    for timer in timers:
+        timer.start()
+
+    report = {'simulated_minutes': minutes, 'speedup': speedup, 'profiles': {}}
+    try:
+        for profile in (LIVE, IDLE):
+            activity.set(profile, "benchmark")
+            time.sleep(min(0.2, window / 10))  # Bascule (réveils immédiats) hors mesure
+            wakeups.clear()
+            switches = context_switches()
+            stub.run_timers(window)
+            switches = None if switches is None else context_switches() - switches
+
+            per_minute = {name: round(count / minutes, 2) for name, count in sorted(wakeups.items())}
+            report['profiles'][profile] = {
+                'wakeups_per_minute': per_minute,
+                'total_wakeups_per_minute': round(sum(wakeups.values()) / minutes, 2),
+                'context_switches_per_minute': None if switches is None else round(switches / minutes, 1),
+                'server_profile': server.activity_profile,
+            }
+    finally:
+        for timer in timers:
+            timer.stop()
+        scheduler.stop()
+        instance.stop()
+        loop.submit(server.stop()).result(5)
+
+    live, idle = report['profiles'][LIVE], report['profiles'][IDLE]
+    report['wakeup_reduction'] = round(live['total_wakeups_per_minute'] / max(idle['total_wakeups_per_minute'], 0.01), 1)
+    if live['context_switches_per_minute'] and idle['context_switches_per_minute']:
+        report['context_switch_reduction'] = round(
+            live['context_switches_per_minute'] / idle['context_switches_per_minute'], 1
+        )
+    report['server_told'] = live['server_profile'] == LIVE and idle['server_profile'] == IDLE
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Réveils des tâches de fond en direct et au repos")
+    parser.add_argument('--minutes', type=float, default=30.0, help="Minutes simulées par profil")
+    parser.add_argument('--speedup', type=float, default=120.0, help="Accélération du temps")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = run(args.minutes, args.speedup)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    idle = report['profiles'][IDLE]['total_wakeups_per_minute']
+    live = report['profiles'][LIVE]['total_wakeups_per_minute']
+    return 0 if report['server_told'] and idle < live else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Démarrage du serveur : lignes d'écoute contre sondes HTTP et attente fixe
+Compatible Python 3.6+
+
+Lance un faux `node server.js` (bench/fake_node.py : démarrage simulé
+puis bannière d'écoute, comme server.js) et mesure le délai entre le
+lancement et le moment où le script considère le serveur prêt :
+- direct  : node_launcher (sortie lue, prêt dès les lignes d'écoute + une sonde)
+- polling : processus sans sortie capturée, sondes HTTP toutes les 0,25 s
+- legacy  : START_SERVER.bat + sleep(3) (attente fixe, pour mémoire)
+Vérifie aussi qu'un serveur qui plante au démarrage est détecté et que
+la fin de sa sortie (pile d'erreur) est conservée.
+
+Usage (depuis obs/):
+    python -m bench.launch_ready
+    python -m bench.launch_ready --launches 10 --startup 0.8
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from node_launcher import launch_node_server
+from server_instances import InstancePorts, ServerInstance
+
+from .load_test import latency_summary
+
+FAKE_NODE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_node.py")
+LEGACY_WAIT = 3.0  # sleep(3) de l'ancien start_server()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _instance(startup, crash=False):
+    instance = ServerInstance("bench", InstancePorts(_free_port()), host="127.0.0.1")
+    env = instance.environment()
+    env['FAKE_NODE_STARTUP'] = str(startup)
+    if crash:
+        env['FAKE_NODE_CRASH'] = '1'
+    return instance, env
+
+
+def _time_ready(instance, launch, timeout):
+    """Délai lancement -> prêt (None si jamais prêt)"""
+    loop = asyncio.get_event_loop()
+    started = time.perf_counter()
+    instance.process = launch()
+    try:
+        healthy = loop.run_until_complete(instance.wait_healthy_async(timeout))
+        return (time.perf_counter() - started) if healthy else None
+    finally:
+        process = instance.process
+        if process.poll() is None:
+            process.terminate()
+            process.wait(5)
+
+
+def run(launches=5, startup=0.5, timeout=15.0):
+    server_dir = tempfile.mkdtemp(prefix="subcount-fake-node-")
+    open(os.path.join(server_dir, "server.js"), 'w').close()
+    node = [sys.executable, FAKE_NODE]
+    try:
+        direct, polling = [], []
+        for _ in range(launches):
+            instance, env = _instance(startup)
+            direct.append(_time_ready(instance, lambda: launch_node_server(server_dir, env, node=node), timeout))
+
+            instance, env = _instance(startup)
+            polling.append(_time_ready(instance, lambda: subprocess.Popen(
+                node + ["server.js"], cwd=server_dir, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ), timeout))
+
+        # Plantage au démarrage : détection et sortie conservée
+        instance, env = _instance(startup, crash=True)
+        started = time.perf_counter()
+        instance.process = launch_node_server(server_dir, env, node=node)
+        crashed = not asyncio.get_event_loop().run_until_complete(instance.wait_healthy_async(timeout))
+        crash_detect = time.perf_counter() - started
+        crash_tail = instance.output_tail(5)
+    finally:
+        shutil.rmtree(server_dir, ignore_errors=True)
+
+    def summary(values):
+        ready = [value for value in values if value is not None]
+        return dict(latency_summary(ready), failures=len(values) - len(ready))
+
+    direct_summary = summary(direct)
+    polling_summary = summary(polling)
+    return {
+        'launches': launches,
+        'simulated_startup_ms': startup * 1000,
+        'ready_ms': {
+            'direct': direct_summary,
+            'polling': polling_summary,
+            'legacy_fixed_sleep': LEGACY_WAIT * 1000,
+        },
+        'overhead_after_startup_ms': {
+            'direct': round(direct_summary['mean'] - startup * 1000, 1) if direct_summary['mean'] else None,
+            'polling': round(polling_summary['mean'] - startup * 1000, 1) if polling_summary['mean'] else None,
+        },
+        'crash': {
+            'detected': crashed,
+            'detect_ms': round(crash_detect * 1000, 1),
+            'output_tail': crash_tail,
+            'stack_captured': any('EADDRINUSE' in line for line in crash_tail),
+        },
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Délai de démarrage perçu (faux node server.js)")
+    parser.add_argument('--launches', type=int, default=5)
+    parser.add_argument('--startup', type=float, default=0.5, help="Démarrage simulé du serveur (s)")
+    parser.add_argument('--timeout', type=float, default=15.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = run(args.launches, args.startup, args.timeout)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    ok = report['crash']['detected'] and report['crash']['stack_captured'] \
+        and not report['ready_ms']['direct']['failures']
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
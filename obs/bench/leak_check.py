@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Équilibre des références OBS et croissance mémoire du script
+Compatible Python 3.6+
+
+Charge obs_subcount_auto.py avec le module obspython simulé (obs_stub),
+puis répète les fonctions qui manipulent des objets OBS, sur le chemin
+normal et avec des erreurs injectées (obs_source_update qui lève...) :
+
+- list_text_sources                (obs_enum_sources / source_list_release)
+- refresh_overlay_browser_sources  (+ obs_source_get_settings / obs_data_release, calldata)
+- on_frontend_event                (obs_frontend_get_current_scene / obs_source_release)
+- TextSourceRenderer._apply_text   (obs_get_source_by_name / obs_data_create)
+
+Chaque scénario rapporte les objets jamais libérés (ligne
+d'acquisition) et les doubles libérations. Un MemoryWatchdog suit en
+parallèle la mémoire Python et les threads sur l'ensemble des cycles.
+
+Usage (depuis obs/):
+    python -m bench.leak_check --iterations 200
+    python -m bench.leak_check --cycles 10 -o leaks.json
+
+Code de sortie 1 si un déséquilibre est trouvé.
+"""
+
+import importlib
+import json
+import logging
+import os
+import sys
+
+from memory_watchdog import MemoryWatchdog
+
+from .obs_stub import ObsStub, ObsStubError
+
+logger = logging.getLogger(__name__)
+
+OBS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(OBS_DIR)
+
+# Fonctions OBS en échec pour les chemins d'erreur (None = chemin normal)
+FAULTS = (None, 'obs_source_get_unversioned_id', 'obs_source_get_id', 'obs_source_get_name',
+          'obs_data_set_string', 'obs_source_update')
+
+
+def build_stub():
+    """Collection de scènes simulée : overlays navigateur, sources Texte, scènes"""
+    stub = ObsStub()
+    stub.add_source("Scène principale", "scene", scene=True)
+    stub.add_source("Pause", "scene")
+    stub.add_source("Overlay follows", "browser_source", {'url': "http://localhost:8082/overlay.html?type=follow"})
+    stub.add_source("Overlay subs", "browser_source", {'url': "http://localhost:8082/overlay.html?type=sub"})
+    stub.add_source("Alertes", "browser_source", {'url': "https://example.com/alerts"})
+    stub.add_source("Texte follows", "text_gdiplus", {'text': ""})
+    stub.add_source("Texte subs", "text_ft2_source", {'text': ""})
+    stub.add_source("Webcam", "dshow_input")
+    return stub.install()
+
+
+def load_script():
+    """Importe obs_subcount_auto avec le stub (sans OBS ni serveur)"""
+    os.makedirs(os.path.join(PROJECT_ROOT, "app", "logs"), exist_ok=True)
+    if OBS_DIR not in sys.path:
+        sys.path.insert(0, OBS_DIR)
+    return importlib.import_module('obs_subcount_auto')
+
+
+def scenarios(script, stub):
+    """Scénarios : nom -> fonction appelée à chaque itération (index)"""
+    renderer = script.TextSourceRenderer(stub, min_interval=0) if script.NATIVE_OVERLAY_AVAILABLE else None
+    if renderer is not None:
+        renderer.bind("Texte follows", "follows")
+        renderer.bind("Texte subs", "subs")
+
+    def render(index):
+        if renderer is None:
+            return
+        goal = {'current': index, 'target': 100, 'remaining': max(0, 100 - index)}
+        renderer.render({'follows': goal, 'subs': dict(goal)})
+
+    return {
+        'list_text_sources': lambda index: script.list_text_sources(),
+        'refresh_overlay_browser_sources': lambda index: script.refresh_overlay_browser_sources(),
+        'on_frontend_event': lambda index: script.on_frontend_event(stub.OBS_FRONTEND_EVENT_SCENE_CHANGED),
+        'text_renderer': render,
+    }
+
+
+def check_scenario(stub, func, iterations, faults=FAULTS):
+    """Exécute un scénario sur chaque chemin (normal + erreurs injectées)
+
+    Returns:
+        dict: Appels en erreur et objets non libérés par ligne d'acquisition
+    """
+    stub.reset_refs()
+    errors = 0
+    for fault in faults:
+        for index in range(iterations):
+            if fault is not None and index % 2 == 0:
+                stub.fail_on(fault)
+            try:
+                func(index)
+            except ObsStubError:
+                errors += 1
+            stub.clear_failures()
+    leaks = [
+        {'kind': kind, 'site': site.replace(PROJECT_ROOT + os.sep, ''), 'count': count}
+        for (kind, site), count in sorted(stub.outstanding().items(), key=lambda item: -item[1])
+    ]
+    return {
+        'calls': iterations * len(faults),
+        'raised': errors,
+        'leaked': sum(leak['count'] for leak in leaks),
+        'leaks': leaks,
+        'double_releases': len(stub.double_releases),
+    }
+
+
+def run(iterations=100, cycles=5):
+    """Équilibre des références par scénario + suivi mémoire sur `cycles` cycles"""
+    stub = build_stub()
+    script = load_script()
+    # Le script loggue chaque rafraîchissement : garder la sortie lisible
+    logging.getLogger().setLevel(logging.ERROR)
+
+    checks = scenarios(script, stub)
+    report = {'scenarios': {}}
+    for name, func in checks.items():
+        report['scenarios'][name] = check_scenario(stub, func, iterations)
+
+    # Croissance mémoire : cycles complets, un relevé par cycle
+    watchdog = MemoryWatchdog(interval=0)
+    watchdog.watch_size('font_metadata', lambda: len(script.font_metadata))
+    watchdog.watch_size('services', lambda: len(script.services.tasks()))
+    watchdog.start()
+    try:
+        for _ in range(cycles):
+            for func in checks.values():
+                check_scenario(stub, func, iterations, faults=(None,))
+            last = watchdog.check()
+    finally:
+        watchdog.stop()
+    report['memory'] = {
+        'traced_bytes': last['traced_bytes'],
+        'threads': last['threads'],
+        'thread_groups': last['thread_groups'],
+        'growing': last['growing'][:5],
+        'suspects': last['suspects'],
+        'sizes': last['sizes'],
+    }
+    report['balanced'] = all(
+        result['leaked'] == 0 and result['double_releases'] == 0 for result in report['scenarios'].values()
+    )
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Équilibre des références OBS et croissance mémoire du script")
+    parser.add_argument('--iterations', type=int, default=100, help="Appels par scénario et par chemin")
+    parser.add_argument('--cycles', type=int, default=5, help="Cycles suivis par le watchdog mémoire")
+    parser.add_argument('-o', '--output', help="Rapport JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = run(args.iterations, args.cycles)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0 if report['balanced'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
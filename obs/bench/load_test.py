@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Générateur de charge asyncio pour les endpoints compteurs
+Compatible Python 3.6+
+
+Rejoue des profils de rafales (raid, sub train...) sur les endpoints
+appelés par le script OBS, mesure débit et latences p50/p95/p99, puis
+vérifie via /api/current qu'aucun incrément n'a été perdu ou compté
+deux fois. Le rapport est émis en JSON.
+
+Usage (depuis obs/):
+    python -m bench.load_test --stub                      # serveur stub en mémoire
+    python -m bench.load_test --url http://localhost:8082 --profile raid -o report.json
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+
+from async_http import HttpConnection
+
+logger = logging.getLogger(__name__)
+
+# Endpoints mutateurs : nom -> (route, compteur, type)
+#   "increment" : +amount par requête (batché côté serveur)
+#   "absolute"  : valeur absolue (la dernière valeur acquittée doit gagner)
+ENDPOINTS = {
+    'add-follows': ("/admin/add-follows", 'follows', 'increment'),
+    'add-subs': ("/admin/add-subs", 'subs', 'increment'),
+    'update-follows': ("/api/update-follows", 'follows', 'absolute'),
+}
+
+# Profils intégrés : liste de phases
+#   endpoint, requests, concurrency, rate (req/s, None = au plus vite), pause (s après la phase)
+PROFILES = {
+    'smoke': [
+        {'endpoint': 'add-follows', 'requests': 20, 'concurrency': 2},
+        {'endpoint': 'add-subs', 'requests': 20, 'concurrency': 2},
+        {'endpoint': 'update-follows', 'requests': 20, 'concurrency': 2},
+    ],
+    'raid': [
+        {'endpoint': 'add-follows', 'requests': 50, 'concurrency': 5, 'rate': 20},
+        {'endpoint': 'add-follows', 'requests': 1000, 'concurrency': 100, 'pause': 1.0},
+        {'endpoint': 'add-follows', 'requests': 200, 'concurrency': 10, 'rate': 50},
+    ],
+    'sub_train': [
+        {'endpoint': 'add-subs', 'requests': 300, 'concurrency': 20, 'rate': 100},
+        {'endpoint': 'add-subs', 'requests': 500, 'concurrency': 50},
+    ],
+    'mixed': [
+        {'endpoint': 'update-follows', 'requests': 200, 'concurrency': 20},
+        {'endpoint': 'add-follows', 'requests': 500, 'concurrency': 50},
+        {'endpoint': 'add-subs', 'requests': 500, 'concurrency': 50},
+    ],
+}
+
+
+def percentile(sorted_values, q):
+    """Percentile par rang le plus proche (liste déjà triée)"""
+    if not sorted_values:
+        return None
+    index = max(0, int(math.ceil(q * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """Résumé des latences en millisecondes"""
+    values = sorted(latencies)
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None, 'mean': None}
+    return {
+        'p50': round(percentile(values, 0.50) * 1000, 3),
+        'p95': round(percentile(values, 0.95) * 1000, 3),
+        'p99': round(percentile(values, 0.99) * 1000, 3),
+        'max': round(values[-1] * 1000, 3),
+        'mean': round(sum(values) / len(values) * 1000, 3),
+    }
+
+
+class LoadTester:
+    """Exécute un profil de charge contre un serveur
+
+    Args:
+        base_url (str): URL du serveur (ex. http://localhost:8082)
+        settle_timeout (float): Attente max de l'application des batchs (s)
+        timeout (float): Timeout par requête (s)
+    """
+
+    def __init__(self, base_url, settle_timeout=10.0, timeout=10.0):
+        self.base_url = base_url
+        self.settle_timeout = settle_timeout
+        self.timeout = timeout
+        self._control = HttpConnection(base_url, timeout)
+
+    async def current(self):
+        """Valeurs actuelles {'follows', 'subs'} via /api/current"""
+        status, body = await self._control.request('GET', '/api/current')
+        if status != 200 or not isinstance(body, dict):
+            raise RuntimeError(f"/api/current a répondu {status}")
+        return body
+
+    async def settle(self, counter, expected):
+        """Attend que `counter` atteigne `expected` (batching serveur)
+
+        Returns:
+            int: Dernière valeur lue (peut différer si incréments perdus)
+        """
+        deadline = time.monotonic() + self.settle_timeout
+        value = (await self.current())[counter]
+        while value != expected and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            value = (await self.current())[counter]
+        return value
+
+    async def run_phase(self, index, phase):
+        """Exécute une phase et vérifie la cohérence du compteur"""
+        route, counter, kind = ENDPOINTS[phase['endpoint']]
+        total = int(phase.get('requests', 100))
+        concurrency = max(1, int(phase.get('concurrency', 10)))
+        rate = phase.get('rate')
+
+        before = (await self.current())[counter]
+        latencies = []
+        status_counts = {}
+        acknowledged = []  # (heure de réponse, valeur) pour les mises à jour absolues
+        errors = 0
+        next_request = [0]
+
+        def payload_for(i):
+            if kind == 'absolute':
+                return {'follows': before + i + 1}
+            if counter == 'subs':
+                return {'amount': 1, 'tier': '1000'}
+            return {'amount': 1}
+
+        async def worker():
+            nonlocal errors
+            connection = HttpConnection(self.base_url, self.timeout)
+            try:
+                while next_request[0] < total:
+                    i = next_request[0]
+                    next_request[0] += 1
+                    if rate:
+                        # Charge en boucle ouverte : départ planifié à i / rate
+                        delay = started + i / rate - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+
+                    payload = payload_for(i)
+                    t0 = time.perf_counter()
+                    try:
+                        status, _ = await connection.request('POST', route, payload)
+                    except Exception as e:
+                        errors += 1
+                        status_counts['error'] = status_counts.get('error', 0) + 1
+                        logger.debug(f"Requête {route} en échec: {e}")
+                        continue
+                    t1 = time.perf_counter()
+                    latencies.append(t1 - t0)
+                    status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+                    if status == 200 and kind == 'absolute':
+                        acknowledged.append((t1, payload['follows']))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        duration = time.perf_counter() - started
+
+        ok = status_counts.get('200', 0)
+        if kind == 'increment':
+            expected = before + ok
+            after = await self.settle(counter, expected)
+            consistency = {
+                'counter': counter,
+                'before': before,
+                'after': after,
+                'expected': expected,
+                'lost': max(0, expected - after),
+                'double_counted': max(0, after - expected),
+            }
+            consistency['ok'] = consistency['lost'] == 0 and consistency['double_counted'] == 0
+        else:
+            # La valeur finale doit être une valeur envoyée et acquittée
+            expected = max(acknowledged)[1] if acknowledged else before
+            after = await self.settle(counter, expected)
+            consistency = {
+                'counter': counter,
+                'before': before,
+                'after': after,
+                'expected': expected,
+                'last_acknowledged_wins': after == expected,
+                'ok': after == expected or after in {value for _, value in acknowledged},
+            }
+
+        result = {
+            'phase': index,
+            'endpoint': phase['endpoint'],
+            'route': route,
+            'requests': total,
+            'concurrency': concurrency,
+            'rate': rate,
+            'ok': ok,
+            'errors': errors,
+            'status_counts': status_counts,
+            'duration_s': round(duration, 4),
+            'throughput_rps': round(ok / duration, 1) if duration > 0 else None,
+            'latency_ms': latency_summary(latencies),
+            'consistency': consistency,
+        }
+
+        if phase.get('pause'):
+            await asyncio.sleep(phase['pause'])
+        return result
+
+    async def run(self, phases, restore=True):
+        """Exécute toutes les phases et retourne le rapport
+
+        Args:
+            phases (list): Phases du profil
+            restore (bool): Remettre les compteurs à leur valeur initiale
+        """
+        initial = await self.current()
+        started_at = time.time()
+        results = []
+        try:
+            for index, phase in enumerate(phases):
+                result = await self.run_phase(index, phase)
+                results.append(result)
+                latency = result['latency_ms']
+                logger.info(
+                    f"{'✅' if result['consistency']['ok'] else '❌'} Phase {index} {result['endpoint']}: "
+                    f"{result['throughput_rps']} req/s, p50={latency['p50']}ms p99={latency['p99']}ms"
+                )
+        finally:
+            if restore:
+                for counter, route in (('follows', '/admin/set-follows'), ('subs', '/admin/set-subs')):
+                    await self._control.request('POST', route, {'count': initial[counter]})
+            self._control.close()
+
+        total_ok = sum(result['ok'] for result in results)
+        total_duration = sum(result['duration_s'] for result in results)
+        return {
+            'target': self.base_url,
+            'started_at': started_at,
+            'initial': initial,
+            'phases': results,
+            'summary': {
+                'requests': sum(result['requests'] for result in results),
+                'ok': total_ok,
+                'errors': sum(result['errors'] for result in results),
+                'throughput_rps': round(total_ok / total_duration, 1) if total_duration > 0 else None,
+                'lost': sum(result['consistency'].get('lost', 0) for result in results),
+                'double_counted': sum(result['consistency'].get('double_counted', 0) for result in results),
+                'consistent': all(result['consistency']['ok'] for result in results),
+            },
+        }
+
+
+async def _run_with_target(args, phases):
+    stub = None
+    url = args.url
+    if args.stub:
+        from .stub_server import StubServer
+        stub = StubServer(batch_delay=args.batch_delay)
+        await stub.start()
+        url = stub.url
+    try:
+        tester = LoadTester(url, settle_timeout=args.settle_timeout, timeout=args.timeout)
+        report = await tester.run(phases, restore=not args.no_restore)
+        report['profile'] = args.profile_file or args.profile
+        report['stub'] = bool(stub)
+        return report
+    finally:
+        if stub is not None:
+            await stub.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Test de charge des endpoints compteurs")
+    parser.add_argument('--url', default="http://localhost:8082", help="URL du serveur")
+    parser.add_argument('--stub', action='store_true', help="Lancer un serveur stub en mémoire")
+    parser.add_argument('--batch-delay', type=float, default=0.1,
+                        help="Délai de batching simulé par le stub (s)")
+    parser.add_argument('--profile', default='smoke', choices=sorted(PROFILES))
+    parser.add_argument('--profile-file', help="Profil JSON (liste de phases)")
+    parser.add_argument('--settle-timeout', type=float, default=10.0)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--no-restore', action='store_true',
+                        help="Ne pas remettre les compteurs à leur valeur initiale")
+    parser.add_argument('-o', '--output', help="Fichier du rapport JSON (défaut: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.profile_file:
+        with open(args.profile_file, 'r', encoding='utf-8') as f:
+            phases = json.load(f)
+    else:
+        phases = PROFILES[args.profile]
+    for phase in phases:
+        if phase.get('endpoint') not in ENDPOINTS:
+            parser.error(f"Endpoint inconnu: {phase.get('endpoint')} (valides: {', '.join(ENDPOINTS)})")
+
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(_run_with_target(args, phases))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"📄 Rapport écrit: {args.output}")
+    else:
+        print(output)
+
+    return 0 if report['summary']['consistent'] else 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du pilotage de plusieurs instances serveur
+Compatible Python 3.6+
+
+Lance N serveurs stub dans des processus séparés (un jeu de ports par
+instance, comme le ferait le script OBS avec START_SERVER.bat) via
+InstanceRegistry, puis mesure :
+- démarrage parallèle (lancement + health checks concurrents) contre
+  démarrage séquentiel instance par instance
+- diffusion d'ajustements de compteurs à toutes les instances en
+  parallèle, avec vérification via /api/current que chaque instance a
+  reçu exactement ses incréments (et rien de ceux des autres)
+- diffusion d'une mise à jour overlay (un POST par instance)
+- arrêt parallèle
+
+Usage (depuis obs/):
+    python -m bench.multi_instance --instances 3
+    python -m bench.multi_instance --instances 4 --startup-delay 1.5 --adjustments 50 -o multi.json
+"""
+
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from async_http import HttpConnection
+from background_loop import get_background_loop
+from server_instances import InstancePorts, InstanceRegistry, ServerInstance
+
+logger = logging.getLogger(__name__)
+
+OBS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port_block(size=3, start=20000, end=60000):
+    """Premier bloc de `size` ports consécutifs libres"""
+    port = start
+    while port + size < end:
+        sockets = []
+        try:
+            for offset in range(size):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sockets.append(sock)
+                sock.bind(("127.0.0.1", port + offset))
+            return port
+        except OSError:
+            port += size
+        finally:
+            for sock in sockets:
+                sock.close()
+    raise RuntimeError("Aucun bloc de ports libre")
+
+
+def build_registry(count, startup_delay):
+    """Registre de `count` instances stub sur des ports distincts"""
+    registry = InstanceRegistry()
+    port = 20000
+    for index in range(count):
+        port = free_port_block(start=port)
+        registry.add(ServerInstance(f"stub-{index}", InstancePorts(port), host="127.0.0.1"))
+        port += 3
+
+    def launcher(instance):
+        http, ws_counter, ws_config = instance.ports.as_tuple()
+        return subprocess.Popen(
+            [sys.executable, '-m', 'bench.stub_server', '--port', str(http),
+             '--ws-counter-port', str(ws_counter), '--ws-config-port', str(ws_config),
+             '--startup-delay', str(startup_delay)],
+            cwd=OBS_DIR,
+            env=instance.environment(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+    return registry, launcher
+
+
+def measure_startup(registry, launcher, sequential=False, timeout=30.0):
+    """Durée jusqu'à ce que toutes les instances répondent"""
+    started = time.perf_counter()
+    if sequential:
+        healthy = {}
+        for name in registry.names():
+            healthy.update(registry.start_all(launcher, timeout, target=name))
+    else:
+        healthy = registry.start_all(launcher, timeout)
+    return {
+        'seconds': round(time.perf_counter() - started, 3),
+        'healthy': sum(1 for ok in healthy.values() if ok),
+        'instances': len(healthy),
+    }
+
+
+async def _adjust(instance, adjustments):
+    """`adjustments` add-follows (amount=index+1) sur une connexion keep-alive"""
+    connection = HttpConnection(instance.url, 5)
+    try:
+        for _ in range(adjustments):
+            response = await connection.request('POST', '/admin/add-follows', {'amount': 1})
+            if response.status_code != 200:
+                return False
+        current = await connection.request('GET', '/api/current')
+        return current.body
+    finally:
+        connection.close()
+
+
+def measure_fan_out(registry, adjustments):
+    """Ajustements diffusés à toutes les instances en parallèle + vérification"""
+    started = time.perf_counter()
+    results = registry.submit(lambda instance: _adjust(instance, adjustments)).result(60)
+    elapsed = time.perf_counter() - started
+    consistent = all(
+        isinstance(body, dict) and body.get('follows') == adjustments
+        for body in results.values()
+    )
+    return {
+        'requests': adjustments * len(results),
+        'seconds': round(elapsed, 3),
+        'requests_per_s': round(adjustments * len(results) / elapsed, 1) if elapsed else None,
+        'consistent': consistent,
+    }
+
+
+def measure_overlay_fan_out(registry):
+    """Une mise à jour de police diffusée à toutes les instances"""
+    started = time.perf_counter()
+    results = registry.submit(
+        lambda instance: instance.overlay_config.update_font(family='Arial', size='64px')
+    ).result(30)
+    return {
+        'seconds': round(time.perf_counter() - started, 3),
+        'applied': sum(1 for ok in results.values() if ok is True),
+        'instances': len(results),
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark multi-instances (serveurs stub)")
+    parser.add_argument('--instances', type=int, default=3)
+    parser.add_argument('--startup-delay', type=float, default=1.0,
+                        help="Temps de démarrage simulé de chaque serveur (secondes)")
+    parser.add_argument('--adjustments', type=int, default=20, help="add-follows par instance")
+    parser.add_argument('--skip-sequential', action='store_true', help="Ne pas mesurer le démarrage séquentiel")
+    parser.add_argument('-o', '--output', help="Fichier du rapport JSON (défaut: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    registry, launcher = build_registry(max(1, args.instances), args.startup_delay)
+    report = {'instances': len(registry), 'startup_delay_s': args.startup_delay}
+    try:
+        if not args.skip_sequential:
+            report['startup_sequential'] = measure_startup(registry, launcher, sequential=True)
+            registry.stop_all()
+        report['startup_parallel'] = measure_startup(registry, launcher)
+        logger.info(
+            f"🚀 démarrage parallèle: {report['startup_parallel']['seconds']}s "
+            f"({report['startup_parallel']['healthy']}/{len(registry)} instances)"
+        )
+        report['counter_fan_out'] = measure_fan_out(registry, args.adjustments)
+        report['overlay_fan_out'] = measure_overlay_fan_out(registry)
+    finally:
+        registry.close_overlay_managers()
+        started = time.perf_counter()
+        registry.stop_all()
+        report['stop_seconds'] = round(time.perf_counter() - started, 3)
+        get_background_loop().stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"📄 Rapport écrit: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
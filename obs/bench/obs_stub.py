@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module `obspython` simulé avec comptage des références
+Compatible Python 3.6+
+
+Remplace obspython (sys.modules) pour exécuter les fonctions du script
+hors d'OBS. Chaque objet que l'API OBS demande de libérer est compté :
+
+    obs_data_create / obs_source_get_settings / obs_data_get_obj  -> obs_data_release
+    obs_get_source_by_name / obs_frontend_get_current_scene       -> obs_source_release
+    obs_enum_sources (chaque source de la liste)                  -> source_list_release
+    calldata_create                                               -> calldata_destroy
+    obs_data_get_array / obs_hotkey_save                          -> obs_data_array_release
+
+`outstanding()` liste ce qui n'a pas été libéré, groupé par ligne
+d'acquisition ; une double libération est aussi enregistrée.
+`fail_on(nom)` fait lever une exception à une fonction pour vérifier
+les libérations sur les chemins d'erreur.
+
+Les timers (timer_add / timer_remove) sont enregistrés ; `run_timers`
+joue le rôle de la boucle OBS et compte les appels par fonction.
+
+Les fonctions non simulées (propriétés...) sont des no-op et les
+constantes (OBS_*) valent 0.
+"""
+
+import sys
+import threading
+import time
+import types
+from collections import Counter
+
+KIND_DATA = 'obs_data'
+KIND_SOURCE = 'obs_source'
+KIND_CALLDATA = 'calldata'
+KIND_ARRAY = 'obs_data_array'
+
+
+class ObsStubError(RuntimeError):
+    """Erreur injectée par fail_on()"""
+
+
+class _Ref:
+    """Objet natif simulé (obs_data_t, obs_source_t...)"""
+
+    __slots__ = ('kind', 'site', 'released', 'payload')
+
+    def __init__(self, kind, site, payload=None):
+        self.kind = kind
+        self.site = site
+        self.released = False
+        self.payload = payload
+
+    def __bool__(self):
+        return True
+
+
+class StubSource:
+    """Source de la collection simulée"""
+
+    def __init__(self, name, source_id, settings=None):
+        self.name = name
+        self.id = source_id
+        self.settings = dict(settings or {})
+        self.updates = 0
+
+
+class ObsStub(types.ModuleType):
+    """Module obspython simulé (à installer avec install())"""
+
+    def __init__(self):
+        super().__init__('obspython')
+        self.sources = {}
+        self.current_scene = None
+        self.calls = Counter()
+        self.double_releases = []
+        self._live = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+        self.hotkeys = {}  # id -> [nom, libellé, callback, touches]
+        self.timers = {}   # callback -> [période (s), prochaine échéance]
+        self.timer_calls = Counter()  # Nom de la fonction -> appels par run_timers
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name.isupper():
+            return 0
+        return lambda *args, **kwargs: None
+
+    # ------------------------------------------------------------------
+    # Harnais
+    # ------------------------------------------------------------------
+
+    def install(self):
+        sys.modules['obspython'] = self
+        return self
+
+    def add_source(self, name, source_id, settings=None, scene=False):
+        self.sources[name] = StubSource(name, source_id, settings)
+        if scene and self.current_scene is None:
+            self.current_scene = name
+        return self.sources[name]
+
+    def bind_key(self, name, *keys):
+        """L'utilisateur associe des touches au raccourci `name`"""
+        for hotkey in self.hotkeys.values():
+            if hotkey[0] == name:
+                hotkey[3] = list(keys)
+
+    def press(self, name, pressed=True):
+        """Appui (ou relâchement) du raccourci `name`"""
+        for hotkey in list(self.hotkeys.values()):
+            if hotkey[0] == name:
+                hotkey[2](pressed)
+
+    def fail_on(self, name, times=1):
+        """La fonction `name` lève ObsStubError ses `times` prochains appels"""
+        self._failures[name] = times
+
+    def clear_failures(self):
+        self._failures.clear()
+
+    def _maybe_fail(self, name):
+        self.calls[name] += 1
+        remaining = self._failures.get(name, 0)
+        if remaining:
+            self._failures[name] = remaining - 1
+            raise ObsStubError(f"{name}: erreur injectée")
+
+    def _caller_site(self):
+        # Première frame hors de ce module : la ligne qui a fait l'acquisition
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        if frame is None:
+            return '?'
+        return f"{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+    def _acquire(self, kind, payload=None):
+        ref = _Ref(kind, self._caller_site(), payload)
+        with self._lock:
+            self._live[id(ref)] = ref
+        return ref
+
+    def _release(self, ref, kind):
+        if not isinstance(ref, _Ref):
+            return
+        with self._lock:
+            if ref.released or id(ref) not in self._live:
+                self.double_releases.append((kind, ref.site, self._caller_site()))
+                return
+            ref.released = True
+            del self._live[id(ref)]
+
+    def outstanding(self):
+        """Objets non libérés : {(type, ligne d'acquisition): nombre}"""
+        with self._lock:
+            return dict(Counter((ref.kind, ref.site) for ref in self._live.values()))
+
+    def reset_refs(self):
+        with self._lock:
+            self._live.clear()
+            self.double_releases = []
+
+    # ------------------------------------------------------------------
+    # obs_data
+    # ------------------------------------------------------------------
+
+    def obs_data_create(self):
+        self._maybe_fail('obs_data_create')
+        return self._acquire(KIND_DATA, {})
+
+    def obs_data_release(self, data):
+        self._release(data, KIND_DATA)
+
+    def obs_data_get_obj(self, data, name):
+        value = data.payload.get(name) if isinstance(data, _Ref) else None
+        return self._acquire(KIND_DATA, dict(value)) if isinstance(value, dict) else None
+
+    def obs_data_set_string(self, data, name, value):
+        self._maybe_fail('obs_data_set_string')
+        data.payload[name] = value
+
+    def obs_data_get_string(self, data, name):
+        value = data.payload.get(name, '') if isinstance(data, _Ref) else ''
+        return value if isinstance(value, str) else ''
+
+    def obs_data_get_int(self, data, name):
+        value = data.payload.get(name, 0) if isinstance(data, _Ref) else 0
+        return value if isinstance(value, int) else 0
+
+    def obs_data_get_bool(self, data, name):
+        return bool(data.payload.get(name, False)) if isinstance(data, _Ref) else False
+
+    def obs_data_get_array(self, data, name):
+        value = data.payload.get(name) if isinstance(data, _Ref) else None
+        return self._acquire(KIND_ARRAY, list(value)) if isinstance(value, list) else None
+
+    def obs_data_set_array(self, data, name, array):
+        data.payload[name] = list(array.payload)
+
+    def obs_data_array_release(self, array):
+        self._release(array, KIND_ARRAY)
+
+    # ------------------------------------------------------------------
+    # Raccourcis
+    # ------------------------------------------------------------------
+
+    def obs_hotkey_register_frontend(self, name, description, callback):
+        self._maybe_fail('obs_hotkey_register_frontend')
+        hotkey_id = len(self.hotkeys) + 1
+        self.hotkeys[hotkey_id] = [name, description, callback, []]
+        return hotkey_id
+
+    def obs_hotkey_unregister(self, callback):
+        for hotkey_id, hotkey in list(self.hotkeys.items()):
+            if hotkey[2] is callback:
+                del self.hotkeys[hotkey_id]
+
+    def obs_hotkey_save(self, hotkey_id):
+        return self._acquire(KIND_ARRAY, list(self.hotkeys[hotkey_id][3]))
+
+    def obs_hotkey_load(self, hotkey_id, array):
+        self.hotkeys[hotkey_id][3] = list(array.payload)
+
+    # ------------------------------------------------------------------
+    # Timers
+    # ------------------------------------------------------------------
+
+    def timer_add(self, callback, ms):
+        with self._lock:
+            self.timers[callback] = [ms / 1000.0, time.monotonic() + ms / 1000.0]
+
+    def timer_remove(self, callback):
+        with self._lock:
+            self.timers.pop(callback, None)
+
+    def run_timers(self, duration):
+        """Boucle des timers OBS pendant `duration` secondes (thread appelant)"""
+        end = time.monotonic() + duration
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                due = [callback for callback, (_, at) in self.timers.items() if at <= now]
+                for callback in due:
+                    timer = self.timers[callback]
+                    timer[1] = max(timer[1] + timer[0], now)
+                upcoming = min([at for _, at in self.timers.values()] + [end])
+            for callback in due:
+                self.timer_calls[getattr(callback, '__name__', repr(callback))] += 1
+                callback()
+            if now >= end:
+                return
+            time.sleep(max(0.0, upcoming - time.monotonic()))
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    def _source_ref(self, source):
+        return self._acquire(KIND_SOURCE, source)
+
+    def obs_enum_sources(self):
+        self._maybe_fail('obs_enum_sources')
+        return [self._source_ref(source) for source in self.sources.values()]
+
+    def source_list_release(self, sources):
+        for source in sources or ():
+            self._release(source, KIND_SOURCE)
+
+    def obs_get_source_by_name(self, name):
+        self._maybe_fail('obs_get_source_by_name')
+        source = self.sources.get(name)
+        return self._source_ref(source) if source is not None else None
+
+    def obs_frontend_get_current_scene(self):
+        source = self.sources.get(self.current_scene)
+        return self._source_ref(source) if source is not None else None
+
+    def obs_frontend_get_scene_names(self):
+        return [name for name, source in self.sources.items() if source.id == 'scene']
+
+    def obs_source_release(self, source):
+        self._release(source, KIND_SOURCE)
+
+    def obs_source_get_name(self, source):
+        self._maybe_fail('obs_source_get_name')
+        return source.payload.name
+
+    def obs_source_get_id(self, source):
+        self._maybe_fail('obs_source_get_id')
+        return source.payload.id
+
+    def obs_source_get_unversioned_id(self, source):
+        self._maybe_fail('obs_source_get_unversioned_id')
+        return source.payload.id
+
+    def obs_source_get_settings(self, source):
+        self._maybe_fail('obs_source_get_settings')
+        return self._acquire(KIND_DATA, dict(source.payload.settings))
+
+    def obs_source_update(self, source, settings):
+        self._maybe_fail('obs_source_update')
+        source.payload.settings.update(settings.payload)
+        source.payload.updates += 1
+
+    def obs_source_get_proc_handler(self, source):
+        return object()
+
+    def calldata_create(self):
+        return self._acquire(KIND_CALLDATA)
+
+    def calldata_destroy(self, data):
+        self._release(data, KIND_CALLDATA)
+
+    def proc_handler_call(self, handler, name, data):
+        self._maybe_fail('proc_handler_call')
+        return True
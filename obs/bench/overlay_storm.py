@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de tempêtes de mises à jour de la config overlay
+Compatible Python 3.6+
+
+Simule ce que fait l'interface OBS quand on fait glisser un curseur ou
+qu'on enchaîne les boutons : une rafale d'appels update_font /
+update_colors / update_animation / update_layout / update_full_config
+soumis depuis le thread principal à AsyncOverlayConfigManager.
+
+Le serveur stub (dans la boucle d'arrière-plan) enregistre chaque POST
+reçu, ce qui permet de mesurer :
+- appels soumis vs POST réellement envoyés (fusion des appels remplacés)
+- latence soumission -> résolution du Future (p50/p95/p99)
+- cohérence : pour chaque section, l'état obtenu en rejouant les POST
+  dans l'ordre d'arrivée est celui du dernier appel (last writer wins)
+
+Avec --compare-sync (module requests requis), la même tempête est rejouée
+avec OverlayConfigManager (appels bloquants séquentiels).
+
+--preset-switches N mesure aussi N changements de look : preset appliqué
+en une requête (comme au changement de scène) contre la suite de clics
+police -> couleur prédéfinie -> couleur personnalisée.
+
+Usage (depuis obs/):
+    python -m bench.overlay_storm --calls 500
+    python -m bench.overlay_storm --calls 200 --rate 60 --compare-sync -o storm.json
+    python -m bench.overlay_storm --calls 0 --preset-switches 200
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+
+from async_overlay_config_manager import AsyncOverlayConfigManager
+from background_loop import BackgroundLoop
+from overlay_presets import OverlayPreset
+
+from .load_test import latency_summary
+from .stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+FONT_FAMILIES = ['Arial', 'Verdana', 'SEA', 'Impact', 'Georgia']
+EASINGS = ['linear', 'ease-in-out', 'ease-out', 'cubic-bezier(0.25, 0.46, 0.45, 0.94)']
+
+# Répartition des appels d'une tempête : (méthode, poids)
+CALL_MIX = [
+    ('update_font', 4),
+    ('update_colors', 3),
+    ('update_animation', 1),
+    ('update_layout', 1),
+    ('update_full_config', 1),
+]
+
+
+def _color(rng):
+    return f"#{rng.randrange(0x1000000):06x}"
+
+
+def generate_storm(calls, seed=0):
+    """Liste déterministe d'appels (méthode, kwargs, sections attendues)"""
+    rng = random.Random(seed)
+    methods = [method for method, weight in CALL_MIX for _ in range(weight)]
+    storm = []
+    for _ in range(calls):
+        method = rng.choice(methods)
+        if method == 'update_font':
+            kwargs = {'family': rng.choice(FONT_FAMILIES), 'size': f"{rng.randint(20, 120)}px"}
+            sections = {'font': dict(kwargs)}
+        elif method == 'update_colors':
+            kwargs = {'text': _color(rng), 'shadow': _color(rng)}
+            sections = {'colors': dict(kwargs)}
+        elif method == 'update_animation':
+            kwargs = {'duration': f"{rng.randint(100, 2000)}ms", 'easing': rng.choice(EASINGS)}
+            sections = {'animation': dict(kwargs)}
+        elif method == 'update_layout':
+            kwargs = {'paddingLeft': f"{rng.randint(0, 80)}px", 'gap': f"{rng.randint(0, 40)}px"}
+            sections = {'layout': dict(kwargs)}
+        else:
+            kwargs = {
+                'font': {'family': rng.choice(FONT_FAMILIES), 'size': f"{rng.randint(20, 120)}px"},
+                'colors': {'text': _color(rng)},
+            }
+            sections = {section: dict(values) for section, values in kwargs.items()}
+        storm.append((method, kwargs, sections))
+    return storm
+
+
+def fold_sections(updates_list):
+    """État par section obtenu en appliquant des mises à jour partielles dans l'ordre"""
+    state = {}
+    for updates in updates_list:
+        for section, values in updates.items():
+            if isinstance(values, dict):
+                state.setdefault(section, {}).update(values)
+    return state
+
+
+def _pace(index, started, rate):
+    if rate:
+        delay = started + index / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_async_storm(stub, storm, background_loop, rate=0, max_in_flight=2):
+    """Tempête via AsyncOverlayConfigManager (soumissions non bloquantes)
+
+    `background_loop` doit être la BackgroundLoop qui héberge le stub.
+    """
+    manager = AsyncOverlayConfigManager(
+        server_url=stub.url, enable_cache=False, max_in_flight=max_in_flight,
+        background_loop=background_loop
+    )
+    posts_before = len(stub.overlay_posts)
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    remaining = threading.Event()
+    pending = [len(storm)]
+
+    def on_done(submitted_at, future):
+        elapsed = time.perf_counter() - submitted_at
+        with lock:
+            latencies.append(elapsed)
+            if future.cancelled() or future.exception() is not None or not future.result():
+                failures.append(elapsed)
+            pending[0] -= 1
+            if not pending[0]:
+                remaining.set()
+
+    started = time.perf_counter()
+    blocked = 0.0
+    for index, (method, kwargs, _) in enumerate(storm):
+        _pace(index, started, rate)
+        submitted_at = time.perf_counter()
+        future = manager.submit(getattr(manager, method)(**kwargs))
+        blocked = max(blocked, time.perf_counter() - submitted_at)
+        future.add_done_callback(lambda f, t=submitted_at: on_done(t, f))
+    remaining.wait(60)
+    duration = time.perf_counter() - started
+    manager.submit(manager.close()).result(5)
+
+    posts = stub.overlay_posts[posts_before:]
+    return {
+        'calls': len(storm),
+        'posts': len(posts),
+        'superseded': manager.updates_superseded,
+        'failures': len(failures),
+        'duration_s': round(duration, 3),
+        'calls_per_s': round(len(storm) / duration, 1) if duration else None,
+        'max_submit_block_ms': round(blocked * 1000, 3),
+        'latency_ms': latency_summary(latencies),
+        'consistent': fold_sections(posts) == fold_sections([sections for _, _, sections in storm]),
+    }
+
+
+def run_sync_storm(stub, storm, rate=0):
+    """Même tempête via OverlayConfigManager (appels bloquants)"""
+    try:
+        from overlay_config_manager import OverlayConfigManager
+        manager = OverlayConfigManager(server_url=stub.url, enable_cache=False)
+    except ImportError as e:
+        return {'skipped': str(e)}
+
+    posts_before = len(stub.overlay_posts)
+    latencies = []
+    started = time.perf_counter()
+    for index, (method, kwargs, _) in enumerate(storm):
+        _pace(index, started, rate)
+        call_started = time.perf_counter()
+        getattr(manager, method)(**kwargs)
+        latencies.append(time.perf_counter() - call_started)
+    duration = time.perf_counter() - started
+
+    posts = stub.overlay_posts[posts_before:]
+    return {
+        'calls': len(storm),
+        'posts': len(posts),
+        'duration_s': round(duration, 3),
+        'calls_per_s': round(len(storm) / duration, 1) if duration else None,
+        'max_submit_block_ms': round(max(latencies) * 1000, 3) if latencies else None,
+        'latency_ms': latency_summary(latencies),
+        'consistent': fold_sections(posts) == fold_sections([sections for _, _, sections in storm]),
+    }
+
+
+def generate_presets(count=3, seed=0):
+    """Presets complets (police + couleurs + animation) distincts"""
+    rng = random.Random(seed)
+    return [
+        OverlayPreset(
+            f"preset-{i}",
+            font={'family': rng.choice(FONT_FAMILIES), 'size': f"{rng.randint(20, 120)}px"},
+            colors={'text': _color(rng), 'shadow': _color(rng)},
+            animation={'duration': f"{rng.randint(100, 2000)}ms", 'easing': rng.choice(EASINGS)},
+        )
+        for i in range(count)
+    ]
+
+
+def run_preset_switches(stub, background_loop, switches, presets):
+    """Changements de look : preset (1 requête) vs suite de clics (3 requêtes)
+
+    Chaque changement est attendu avant le suivant, comme des changements
+    de scène successifs. Chaque POST reçu par le stub = une diffusion
+    config_update = un rafraîchissement des overlays.
+    """
+    manager = AsyncOverlayConfigManager(server_url=stub.url, enable_cache=False, background_loop=background_loop)
+
+    async def clicks(preset):
+        font, colors = preset.updates['font'], preset.updates['colors']
+        results = [
+            await manager.update_font(**font),
+            await manager.update_colors(text=colors['text']),
+            await manager.update_colors(**colors),
+        ]
+        return all(results)
+
+    report = {}
+    for mode in ('preset', 'clicks'):
+        posts_before = len(stub.overlay_posts)
+        latencies = []
+        failures = 0
+        for index in range(switches):
+            preset = presets[index % len(presets)]
+            coro = manager.apply_preset(preset) if mode == 'preset' else clicks(preset)
+            started = time.perf_counter()
+            if not manager.submit(coro).result(30):
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+        report[mode] = {
+            'switches': switches,
+            'posts': len(stub.overlay_posts) - posts_before,
+            'failures': failures,
+            'latency_ms': latency_summary(latencies),
+        }
+    manager.submit(manager.close()).result(5)
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de tempêtes de mises à jour overlay")
+    parser.add_argument('--calls', type=int, default=500, help="Appels par tempête")
+    parser.add_argument('--rate', type=float, default=0, help="Appels/s (0 = rafale)")
+    parser.add_argument('--max-in-flight', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare-sync', action='store_true', help="Rejouer avec OverlayConfigManager (requests)")
+    parser.add_argument('--preset-switches', type=int, default=0, help="Changements de preset à mesurer")
+    parser.add_argument('-o', '--output', help="Fichier du rapport JSON (défaut: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    background_loop = BackgroundLoop(name="overlay-storm")
+    stub = StubServer()
+    background_loop.submit(stub.start()).result(5)
+    storm = generate_storm(args.calls, args.seed)
+
+    try:
+        report = {'calls': args.calls, 'rate': args.rate or None, 'seed': args.seed}
+        if storm:
+            report['async'] = run_async_storm(stub, storm, background_loop, args.rate, args.max_in_flight)
+            logger.info(
+                f"⚡ async: {report['async']['calls']} appels -> {report['async']['posts']} POST, "
+                f"p99={report['async']['latency_ms']['p99']}ms cohérent={report['async']['consistent']}"
+            )
+            if args.compare_sync:
+                report['sync'] = run_sync_storm(stub, storm, args.rate)
+        if args.preset_switches:
+            report['preset_switches'] = run_preset_switches(
+                stub, background_loop, args.preset_switches, generate_presets(seed=args.seed)
+            )
+            logger.info(
+                f"🎭 preset: {report['preset_switches']['preset']['posts']} POST, "
+                f"clics: {report['preset_switches']['clicks']['posts']} POST"
+            )
+    finally:
+        background_loop.submit(stub.stop()).result(5)
+        background_loop.stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"📄 Rapport écrit: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur stub des endpoints compteurs de server.js
+Compatible Python 3.6+
+
+Implémente en mémoire les routes utilisées par le script OBS pour
+lancer les benchmarks sans Node.js. `batch_delay` simule le batching
+de batching-factory.js (incréments appliqués après un délai).
+Optionnellement, les WebSockets compteurs (8083) et config (8084)
+diffusent les mêmes messages que broadcast-factory.js, y compris
+l'écho `traces` des requêtes portant un header X-Trace-Id.
+POST /api/batch applique un lot comme la transaction du StateManager :
+tout ou rien, une écriture de l'état et un broadcast par compteur /
+config touché (`state_writes` et `broadcasts` comptent les deux).
+POST /api/activity-profile enregistre le profil envoyé par le script
+(`activity_profile`), comme le polling de polling-factory.js.
+
+Usage autonome (depuis obs/):
+    python -m bench.stub_server --port 8082
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from async_http import HttpError, decode_json, encode_message, read_message
+from tracing import TRACE_HEADER, now as trace_now
+
+from . import ws_protocol
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+# Objectifs par défaut de goals-factory.js (aucun palier configuré)
+DEFAULT_TARGETS = {'follows': 100, 'subs': 10}
+
+
+def _amount(payload):
+    """parseInt(req.body.amount) || 1 (comme server.js)"""
+    try:
+        return int((payload or {}).get('amount')) or 1
+    except (TypeError, ValueError):
+        return 1
+
+
+def _trace(trace_id):
+    """Étapes serveur d'une requête tracée (ms epoch, comme trace-context.js)"""
+    return {'id': trace_id, 'receivedAt': trace_now() * 1000, 'appliedAt': None, 'broadcastAt': None}
+
+
+def _timestamp():
+    """Horodatage ISO 8601 (new Date().toISOString())"""
+    return datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+
+
+class StubServer:
+    """Serveur HTTP asyncio imitant les endpoints compteurs de server.js
+
+    Args:
+        host (str): Adresse d'écoute
+        port (int): Port (0 = port libre choisi par l'OS)
+        batch_delay (float): Délai avant application des add/remove (secondes)
+        ws_counter_port (int): Port du WebSocket compteurs (None = désactivé, 0 = libre)
+        ws_config_port (int): Port du WebSocket config (None = désactivé, 0 = libre)
+        latency (float): Délai ajouté à chaque réponse HTTP (aller-retour simulé, s)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, batch_delay=0.0, ws_counter_port=None, ws_config_port=None,
+                 latency=0.0):
+        self.host = host
+        self.port = port
+        self.batch_delay = batch_delay
+        self.ws_counter_port = ws_counter_port
+        self.ws_config_port = ws_config_port
+        self.latency = latency
+        self.counter_clients = set()
+        self.config_clients = set()
+        self._ws_servers = []
+        self.follows = 0
+        self.subs = 0
+        self.overlay_config = {}
+        self.overlay_posts = []  # Corps des POST /api/overlay-config reçus (ordre d'arrivée)
+        self.sub_counter_mode = 'realtime'
+        self.activity_profile = 'live'
+        self.requests_handled = 0
+        self.state_writes = 0   # Persistances de l'état (une par mutation effective, une par lot)
+        self.broadcasts = 0     # Messages diffusés (par type, pas par client)
+        self._deferred = None   # Broadcasts retenus pendant un lot (compteurs / 'config')
+        self._traces = []  # Traces de la requête en cours de traitement
+        self._server = None
+        self._routes = {
+            ('GET', '/'): self._status,
+            ('GET', '/api/current'): self._current,
+            ('GET', '/api/overlay-config'): self._get_overlay_config,
+            ('POST', '/api/overlay-config'): self._set_overlay_config,
+            ('POST', '/api/update-follows'): self._update_follows,
+            ('POST', '/api/update-subs'): self._update_subs,
+            ('POST', '/admin/add-follows'): lambda p: self._adjust('follows', _amount(p)),
+            ('POST', '/admin/remove-follows'): lambda p: self._adjust('follows', -_amount(p)),
+            ('POST', '/admin/add-subs'): lambda p: self._adjust('subs', _amount(p)),
+            ('POST', '/admin/remove-subs'): lambda p: self._adjust('subs', -_amount(p)),
+            ('POST', '/admin/set-follows'): lambda p: self._set('follows', (p or {}).get('count')),
+            ('POST', '/admin/set-subs'): lambda p: self._set('subs', (p or {}).get('count')),
+            ('POST', '/admin/set-follow-goal'): self._set_goal,
+            ('POST', '/admin/set-sub-goal'): self._set_goal,
+            ('GET', '/api/sub-counter-mode'): lambda p: (200, {'success': True, 'mode': self.sub_counter_mode}),
+            ('POST', '/api/sub-counter-mode'): self._set_mode,
+            ('POST', '/api/batch'): self._batch,
+            ('GET', '/api/activity-profile'): lambda p: (200, {'success': True, 'profile': self.activity_profile}),
+            ('POST', '/api/activity-profile'): self._set_activity_profile,
+        }
+        # Opérations de /api/batch -> routes (utils/batch-operations.js)
+        self._batch_routes = {
+            'set-follows': '/admin/set-follows',
+            'set-subs': '/admin/set-subs',
+            'add-follows': '/admin/add-follows',
+            'remove-follows': '/admin/remove-follows',
+            'add-subs': '/admin/add-subs',
+            'remove-subs': '/admin/remove-subs',
+            'set-follow-goal': '/admin/set-follow-goal',
+            'set-sub-goal': '/admin/set-sub-goal',
+            'sub-counter-mode': '/api/sub-counter-mode',
+            'overlay-config': '/api/overlay-config',
+        }
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_counter_url(self):
+        return f"ws://{self.host}:{self.ws_counter_port}"
+
+    @property
+    def ws_config_url(self):
+        return f"ws://{self.host}:{self.ws_config_port}"
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🧪 Serveur stub: {self.url}")
+
+        if self.ws_counter_port is not None:
+            server = await asyncio.start_server(self._handle_counter_ws, self.host, self.ws_counter_port)
+            self.ws_counter_port = server.sockets[0].getsockname()[1]
+            self._ws_servers.append(server)
+        if self.ws_config_port is not None:
+            server = await asyncio.start_server(self._handle_config_ws, self.host, self.ws_config_port)
+            self.ws_config_port = server.sockets[0].getsockname()[1]
+            self._ws_servers.append(server)
+
+    async def stop(self):
+        for client in list(self.counter_clients) + list(self.config_clients):
+            client.close()
+        for server in self._ws_servers:
+            server.close()
+            await server.wait_closed()
+        self._ws_servers = []
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    def _status(self, payload):
+        return 200, {'status': 'ok', 'stub': True}
+
+    def _current(self, payload):
+        return 200, {'follows': self.follows, 'subs': self.subs}
+
+    def _get_overlay_config(self, payload):
+        return 200, self.overlay_config
+
+    def _set_overlay_config(self, payload):
+        # Remplacement complet, comme stateManager.setOverlayConfig()
+        self.overlay_config = json.loads(json.dumps(payload or {}))
+        self.overlay_posts.append(self.overlay_config)
+        self._changed('config')
+        return 200, {'success': True, 'config': self.overlay_config}
+
+    def _config_message(self):
+        return {'type': 'config_update', 'config': self.overlay_config, 'timestamp': _timestamp()}
+
+    def _set_goal(self, payload):
+        # Comme server.js : validé et acquitté, les paliers viennent des fichiers
+        try:
+            goal = int((payload or {}).get('goal'))
+        except (TypeError, ValueError):
+            return 400, {'error': 'Invalid goal'}
+        if goal < 0:
+            return 400, {'error': 'Invalid goal'}
+        return 200, {'success': True, 'goal': goal}
+
+    def _set_mode(self, payload):
+        mode = (payload or {}).get('mode')
+        if mode not in ('realtime', 'session'):
+            return 400, {'error': 'Mode invalide. Utilisez "realtime" ou "session"'}
+        changed = mode != self.sub_counter_mode
+        self.sub_counter_mode = mode
+        if changed:
+            self._changed(None)
+        return 200, {'success': True, 'mode': mode, 'changed': changed}
+
+    def _set_activity_profile(self, payload):
+        profile = (payload or {}).get('profile')
+        if profile not in ('live', 'idle'):
+            return 400, {'error': 'Profil invalide. Utilisez "live" ou "idle"'}
+        changed = profile != self.activity_profile
+        self.activity_profile = profile
+        return 200, {'success': True, 'profile': profile, 'changed': changed}
+
+    def _batch(self, payload):
+        """Lot atomique : état restauré si une opération échoue"""
+        operations = (payload or {}).get('operations')
+        if not isinstance(operations, list) or not operations:
+            return 400, {'success': False, 'error': 'operations doit être une liste non vide'}
+
+        saved = (self.follows, self.subs, self.sub_counter_mode, self.overlay_config, len(self.overlay_posts))
+        self._deferred = []
+        try:
+            results = []
+            for index, operation in enumerate(operations):
+                route = self._batch_routes.get((operation or {}).get('op'))
+                body = dict(operation or {})
+                body.pop('op', None)
+                if route == '/api/overlay-config':
+                    body = body.get('config')
+                status, result = (404, {'error': 'Opération inconnue'}) if route is None \
+                    else self._routes[('POST', route)](body)
+                if status != 200:
+                    self.follows, self.subs, self.sub_counter_mode, self.overlay_config, posts = saved
+                    del self.overlay_posts[posts:]
+                    return 400, {'success': False, 'error': result.get('error'), 'index': index}
+                results.append(dict(result, op=operation['op']))
+            deferred = self._deferred
+        finally:
+            self._deferred = None
+
+        if deferred:
+            self.state_writes += 1
+        for key in ('follows', 'subs', 'config'):
+            if key in deferred:
+                self._send_change(key)
+        return 200, {'success': True, 'applied': len(results), 'results': results,
+                     'follows': self.follows, 'subs': self.subs, 'mode': self.sub_counter_mode}
+
+    def _update_follows(self, payload):
+        value = (payload or {}).get('follows')
+        if not isinstance(value, (int, float)) or value < 0:
+            return 400, {'error': 'Invalid follows value'}
+        self._apply('follows', value, absolute=True)
+        return 200, {'success': True, 'follows': self.follows}
+
+    def _update_subs(self, payload):
+        value = (payload or {}).get('subs')
+        if not isinstance(value, (int, float)) or value < 0:
+            return 400, {'error': 'Invalid subs value'}
+        self._apply('subs', value, absolute=True)
+        return 200, {'success': True, 'subs': self.subs}
+
+    def _set(self, counter, count):
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            return 400, {'error': 'Invalid count'}
+        if count < 0:
+            return 400, {'error': 'Invalid count'}
+        self._apply(counter, count, absolute=True)
+        return 200, {'success': True, 'total': count}
+
+    def _adjust(self, counter, delta):
+        total = max(0, getattr(self, counter) + delta)
+        if self.batch_delay > 0 and self._deferred is None:
+            asyncio.get_event_loop().call_later(self.batch_delay, self._apply, counter, delta, False, self._traces)
+        else:
+            self._apply(counter, delta)
+        return 200, {'success': True, 'total': total}
+
+    def _apply(self, counter, value, absolute=False, traces=None):
+        traces = self._traces if traces is None else traces
+        old_value = getattr(self, counter)
+        setattr(self, counter, value if absolute else max(0, old_value + value))
+        if getattr(self, counter) != old_value:
+            self._changed(counter, traces)
+
+    def _changed(self, key, traces=None):
+        """Mutation effective : persistance + broadcast (retenus pendant un lot)
+
+        Args:
+            key: 'follows', 'subs', 'config' ou None (rien à diffuser)
+        """
+        if self._deferred is not None:
+            if key not in self._deferred:
+                self._deferred.append(key)
+            return
+        self.state_writes += 1
+        if key is not None:
+            self._send_change(key, traces)
+
+    def _send_change(self, key, traces=None):
+        traces = self._traces if traces is None else traces
+        if key == 'config':
+            self._broadcast(self.config_clients, self._config_message(), traces)
+        else:
+            self._broadcast(self.counter_clients, self._counter_message(key), traces)
+
+    # ------------------------------------------------------------------
+    # WebSockets (format de broadcast-factory.js)
+    # ------------------------------------------------------------------
+
+    def _goal(self, counter):
+        current = getattr(self, counter)
+        return {'current': current, 'target': DEFAULT_TARGETS[counter], 'message': '', 'isMaxReached': False}
+
+    def _counter_message(self, counter, initial=False):
+        message = {
+            'type': 'follow_update' if counter == 'follows' else 'sub_update',
+            counter: getattr(self, counter),
+            'goal': self._goal(counter),
+            'timestamp': _timestamp(),
+        }
+        if initial:
+            message['isInitial'] = True
+        return message
+
+    def _broadcast(self, clients, message, traces=None):
+        self.broadcasts += 1
+        if not clients:
+            return
+        if traces:
+            stamp = trace_now() * 1000
+            for trace in traces:
+                trace['appliedAt'] = trace['appliedAt'] or stamp
+                trace['broadcastAt'] = trace['broadcastAt'] or stamp
+            message['traces'] = traces
+        text = json.dumps(message)
+        for client in list(clients):
+            client.send_text_nowait(text)
+
+    async def _handle_counter_ws(self, reader, writer):
+        connection = await ws_protocol.accept(reader, writer)
+        if connection is None:
+            return
+        self.counter_clients.add(connection)
+        try:
+            for counter in ('follows', 'subs'):
+                await connection.send_text(json.dumps(self._counter_message(counter, initial=True)))
+            await self._drain_until_closed(connection)
+        finally:
+            self.counter_clients.discard(connection)
+
+    async def _handle_config_ws(self, reader, writer):
+        connection = await ws_protocol.accept(reader, writer)
+        if connection is None:
+            return
+        self.config_clients.add(connection)
+        try:
+            await connection.send_text(json.dumps({'type': 'config', 'config': self.overlay_config}))
+            await self._drain_until_closed(connection)
+        finally:
+            self.config_clients.discard(connection)
+
+    async def _drain_until_closed(self, connection):
+        """Ignore les messages entrants jusqu'à la fermeture"""
+        try:
+            while True:
+                await connection.recv()
+        except ws_protocol.WebSocketClosed:
+            pass
+
+    # ------------------------------------------------------------------
+    # Connexions
+    # ------------------------------------------------------------------
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except (HttpError, ValueError, asyncio.IncompleteReadError):
+                    break
+                if message is None:
+                    break
+
+                request_line, headers, body = message
+                parts = request_line.split(' ')
+                method = parts[0] if parts else ''
+                path = parts[1].split('?', 1)[0] if len(parts) > 1 else '/'
+
+                trace_id = headers.get(TRACE_HEADER.lower())
+                self._traces = [_trace(trace_id)] if trace_id else []
+                response_headers = {'Content-Type': 'application/json; charset=utf-8', 'Connection': 'keep-alive'}
+                if trace_id:
+                    response_headers[TRACE_HEADER] = trace_id
+
+                handler = self._routes.get((method, path))
+                if handler is None:
+                    status, payload = 404, {'error': 'Not found'}
+                else:
+                    try:
+                        status, payload = handler(decode_json(body))
+                    except Exception as e:
+                        logger.error(f"❌ Erreur stub {method} {path}: {e}")
+                        status, payload = 500, {'error': str(e)}
+                    finally:
+                        self._traces = []
+                self.requests_handled += 1
+                if self.latency > 0:
+                    await asyncio.sleep(self.latency)
+
+                writer.write(encode_message(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                    response_headers,
+                    json.dumps(payload).encode('utf-8')
+                ))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur stub des endpoints compteurs")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--batch-delay', type=float, default=0.0,
+                        help="Délai d'application des add/remove (secondes)")
+    parser.add_argument('--ws-counter-port', type=int, default=8083)
+    parser.add_argument('--ws-config-port', type=int, default=8084)
+    parser.add_argument('--startup-delay', type=float, default=0.0,
+                        help="Attente avant l'écoute, comme le démarrage de server.js (secondes)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.startup_delay > 0:
+        import time
+        time.sleep(args.startup_delay)
+    loop = asyncio.get_event_loop()
+    stub = StubServer(args.host, args.port, args.batch_delay, args.ws_counter_port, args.ws_config_port)
+    loop.run_until_complete(stub.start())
+    print(f"🧪 Serveur stub en écoute sur {stub.url} (Ctrl+C pour arrêter)")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(stub.stop())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Traces de bout en bout : où passe la latence d'une action OBS
+Compatible Python 3.6+
+
+Envoie des actions tracées (header X-Trace-Id, comme
+api_call_with_retry et OverlayConfigManager) à un serveur local ou au
+serveur stub, écoute les WebSockets compteurs (8083) et config (8084)
+avec tracing.TraceListener, puis exporte les spans en JSON avec la
+répartition du budget de latence :
+
+    obs.callback -> http.to_server -> server.queue -> server.broadcast -> ws.delivery
+
+Actions (une à la fois, la suivante part après réception du broadcast) :
+- follow : POST /admin/add-follows (batching serveur compris)
+- set    : POST /api/update-follows (valeur absolue, diffusion immédiate)
+- font   : POST /api/overlay-config
+
+Sur un serveur réel, les compteurs et la config overlay sont restaurés
+à la fin (sauf --no-restore).
+
+Usage (depuis obs/):
+    python -m bench.trace_report --stub --actions 200
+    python -m bench.trace_report --actions 50 -o traces.json   # serveur réel
+"""
+
+import asyncio
+import json
+import logging
+
+from async_http import HttpConnection
+from tracing import Tracer, TraceListener, summarize
+
+from . import ws_protocol
+from .stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+ACTION_KINDS = ('follow', 'set', 'font')
+
+
+class TraceBenchmark:
+    """Actions tracées contre un serveur + écoute des broadcasts
+
+    Args:
+        url (str): Serveur HTTP
+        counter_ws (str): WebSocket compteurs
+        config_ws (str): WebSocket config
+        timeout (float): Attente max du broadcast d'une action (s)
+    """
+
+    def __init__(self, url, counter_ws, config_ws, timeout=5.0):
+        self.url = url
+        self.ws_urls = [counter_ws, config_ws]
+        self.timeout = timeout
+        self.tracer = Tracer()
+        self.listener = TraceListener(self.tracer)
+        self._waiting = {}
+        self._connections = []
+        self._readers = []
+
+    async def _read(self, connection):
+        try:
+            while True:
+                closed = self.listener.handle_message(await connection.recv())
+                for trace_id in closed:
+                    event = self._waiting.pop(trace_id, None)
+                    if event is not None:
+                        event.set()
+        except ws_protocol.WebSocketClosed:
+            pass
+
+    async def connect(self):
+        loop = asyncio.get_event_loop()
+        for url in self.ws_urls:
+            connection = await ws_protocol.connect(url)
+            self._connections.append(connection)
+            self._readers.append(loop.create_task(self._read(connection)))
+
+    async def close(self):
+        for connection in self._connections:
+            connection.close()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+
+    async def _action(self, connection, kind, index, base_follows):
+        with self.tracer.trace(f"bench.{kind}") as trace_id:
+            event = self._waiting[trace_id] = asyncio.Event()
+            _, headers = self.tracer.headers(trace_id)
+            if kind == 'follow':
+                method, path, payload = 'POST', '/admin/add-follows', {'amount': 1}
+            elif kind == 'set':
+                method, path, payload = 'POST', '/api/update-follows', {'follows': base_follows + 10000 + index}
+            else:
+                method, path, payload = 'POST', '/api/overlay-config', {
+                    'font': {'family': 'Arial', 'size': f"{32 + index % 40}px", 'weight': 700},
+                    '_bench': {'trace': index},
+                }
+            with self.tracer.request(trace_id):
+                response = await connection.request(method, path, payload, headers)
+        if response.status_code != 200:
+            self._waiting.pop(trace_id, None)
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._waiting.pop(trace_id, None)
+            return False
+
+    async def run(self, actions, kinds=ACTION_KINDS, interval=0.0, restore=True):
+        """Returns: dict: Résumé (tracing.summarize) + actions perdues"""
+        connection = HttpConnection(self.url, timeout=self.timeout)
+        try:
+            current = (await connection.request('GET', '/api/current')).body or {}
+            saved_config = (await connection.request('GET', '/api/overlay-config')).body
+            base_follows = int(current.get('follows') or 0)
+
+            lost = 0
+            for index in range(actions):
+                if not await self._action(connection, kinds[index % len(kinds)], index, base_follows):
+                    lost += 1
+                if interval:
+                    await asyncio.sleep(interval)
+
+            if restore:
+                await asyncio.sleep(self.timeout / 5)  # Batchs encore en attente
+                await connection.request('POST', '/api/update-follows', {'follows': base_follows})
+                if isinstance(saved_config, dict):
+                    await connection.request('POST', '/api/overlay-config', saved_config)
+        finally:
+            connection.close()
+
+        report = summarize(self.tracer.spans())
+        report['actions'] = actions
+        report['lost'] = lost
+        return report
+
+
+async def _run(args):
+    stub = None
+    url, counter_ws, config_ws = args.url, args.counter_ws, args.config_ws
+    if args.stub:
+        stub = StubServer(batch_delay=args.batch_delay, ws_counter_port=0, ws_config_port=0)
+        await stub.start()
+        url, counter_ws, config_ws = stub.url, stub.ws_counter_url, stub.ws_config_url
+
+    benchmark = TraceBenchmark(url, counter_ws, config_ws, timeout=args.timeout)
+    try:
+        await benchmark.connect()
+        await asyncio.sleep(0.1)  # Messages initiaux
+        kinds = tuple(kind.strip() for kind in args.kinds.split(',') if kind.strip())
+        report = await benchmark.run(args.actions, kinds, args.interval, restore=not (args.no_restore or stub))
+        report['stub'] = bool(stub)
+        if args.output:
+            document = benchmark.tracer.export_json(args.output)
+            logger.info(f"📄 {len(document['spans'])} spans écrits: {args.output}")
+        return report
+    finally:
+        await benchmark.close()
+        if stub is not None:
+            await stub.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Traces de bout en bout (action -> overlay)")
+    parser.add_argument('--url', default="http://localhost:8082")
+    parser.add_argument('--counter-ws', default="ws://localhost:8083")
+    parser.add_argument('--config-ws', default="ws://localhost:8084")
+    parser.add_argument('--stub', action='store_true', help="Lancer un serveur stub en mémoire")
+    parser.add_argument('--batch-delay', type=float, default=0.3, help="Batching simulé par le stub (s)")
+    parser.add_argument('--actions', type=int, default=60)
+    parser.add_argument('--kinds', default=','.join(ACTION_KINDS), help="Actions alternées (follow,set,font)")
+    parser.add_argument('--interval', type=float, default=0.0, help="Pause entre deux actions (s)")
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--no-restore', action='store_true')
+    parser.add_argument('-o', '--output', help="Fichier JSON des spans (+ résumé)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.kinds.split(',')) - set(ACTION_KINDS)
+    if unknown:
+        parser.error(f"Actions inconnues: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    loop = asyncio.get_event_loop()
+    print(json.dumps(loop.run_until_complete(_run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
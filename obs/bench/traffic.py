@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Enregistrement et rejeu du trafic réel de server.js
+Compatible Python 3.6+
+
+Enregistrement (TrafficRecorder) :
+- abonné aux WebSockets compteurs (8083) et config (8084), chaque
+  message reçu est horodaté (horloge monotone) dans un journal
+  bench.event_log ; reconnexion automatique si le serveur redémarre
+- mutations HTTP : proxy local (ex. 8092) à placer devant 8082 ; chaque
+  requête autre que GET/HEAD/OPTIONS est journalisée puis transmise
+  telle quelle, la réponse du serveur revient au client
+
+Rejeu (TrafficReplayer), à 1×, N× ou vitesse maximale :
+- les mutations HTTP sont renvoyées dans l'ordre (une à la fois, comme
+  enregistrées) vers un serveur local ou le serveur stub
+- optionnellement, les messages WebSocket enregistrés sont rediffusés
+  sur des ports locaux : les overlays s'y connectent comme à 8083/8084
+  et reçoivent exactement la séquence capturée, sans serveur
+
+Usage (depuis obs/):
+    python -m bench.traffic record -o stream.sclog --proxy-port 8092
+    python -m bench.traffic info stream.sclog
+    python -m bench.traffic replay stream.sclog --speed 4 --url http://localhost:8082
+    python -m bench.traffic replay stream.sclog --speed max --stub
+    python -m bench.traffic replay stream.sclog --http-off --ws-counter-port 9083 --ws-config-port 9084
+    python -m bench.traffic bench --mutations 2000
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from async_http import HttpConnection, HttpError, encode_message, read_message
+
+from . import ws_protocol
+from .event_log import (
+    CHANNEL_CONFIG, CHANNEL_COUNTER, CHANNEL_HTTP, CHANNEL_NAMES,
+    EventLogWriter, decode_http, encode_http, read_events, summarize,
+)
+from .load_test import latency_summary
+from .stub_server import StubServer
+
+logger = logging.getLogger(__name__)
+
+# Méthodes non journalisées par le proxy (lectures)
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Headers recalculés par encode_message
+_HOP_HEADERS = ('content-length', 'transfer-encoding')
+MAX_RECONNECT_DELAY = 10.0
+# Rejeu à vitesse maximale : rendre la main à la boucle tous les N événements
+MAX_SPEED_YIELD_EVERY = 100
+
+
+def _forward_headers(headers):
+    return {name: value for name, value in headers.items() if name not in _HOP_HEADERS}
+
+
+# ==================================================================
+# ENREGISTREMENT
+# ==================================================================
+
+class TrafficRecorder:
+    """Journalise les WebSockets du serveur et les mutations HTTP
+
+    Args:
+        writer (EventLogWriter): Journal de destination
+        counter_ws (str): URL du WebSocket compteurs (None = ignoré)
+        config_ws (str): URL du WebSocket config (None = ignoré)
+        upstream_url (str): Serveur HTTP derrière le proxy (None = pas de proxy)
+        proxy_host (str): Adresse d'écoute du proxy
+        proxy_port (int): Port du proxy (0 = port libre choisi par l'OS)
+        reconnect_delay (float): Délai initial de reconnexion WebSocket (s)
+    """
+
+    def __init__(self, writer, counter_ws="ws://localhost:8083", config_ws="ws://localhost:8084",
+                 upstream_url=None, proxy_host="127.0.0.1", proxy_port=0, reconnect_delay=1.0):
+        self.writer = writer
+        self.streams = [(url, channel) for url, channel in
+                        ((counter_ws, CHANNEL_COUNTER), (config_ws, CHANNEL_CONFIG)) if url]
+        self.upstream_url = upstream_url
+        self.proxy_host = proxy_host
+        self.proxy_port = proxy_port
+        self.reconnect_delay = reconnect_delay
+        self.counts = {name: 0 for name in CHANNEL_NAMES.values()}
+        self.connected = {channel: asyncio.Event() for _, channel in self.streams}
+        self._connections = set()
+        self._tasks = []
+        self._proxy = None
+        self._stopping = False
+
+    @property
+    def proxy_url(self):
+        return f"http://{self.proxy_host}:{self.proxy_port}"
+
+    def _record(self, channel, data):
+        self.writer.write(channel, data)
+        self.counts[CHANNEL_NAMES[channel]] += 1
+
+    async def start(self):
+        loop = asyncio.get_event_loop()
+        self._tasks = [loop.create_task(self._follow(url, channel)) for url, channel in self.streams]
+        if self.upstream_url:
+            self._proxy = await asyncio.start_server(self._handle_proxy, self.proxy_host, self.proxy_port)
+            self.proxy_port = self._proxy.sockets[0].getsockname()[1]
+            logger.info(f"🎙️ Proxy d'enregistrement: {self.proxy_url} -> {self.upstream_url}")
+
+    async def wait_connected(self, timeout=10.0):
+        """Attend que chaque WebSocket suivi soit connecté"""
+        events = [event.wait() for event in self.connected.values()]
+        if events:
+            await asyncio.wait_for(asyncio.gather(*events), timeout)
+
+    async def stop(self):
+        self._stopping = True
+        if self._proxy is not None:
+            self._proxy.close()
+            await self._proxy.wait_closed()
+            self._proxy = None
+        for connection in list(self._connections):
+            connection.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.writer.flush()
+
+    async def _follow(self, url, channel):
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                connection = await ws_protocol.connect(url)
+            except (OSError, HttpError, asyncio.TimeoutError) as e:
+                logger.warning(f"⚠️ WebSocket {url} indisponible ({e}), nouvel essai dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+
+            delay = self.reconnect_delay
+            self._connections.add(connection)
+            self.connected[channel].set()
+            try:
+                while True:
+                    message = await connection.recv()
+                    self._record(channel, message)
+            except ws_protocol.WebSocketClosed:
+                if not self._stopping:
+                    logger.info(f"🔌 WebSocket {url} fermé, reconnexion")
+            finally:
+                self._connections.discard(connection)
+                connection.close()
+
+    async def _handle_proxy(self, reader, writer):
+        upstream = None
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except (HttpError, ValueError, asyncio.IncompleteReadError):
+                    break
+                if message is None:
+                    break
+
+                request_line, headers, body = message
+                method, _, rest = request_line.partition(' ')
+                path = rest.rsplit(' ', 1)[0]
+                if method not in READ_METHODS:
+                    self._record(CHANNEL_HTTP, encode_http(method, path, body))
+
+                if upstream is None:
+                    upstream = await self._open_upstream()
+                upstream[1].write(encode_message(request_line, _forward_headers(headers), body))
+                await upstream[1].drain()
+                response = await read_message(upstream[0])
+                if response is None:
+                    break
+                status_line, response_headers, response_body = response
+                writer.write(encode_message(status_line, _forward_headers(response_headers), response_body))
+                await writer.drain()
+        except (ConnectionError, OSError, HttpError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Proxy: connexion interrompue ({e})")
+        finally:
+            if upstream is not None:
+                upstream[1].close()
+            writer.close()
+
+    async def _open_upstream(self):
+        connection = HttpConnection(self.upstream_url)
+        return await asyncio.open_connection(connection.host, connection.port)
+
+
+async def record(recorder, duration=None):
+    """Enregistre pendant `duration` secondes (None = jusqu'à annulation)"""
+    await recorder.start()
+    try:
+        if duration:
+            await asyncio.sleep(duration)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await recorder.stop()
+
+
+# ==================================================================
+# REJEU
+# ==================================================================
+
+class ReplayBroadcaster:
+    """Ports WebSocket locaux rediffusant les messages enregistrés"""
+
+    def __init__(self, host="127.0.0.1", counter_port=None, config_port=None):
+        self.host = host
+        self.ports = {CHANNEL_COUNTER: counter_port, CHANNEL_CONFIG: config_port}
+        self.clients = {CHANNEL_COUNTER: set(), CHANNEL_CONFIG: set()}
+        self._servers = []
+        self._client_joined = asyncio.Event()
+
+    def url(self, channel):
+        return f"ws://{self.host}:{self.ports[channel]}"
+
+    async def start(self):
+        for channel, port in self.ports.items():
+            if port is None:
+                continue
+            server = await asyncio.start_server(
+                lambda reader, writer, channel=channel: self._handle(channel, reader, writer), self.host, port
+            )
+            self.ports[channel] = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+            logger.info(f"📡 Rediffusion {CHANNEL_NAMES[channel]}: {self.url(channel)}")
+
+    def serves(self, channel):
+        return self.ports.get(channel) is not None
+
+    def client_count(self):
+        return sum(len(clients) for clients in self.clients.values())
+
+    async def wait_clients(self, count, timeout=None):
+        """Attend `count` overlays connectés avant de démarrer le rejeu"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.client_count() < count:
+            self._client_joined.clear()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError()
+            await asyncio.wait_for(self._client_joined.wait(), remaining)
+
+    def broadcast(self, channel, text):
+        for client in list(self.clients[channel]):
+            client.send_text_nowait(text)
+
+    async def stop(self):
+        for clients in self.clients.values():
+            for client in list(clients):
+                client.close()
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+
+    async def _handle(self, channel, reader, writer):
+        connection = await ws_protocol.accept(reader, writer)
+        if connection is None:
+            return
+        self.clients[channel].add(connection)
+        self._client_joined.set()
+        try:
+            while True:
+                await connection.recv()
+        except ws_protocol.WebSocketClosed:
+            pass
+        finally:
+            self.clients[channel].discard(connection)
+
+
+class TrafficReplayer:
+    """Rejoue un journal de trafic
+
+    Args:
+        events (list): Event du journal (bench.event_log)
+        speed (float): 1.0 = temps réel, N = N fois plus vite, None/0 = maximum
+        target_url (str): Serveur recevant les mutations HTTP (None = non rejouées)
+        broadcaster (ReplayBroadcaster): Rediffusion WebSocket (None = non rediffusés)
+    """
+
+    def __init__(self, events, speed=1.0, target_url=None, broadcaster=None):
+        self.events = events
+        self.speed = speed or None
+        self.target_url = target_url
+        self.broadcaster = broadcaster
+
+    async def run(self):
+        """Returns: dict: Rapport (événements envoyés, erreurs, retard sur l'horaire)"""
+        connection = HttpConnection(self.target_url) if self.target_url else None
+        sent = {name: 0 for name in CHANNEL_NAMES.values()}
+        skipped = 0
+        http_errors = 0
+        lags = []
+        loop = asyncio.get_event_loop()
+        first = self.events[0].offset if self.events else 0.0
+        started = loop.time()
+
+        try:
+            for index, event in enumerate(self.events):
+                if self.speed:
+                    due = started + (event.offset - first) / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    lags.append(max(0.0, loop.time() - due))
+                elif index % MAX_SPEED_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+
+                if event.channel == CHANNEL_HTTP:
+                    if connection is None:
+                        skipped += 1
+                        continue
+                    method, path, body = decode_http(event.data)
+                    try:
+                        response = await connection.request(method, path, body if body else None)
+                        if response.status_code >= 400:
+                            http_errors += 1
+                    except (OSError, HttpError, asyncio.TimeoutError) as e:
+                        http_errors += 1
+                        logger.warning(f"⚠️ Rejeu {method} {path}: {e}")
+                elif self.broadcaster is not None and self.broadcaster.serves(event.channel):
+                    self.broadcaster.broadcast(event.channel, event.data.decode('utf-8'))
+                else:
+                    skipped += 1
+                    continue
+                sent[CHANNEL_NAMES.get(event.channel, str(event.channel))] += 1
+        finally:
+            if connection is not None:
+                connection.close()
+
+        elapsed = loop.time() - started
+        recorded = (self.events[-1].offset - first) if self.events else 0.0
+        return {
+            'speed': self.speed or 'max',
+            'events': len(self.events),
+            'sent': sent,
+            'skipped': skipped,
+            'http_errors': http_errors,
+            'recorded_duration_s': round(recorded, 3),
+            'elapsed_s': round(elapsed, 3),
+            'effective_speed': round(recorded / elapsed, 2) if elapsed > 0 else None,
+            'events_per_s': round(len(self.events) / elapsed, 1) if elapsed > 0 else None,
+            'schedule_lag_ms': latency_summary(lags),
+        }
+
+
+# ==================================================================
+# BENCHMARK (enregistrement puis rejeu sur serveurs stub)
+# ==================================================================
+
+async def _generate_traffic(url, mutations):
+    """Même mélange que les boutons OBS : add/remove, set, config overlay"""
+    connection = HttpConnection(url)
+    try:
+        for index in range(mutations):
+            kind = index % 10
+            if kind < 4:
+                await connection.request('POST', '/admin/add-follows', {'amount': 1 + index % 3})
+            elif kind < 6:
+                await connection.request('POST', '/admin/add-subs', {'amount': 1})
+            elif kind == 6:
+                await connection.request('POST', '/admin/remove-follows', {'amount': 1})
+            elif kind == 7:
+                await connection.request('POST', '/api/update-subs', {'subs': index // 2})
+            else:
+                await connection.request('POST', '/api/overlay-config', {
+                    'font': {'family': 'Arial', 'size': f"{32 + index % 40}px"},
+                    '_bench': {'seq': index},
+                })
+            await connection.request('GET', '/api/current')
+    finally:
+        connection.close()
+
+
+async def _run_benchmark(mutations, compress, speed):
+    source = StubServer(ws_counter_port=0, ws_config_port=0)
+    await source.start()
+    fd, path = tempfile.mkstemp(suffix='.sclog')
+    os.close(fd)
+    try:
+        writer = EventLogWriter.open(path, compress=compress)
+        recorder = TrafficRecorder(writer, source.ws_counter_url, source.ws_config_url, upstream_url=source.url)
+        await recorder.start()
+        await recorder.wait_connected()
+
+        started = time.perf_counter()
+        await _generate_traffic(recorder.proxy_url, mutations)
+        recording_s = time.perf_counter() - started
+        await asyncio.sleep(0.2)  # Derniers broadcasts
+        await recorder.stop()
+        writer.close()
+        await source.stop()
+
+        info = summarize(path)
+        started = time.perf_counter()
+        events = read_events(path)
+        parse_s = time.perf_counter() - started
+
+        results = {'mutations': mutations, 'recording_s': round(recording_s, 3),
+                   'log': info, 'parse_s': round(parse_s, 4)}
+        for label, replay_speed in (('max', None), (f"{speed:g}x", speed)):
+            target = StubServer()
+            await target.start()
+            try:
+                report = await TrafficReplayer(events, replay_speed, target.url).run()
+            finally:
+                await target.stop()
+            report['consistent'] = (
+                (target.follows, target.subs, target.overlay_config)
+                == (source.follows, source.subs, source.overlay_config)
+            )
+            results[f"replay_{label}"] = report
+
+        # Rediffusion WebSocket seule : un overlay doit recevoir toute la séquence
+        broadcaster = ReplayBroadcaster(counter_port=0, config_port=0)
+        await broadcaster.start()
+        overlays = [await ws_protocol.connect(broadcaster.url(channel)) for channel in (CHANNEL_COUNTER, CHANNEL_CONFIG)]
+        received = []
+
+        async def drain(connection):
+            try:
+                while True:
+                    received.append(await connection.recv())
+            except ws_protocol.WebSocketClosed:
+                pass
+
+        readers = [asyncio.get_event_loop().create_task(drain(overlay)) for overlay in overlays]
+        try:
+            await broadcaster.wait_clients(2, timeout=5.0)
+            report = await TrafficReplayer(events, None, broadcaster=broadcaster).run()
+            expected = info['channels']['counter'] + info['channels']['config']
+            deadline = time.monotonic() + 5.0
+            while len(received) < expected and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            report['overlay_received'] = len(received)
+            report['consistent'] = len(received) == expected
+            results['replay_ws_max'] = report
+        finally:
+            await broadcaster.stop()
+            await asyncio.gather(*readers, return_exceptions=True)
+        return results
+    finally:
+        os.remove(path)
+
+
+def benchmark(mutations=2000, compress=True, speed=2.0):
+    """Enregistre `mutations` requêtes via le proxy puis les rejoue (max, N×, WebSockets seuls)"""
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(_run_benchmark(mutations, compress, speed))
+
+
+# ==================================================================
+# CLI
+# ==================================================================
+
+def _parse_speed(value):
+    if value.lower() in ('max', '0'):
+        return None
+    speed = float(value.lower().rstrip('x'))
+    if speed <= 0:
+        raise ValueError(value)
+    return speed
+
+
+async def _replay(args):
+    events = read_events(args.log)
+    broadcaster = None
+    if args.ws_counter_port is not None or args.ws_config_port is not None:
+        broadcaster = ReplayBroadcaster(args.host, args.ws_counter_port, args.ws_config_port)
+        await broadcaster.start()
+    stub = None
+    target_url = None if args.http_off else args.url
+    if args.stub and not args.http_off:
+        stub = StubServer()
+        await stub.start()
+        target_url = stub.url
+    try:
+        if broadcaster is not None and args.wait_clients:
+            logger.info(f"⏳ Attente de {args.wait_clients} overlay(s)...")
+            await broadcaster.wait_clients(args.wait_clients)
+        report = await TrafficReplayer(events, args.speed, target_url, broadcaster).run()
+        if stub is not None:
+            report['final_state'] = {'follows': stub.follows, 'subs': stub.subs}
+        return report
+    finally:
+        if stub is not None:
+            await stub.stop()
+        if broadcaster is not None:
+            await broadcaster.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enregistrement et rejeu du trafic de server.js")
+    commands = parser.add_subparsers(dest='command')
+
+    rec = commands.add_parser('record', help="Enregistrer les WebSockets et les mutations HTTP")
+    rec.add_argument('-o', '--output', required=True, help="Fichier journal (.sclog)")
+    rec.add_argument('--url', default="http://localhost:8082", help="Serveur derrière le proxy")
+    rec.add_argument('--proxy-port', type=int, default=8092, help="Port du proxy (-1 = sans proxy)")
+    rec.add_argument('--counter-ws', default="ws://localhost:8083")
+    rec.add_argument('--config-ws', default="ws://localhost:8084")
+    rec.add_argument('--duration', type=float, default=0, help="Durée en secondes (0 = jusqu'à Ctrl+C)")
+    rec.add_argument('--no-compress', action='store_true')
+
+    rep = commands.add_parser('replay', help="Rejouer un journal")
+    rep.add_argument('log')
+    rep.add_argument('--speed', type=_parse_speed, default=1.0, help="1, 4, 4x... ou max")
+    rep.add_argument('--url', default="http://localhost:8082", help="Serveur recevant les mutations")
+    rep.add_argument('--stub', action='store_true', help="Rejouer les mutations dans un serveur stub")
+    rep.add_argument('--http-off', action='store_true', help="Ne pas rejouer les mutations HTTP")
+    rep.add_argument('--host', default="127.0.0.1")
+    rep.add_argument('--ws-counter-port', type=int, help="Rediffuser le WebSocket compteurs sur ce port")
+    rep.add_argument('--ws-config-port', type=int, help="Rediffuser le WebSocket config sur ce port")
+    rep.add_argument('--wait-clients', type=int, default=0, help="Overlays attendus avant le rejeu")
+
+    info = commands.add_parser('info', help="Résumé d'un journal")
+    info.add_argument('log')
+
+    bench = commands.add_parser('bench', help="Enregistrement + rejeu sur serveurs stub")
+    bench.add_argument('--mutations', type=int, default=2000)
+    bench.add_argument('--speed', type=float, default=2.0, help="Vitesse du rejeu cadencé")
+    bench.add_argument('--no-compress', action='store_true')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    loop = asyncio.get_event_loop()
+
+    if args.command == 'record':
+        writer = EventLogWriter.open(args.output, compress=not args.no_compress)
+        recorder = TrafficRecorder(
+            writer, args.counter_ws, args.config_ws,
+            upstream_url=args.url if args.proxy_port >= 0 else None, proxy_port=max(0, args.proxy_port)
+        )
+        task = loop.create_task(record(recorder, args.duration))
+        try:
+            loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        finally:
+            writer.close()
+        logger.info(f"💾 {writer.records} événement(s) enregistrés dans {args.output}: {recorder.counts}")
+        return 0
+
+    if args.command == 'replay':
+        report = loop.run_until_complete(_replay(args))
+    elif args.command == 'info':
+        report = summarize(args.log)
+    elif args.command == 'bench':
+        report = benchmark(args.mutations, not args.no_compress, args.speed)
+    else:
+        parser.print_help()
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
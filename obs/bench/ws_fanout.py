@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de diffusion WebSocket vers de nombreux overlays
+Compatible Python 3.6+
+
+Ouvre N overlays simulés (chacun connecté au WebSocket compteurs 8083
+et au WebSocket config 8084), déclenche des mutations par les mêmes
+appels HTTP que le script OBS, et mesure pour chaque palier de N :
+- la latence mutation -> réception par client (p50/p95/p99)
+- les messages perdus et les doublons
+
+Chaque mutation porte une valeur unique (valeur de compteur ou marqueur
+`_bench.seq` dans la config) pour l'associer aux messages reçus. Les
+mutations sont envoyées une par une : la suivante part quand tous les
+clients ont reçu la précédente (ou après `timeout`).
+
+Les clients tournent dans la même boucle asyncio : au-delà de quelques
+centaines de clients, une partie de la latence mesurée est côté lecteur.
+
+Usage (depuis obs/):
+    python -m bench.ws_fanout --stub --clients 1,10,100,1000
+    python -m bench.ws_fanout --clients 1,50,200 -o fanout.json   # serveur réel
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from async_http import HttpConnection
+
+from . import ws_protocol
+from .load_test import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# Routes de mutation des compteurs (mêmes appels que le script OBS)
+COUNTER_ROUTES = {
+    'update-follows': "/api/update-follows",  # Valeur absolue, diffusée immédiatement
+    'add-follows': "/admin/add-follows",      # Incrément, diffusé après le batching serveur
+}
+
+# Connexions ouvertes en parallèle pendant la montée en charge
+CONNECT_CONCURRENCY = 100
+
+
+def raise_file_limit(needed):
+    """Augmente la limite de descripteurs si possible (POSIX uniquement)"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError):
+            pass
+
+
+class _Channel:
+    """Suivi des mutations d'un type (compteur ou config) pour un palier"""
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.sent_at = {}      # clé -> heure d'envoi
+        self.arrivals = {}     # clé -> nombre de clients l'ayant reçue
+        self.events = {}       # clé -> asyncio.Event (tous reçus)
+        self.latencies = []
+        self.duplicates = 0
+
+    def expect(self, key):
+        self.arrivals[key] = 0
+        self.events[key] = asyncio.Event()
+        self.sent_at[key] = time.perf_counter()
+
+    def receive(self, key, seen, received_at):
+        """Enregistre la réception de `key` par un client (set `seen`)"""
+        sent = self.sent_at.get(key)
+        if sent is None:
+            return
+        if key in seen:
+            self.duplicates += 1
+            return
+        seen.add(key)
+        self.latencies.append(received_at - sent)
+        self.arrivals[key] += 1
+        if self.arrivals[key] >= self.clients:
+            self.events[key].set()
+
+    def report(self):
+        expected = len(self.sent_at) * self.clients
+        received = sum(self.arrivals.values())
+        return {
+            'mutations': len(self.sent_at),
+            'expected_messages': expected,
+            'received': received,
+            'lost': expected - received,
+            'loss_rate': round((expected - received) / expected, 6) if expected else 0.0,
+            'duplicates': self.duplicates,
+            'latency_ms': latency_summary(self.latencies),
+        }
+
+
+class FanoutBenchmark:
+    """Mesure la diffusion WebSocket pour différents nombres de clients
+
+    Args:
+        base_url (str): URL HTTP du serveur (mutations)
+        counter_ws_url (str): WebSocket compteurs
+        config_ws_url (str): WebSocket config (None = non mesuré)
+        mutations (int): Mutations de chaque type par palier
+        timeout (float): Attente max de la réception d'une mutation (s)
+        counter_route (str): Clé de COUNTER_ROUTES
+    """
+
+    def __init__(self, base_url, counter_ws_url, config_ws_url=None, mutations=20,
+                 timeout=5.0, counter_route='update-follows'):
+        self.base_url = base_url
+        self.counter_ws_url = counter_ws_url
+        self.config_ws_url = config_ws_url
+        self.mutations = mutations
+        self.timeout = timeout
+        self.counter_route = counter_route
+        self._http = HttpConnection(base_url, timeout)
+        self._follows = 0
+        self._config_seq = 0
+
+    async def _reader(self, connection, on_message):
+        try:
+            while True:
+                text = await connection.recv()
+                received_at = time.perf_counter()
+                try:
+                    data = json.loads(text)
+                except ValueError:
+                    continue
+                on_message(data, received_at)
+        except ws_protocol.WebSocketClosed:
+            pass
+
+    async def _open_clients(self, url, count, on_message_factory):
+        semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+        async def open_one():
+            async with semaphore:
+                return await ws_protocol.connect(url, self.timeout)
+
+        results = await asyncio.gather(*(open_one() for _ in range(count)), return_exceptions=True)
+        connections = [result for result in results if isinstance(result, ws_protocol.WebSocketConnection)]
+        failures = len(results) - len(connections)
+        tasks = [
+            asyncio.ensure_future(self._reader(connection, on_message_factory()))
+            for connection in connections
+        ]
+        return connections, tasks, failures
+
+    async def _mutate_counter(self, channel):
+        if self.counter_route == 'add-follows':
+            payload = {'amount': 1}
+            self._follows += 1
+        else:
+            self._follows += 1
+            payload = {'follows': self._follows}
+        channel.expect(self._follows)
+        status, _ = await self._http.request('POST', COUNTER_ROUTES[self.counter_route], payload)
+        return status == 200, self._follows
+
+    async def _mutate_config(self, channel, base_config):
+        self._config_seq += 1
+        config = dict(base_config, _bench={'seq': self._config_seq})
+        channel.expect(self._config_seq)
+        status, _ = await self._http.request('POST', "/api/overlay-config", config)
+        return status == 200, self._config_seq
+
+    async def _wait(self, channel, key):
+        try:
+            await asyncio.wait_for(channel.events[key].wait(), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run_level(self, clients, base_config):
+        """Mesure un palier de `clients` overlays simulés"""
+        counter_channel = _Channel(clients)
+        config_channel = _Channel(clients) if self.config_ws_url else None
+
+        def counter_handler():
+            seen = set()
+
+            def on_message(data, received_at):
+                if data.get('type') == 'follow_update' and not data.get('isInitial'):
+                    counter_channel.receive(data.get('follows'), seen, received_at)
+            return on_message
+
+        def config_handler():
+            seen = set()
+
+            def on_message(data, received_at):
+                if data.get('type') == 'config_update':
+                    seq = ((data.get('config') or {}).get('_bench') or {}).get('seq')
+                    config_channel.receive(seq, seen, received_at)
+            return on_message
+
+        started = time.perf_counter()
+        connections, tasks, failures = await self._open_clients(self.counter_ws_url, clients, counter_handler)
+        if config_channel is not None:
+            config_connections, config_tasks, config_failures = await self._open_clients(
+                self.config_ws_url, clients, config_handler
+            )
+            connections += config_connections
+            tasks += config_tasks
+            failures += config_failures
+        connect_time = time.perf_counter() - started
+
+        # Laisser passer les messages initiaux
+        await asyncio.sleep(0.5)
+
+        http_errors = 0
+        try:
+            for _ in range(self.mutations):
+                ok, key = await self._mutate_counter(counter_channel)
+                if not ok:
+                    http_errors += 1
+                await self._wait(counter_channel, key)
+
+                if config_channel is not None:
+                    ok, key = await self._mutate_config(config_channel, base_config)
+                    if not ok:
+                        http_errors += 1
+                    await self._wait(config_channel, key)
+            # Dernière chance pour les doublons tardifs
+            await asyncio.sleep(0.2)
+        finally:
+            for connection in connections:
+                connection.close()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        result = {
+            'clients': clients,
+            'connect_s': round(connect_time, 3),
+            'connect_failures': failures,
+            'http_errors': http_errors,
+            'counter': counter_channel.report(),
+        }
+        if config_channel is not None:
+            result['config'] = config_channel.report()
+        return result
+
+    async def run(self, levels, restore=True):
+        """Exécute tous les paliers et retourne le rapport"""
+        status, current = await self._http.request('GET', "/api/current")
+        if status != 200:
+            raise RuntimeError(f"/api/current a répondu {status}")
+        initial_follows = current['follows']
+        self._follows = initial_follows
+        status, base_config = await self._http.request('GET', "/api/overlay-config")
+        base_config = base_config if status == 200 and isinstance(base_config, dict) else {}
+        base_config.pop('_bench', None)
+
+        results = []
+        try:
+            for clients in levels:
+                result = await self.run_level(clients, base_config)
+                results.append(result)
+                counter = result['counter']
+                logger.info(
+                    f"📡 {clients} client(s): p50={counter['latency_ms']['p50']}ms "
+                    f"p99={counter['latency_ms']['p99']}ms perdus={counter['lost']} doublons={counter['duplicates']}"
+                )
+        finally:
+            if restore:
+                await self._http.request('POST', "/admin/set-follows", {'count': initial_follows})
+                if self.config_ws_url:
+                    await self._http.request('POST', "/api/overlay-config", base_config)
+            self._http.close()
+
+        return {
+            'target': self.base_url,
+            'counter_ws': self.counter_ws_url,
+            'config_ws': self.config_ws_url,
+            'counter_route': self.counter_route,
+            'mutations_per_level': self.mutations,
+            'started_at': time.time(),
+            'levels': results,
+        }
+
+
+async def _run_with_target(args, levels):
+    stub = None
+    url, counter_ws, config_ws = args.url, args.counter_ws, args.config_ws
+    if args.stub:
+        from .stub_server import StubServer
+        stub = StubServer(batch_delay=args.batch_delay, ws_counter_port=0, ws_config_port=0)
+        await stub.start()
+        url, counter_ws, config_ws = stub.url, stub.ws_counter_url, stub.ws_config_url
+    try:
+        benchmark = FanoutBenchmark(
+            url, counter_ws, None if args.no_config else config_ws,
+            mutations=args.mutations, timeout=args.timeout, counter_route=args.counter_route
+        )
+        report = await benchmark.run(levels, restore=not args.no_restore)
+        report['stub'] = bool(stub)
+        return report
+    finally:
+        if stub is not None:
+            await stub.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de diffusion WebSocket (fan-out)")
+    parser.add_argument('--url', default="http://localhost:8082")
+    parser.add_argument('--counter-ws', default="ws://localhost:8083")
+    parser.add_argument('--config-ws', default="ws://localhost:8084")
+    parser.add_argument('--no-config', action='store_true', help="Ne pas mesurer le WebSocket config")
+    parser.add_argument('--stub', action='store_true', help="Lancer un serveur stub en mémoire")
+    parser.add_argument('--batch-delay', type=float, default=0.1, help="Batching simulé par le stub (s)")
+    parser.add_argument('--clients', default="1,10,100,1000", help="Paliers de clients (ex. 1,10,100)")
+    parser.add_argument('--mutations', type=int, default=20, help="Mutations de chaque type par palier")
+    parser.add_argument('--counter-route', default='update-follows', choices=sorted(COUNTER_ROUTES))
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--no-restore', action='store_true')
+    parser.add_argument('-o', '--output', help="Fichier du rapport JSON (défaut: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    levels = [int(value) for value in args.clients.split(',') if value.strip()]
+    if not levels or min(levels) < 1:
+        parser.error("--clients doit contenir des entiers >= 1")
+    # Chaque overlay = 2 sockets (+ côté serveur si stub)
+    raise_file_limit(max(levels) * (4 if args.stub else 2) + 256)
+
+    loop = asyncio.get_event_loop()
+    report = loop.run_until_complete(_run_with_target(args, levels))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"📄 Rapport écrit: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
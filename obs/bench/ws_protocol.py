@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket (RFC 6455) minimal sur asyncio : client et poignée de main serveur
+Compatible Python 3.6+
+
+Juste ce qu'il faut pour simuler des centaines d'overlays (messages
+texte, ping/pong, fermeture) sans dépendance externe.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from urllib.parse import urlsplit
+
+from async_http import HttpError, encode_message, read_message
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Taille maximale d'un message accepté
+MAX_MESSAGE_SIZE = 4 * 1024 * 1024
+
+
+class WebSocketClosed(Exception):
+    """La connexion WebSocket est fermée"""
+
+
+def accept_key(key):
+    """Valeur de Sec-WebSocket-Accept pour une Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + WS_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def encode_frame(opcode, payload, mask=False):
+    """Encode une trame finale (les clients doivent masquer leurs trames)"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return bytes(header) + payload
+
+
+async def read_frame(reader):
+    """Lit une trame
+
+    Returns:
+        tuple: (fin, opcode, payload)
+    """
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', await reader.readexactly(8))[0]
+    if length > MAX_MESSAGE_SIZE:
+        raise WebSocketClosed(f"Trame trop volumineuse ({length} octets)")
+
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length) if length else b''
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+class WebSocketConnection:
+    """Connexion WebSocket établie (côté client ou serveur)"""
+
+    def __init__(self, reader, writer, is_client):
+        self.reader = reader
+        self.writer = writer
+        self.is_client = is_client
+        self.closed = False
+
+    async def recv(self):
+        """Retourne le prochain message (str ou bytes), répond aux pings
+
+        Raises:
+            WebSocketClosed: Si la connexion est fermée
+        """
+        fragments = []
+        message_opcode = None
+        while True:
+            try:
+                fin, opcode, payload = await read_frame(self.reader)
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                self.closed = True
+                raise WebSocketClosed(str(e))
+
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                if not self.closed:
+                    await self._send_frame(OP_CLOSE, payload[:2])
+                self.close()
+                raise WebSocketClosed("Fermeture demandée par le pair")
+
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                data = b''.join(fragments)
+                return data.decode('utf-8') if message_opcode == OP_TEXT else data
+
+    async def send_text(self, text):
+        await self._send_frame(OP_TEXT, text.encode('utf-8'))
+
+    async def _send_frame(self, opcode, payload):
+        if self.closed:
+            raise WebSocketClosed("Connexion fermée")
+        try:
+            self.writer.write(encode_frame(opcode, payload, mask=self.is_client))
+            await self.writer.drain()
+        except ConnectionError as e:
+            self.closed = True
+            raise WebSocketClosed(str(e))
+
+    def send_text_nowait(self, text):
+        """Envoi sans attendre le drain (diffusion côté serveur)"""
+        if not self.closed:
+            self.writer.write(encode_frame(OP_TEXT, text.encode('utf-8')))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(OP_CLOSE, struct.pack('!H', 1000), mask=self.is_client))
+        except Exception:
+            pass
+        self.writer.close()
+
+
+async def connect(url, timeout=10.0):
+    """Ouvre une connexion WebSocket client (ws:// uniquement)"""
+    parts = urlsplit(url)
+    host = parts.hostname or 'localhost'
+    port = parts.port or 80
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    request = encode_message(f"GET {parts.path or '/'} HTTP/1.1", {
+        'Host': f"{host}:{port}",
+        'Upgrade': 'websocket',
+        'Connection': 'Upgrade',
+        'Sec-WebSocket-Key': key,
+        'Sec-WebSocket-Version': '13',
+    })
+    writer.write(request)
+    await writer.drain()
+
+    response = await asyncio.wait_for(read_message(reader), timeout)
+    if response is None or ' 101 ' not in response[0] + ' ':
+        writer.close()
+        raise HttpError(f"Handshake WebSocket refusé: {response[0] if response else 'connexion fermée'}")
+    if response[1].get('sec-websocket-accept') != accept_key(key):
+        writer.close()
+        raise HttpError("Sec-WebSocket-Accept invalide")
+    return WebSocketConnection(reader, writer, is_client=True)
+
+
+async def accept(reader, writer):
+    """Poignée de main côté serveur
+
+    Returns:
+        WebSocketConnection ou None si la requête n'est pas un upgrade valide
+    """
+    try:
+        request = await read_message(reader)
+    except (HttpError, ValueError, asyncio.IncompleteReadError):
+        request = None
+    key = request[1].get('sec-websocket-key') if request else None
+    if not key or request[1].get('upgrade', '').lower() != 'websocket':
+        writer.close()
+        return None
+
+    writer.write((
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+    ).encode('latin-1'))
+    await writer.drain()
+    return WebSocketConnection(reader, writer, is_client=False)
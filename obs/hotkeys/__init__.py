@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raccourcis clavier OBS pour SubCount Auto
+Actions déposées sans bloquer OBS, envoyées regroupées en arrière-plan
+"""
+
+from .bindings import HOTKEYS, HotkeyBindings
+from .sender import ActionSender
+
+__all__ = ['HOTKEYS', 'ActionSender', 'HotkeyBindings']
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raccourcis clavier OBS (Paramètres > Raccourcis clavier)
+Compatible Python 3.6+
+
+Enregistre des raccourcis « frontend » via l'API hotkeys d'OBS. Les
+touches choisies par l'utilisateur sont sauvegardées dans les
+paramètres du script (script_save) et rechargées au chargement.
+Les callbacks ne font que déposer l'action dans un ActionSender.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (nom du raccourci et clé des paramètres, libellé, action, quantité)
+# quantité None : action sans quantité (dédupliquée par l'ActionSender)
+HOTKEYS = (
+    ("subcount_follow_add", "SubCount : +1 follow", "follows", 1),
+    ("subcount_follow_remove", "SubCount : -1 follow", "follows", -1),
+    ("subcount_sub_add", "SubCount : +1 sub", "subs", 1),
+    ("subcount_sub_remove", "SubCount : -1 sub", "subs", -1),
+    ("subcount_sync", "SubCount : synchroniser avec Twitch", "sync", None),
+    ("subcount_apply_preset", "SubCount : appliquer le preset overlay sélectionné", "preset", None),
+)
+
+
+class HotkeyBindings:
+    """Raccourcis enregistrés dans OBS et leur persistance
+
+    Args:
+        obs_module: Module `obspython` (ou un stub pour les tests)
+        sender (ActionSender): Destination des actions
+        hotkeys (tuple): Définitions (voir HOTKEYS)
+    """
+
+    def __init__(self, obs_module, sender, hotkeys=HOTKEYS):
+        self.obs = obs_module
+        self.sender = sender
+        self.hotkeys = hotkeys
+        self._registered = {}  # nom -> (id OBS, callback)
+
+    def _callback(self, action, amount):
+        sender = self.sender
+
+        def on_hotkey(pressed):
+            # Une action par appui ; le relâchement et le maintien n'ajoutent rien
+            if pressed:
+                sender.submit(action, amount)
+        return on_hotkey
+
+    def register(self, settings):
+        """Enregistre les raccourcis et recharge les touches sauvegardées"""
+        obs = self.obs
+        for name, description, action, amount in self.hotkeys:
+            if name in self._registered:
+                continue
+            callback = self._callback(action, amount)
+            hotkey_id = obs.obs_hotkey_register_frontend(name, description, callback)
+            self._registered[name] = (hotkey_id, callback)
+
+            saved = obs.obs_data_get_array(settings, name)
+            if saved:
+                try:
+                    obs.obs_hotkey_load(hotkey_id, saved)
+                finally:
+                    obs.obs_data_array_release(saved)
+        return len(self._registered)
+
+    def save(self, settings):
+        """Sauvegarde les touches choisies dans les paramètres du script"""
+        obs = self.obs
+        for name, (hotkey_id, _) in self._registered.items():
+            bindings = obs.obs_hotkey_save(hotkey_id)
+            if not bindings:
+                continue
+            try:
+                obs.obs_data_set_array(settings, name, bindings)
+            finally:
+                obs.obs_data_array_release(bindings)
+
+    def unregister(self):
+        """Retire les raccourcis d'OBS (déchargement du script)"""
+        for hotkey_id, callback in self._registered.values():
+            try:
+                self.obs.obs_hotkey_unregister(callback)
+            except Exception as e:
+                logger.debug(f"Raccourci {hotkey_id} non retiré: {e}")
+        self._registered.clear()
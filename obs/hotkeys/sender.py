@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Envoi en arrière-plan des actions clavier, regroupées
+Compatible Python 3.6+
+
+Les callbacks de raccourcis (et les boutons du script) ne font que
+déposer l'action ; un thread unique les envoie :
+- les ajustements d'un même compteur s'additionnent (+1 +1 -1 -> +1) ;
+  un total nul n'envoie rien
+- une synchro ou un preset demandés plusieurs fois ne partent qu'une fois
+- les actions déposées pendant un envoi partent ensemble au suivant
+
+Seuls les appuis réels sont comptés : une touche maintenue n'ajoute rien
+de plus (OBS ne répète pas les raccourcis, et une répétition simulée
+continuerait indéfiniment si le relâchement était perdu).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ActionSender:
+    """File d'actions regroupées, envoyées par un thread d'arrière-plan
+
+    Args:
+        send (callable): send(action, amount) — amount est le total signé
+            pour un compteur, None pour une action sans quantité
+        window (float): Attente après la première action d'un lot (s),
+            pour regrouper une rafale d'appuis
+        min_interval (float): Écart minimal entre deux lots (s) : pendant
+            une rafale, les appuis s'accumulent au lieu de partir un par un
+    """
+
+    def __init__(self, send, window=0.05, min_interval=0.25, clock=time.monotonic):
+        self.send = send
+        self.window = window
+        self.min_interval = min_interval
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()  # action -> total (ou None)
+        self._first_pending = None     # Horodatage de la plus ancienne action en attente
+        self._thread = None
+        self._stopping = False
+        self._sending = False
+        self._last_batch = float('-inf')
+        self.stats = {'submitted': 0, 'batches': 0, 'requests': 0, 'cancelled_out': 0,
+                      'errors': 0, 'max_wait': 0.0}
+
+    # ------------------------------------------------------------------
+    # Dépôt (thread OBS / thread des raccourcis : ne bloque jamais)
+    # ------------------------------------------------------------------
+
+    def _add(self, action, amount):
+        """Ajoute une action en attente (verrou tenu)"""
+        if amount is None:
+            self._pending[action] = None
+        else:
+            self._pending[action] = (self._pending.get(action) or 0) + amount
+        if self._first_pending is None:
+            self._first_pending = self._clock()
+
+    def submit(self, action, amount=None):
+        """Dépose une action (amount: variation d'un compteur, None sinon)"""
+        with self._condition:
+            self._add(action, amount)
+            self.stats['submitted'] += 1
+            self._condition.notify()
+
+    def pending(self):
+        with self._condition:
+            return dict(self._pending)
+
+    def idle(self):
+        """Rien en attente, aucun envoi en cours"""
+        with self._condition:
+            return not (self._pending or self._sending)
+
+    # ------------------------------------------------------------------
+    # Thread d'envoi
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="hotkey-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Envoie ce qui est en attente puis arrête le thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_batch(self):
+        """Attend puis retire le prochain lot (None à l'arrêt sans rien en attente)"""
+        with self._condition:
+            while not (self._pending or self._stopping):
+                self._condition.wait()
+
+            if not self._pending:
+                return None
+            # Regrouper la suite de la rafale (et pas plus d'un lot par min_interval)
+            deadline = max(self._first_pending + self.window, self._last_batch + self.min_interval)
+            while not self._stopping:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch, self._pending = self._pending, OrderedDict()
+            self._sending = True
+            self._last_batch = self._clock()
+            waited, self._first_pending = self._last_batch - self._first_pending, None
+            self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self.stats['batches'] += 1
+            for action, amount in batch.items():
+                if amount == 0:
+                    self.stats['cancelled_out'] += 1
+                    continue
+                self.stats['requests'] += 1
+                try:
+                    self.send(action, amount)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"❌ Action '{action}' non envoyée: {e}")
+            with self._condition:
+                self._sending = False
+                if self._stopping and not self._pending:
+                    return
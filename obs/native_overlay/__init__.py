@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rendu natif des compteurs dans des sources Texte OBS
+Alternative légère aux sources navigateur (CEF) overlay.html
+"""
+
+from .counter_feed import CounterFeed
+from .text_renderer import TextSourceRenderer, format_goal_text, format_milestone_text
+
+__all__ = ['CounterFeed', 'TextSourceRenderer', 'format_goal_text', 'format_milestone_text']
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Flux des compteurs en direct depuis le WebSocket du serveur (port 8083)
+Compatible Python 3.6+
+
+Maintient le dernier état follows/subs (valeur + objectif) reçu via les
+messages `follow_update` / `sub_update`, dans un thread d'arrière-plan.
+"""
+
+import json
+import logging
+import threading
+
+# Import conditionnel de websocket-client
+try:
+    import websocket
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+    print("⚠️ Module websocket-client non disponible - rendu natif des compteurs désactivé")
+
+logger = logging.getLogger(__name__)
+
+# Type de message WebSocket -> clé du compteur
+MESSAGE_TYPES = {
+    'follow_update': 'follows',
+    'sub_update': 'subs',
+}
+
+
+class CounterFeed:
+    """Écoute les mises à jour de compteurs et expose un état versionné"""
+
+    def __init__(self, ws_url="ws://localhost:8083", reconnect_delay=1.0, max_reconnect_delay=10.0):
+        self.ws_url = ws_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._lock = threading.Lock()
+        self._state = {}
+        self._version = 0
+        self._listeners = []
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # État
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self):
+        """Numéro incrémenté à chaque changement d'état"""
+        return self._version
+
+    def snapshot(self):
+        """Retourne (version, état) - état: {'follows': goal, 'subs': goal}
+
+        Chaque goal a le format du serveur: {current, target, message, isMaxReached}
+        """
+        with self._lock:
+            return self._version, dict(self._state)
+
+    def add_listener(self, callback):
+        """Enregistre un callback(counter, goal) appelé à chaque changement"""
+        self._listeners.append(callback)
+
+    def handle_message(self, raw):
+        """Traite un message brut du WebSocket compteurs
+
+        Returns:
+            bool: True si l'état a changé
+        """
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return False
+
+        counter = MESSAGE_TYPES.get(data.get('type'))
+        goal = data.get('goal')
+        if counter is None or not isinstance(goal, dict):
+            return False
+
+        with self._lock:
+            if self._state.get(counter) == goal:
+                return False
+            self._state[counter] = goal
+            self._version += 1
+
+        for callback in list(self._listeners):
+            try:
+                callback(counter, goal)
+            except Exception as e:
+                logger.error(f"Erreur listener compteurs: {e}", exc_info=True)
+        return True
+
+    # ------------------------------------------------------------------
+    # Connexion
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre l'écoute en arrière-plan (reconnexion automatique)"""
+        if not WEBSOCKET_AVAILABLE:
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return True
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="subcount-counter-feed", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=2.0):
+        """Arrête l'écoute et attend la fin du thread"""
+        self._stop.set()
+        app = self._app
+        if app is not None:
+            try:
+                app.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Boucle de connexion avec backoff"""
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            self._app = websocket.WebSocketApp(
+                self.ws_url,
+                on_message=lambda ws, message: self.handle_message(message),
+                on_open=lambda ws: logger.info("✅ Flux compteurs connecté"),
+            )
+            try:
+                self._app.run_forever()
+            except Exception as e:
+                logger.warning(f"⚠️ Flux compteurs interrompu: {e}")
+            self._app = None
+
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 1.5, self.max_reconnect_delay)
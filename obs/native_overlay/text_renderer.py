@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rendu des compteurs dans des sources Texte natives OBS
+Compatible Python 3.6+
+
+Une source Texte (GDI+/FreeType) coûte une simple texture, là où chaque
+source navigateur overlay.html lance un processus Chromium (CEF).
+Les mises à jour ne sont appliquées que si le texte change, avec un
+intervalle minimal par source, et toujours depuis le thread OBS
+(callback de `obs.timer_add`).
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Types de rendu disponibles
+KIND_GOAL = "goal"            # "12/50 : message" (identique à overlay.html)
+KIND_MILESTONE = "milestone"  # Message du palier en cours uniquement
+
+
+def format_goal_text(goal):
+    """Formate un objectif comme overlay.html (displayGoalText)
+
+    Args:
+        goal (dict): {current, target, message, isMaxReached}
+    """
+    current = goal.get('current', 0)
+    if goal.get('isMaxReached'):
+        return str(current)
+
+    message = (goal.get('message') or '').strip()
+    if not message:
+        return f"{current}/{goal.get('target', 0)}"
+    return f"{current}/{goal.get('target', 0)} : {message}"
+
+
+def format_milestone_text(goal):
+    """Retourne le message du prochain palier (vide si aucun)"""
+    if goal.get('isMaxReached'):
+        return ''
+    return (goal.get('message') or '').strip()
+
+
+FORMATTERS = {
+    KIND_GOAL: format_goal_text,
+    KIND_MILESTONE: format_milestone_text,
+}
+
+# Compteur du flux -> type de paliers du moteur d'objectifs
+GOAL_KINDS = {
+    'follows': 'follow',
+    'subs': 'sub',
+}
+
+
+class TextSourceRenderer:
+    """Applique l'état des compteurs à des sources Texte OBS
+
+    Args:
+        obs_module: Module `obspython` (ou un stub pour les tests)
+        min_interval (float): Intervalle minimal entre deux mises à jour
+            d'une même source (secondes)
+        goals: Moteur d'objectifs local (goal_engine.GoalEngine). Si fourni,
+            le message du palier vient des fichiers de paliers, relus à
+            chaque rendu s'ils ont changé, plutôt que du message du serveur.
+    """
+
+    def __init__(self, obs_module, min_interval=0.25, clock=time.monotonic, goals=None):
+        self.obs = obs_module
+        self.min_interval = min_interval
+        self.goals = goals
+        self._clock = clock
+        self._bindings = {}     # nom source -> (compteur, type)
+        self._last_text = {}    # nom source -> dernier texte appliqué
+        self._last_update = {}  # nom source -> horodatage dernière mise à jour
+        self._rendered_version = None
+        self._throttled = False
+        self.updates_applied = 0
+
+    def bind(self, source_name, counter, kind=KIND_GOAL):
+        """Associe une source Texte à un compteur
+
+        Args:
+            source_name (str): Nom de la source Texte dans OBS
+            counter (str): 'follows' ou 'subs'
+            kind (str): KIND_GOAL ou KIND_MILESTONE
+        """
+        if kind not in FORMATTERS:
+            raise ValueError(f"Type de rendu invalide: '{kind}'")
+        self._bindings[source_name] = (counter, kind)
+        self._last_text.pop(source_name, None)
+        self._rendered_version = None
+
+    def clear_bindings(self):
+        """Retire toutes les associations"""
+        self._bindings.clear()
+        self._last_text.clear()
+        self._last_update.clear()
+        self._rendered_version = None
+
+    def has_bindings(self):
+        return bool(self._bindings)
+
+    def render(self, state, version=None):
+        """Met à jour les sources dont le texte a changé (thread OBS uniquement)
+
+        Args:
+            state (dict): {'follows': goal, 'subs': goal}
+            version (int): Version de l'état (CounterFeed.version). Si elle
+                n'a pas changé depuis le dernier rendu complet, rien n'est fait.
+
+        Returns:
+            int: Nombre de sources mises à jour
+        """
+        if self.goals is not None and self.goals.refresh():
+            self._rendered_version = None  # Paliers modifiés : textes recalculés
+
+        if version is not None and version == self._rendered_version and not self._throttled:
+            return 0
+
+        now = self._clock()
+        updated = 0
+        throttled = False
+        complete = True  # Toutes les sources liées ont reçu leur texte
+        for source_name, (counter, kind) in self._bindings.items():
+            goal = state.get(counter)
+            if goal is None:
+                continue
+
+            text = self._format(counter, kind, goal)
+            if self._last_text.get(source_name) == text:
+                continue
+            if now - self._last_update.get(source_name, float('-inf')) < self.min_interval:
+                throttled = True  # Limité : sera appliqué au prochain tick
+                continue
+
+            if self._apply_text(source_name, text):
+                self._last_text[source_name] = text
+                self._last_update[source_name] = now
+                updated += 1
+            else:
+                complete = False  # Source absente : réessayée au prochain tick
+
+        self._throttled = throttled
+        self._rendered_version = version if complete else None
+        self.updates_applied += updated
+        return updated
+
+    def _format(self, counter, kind, goal):
+        """Texte d'une source ; palier recalculé localement si possible"""
+        if kind == KIND_MILESTONE and self.goals is not None and counter in GOAL_KINDS:
+            track = self.goals.track(GOAL_KINDS[counter], refresh=False)
+            if len(track):
+                goal = track.goal_info(goal.get('current', 0))['goal']
+        return FORMATTERS[kind](goal)
+
+    def _apply_text(self, source_name, text):
+        """Écrit le texte dans la source via obs_source_update"""
+        obs = self.obs
+        source = obs.obs_get_source_by_name(source_name)
+        if not source:
+            return False
+
+        settings = obs.obs_data_create()
+        try:
+            obs.obs_data_set_string(settings, "text", text)
+            obs.obs_source_update(source, settings)
+        finally:
+            obs.obs_data_release(settings)
+            obs.obs_source_release(source)
+        return True
@@ -22,18 +22,60 @@ import subprocess
 import os
 import sys
 import time
-import threading
 import logging
 import webbrowser
 import json
 import re
-import winreg  # Pour lire les polices du registre Windows
+import uuid
+from urllib.parse import urlsplit
 
 # Ajouter le répertoire du script au sys.path pour les imports
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # Pointe vers obs/
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)  # Pointe vers la racine du projet
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, "app", "scripts")  # Modules Python partagés
 if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# Résilience des appels serveur (disjoncteur + retry partagés)
+from server_resilience import DEFAULT_RETRY_POLICY, STATE_CLOSED, get_circuit_breaker
+from action_journal import ActionJournal
+# Métriques en processus (histogrammes de latence + endpoint Prometheus localhost)
+from metrics import DEFAULT_METRICS_PORT, REGISTRY as METRICS, MetricsServer
+# Historique compact des compteurs pendant le stream (débits, ETA, rafales)
+from session_series import SessionSeries
+# Paliers follows/subs lus localement (message du palier en rendu natif)
+from goal_engine import GoalEngine
+# Noms de famille lus dans les fichiers de police (table 'name', mmap)
+from font_metadata import FontMetadataCache
+# Sources de polices de la plateforme (registre Windows, dossiers fontconfig...)
+from font_discovery import FALLBACK_FONTS, default_backends, discover_font_families
+# Tâches d'arrière-plan avec jetons d'annulation, arrêt parallèle borné
+from service_manager import ServiceManager, current_token, terminate_processes
+# Traces de bout en bout (X-Trace-Id recopié dans les broadcasts)
+from tracing import TRACER
+# Mutations regroupées en un POST /api/batch (une écriture, un broadcast par compteur)
+from batch_client import BATCH_PATH, BatchTransaction
+# Surveillance mémoire optionnelle (tracemalloc, RSS, threads) pour les longues sessions
+from memory_watchdog import MemoryWatchdog
+# Lancement direct de node server.js (sortie capturée, prêt dès les lignes d'écoute)
+from node_launcher import SERVER_SCRIPT, launch_node_server
+# Sauvegardes incrémentales (état, paliers, config Twitch) dédupliquées par contenu
+from backup_store import PRIMARY_FILES, REASON_PRE_UPDATE, BackupError, BackupStore
+# Synchro Twitch en arrière-plan (intervalle adaptatif, respect du rate limit)
+from sync_scheduler import OUTCOME_RATE_LIMITED, OUTCOME_UNAUTHENTICATED, OUTCOME_UNCHANGED, OUTCOME_UPDATED, TwitchSyncScheduler
+# Instances multiples du serveur (ports, processus, supervision, clients par chaîne)
+from server_instances import (
+    ALL_INSTANCES, PRIMARY_INSTANCE, SUPERVISE_IDLE_INTERVAL, SUPERVISE_INTERVAL,
+    InstancePorts, InstanceRegistry, ServerInstance, parse_instance_specs
+)
+# Validation des valeurs overlay (même schéma que les gestionnaires de config)
+from overlay_config_schema import is_valid_color
+# Boucle asyncio d'arrière-plan partagée (clients HTTP des instances)
+from background_loop import get_background_loop
+# Profil d'activité : tâches de fond ralenties quand OBS ne diffuse ni n'enregistre
+from activity_profile import IDLE, LIVE, PAUSED, ActivityProfile, ProfiledTimer
 
 # Imports optionnels avec gestion d'erreur
 try:
@@ -58,36 +100,107 @@ except ImportError:
     UPDATE_MODULE_AVAILABLE = False
     print("⚠️ Module updater non disponible - vérification des mises à jour désactivée")
 
+# Configuration
+SERVER_DIR = os.path.join(PROJECT_ROOT, "app", "server")
+LOG_FILE = os.path.join(PROJECT_ROOT, "app", "logs", "obs_subcount_auto.log")
+JOURNAL_FILE = os.path.join(PROJECT_ROOT, "obs", "data", "pending_actions.journal")
+PRESETS_FILE = os.path.join(PROJECT_ROOT, "obs", "data", "overlay_presets.json")
+SESSIONS_DIR = os.path.join(PROJECT_ROOT, "obs", "data", "sessions")
+FONT_CACHE_FILE = os.path.join(PROJECT_ROOT, "obs", "data", "font_metadata_cache.json")
+BACKUP_DIR = os.path.join(PROJECT_ROOT, "obs", "data", "backups")
+SERVER_URL = "http://localhost:8082"
+WS_COUNTER_URL = "ws://localhost:8083"
+VERSION = "v3.1.1"
+
+# Journal hors-ligne des actions manuelles (rejouées au retour du serveur)
+try:
+    action_journal = ActionJournal(JOURNAL_FILE)
+except Exception as e:
+    action_journal = None
+    print(f"⚠️ Journal hors-ligne non disponible ({e}) - actions perdues si serveur arrêté")
+
+# Registre des instances : la principale (ports historiques) puis celles
+# déclarées dans les paramètres du script. Le journal hors-ligne ne
+# concerne que l'instance principale.
+server_instances = InstanceRegistry()
+primary_instance = server_instances.add(
+    ServerInstance(PRIMARY_INSTANCE, InstancePorts(8082, 8083, 8084), journal=action_journal)
+)
+
+# Import du rendu natif (sources Texte OBS, sans navigateur CEF)
+try:
+    from native_overlay import CounterFeed, TextSourceRenderer
+    NATIVE_OVERLAY_AVAILABLE = True
+except ImportError:
+    NATIVE_OVERLAY_AVAILABLE = False
+    print("⚠️ Module native_overlay non disponible - rendu texte natif désactivé")
+
+# Raccourcis clavier et boutons : actions regroupées, envoyées en arrière-plan
+from hotkeys import ActionSender, HotkeyBindings
+
 # Import du module de configuration dynamique des overlays
+# (version asyncio : les callbacks de l'interface ne bloquent jamais OBS)
 try:
-    # Ajouter le dossier app/scripts au sys.path pour l'import
-    scripts_path = os.path.join(PROJECT_ROOT, "app", "scripts")
-    if scripts_path not in sys.path:
-        sys.path.insert(0, scripts_path)
-    
-    from overlay_config_manager import OverlayConfigManager
-    overlay_config = OverlayConfigManager()
+    # Le gestionnaire de l'instance importe async_overlay_config_manager
+    overlay_config = primary_instance.overlay_config
     OVERLAY_CONFIG_AVAILABLE = True
 except ImportError:
     OVERLAY_CONFIG_AVAILABLE = False
     print("⚠️ Module overlay_config_manager non disponible - configuration dynamique désactivée")
 
-# Configuration
-START_SERVER_BAT = os.path.join(PROJECT_ROOT, "app", "scripts", "START_SERVER.bat")
-LOG_FILE = os.path.join(PROJECT_ROOT, "app", "logs", "obs_subcount_auto.log")
-SERVER_URL = "http://localhost:8082"
-VERSION = "v3.1.1"
+# Presets de style des overlays (appliqués en une requête, liables aux scènes)
+try:
+    from overlay_presets import OverlayPreset, PresetStore
+    preset_store = PresetStore(PRESETS_FILE)
+    PRESETS_AVAILABLE = OVERLAY_CONFIG_AVAILABLE
+except ImportError:
+    PRESETS_AVAILABLE = False
+    print("⚠️ Module overlay_presets non disponible - presets overlay désactivés")
 
 # Variables globales
 server_process = None
-server_thread = None
+services = ServiceManager()  # Threads du script et arrêts à la fermeture
 is_server_running = False
 update_info = None
 CACHED_FONTS = None  # Cache des polices Windows
+font_metadata = FontMetadataCache(FONT_CACHE_FILE)  # Noms lus par fichier (taille + mtime)
+backup_store = BackupStore(BACKUP_DIR, PROJECT_ROOT)  # Sauvegardes des données utilisateur
 server_health_status = False  # Statut santé du serveur
 global_settings = None  # Settings OBS accessibles globalement
 _refresh_timer = None  # Timer pour le rafraîchissement automatique
 _refresh_attempts = 0  # Compteur de tentatives de refresh
+counter_feed = None  # Flux WebSocket des compteurs (rendu natif + série de session)
+text_renderer = None  # Rendu des sources Texte natives
+goal_engine = GoalEngine(PROJECT_ROOT)  # Paliers de l'instance principale (rechargés si modifiés)
+native_overlay_active = False  # Timer de rendu natif actif
+session_series = None  # Série temporelle follows/subs de la session
+action_sender = None  # Envoi regroupé des actions (raccourcis, boutons)
+hotkey_bindings = None  # Raccourcis clavier enregistrés dans OBS
+
+# Rendu natif : clé de setting -> (compteur, type de rendu "goal" | "milestone")
+NATIVE_TEXT_SOURCES = {
+    "native_follow_source": ("follows", "goal"),
+    "native_follow_milestone_source": ("follows", "milestone"),
+    "native_sub_source": ("subs", "goal"),
+    "native_sub_milestone_source": ("subs", "milestone"),
+}
+NATIVE_RENDER_INTERVAL_MS = 250  # Fréquence max de mise à jour des textes
+NATIVE_RENDER_IDLE_INTERVAL_MS = 1000  # Idem hors direct (aperçu OBS seulement)
+metrics_server = None  # Endpoint Prometheus localhost (optionnel)
+active_preset = None  # Dernier preset overlay appliqué (None après une modification manuelle)
+METRICS_SUMMARY_INTERVAL_MS = 60000  # Résumé des métriques dans le log
+sync_schedulers = {}  # Nom d'instance -> TwitchSyncScheduler
+UNLOAD_DEADLINE = 3.0  # Délai ferme des arrêts dans script_unload (s)
+SERVER_STOP_TIMEOUT = 2.0  # Attente d'un processus serveur avant kill à la fermeture (s)
+AUTO_SYNC_DEFAULT_INTERVAL = 120  # Intervalle nominal de la synchro automatique (s)
+AUTO_SYNC_MAX_INTERVAL = 900  # Intervalle maximal quand rien ne change (s)
+REFRESH_PARAM_PATTERN = re.compile(r'([?&])_refresh=\d+&?')  # Cache-bust des sources navigateur
+memory_watchdog = None  # Surveillance mémoire des longues sessions (optionnelle)
+MEMORY_WATCHDOG_INTERVAL = 300  # Intervalle par défaut des relevés mémoire (s)
+memory_watchdog_interval = MEMORY_WATCHDOG_INTERVAL  # Intervalle choisi (en direct) du watchdog actif
+activity = ActivityProfile()  # En direct / au repos, suivi via les événements frontend OBS
+obs_exiting = False  # OBS se ferme : plus de nouvelles requêtes avant script_unload
+BACKUP_INTERVAL = 3600  # Sauvegarde planifiée des données utilisateur (s)
 
 # Configuration du logging
 logging.basicConfig(
@@ -106,6 +219,12 @@ SILENT_MODE = True
 HTTP_TIMEOUT_SHORT = 5  # Opérations rapides (add/remove)
 HTTP_TIMEOUT_MEDIUM = 10  # Sync Twitch
 HTTP_TIMEOUT_LONG = 30  # Opérations lourdes
+SERVER_START_TIMEOUT = 30  # Attente max de la réponse des instances au démarrage
+
+# Politique de retry unique (la même instance que OverlayConfigManager)
+SERVER_RETRY_POLICY = DEFAULT_RETRY_POLICY
+# Disjoncteur partagé du serveur : fail-fast quand le serveur est arrêté
+server_breaker = get_circuit_breaker(SERVER_URL)
 
 # Map des couleurs CSS pour overlays
 COLOR_MAP = {
@@ -146,11 +265,15 @@ def log_message(message, level="info", force_display=False):
         
         # Le StreamHandler affiche déjà dans la console, pas besoin de print()
 
+@METRICS.timed('subcount_font_scan_seconds', "Durée du scan des polices Windows")
 def get_windows_fonts():
     """
-    Récupère la liste de toutes les polices installées sur Windows (polices mères uniquement, sans variantes)
+    Récupère la liste de toutes les polices installées (polices mères uniquement, sans variantes)
     Utilise un cache pour éviter de recharger les polices à chaque appel
     
+    Les sources dépendent de la plateforme (registre + dossiers Windows,
+    arborescences fontconfig sous Linux, voir font_discovery).
+    
     Returns:
         list: Liste des noms de polices disponibles (sans Bold, Italic, Light, etc.)
     """
@@ -160,168 +283,17 @@ def get_windows_fonts():
     if CACHED_FONTS is not None:
         return CACHED_FONTS
     
-    fonts = set()
-    
-    # Suffixes de variantes à retirer (ordre important: du plus long au plus court)
-    variant_suffixes = [
-        # Composés (les plus longs d'abord)
-        '-BoldItalic', '-SemiBoldItalic', '-LightItalic', '-ExtraBoldItalic',
-        ' Bold Italic', ' Gras Italique', ' Extra Bold', ' Extra Light',
-        ' Semi Bold', ' Demi Bold', ' Ultra Bold', ' Ultra Light',
-        ' Bold Italique', ' Ext Condensed Bold', ' Ultra Bold Condensed',
-        # Simples
-        '-Bold', '-Italic', '-Light', '-Regular', '-Medium', '-Thin', '-Black',
-        '-SemiBold', '-DemiBold', '-ExtraBold', '-ExtraLight', '-Heavy',
-        ' Bold', ' Italic', ' Light', ' Regular', ' Medium', ' Thin', ' Black',
-        ' Heavy', ' SemiBold', ' Semibold', ' DemiBold', ' Demibold',
-        ' ExtraBold', ' ExtraLight', ' UltraLight', ' UltraBold',
-        ' Condensed', ' Extended', ' Narrow', ' Wide', ' Normal', ' Book', ' Roman',
-        ' Oblique', ' Semilight', ' SemiLight',
-        ' Gras', ' Italique', ' Léger', ' Maigre',
-        # Suffixes courts en dernier
-        ' MT', ' ITC', ' LT', ' UI'
-    ]
-    
-    def is_variant_name(name):
-        """Vérifie si le nom indique une variante"""
-        name_lower = name.lower()
-        # Mots qui indiquent une variante quand ils apparaissent
-        variant_words = [
-            'bold', 'italic', 'oblique', 'light', 'thin', 'medium', 'black', 'heavy',
-            'semibold', 'demibold', 'extrabold', 'extralight', 'ultralight', 'ultrabold',
-            'semilight', 'condensed', 'extended', 'narrow', 'wide',
-            'gras', 'italique', 'léger', 'maigre'
-        ]
-        # Vérifier si un mot de variante est présent (séparé par espace ou tiret)
-        for word in variant_words:
-            # Le mot doit être précédé d'un espace ou tiret (pas au début du nom)
-            if f' {word}' in name_lower or f'-{word}' in name_lower:
-                return True
-        return False
-    
-    def extract_base_font_name(font_name):
-        """Extrait le nom de base d'une police"""
-        clean = font_name.strip()
-        
-        # Retirer ce qui est entre parenthèses (TrueType), (OpenType), etc.
-        if '(' in clean:
-            clean = clean.split('(')[0].strip()
-        
-        # Retirer les & et ce qui suit
-        if ' & ' in clean:
-            clean = clean.split(' & ')[0].strip()
-        
-        # Retirer les suffixes de variante
-        for suffix in variant_suffixes:
-            if clean.lower().endswith(suffix.lower()):
-                clean = clean[:-len(suffix)].strip()
-        
-        # Retirer les suffixes comme -Regular, _Regular
-        clean = re.sub(r'[-_](Regular|Normal|Book|Roman)$', '', clean, flags=re.IGNORECASE)
-        
-        # Retirer les patterns comme [wght] pour les polices variables
-        clean = re.sub(r'\[.*?\]', '', clean).strip()
-        
-        return clean
-    
-    def add_font_if_valid(name):
-        """Ajoute une police si elle n'est pas une variante ou un fichier système"""
-        clean = extract_base_font_name(name)
-        if clean and len(clean) > 1:
-            # Exclure les polices système obsolètes (commencent par des chiffres comme 8514fix, 8514oem)
-            if clean[0].isdigit():
-                return
-            
-            # Exclure les polices bitmap/système connues
-            excluded_patterns = [
-                'vga', 'oem', 'fix', 'terminal', 'system', 'fixedsys', 'modern', 'roman', 'script',
-                'small fonts', 'ms sans serif', 'ms serif', 'courier', 'marlett', 'symbol',
-                'wingdings', 'webdings', 'holomdl2', 'segoe mdl2', 'segoe fluent'
-            ]
-            name_lower = clean.lower()
-            for pattern in excluded_patterns:
-                if pattern in name_lower and len(clean) < 15:  # Seulement les noms courts
-                    return
-            
-            # Vérifier que le nom nettoyé n'est pas une variante
-            if not is_variant_name(clean):
-                fonts.add(clean)
-    
-    def read_fonts_from_registry(registry_key, path):
-        """Lit les polices depuis une clé de registre"""
-        try:
-            key = winreg.OpenKey(registry_key, path)
-            i = 0
-            while True:
-                try:
-                    font_name, _, _ = winreg.EnumValue(key, i)
-                    add_font_if_valid(font_name)
-                    i += 1
-                except OSError:
-                    break
-            winreg.CloseKey(key)
-        except Exception as e:
-            log_message(f"⚠️ Erreur lecture registre: {e}", level="warning")
-    
-    def read_fonts_from_directory(dir_path, source_name):
-        """Lit les polices depuis un dossier (TTF/OTF uniquement, pas les .fon obsolètes)"""
-        if not os.path.exists(dir_path):
-            return
-        
-        count = 0
-        try:
-            for font_file in os.listdir(dir_path):
-                # Exclure les .fon (polices bitmap obsolètes comme 8514fix, vgaoem, etc.)
-                if font_file.lower().endswith(('.ttf', '.otf', '.ttc')):
-                    # Extraire le nom sans extension
-                    name = os.path.splitext(font_file)[0]
-                    add_font_if_valid(name)
-                    count += 1
-        except PermissionError:
-            pass
-        
-        if count > 0:
-            log_message(f"📂 {count} fichiers scannés depuis {source_name}", level="info")
-    
     try:
-        # 1. Registre système (polices installées pour tous les utilisateurs)
-        read_fonts_from_registry(
-            winreg.HKEY_LOCAL_MACHINE,
-            r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts"
-        )
-        
-        # 2. Registre utilisateur (polices installées pour l'utilisateur courant)
-        read_fonts_from_registry(
-            winreg.HKEY_CURRENT_USER,
-            r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Fonts"
-        )
-        
-        # 3. Dossier polices utilisateur (Windows 10/11)
-        user_fonts_dir = os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts')
-        read_fonts_from_directory(user_fonts_dir, "polices utilisateur")
-        
-        # 4. Dossier polices système
-        system_fonts_dir = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-        read_fonts_from_directory(system_fonts_dir, "polices système")
-        
-        # Convertir en liste triée
-        font_list = sorted(list(fonts), key=str.lower)
-        
-        # Polices prioritaires en premier
-        priority = ["SEA", "Arial", "Verdana", "Times New Roman", "Courier New", "Georgia", "Impact", "Comic Sans MS"]
-        result = []
-        
-        for font in priority:
-            matching = [f for f in font_list if f.lower() == font.lower()]
-            if matching:
-                result.append(matching[0])
-                font_list = [f for f in font_list if f.lower() != font.lower()]
+        stats = {}
+        result = discover_font_families(default_backends(), font_metadata, stats=stats)
+        for source, count in stats.items():
+            log_message(f"📂 {count} polices trouvées ({source})", level="info")
         
-        result.extend(font_list)
-        
-        # Toujours avoir Arial
-        if not any(f.lower() == 'arial' for f in result):
-            result.insert(0, 'Arial')
+        # Noms lus conservés pour les prochains chargements (fichiers inchangés)
+        try:
+            font_metadata.save()
+        except OSError as e:
+            log_message(f"⚠️ Cache des polices non enregistré: {e}", level="warning")
         
         log_message(f"✅ {len(result)} polices chargées", level="info")
         
@@ -330,7 +302,7 @@ def get_windows_fonts():
         
     except Exception as e:
         log_message(f"⚠️ Erreur lecture polices: {e}", level="warning")
-        CACHED_FONTS = ["Arial", "Verdana", "Georgia", "Impact", "Courier New", "Times New Roman"]
+        CACHED_FONTS = list(FALLBACK_FONTS)
         return CACHED_FONTS
 
 def cleanup_log_file(log_file_path, max_size_mb=5, keep_lines=1000):
@@ -385,8 +357,10 @@ def check_for_updates_async():
         # Attendre que le serveur soit démarré avant d'afficher le message
         max_wait = 10  # Attendre max 10 secondes
         waited = 0
+        token = current_token()
         while not is_server_running and waited < max_wait:
-            time.sleep(0.5)
+            if token.wait(0.5):
+                return
             waited += 0.5
         
         # Vérification silencieuse (pas de logs intermédiaires)
@@ -411,7 +385,12 @@ def check_for_updates_async():
             print("   🔗 Téléchargement:")
             print("      https://github.com/Bl0uD/AutoSubGoalTwitch/releases")
             print("")
-            print("   ⚠️  Pensez à sauvegarder votre dossier 'obs/data/' avant MAJ !")
+            backup_id = run_backup(REASON_PRE_UPDATE)
+            if backup_id:
+                print(f"   💾 Données sauvegardées automatiquement : {backup_id}")
+                print("      (restauration : section SAUVEGARDES des paramètres du script)")
+            else:
+                print("   ⚠️  Pensez à sauvegarder votre dossier 'obs/data/' avant MAJ !")
             print("")
             print("=" * 70)
             print("")
@@ -549,8 +528,7 @@ def check_dependencies():
     # Note: twitch_config.txt n'est plus nécessaire - l'auth est gérée par app_state.json
     essential_files = {
         'app/server/server.js': 'Serveur Node.js principal',
-        'app/server/package.json': 'Configuration npm',
-        'app/scripts/START_SERVER.bat': 'Script de démarrage'
+        'app/server/package.json': 'Configuration npm'
     }
     
     for file, description in essential_files.items():
@@ -629,7 +607,7 @@ def find_subcount_processes():
                 if (proc.info['name'] and 'node' in proc.info['name'].lower() and 
                     proc.info['cmdline'] and any('server.js' in str(cmd) for cmd in proc.info['cmdline'])):
                     processes.append(proc)
-                # Chercher les processus cmd.exe qui lancent START_SERVER.bat
+                # Chercher les processus cmd.exe qui lancent START_SERVER.bat (lancement manuel ou ancienne version)
                 elif (proc.info['name'] and 'cmd' in proc.info['name'].lower() and 
                       proc.info['cmdline'] and any('START_SERVER.bat' in str(cmd) for cmd in proc.info['cmdline'])):
                     processes.append(proc)
@@ -640,32 +618,29 @@ def find_subcount_processes():
     
     return processes
 
-def kill_existing_servers():
-    """Tue tous les serveurs SubCount Auto existants"""
+def kill_existing_servers(timeout=3):
+    """Tue tous les serveurs SubCount Auto existants
+    
+    Les processus sont terminés ensemble : `timeout` est le délai total
+    avant kill, pas un délai par processus.
+    """
     processes = find_subcount_processes()
     
     if processes:
         log_message(f"🔄 Arrêt de {len(processes)} processus SubCount Auto existants...", level="info")
         for proc in processes:
-            try:
-                log_message(f"   ⏹️ Arrêt du processus {proc.pid} ({proc.info['name']})", level="info")
-                proc.terminate()
-                # Attendre 3 secondes pour un arrêt propre
-                proc.wait(timeout=3)
-            except psutil.TimeoutExpired:
-                log_message(f"   💥 Force l'arrêt du processus {proc.pid}", level="warning")
-                proc.kill()
-            except Exception as e:
-                log_message(f"   ❌ Erreur arrêt processus {proc.pid}: {e}", level="error")
+            log_message(f"   ⏹️ Arrêt du processus {proc.pid} ({proc.info['name']})", level="info")
+        for proc in terminate_processes(processes, timeout):
+            log_message(f"   💥 Arrêt forcé du processus {proc.pid}", level="warning")
         
         # Vérifier que tout est bien arrêté
-        time.sleep(1)
         remaining = find_subcount_processes()
         if remaining:
             log_message(f"⚠️ {len(remaining)} processus toujours actifs", level="warning")
         else:
             log_message("✅ Tous les processus SubCount Auto arrêtés", level="info")
 
+@METRICS.timed('subcount_server_start_seconds', "Durée du démarrage du serveur Node")
 def start_server():
     """Démarre le serveur SubCount Auto"""
     global server_process, is_server_running
@@ -689,9 +664,9 @@ def start_server():
         
         # Si des warnings mais pas d'erreurs, continuer silencieusement
         
-        # Vérifier que le fichier START_SERVER.bat existe
-        if not os.path.exists(START_SERVER_BAT):
-            log_message(f"❌ Fichier START_SERVER.bat introuvable: {START_SERVER_BAT}", level="error")
+        # Vérifier que le serveur Node existe
+        if not os.path.exists(os.path.join(SERVER_DIR, SERVER_SCRIPT)):
+            log_message(f"❌ Fichier {SERVER_SCRIPT} introuvable dans {SERVER_DIR}", level="error")
             return False
         
         log_message("🔄 Arrêt des serveurs existants...", level="info")
@@ -699,192 +674,485 @@ def start_server():
         # Tuer les serveurs existants
         kill_existing_servers()
         
-        # Démarrer le nouveau serveur
-        server_process = subprocess.Popen(
-            [START_SERVER_BAT],
-            cwd=SCRIPT_DIR,
-            shell=True,
-            creationflags=subprocess.CREATE_NEW_CONSOLE
-        )
-        
-        is_server_running = True
-        log_message(f"✅ Serveur SubCount Auto démarré (PID: {server_process.pid})", level="info", force_display=True)
+        # Lancer toutes les instances, puis attendre leurs réponses en parallèle
+        if len(server_instances) > 1:
+            log_message(f"🚀 Démarrage de {len(server_instances)} instances en parallèle...", level="info")
+        report_instance_startup(server_instances.start_all(launch_instance, timeout=SERVER_START_TIMEOUT))
         
-        # Attendre un peu pour vérifier que le serveur démarre bien
-        time.sleep(3)
+        server_process = primary_instance.process
+        is_server_running = primary_instance.running
+        if server_process is not None:
+            log_message(f"✅ Serveur SubCount Auto démarré (PID: {server_process.pid})", level="info", force_display=True)
         
-        if server_process.poll() is None:
-            log_message("✅ Serveur SubCount Auto en cours d'exécution", level="info", force_display=True)
-            return True
-        else:
-            log_message("❌ Le serveur SubCount Auto s'est arrêté immédiatement", level="error")
-            is_server_running = False
-            return False
+        monitor_server()
+        push_activity_profile()
+        return is_server_running
             
     except Exception as e:
         log_message(f"❌ Erreur démarrage serveur: {e}", level="error")
         is_server_running = False
         return False
 
-def stop_server():
-    """Arrête le serveur SubCount Auto"""
+def launch_instance(instance):
+    """Lance node server.js avec les ports et fichiers d'état de l'instance
+    
+    Sans console : la sortie est lue dans un tampon circulaire
+    (instance.output_tail()) et journalisée si le serveur s'arrête.
+    """
+    return launch_node_server(SERVER_DIR, instance.environment())
+
+def report_instance_startup(results):
+    """Journalise le résultat de InstanceRegistry.start_all
+    
+    Une instance lancée qui ne répond pas encore (ex. npm install au
+    premier démarrage) reste considérée comme en cours d'exécution.
+    """
+    for name, healthy in results.items():
+        instance = server_instances.get(name)
+        if instance is None:
+            continue
+        if healthy:
+            log_message(f"✅ [{name}] Serveur SubCount Auto en cours d'exécution ({instance.url})", level="info", force_display=True)
+        elif instance.process is not None and instance.process.poll() is None:
+            log_message(f"⏳ [{name}] Serveur lancé mais ne répond pas encore ({instance.url})", level="warning")
+        else:
+            log_message(f"❌ [{name}] Le serveur SubCount Auto s'est arrêté immédiatement", level="error")
+            instance.running = False
+
+def stop_server(timeout=5):
+    """Arrête le serveur SubCount Auto (toutes les instances)
+    
+    Args:
+        timeout (float): Attente de chaque processus avant kill (en parallèle)
+    """
     global server_process, is_server_running
     
     log_message("🔄 Arrêt du serveur SubCount Auto...", level="info")
     
-    # Arrêter le processus principal si il existe
-    if server_process:
-        try:
-            log_message(f"   ⏹️ Arrêt du processus principal {server_process.pid}", level="info")
-            server_process.terminate()
-            server_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            log_message("   💥 Force l'arrêt du processus principal", level="warning")
-            server_process.kill()
-        except Exception as e:
-            log_message(f"   ❌ Erreur arrêt processus principal: {e}", level="error")
+    # Arrêter les processus des instances en parallèle (disjoncteurs ouverts :
+    # les appels suivants sont rejetés immédiatement)
+    for name, outcome in server_instances.stop_all(timeout=timeout).items():
+        if isinstance(outcome, Exception):
+            log_message(f"   ❌ [{name}] Erreur arrêt processus: {outcome}", level="error")
     
-    # Arrêter tous les processus SubCount Auto
-    kill_existing_servers()
+    # Arrêter tous les processus SubCount Auto restants
+    kill_existing_servers(timeout)
     
     server_process = None
     is_server_running = False
     log_message("✅ Serveur SubCount Auto arrêté", level="info")
 
-def monitor_server():
-    """Surveille le serveur en arrière-plan"""
+def _on_instance_exit(instance):
+    """Arrêt inattendu d'une instance (appelé par son superviseur)"""
     global is_server_running
+    if instance is primary_instance:
+        is_server_running = False
+
+def supervise_interval():
+    """Intervalle des superviseurs : 10 s en direct, 60 s au repos (relu à chaque contrôle)"""
+    return activity.interval(SUPERVISE_INTERVAL, SUPERVISE_IDLE_INTERVAL)
+
+def monitor_server():
+    """Démarre un superviseur par instance lancée (processus + health check périodique)"""
+    for instance in server_instances:
+        if instance.running:
+            # L'instance principale garde le health check instrumenté (métriques)
+            health_check = (lambda _: is_server_healthy()) if instance is primary_instance else None
+            instance.supervise(on_exit=_on_instance_exit, health_check=health_check, interval=supervise_interval)
+
+def get_action_target():
+    """Instance(s) visée(s) par les boutons : None (principale), un nom ou "*" (toutes)"""
+    if global_settings is None:
+        return None
+    target = obs.obs_data_get_string(global_settings, "action_target")
+    if target == ALL_INSTANCES:
+        return ALL_INSTANCES
+    return target if target and server_instances.get(target) is not None else None
+
+def target_instance():
+    """Première instance visée (pages web)"""
+    instances = server_instances.targets(get_action_target())
+    return instances[0] if instances else primary_instance
+
+def target_url():
+    """URL de la première instance visée"""
+    return target_instance().url
+
+def target_page(path="/"):
+    """Page web de la première instance visée, avec ses ports WebSocket"""
+    return target_instance().page_url(path)
+
+def log_overlay_urls():
+    """Journalise les URLs des overlays des instances visées (sources navigateur)"""
+    for instance in server_instances.targets(get_action_target()):
+        log_message(f"🖼️ Overlays de l'instance {instance.name} :", level="info")
+        for kind in ("follow", "sub"):
+            log_message(f"   {instance.overlay_url(kind)}", level="info")
+    return False
+
+def configure_server_instances(settings):
+    """Synchronise le registre avec les instances déclarées dans les paramètres
+    
+    Les instances retirées (ou modifiées) sont arrêtées ; les nouvelles sont
+    démarrées en parallèle si le serveur tourne déjà.
+    """
+    try:
+        declared = parse_instance_specs(obs.obs_data_get_string(settings, "server_instances"))
+    except ValueError as e:
+        log_message(f"❌ Instances serveur invalides: {e}", level="error")
+        return
     
-    while is_server_running:
+    wanted = {instance.name: instance for instance in declared}
+    removed = []
+    for instance in list(server_instances):
+        if instance is primary_instance:
+            continue
+        replacement = wanted.get(instance.name)
+        if replacement is not None and replacement.ports == instance.ports:
+            del wanted[instance.name]
+            continue
+        server_instances.remove(instance.name)
+        removed.append(instance)
+    
+    added = []
+    for instance in wanted.values():
         try:
-            if server_process and server_process.poll() is not None:
-                log_message("⚠️ Le serveur SubCount Auto s'est arrêté de manière inattendue", level="warning")
-                is_server_running = False
-                break
-            
-            time.sleep(10)  # Vérifier toutes les 10 secondes
-            
-        except Exception as e:
-            log_message(f"❌ Erreur monitoring serveur: {e}", level="error")
-            break
+            server_instances.add(instance)
+            added.append(instance.name)
+        except ValueError as e:
+            log_message(f"❌ Instance '{instance.name}' ignorée: {e}", level="error")
+    
+    if removed or added:
+        log_message(f"🧩 Instances: {', '.join(server_instances.names())}", level="info")
+    if removed or (added and is_server_running):
+        # Une modification précédente encore en cours se termine d'abord
+        services.spawn("instance-changes", _apply_instance_changes, removed, added if is_server_running else [])
+
+def _apply_instance_changes(removed, added):
+    """Arrête les instances retirées puis démarre les nouvelles (thread)"""
+    for instance in removed:
+        if instance.running:
+            instance.stop()
+            log_message(f"⏹️ [{instance.name}] Instance arrêtée", level="info")
+    if added:
+        report_instance_startup(server_instances.start_all(launch_instance, SERVER_START_TIMEOUT, target=added))
+        for name in added:
+            instance = server_instances.get(name)
+            if instance is not None and instance.running:
+                instance.supervise(on_exit=_on_instance_exit, interval=supervise_interval)
+        push_activity_profile(targets=added)
 
 # ============================================================================
 # PHASE 1 - FONCTIONS ESSENTIELLES
 # ============================================================================
 
-def add_follow():
-    """Ajoute 1 follow"""
-    if not REQUESTS_AVAILABLE:
-        log_message("❌ Module requests non disponible", level="error")
-        return False
+# Endpoints d'ajustement des compteurs: (compteur, sens) -> (route, payload additionnel)
+COUNTER_ENDPOINTS = {
+    ('follows', 1): ("/admin/add-follows", {}),
+    ('follows', -1): ("/admin/remove-follows", {}),
+    ('subs', 1): ("/admin/add-subs", {'tier': '1000'}),
+    ('subs', -1): ("/admin/remove-subs", {}),
+}
+
+def _post_counter_delta(counter, delta, idempotency_key=None, retries=3, base_url=SERVER_URL):
+    """Envoie un ajustement de compteur au serveur
+    
+    Args:
+        counter: 'follows' ou 'subs'
+        delta: Variation signée (non nulle)
+        idempotency_key: Clé d'idempotence (envoyée à chaque tentative)
+        retries: Nombre de tentatives
+        base_url: URL de l'instance visée
+    
+    Returns:
+        bool: True si le serveur a accepté l'ajustement, False s'il l'a
+        refusé, None s'il ne l'a pas reçu (injoignable, 502/503/504)
+    """
+    route, extra = COUNTER_ENDPOINTS[(counter, 1 if delta > 0 else -1)]
+    headers = {'Content-Type': 'application/json'}
+    if idempotency_key:
+        headers['Idempotency-Key'] = idempotency_key
     
+    payload = dict(extra, amount=abs(delta))
     response = api_call_with_retry(
-        f"{SERVER_URL}/admin/add-follows",
+        f"{base_url}{route}",
         method='POST',
-        json={'amount': 1},
-        headers={'Content-Type': 'application/json'}
+        retries=retries,
+        json=payload,
+        headers=headers
     )
+    if response is None:
+        return None
+    if not 200 <= response.status_code < 300:
+        log_message(f"❌ {counter} {delta:+d} refusé par le serveur (HTTP {response.status_code})", level="error")
+        return False
+    return True
+
+def adjust_counter(counter, delta, instance=None):
+    """Ajuste un compteur, ou journalise l'action si le serveur est injoignable
     
-    if response and response.status_code == 200:
-        log_message("✅ +1 Follow ajouté", level="info")
-        return True
+    Args:
+        counter: 'follows' ou 'subs'
+        delta: Variation signée
+        instance: ServerInstance visée (défaut: instance principale)
     
-    return False
-
-def remove_follow():
-    """Retire 1 follow"""
+    Returns:
+        bool: True si appliqué immédiatement par le serveur
+    """
     if not REQUESTS_AVAILABLE:
         log_message("❌ Module requests non disponible", level="error")
         return False
     
-    response = api_call_with_retry(
-        f"{SERVER_URL}/admin/remove-follows",
-        method='POST',
-        json={'amount': 1},
-        headers={'Content-Type': 'application/json'}
-    )
+    # Clé fixée avant la première tentative : les retries et un rejeu
+    # éventuel la réutilisent, une requête appliquée mais sans réponse
+    # (timeout) n'est pas comptée deux fois
+    key = uuid.uuid4().hex
     
-    if response and response.status_code == 200:
-        log_message("✅ -1 Follow retiré", level="info")
+    # Le journal hors-ligne ne couvre que l'instance principale
+    if instance is not None and instance is not primary_instance:
+        return bool(_post_counter_delta(counter, delta, idempotency_key=key, base_url=instance.url))
+    
+    # Des actions plus anciennes attendent : les rejouer d'abord (ordre préservé)
+    if action_journal is not None and action_journal.has_pending():
+        action_journal.record_counter(counter, delta)
+        log_message(f"📝 {counter} {delta:+d} mis en attente (rejeu en cours)", level="warning")
+        return False
+    
+    delivered = _post_counter_delta(counter, delta, idempotency_key=key)
+    if delivered:
         return True
     
+    # Non remis (même si le disjoncteur reste fermé) : rejoué sous la même clé
+    if delivered is None and action_journal is not None:
+        action_journal.record_counter(counter, delta, key=key)
+        log_message(f"📝 {counter} {delta:+d} mis en attente - rejoué au retour du serveur", level="warning")
     return False
 
-def add_sub():
-    """Ajoute 1 sub (tier 1)"""
-    if not REQUESTS_AVAILABLE:
-        log_message("❌ Module requests non disponible", level="error")
-        return False
+def _replay_journal_operation(op):
+    """Envoie une opération du journal hors-ligne (callback de ActionJournal.replay)"""
+    if op['type'] == 'counter':
+        # Refusée par le serveur : abandonnée (la rejouer bloquerait le journal)
+        return _post_counter_delta(op['counter'], op['delta'], idempotency_key=op['key'], retries=1) is not None
+    if op['type'] == 'overlay' and OVERLAY_CONFIG_AVAILABLE:
+        return overlay_config.submit(overlay_config.replay_operation(op)).result(HTTP_TIMEOUT_LONG)
+    # Opération overlay sans gestionnaire disponible : abandonnée
+    log_message(f"⚠️ Action hors-ligne ignorée: {op['type']}", level="warning")
+    return True
+
+def replay_pending_actions():
+    """Rejoue les actions hors-ligne tant que le serveur est joignable"""
+    if action_journal is None:
+        return
     
-    response = api_call_with_retry(
-        f"{SERVER_URL}/admin/add-subs",
-        method='POST',
-        json={'amount': 1, 'tier': '1000'},
-        headers={'Content-Type': 'application/json'}
-    )
+    total = 0
+    token = current_token()
+    while action_journal.has_pending() and not server_breaker.is_open() and not token.cancelled:
+        sent, remaining = action_journal.replay(_replay_journal_operation)
+        total += sent
+        if remaining or not sent:
+            break
+    
+    if total:
+        log_message(f"✅ {total} action(s) hors-ligne rejouée(s)", level="info", force_display=True)
+
+def schedule_pending_replay(*args):
+    """Lance le rejeu du journal en arrière-plan (sans bloquer OBS)"""
+    if action_journal is None or not action_journal.has_pending() or server_breaker.is_open():
+        return
+    replay = services.get("journal-replay")
+    if replay is not None and replay.is_alive():
+        return
+    services.spawn("journal-replay", replay_pending_actions)
+
+def _on_server_state_change(old_state, new_state):
+    """Rejoue le journal dès que le disjoncteur se referme"""
+    if new_state == STATE_CLOSED:
+        schedule_pending_replay()
+
+server_breaker.add_listener(_on_server_state_change)
+if action_journal is not None:
+    action_journal.add_listener(schedule_pending_replay)
+
+def adjust_targets(counter, delta):
+    """Ajuste un compteur sur la ou les instances visées (en parallèle)
+    
+    Returns:
+        bool: True si toutes les instances visées ont appliqué l'ajustement
+    """
+    # Les threads de fan_out partagent la trace de l'action
+    trace_id = TRACER.current_trace_id()
     
-    if response and response.status_code == 200:
+    def adjust(instance):
+        with TRACER.activate(trace_id):
+            return adjust_counter(counter, delta, instance)
+    
+    results = server_instances.fan_out(adjust, get_action_target())
+    failed = [name for name, ok in results.items() if ok is not True]
+    if failed and len(results) > 1:
+        log_message(f"⚠️ {counter} {delta:+d} non appliqué sur: {', '.join(failed)}", level="warning")
+    return bool(results) and not failed
+
+@TRACER.traced('obs.add_follow')
+def add_follow():
+    """Ajoute 1 follow"""
+    if adjust_targets('follows', 1):
+        log_message("✅ +1 Follow ajouté", level="info")
+        return True
+    return False
+
+@TRACER.traced('obs.remove_follow')
+def remove_follow():
+    """Retire 1 follow"""
+    if adjust_targets('follows', -1):
+        log_message("✅ -1 Follow retiré", level="info")
+        return True
+    return False
+
+@TRACER.traced('obs.add_sub')
+def add_sub():
+    """Ajoute 1 sub (tier 1)"""
+    if adjust_targets('subs', 1):
         log_message("✅ +1 Sub ajouté (Tier 1)", level="info")
         return True
+    return False
+
+def send_queued_action(action, amount):
+    """Exécute une action regroupée (thread d'ActionSender)
     
+    Args:
+        action: 'follows', 'subs', 'sync' ou 'preset'
+        amount: Total signé pour un compteur (None sinon)
+    """
+    if action in ('follows', 'subs'):
+        with TRACER.trace(f"obs.queued_{action}"):
+            if adjust_targets(action, amount):
+                log_message(f"✅ {action} {amount:+d}", level="info")
+    elif action == 'sync':
+        sync_with_twitch()
+    elif action == 'preset' and PRESETS_AVAILABLE:
+        preset = _selected_preset()
+        if preset is None:
+            log_message("⚠️ Aucun preset sélectionné pour le raccourci", level="warning")
+        else:
+            apply_overlay_preset(preset, "hotkey")
+
+def queue_action(action, amount=None):
+    """Dépose une action sans bloquer OBS (callback de bouton : pas de rechargement du panneau)"""
+    if action_sender is None:
+        send_queued_action(action, amount)
+    else:
+        action_sender.submit(action, amount)
     return False
 
-def remove_sub():
-    """Retire 1 sub"""
-    if not REQUESTS_AVAILABLE:
-        log_message("❌ Module requests non disponible", level="error")
-        return False
+def start_hotkeys(settings):
+    """Démarre l'envoi regroupé et enregistre les raccourcis (touches sauvegardées)"""
+    global action_sender, hotkey_bindings
     
-    response = api_call_with_retry(
-        f"{SERVER_URL}/admin/remove-subs",
-        method='POST',
-        json={'amount': 1},
-        headers={'Content-Type': 'application/json'}
-    )
+    if action_sender is None:
+        action_sender = ActionSender(send_queued_action)
+        action_sender.start()
+        services.on_shutdown("action-sender", stop_action_sender)
+    if hotkey_bindings is None:
+        hotkey_bindings = HotkeyBindings(obs, action_sender)
+        hotkey_bindings.register(settings)
+
+def stop_action_sender():
+    """Envoie les actions en attente puis arrête le thread d'envoi"""
+    global action_sender
     
-    if response and response.status_code == 200:
+    if action_sender is not None:
+        action_sender.stop()
+        action_sender = None
+
+@TRACER.traced('obs.remove_sub')
+def remove_sub():
+    """Retire 1 sub"""
+    if adjust_targets('subs', -1):
         log_message("✅ -1 Sub retiré", level="info")
         return True
-    
     return False
 
+def get_sync_scheduler(instance):
+    """Planificateur de synchro Twitch d'une instance (créé au premier usage)"""
+    scheduler = sync_schedulers.get(instance.name)
+    if scheduler is None or scheduler.server_url != instance.url:
+        if scheduler is not None:
+            scheduler.stop()
+        scheduler = TwitchSyncScheduler(
+            server_url=instance.url,
+            base_interval=AUTO_SYNC_DEFAULT_INTERVAL,
+            timeout=HTTP_TIMEOUT_MEDIUM,
+            on_result=lambda trigger, result: log_sync_result(instance, trigger, result)
+        )
+        sync_schedulers[instance.name] = scheduler
+    return scheduler
+
+def configure_sync_schedulers(settings):
+    """Active ou coupe la synchro automatique de chaque instance"""
+    enabled = obs.obs_data_get_bool(settings, "auto_sync")
+    interval = max(30, obs.obs_data_get_int(settings, "auto_sync_interval") or AUTO_SYNC_DEFAULT_INTERVAL)
+    
+    # Instances retirées du registre
+    for name in list(sync_schedulers):
+        if server_instances.get(name) is None:
+            sync_schedulers.pop(name).stop()
+    
+    for instance in server_instances:
+        scheduler = get_sync_scheduler(instance)
+        if enabled:
+            # Hors direct : synchros espacées (intervalles × IDLE_FACTOR)
+            scheduler.reconfigure(
+                base_interval=activity.interval(interval),
+                max_interval=activity.interval(max(interval, AUTO_SYNC_MAX_INTERVAL))
+            )
+            scheduler.start()
+        else:
+            scheduler.stop()
+
+def stop_sync_schedulers():
+    for scheduler in sync_schedulers.values():
+        scheduler.stop()
+
 def sync_with_twitch():
-    """Synchronise avec Twitch API"""
-    if not REQUESTS_AVAILABLE:
-        log_message("❌ Module requests non disponible", level="error")
-        return False
-    try:
-        log_message("🔄 Synchronisation avec Twitch API...", level="info")
-        response = requests.get(f"{SERVER_URL}/admin/sync-twitch", timeout=HTTP_TIMEOUT_MEDIUM)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                log_message(f"✅ Sync réussie - Follows: {data['twitchFollows']}, Subs: {data['twitchSubs']}", level="info")
-                if data.get('updated'):
-                    log_message(f"   Diff Follows: {data['followsDiff']:+d}, Diff Subs: {data['subsDiff']:+d}", level="info")
-                else:
-                    log_message("   Déjà à jour", level="info")
-                return True
-            else:
-                log_message(f"❌ Erreur sync: {data.get('error', 'Erreur inconnue')}", level="error")
-        elif response.status_code == 429:
-            # Rate limited - afficher le temps d'attente
-            try:
-                data = response.json()
-                wait_time = data.get('nextResetIn', 60)
-                log_message(f"⏳ Rate limit atteint - Réessayez dans {wait_time}s", level="warning")
-            except:
-                log_message("⏳ Rate limit atteint - Réessayez dans 1 minute", level="warning")
+    """Synchronise avec Twitch API sans bloquer OBS (instances visées)
+    
+    Une synchro déjà en cours est réutilisée ; pendant un rate limit, la
+    demande part automatiquement à l'expiration de la fenêtre.
+    """
+    for instance in server_instances.targets(get_action_target()):
+        get_sync_scheduler(instance).request_sync("manual")
+    return True
+
+def log_sync_result(instance, trigger, result):
+    """Journalise une synchro (les synchros automatiques sans changement restent silencieuses)"""
+    prefix = "" if instance is primary_instance else f"[{instance.name}] "
+    data = result.data or {}
+    manual = trigger != "timer"
+    
+    if result.outcome in (OUTCOME_UPDATED, OUTCOME_UNCHANGED):
+        if not manual and result.outcome == OUTCOME_UNCHANGED:
+            return
+        if data.get('skipped'):
+            log_message(f"🔒 {prefix}Sync ignorée (mode session)", level="info")
+            return
+        log_message(f"✅ {prefix}Sync réussie - Follows: {data.get('twitchFollows')}, Subs: {data.get('twitchSubs')}", level="info")
+        if result.outcome == OUTCOME_UPDATED:
+            log_message(f"   {prefix}Diff Follows: {result.follows_diff:+d}, Diff Subs: {result.subs_diff:+d}", level="info")
         else:
-            log_message(f"❌ Erreur HTTP: {response.status_code}", level="error")
-    except Exception as e:
-        log_message(f"❌ Erreur sync Twitch: {e}", level="error")
-    return False
+            log_message(f"   {prefix}Déjà à jour", level="info")
+    elif result.outcome == OUTCOME_RATE_LIMITED:
+        retry = "nouvelle tentative automatique" if manual else "prochaine synchro automatique"
+        log_message(f"⏳ {prefix}Rate limit atteint - {retry} dans {result.retry_after:.1f}s", level="warning")
+    elif result.outcome == OUTCOME_UNAUTHENTICATED:
+        if manual:
+            log_message(f"❌ {prefix}Erreur sync: non authentifié - connectez-vous à Twitch", level="error")
+    elif manual:
+        log_message(f"❌ {prefix}Erreur sync: {data.get('error', 'serveur non accessible')}", level="error")
 
 def open_dashboard():
     """Ouvre le dashboard dans le navigateur"""
     try:
-        webbrowser.open(f"{SERVER_URL}/")
+        webbrowser.open(target_page("/"))
         log_message("🏠 Dashboard ouvert dans le navigateur", level="info")
         return True
     except Exception as e:
@@ -894,7 +1162,7 @@ def open_dashboard():
 def open_config():
     """Ouvre la page de configuration"""
     try:
-        webbrowser.open(f"{SERVER_URL}/config")
+        webbrowser.open(target_page("/config"))
         log_message("⚙️ Configuration ouverte dans le navigateur", level="info")
         return True
     except Exception as e:
@@ -904,7 +1172,7 @@ def open_config():
 def open_admin():
     """Ouvre le panel admin"""
     try:
-        webbrowser.open(f"{SERVER_URL}/admin")
+        webbrowser.open(target_page("/admin"))
         log_message("🔧 Panel Admin ouvert dans le navigateur", level="info")
         return True
     except Exception as e:
@@ -914,7 +1182,7 @@ def open_admin():
 def connect_twitch():
     """Ouvre la page de configuration pour se connecter à Twitch"""
     try:
-        webbrowser.open(f"{SERVER_URL}")
+        webbrowser.open(target_page("/"))
         log_message("🔐 Page Admin Twitch ouverte", level="info")
         log_message("   Suivez les instructions pour vous connecter", level="info")
         return True
@@ -922,43 +1190,77 @@ def connect_twitch():
         log_message(f"❌ Erreur ouverture admin Twitch: {e}", level="error")
     return False
 
-def disconnect_twitch():
-    """Déconnecte le compte Twitch actuel"""
-    if not REQUESTS_AVAILABLE:
-        log_message("❌ Module requests non disponible", level="error")
-        return False
+def submit_server_call(method, path, payload=None, on_result=None, timeout=HTTP_TIMEOUT_SHORT):
+    """Appel serveur sur les instances visées, depuis la boucle d'arrière-plan (non bloquant)
+    
+    Même chemin que les mises à jour overlay : client asyncio de chaque
+    instance, politique de retry partagée et disjoncteur de l'instance.
+    
+    Args:
+        on_result: Callback(instance, data) par instance ; data est le corps
+            JSON si le serveur a répondu 200, None sinon
+    
+    Returns:
+        concurrent.futures.Future: Résultat par instance ({nom: data ou exception})
+    """
+    headers = None
+    if method == 'POST':
+        _, headers = TRACER.headers()
+    
+    async def run(instance):
+        prefix = "" if instance is primary_instance else f"[{instance.name}] "
+        response = await instance.request_async(method, path, payload, headers=headers, timeout=timeout)
+        data = None
+        if response is None:
+            log_message(f"❌ {prefix}{method} {path}: serveur non accessible", level="error")
+        elif response.status_code != 200:
+            log_message(f"❌ {prefix}Erreur HTTP: {response.status_code}", level="error")
+        elif isinstance(response.body, dict):
+            data = response.body
+        if on_result is not None:
+            on_result(instance, data)
+        return data
+    
+    return server_instances.submit(run, get_action_target())
+
+def server_call(method, path, payload=None, timeout=HTTP_TIMEOUT_SHORT):
+    """Appel bloquant sur la première instance visée (client asyncio, échec immédiat si arrêtée)
+    
+    Returns:
+        dict: Corps JSON si le serveur a répondu 200, None sinon
+    """
+    instances = server_instances.targets(get_action_target())
+    if not instances:
+        return None
     try:
-        response = requests.post(
-            f"{SERVER_URL}/api/disconnect-twitch",
-            headers={'Content-Type': 'application/json'},
-            timeout=HTTP_TIMEOUT_SHORT
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                log_message(f"✅ Déconnecté de Twitch: {data.get('previousUser', 'Utilisateur inconnu')}", level="info")
-                log_message("   Vous pouvez maintenant connecter un autre compte", level="info")
-                return True
-            else:
-                log_message(f"❌ Erreur déconnexion: {data.get('error', 'Erreur inconnue')}", level="error")
-        else:
-            log_message(f"❌ Erreur HTTP: {response.status_code}", level="error")
+        response = get_background_loop().submit(
+            instances[0].request_async(method, path, payload, timeout=timeout, attempts=1)
+        ).result(timeout + 1)
     except Exception as e:
-        log_message(f"❌ Erreur déconnexion Twitch: {e}", level="error")
+        log_message(f"❌ Erreur {method} {path}: {e}", level="error")
+        return None
+    if response is None or response.status_code != 200 or not isinstance(response.body, dict):
+        return None
+    return response.body
+
+def disconnect_twitch():
+    """Déconnecte le compte Twitch des instances visées (sans bloquer OBS)"""
+    def on_result(instance, data):
+        prefix = "" if instance is primary_instance else f"[{instance.name}] "
+        if data is None:
+            return
+        if data.get('success'):
+            log_message(f"✅ {prefix}Déconnecté de Twitch: {data.get('previousUser', 'Utilisateur inconnu')}", level="info")
+            log_message("   Vous pouvez maintenant connecter un autre compte", level="info")
+        else:
+            log_message(f"❌ {prefix}Erreur déconnexion: {data.get('error', 'Erreur inconnue')}", level="error")
+    
+    submit_server_call('POST', "/api/disconnect-twitch", on_result=on_result)
     return False
 
 def get_twitch_status():
-    """Récupère le statut de connexion Twitch"""
-    if not REQUESTS_AVAILABLE:
-        return None
-    try:
-        response = requests.get(f"{SERVER_URL}/api/auth-status", timeout=HTTP_TIMEOUT_SHORT)
-        if response.status_code == 200:
-            data = response.json()
-            return data
-    except Exception as e:
-        log_message(f"❌ Erreur récupération status Twitch: {e}", level="error")
-    return None
+    """Récupère le statut de connexion Twitch (première instance visée)"""
+    return server_call('GET', "/api/auth-status")
 
 def is_server_healthy():
     """Vérifie si le serveur répond correctement"""
@@ -968,17 +1270,25 @@ def is_server_healthy():
         return False
     
     try:
-        response = requests.get(f"{SERVER_URL}/", timeout=2)
+        with METRICS.timed('subcount_health_check_seconds', "Latence du health check serveur"):
+            response = requests.get(f"{SERVER_URL}/", timeout=2)
         is_healthy = response.status_code == 200
-        server_health_status = is_healthy
-        return is_healthy
     except Exception:
-        server_health_status = False
-        return False
+        is_healthy = False
+    
+    server_health_status = is_healthy
+    METRICS.gauge('subcount_server_healthy', "1 si le serveur répond au health check").set(1 if is_healthy else 0)
+    # Alimenter le disjoncteur partagé
+    server_breaker.report_health(is_healthy)
+    return is_healthy
 
 def api_call_with_retry(url, method='GET', retries=3, timeout=HTTP_TIMEOUT_SHORT, **kwargs):
     """Appel API avec retry automatique sur échec
     
+    Utilise la politique SERVER_RETRY_POLICY et le disjoncteur du serveur :
+    si le serveur est connu comme arrêté, l'appel échoue immédiatement
+    au lieu de bloquer l'interface OBS pendant les tentatives.
+    
     Args:
         url: URL de l'API
         method: Méthode HTTP ('GET' ou 'POST')
@@ -993,90 +1303,111 @@ def api_call_with_retry(url, method='GET', retries=3, timeout=HTTP_TIMEOUT_SHORT
         log_message("❌ Module requests non disponible", level="error")
         return None
     
-    for attempt in range(retries):
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, timeout=timeout, **kwargs)
-            elif method.upper() == 'POST':
-                response = requests.post(url, timeout=timeout, **kwargs)
-            else:
-                log_message(f"❌ Méthode HTTP non supportée: {method}", level="error")
-                return None
-            
-            # Retourner si succès
-            if response.status_code < 500:
-                return response
-            
-            # Erreur serveur 5xx, retry
-            if attempt < retries - 1:
-                log_message(f"⚠️ Erreur serveur {response.status_code}, tentative {attempt + 2}/{retries}...", level="warning")
-                time.sleep(1)  # Attendre 1s avant retry
-            
-        except requests.exceptions.Timeout:
-            if attempt < retries - 1:
-                log_message(f"⚠️ Timeout, tentative {attempt + 2}/{retries}...", level="warning")
-                time.sleep(1)
-            else:
-                log_message(f"❌ Timeout après {retries} tentatives", level="error")
-        except Exception as e:
-            if attempt < retries - 1:
-                log_message(f"⚠️ Erreur {e}, tentative {attempt + 2}/{retries}...", level="warning")
-                time.sleep(1)
-            else:
-                log_message(f"❌ Échec après {retries} tentatives: {e}", level="error")
+    method = method.upper()
+    if method == 'GET':
+        send = lambda: requests.get(url, timeout=timeout, **kwargs)
+    elif method == 'POST':
+        send = lambda: requests.post(url, timeout=timeout, **kwargs)
+    else:
+        log_message(f"❌ Méthode HTTP non supportée: {method}", level="error")
+        return None
     
-    return None
-
-# ========================================================================
-# GESTION CONFIGURATION DYNAMIQUE DES OVERLAYS
-# ========================================================================
+    # Mutations tracées : X-Trace-Id est recopié dans le broadcast qui en découle
+    trace_id = None
+    if method == 'POST':
+        trace_id, kwargs['headers'] = TRACER.headers(headers=kwargs.get('headers'))
+    
+    endpoint = urlsplit(url).path or "/"
+    with METRICS.timed('subcount_http_request_seconds', "Latence des appels au serveur Node",
+                       method=method, endpoint=endpoint):
+        with TRACER.request(trace_id):
+            response = SERVER_RETRY_POLICY.run(
+                send,
+                breaker=get_circuit_breaker(url),
+                label=f"{method} {url}",
+                attempts=retries
+            )
+    METRICS.counter(
+        'subcount_http_requests_total', "Appels au serveur Node",
+        method=method, endpoint=endpoint,
+        outcome='ok' if response is not None and response.status_code < 400 else 'error'
+    ).inc()
+    return response
 
-def is_valid_css_color(color):
-    """Valide un code couleur CSS
+def server_transaction(instance=None):
+    """Lot de mutations envoyé en un seul POST /api/batch à la sortie du bloc
+    
+        with server_transaction() as tx:
+            tx.set_follows(120)
+            tx.set_subs(8)
+            tx.set_sub_counter_mode('session')
+    
+    Le serveur valide tout le lot avant de l'appliquer, écrit l'état une
+    fois et diffuse une fois par compteur. Envoi bloquant : à utiliser
+    depuis un thread d'arrière-plan, pas depuis un callback OBS.
     
     Args:
-        color: String contenant le code couleur à valider
+        instance: ServerInstance visée (défaut: instance principale)
     
     Returns:
-        bool: True si la couleur est valide, False sinon
+        BatchTransaction: Lot à remplir (résultat dans tx.ok / tx.error)
     """
-    import re
+    base_url = (instance or primary_instance).url
     
-    if not color or not isinstance(color, str):
-        return False
+    def send(payload, headers):
+        response = api_call_with_retry(f"{base_url}{BATCH_PATH}", method='POST', json=payload, headers=dict(headers))
+        if response is None:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return {'success': False, 'error': f"HTTP {response.status_code}"}
     
-    color = color.strip()
+    return BatchTransaction(send)
+
+# ========================================================================
+# GESTION CONFIGURATION DYNAMIQUE DES OVERLAYS
+# ========================================================================
+
+def submit_overlay_update(description, method, **kwargs):
+    """Soumet une mise à jour overlay à la boucle d'arrière-plan (non bloquant)
     
-    # Patterns supportés
-    patterns = [
-        r'^#[0-9A-Fa-f]{3}$',  # Hex court (#RGB)
-        r'^#[0-9A-Fa-f]{6}$',  # Hex normal (#RRGGBB)
-        r'^#[0-9A-Fa-f]{8}$',  # Hex avec alpha (#RRGGBBAA)
-        r'^rgb\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*\)$',  # rgb(r,g,b)
-        r'^rgba\(\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*\d{1,3}\s*,\s*[\d.]+\s*\)$'  # rgba(r,g,b,a)
-    ]
+    Le cache est vidé avant l'envoi pour permettre de réappliquer la même
+    valeur. La mise à jour part vers les instances visées en parallèle et
+    le résultat est journalisé quand toutes ont répondu.
     
-    # Noms de couleurs CSS standard
-    css_colors = [
-        'white', 'black', 'red', 'green', 'blue', 'yellow', 'cyan', 'magenta',
-        'orange', 'purple', 'pink', 'brown', 'gray', 'grey', 'transparent'
-    ]
+    Args:
+        description: Libellé de l'action pour les logs
+        method: Nom de la méthode de AsyncOverlayConfigManager
     
-    # Vérifier si c'est un nom de couleur
-    if color.lower() in css_colors:
-        return True
+    Returns:
+        concurrent.futures.Future: Résultat par instance ({nom: bool ou exception})
+    """
+    global active_preset
+    active_preset = None
     
-    # Vérifier si ça match un des patterns
-    for pattern in patterns:
-        if re.match(pattern, color):
-            # Pour RGB/RGBA, valider que les valeurs sont dans [0-255]
-            if 'rgb' in color:
-                numbers = re.findall(r'\d{1,3}', color)
-                if any(int(n) > 255 for n in numbers[:3]):  # Vérifier R,G,B (pas alpha)
-                    return False
-            return True
+    async def run(instance):
+        manager = instance.overlay_config
+        manager.clear_cache()
+        return await getattr(manager, method)(**kwargs)
     
-    return False
+    def on_done(future):
+        try:
+            results = future.result()
+        except Exception as e:
+            log_message(f"❌ Erreur {description}: {e}", level="error")
+            return
+        failed = [name for name, result in results.items() if result is not True]
+        if not failed:
+            log_message(f"✅ {description}", level="info")
+        elif len(results) > 1:
+            log_message(f"⚠️ Échec {description} sur: {', '.join(failed)}", level="warning")
+        else:
+            log_message(f"⚠️ Échec {description} (serveur non accessible?)", level="warning")
+    
+    future = server_instances.submit(run, get_action_target())
+    future.add_done_callback(on_done)
+    return future
 
 def apply_overlay_font(props, prop, settings):
     """Applique la police sélectionnée ou saisie aux overlays"""
@@ -1096,13 +1427,10 @@ def apply_overlay_font(props, prop, settings):
         log_message(f"📝 Police sélectionnée: '{font_family}' @ {font_size}px", level="info")
         
         if font_family and font_family.strip():
-            # Vider le cache pour forcer l'envoi
-            overlay_config.clear_cache()
-            result = overlay_config.update_font(family=font_family.strip(), size=f"{font_size}px")
-            if result:
-                log_message(f"✅ Police appliquée au serveur: {font_family.strip()} @ {font_size}px", level="info")
-            else:
-                log_message(f"⚠️ Échec application police (serveur non accessible?)", level="warning")
+            submit_overlay_update(
+                f"application police: {font_family.strip()} @ {font_size}px", 'update_font',
+                family=font_family.strip(), size=f"{font_size}px"
+            )
         else:
             log_message("⚠️ Aucune police sélectionnée", level="warning")
         
@@ -1127,15 +1455,7 @@ def apply_overlay_colors(props, prop, settings):
         # Utiliser la constante globale COLOR_MAP
         final_color = COLOR_MAP.get(text_color, text_color)
         
-        # Vérifier que overlay_config existe avant de l'utiliser
-        try:
-            # Vider le cache pour permettre de réappliquer la même couleur
-            overlay_config.clear_cache()
-            overlay_config.update_colors(text=final_color)
-            log_message(f"✅ Couleur prédéfinie appliquée: {text_color}", level="info")
-        except NameError:
-            log_message("❌ overlay_config non initialisé", level="error")
-            return False
+        submit_overlay_update(f"couleur prédéfinie: {text_color}", 'update_colors', text=final_color)
     
     return True
 
@@ -1170,76 +1490,39 @@ def apply_custom_color(props, prop):
     custom_color = custom_color.strip()
     
     # Valider le format CSS avant d'appliquer
-    if not is_valid_css_color(custom_color):
+    if not is_valid_color(custom_color):
         log_message(f"❌ Code couleur CSS invalide: {custom_color}", level="error")
         log_message("   Formats acceptés: #RGB, #RRGGBB, rgb(r,g,b), rgba(r,g,b,a), ou nom de couleur", level="info")
         return False
     
-    # Vérifier que overlay_config existe avant de l'utiliser
-    try:
-        # Vider le cache pour permettre de réappliquer la même couleur
-        overlay_config.clear_cache()
-        overlay_config.update_colors(text=custom_color)
-        log_message(f"✅ Code couleur CSS appliqué: {custom_color}", level="info")
-        return True
-    except NameError:
-        log_message("❌ overlay_config non initialisé", level="error")
-        return False
-    except Exception as e:
-        log_message(f"❌ Erreur application couleur: {e}", level="error")
-        return False
+    submit_overlay_update(f"code couleur CSS: {custom_color}", 'update_colors', text=custom_color)
+    return True
 
 def apply_sub_counter_mode(props, prop, settings):
-    """Applique le mode de comptage des subs (callback du dropdown)"""
-    try:
-        mode = obs.obs_data_get_string(settings, "sub_counter_mode")
-        
-        if not mode:
-            return False
-        
-        log_message(f"🔄 Changement mode compteur: {mode}", level="info")
-        
-        if not REQUESTS_AVAILABLE:
-            log_message("❌ Module requests non disponible", level="error")
-            return False
-        
-        # Appeler l'API pour changer le mode
-        response = requests.post(
-            f"{SERVER_URL}/api/sub-counter-mode",
-            json={"mode": mode},
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("success"):
-                mode_name = "Session Live" if mode == "session" else "Temps Réel"
-                log_message(f"✅ Mode compteur changé: {mode_name}", level="info")
-                return True
-            else:
-                log_message(f"❌ Erreur API: {data.get('error', 'Inconnu')}", level="error")
-        else:
-            log_message(f"❌ Erreur HTTP: {response.status_code}", level="error")
-        
-        return False
-        
-    except Exception as e:
-        log_message(f"❌ Erreur changement mode: {e}", level="error")
+    """Applique le mode de comptage des subs (callback du dropdown, non bloquant)"""
+    mode = obs.obs_data_get_string(settings, "sub_counter_mode")
+    if not mode:
         return False
+    
+    log_message(f"🔄 Changement mode compteur: {mode}", level="info")
+    mode_name = "Session Live" if mode == "session" else "Temps Réel"
+    
+    def on_result(instance, data):
+        prefix = "" if instance is primary_instance else f"[{instance.name}] "
+        if data is None:
+            return
+        if data.get("success"):
+            log_message(f"✅ {prefix}Mode compteur changé: {mode_name}", level="info")
+        else:
+            log_message(f"❌ {prefix}Erreur API: {data.get('error', 'Inconnu')}", level="error")
+    
+    submit_server_call('POST', "/api/sub-counter-mode", {"mode": mode}, on_result=on_result)
+    return False
 
 def get_current_sub_counter_mode():
-    """Récupère le mode de comptage actuel depuis le serveur"""
-    try:
-        if not REQUESTS_AVAILABLE:
-            return "realtime"
-        
-        response = requests.get(f"{SERVER_URL}/api/sub-counter-mode", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("mode", "realtime")
-    except:
-        pass
-    return "realtime"
+    """Récupère le mode de comptage actuel (première instance visée)"""
+    data = server_call('GET', "/api/sub-counter-mode")
+    return (data or {}).get("mode", "realtime")
 
 def reset_overlay_config(props, prop):
     """Réinitialise la configuration des overlays aux valeurs par défaut"""
@@ -1247,32 +1530,593 @@ def reset_overlay_config(props, prop):
         log_message("❌ Module overlay_config_manager non disponible", level="error")
         return False
     
-    # Vérifier que overlay_config existe avant de l'utiliser
+    submit_overlay_update(
+        "réinitialisation de la configuration overlays", 'update_full_config',
+        font={'family': 'Arial', 'size': '64px', 'weight': 'normal'},
+        colors={'text': 'white', 'shadow': 'rgba(0,0,0,0.5)', 'stroke': 'black'},
+        animation={'duration': '1s', 'easing': 'cubic-bezier(0.25, 0.46, 0.45, 0.94)'},
+        layout={'paddingLeft': '20px', 'gap': '0'}
+    )
+    return True
+
+# ============================================================================
+# FIN PHASE 1
+# ============================================================================
+
+# ============================================================================
+# RENDU NATIF - SOURCES TEXTE OBS
+# ============================================================================
+
+@METRICS.track_callback('native_overlay_tick')
+def native_overlay_tick():
+    """Callback du timer OBS : applique l'état des compteurs aux sources Texte
+    
+    Exécuté sur le thread OBS (obs_source_update y est sûr). Ne fait rien
+    tant que ni l'état ni les fichiers de paliers n'ont changé.
+    """
+    if counter_feed is None or text_renderer is None:
+        return
     try:
-        overlay_config.update_full_config(
-            font={'family': 'Arial', 'size': '64px', 'weight': 'normal'},
-            colors={'text': 'white', 'shadow': 'rgba(0,0,0,0.5)', 'stroke': 'black'},
-            animation={'duration': '1s', 'easing': 'cubic-bezier(0.25, 0.46, 0.45, 0.94)'},
-            layout={'paddingLeft': '20px', 'gap': '0'}
+        version, state = counter_feed.snapshot()
+        text_renderer.render(state, version)
+    except Exception as e:
+        log_message(f"⚠️ Erreur rendu texte natif: {e}", level="warning")
+
+# Hors direct, les textes ne servent qu'à l'aperçu : rendu ralenti
+native_render_timer = ProfiledTimer(
+    obs, native_overlay_tick, activity, NATIVE_RENDER_INTERVAL_MS, NATIVE_RENDER_IDLE_INTERVAL_MS
+)
+
+def configure_native_overlay(settings):
+    """(Re)configure le rendu natif selon les sources Texte choisies"""
+    global text_renderer, native_overlay_active
+    
+    if not NATIVE_OVERLAY_AVAILABLE:
+        return
+    
+    bindings = []
+    for key, (counter, kind) in NATIVE_TEXT_SOURCES.items():
+        source_name = obs.obs_data_get_string(settings, key)
+        if source_name and source_name.strip():
+            bindings.append((source_name.strip(), counter, kind))
+    
+    if not bindings:
+        stop_native_overlay()
+        return
+    
+    if text_renderer is None:
+        text_renderer = TextSourceRenderer(
+            obs, min_interval=NATIVE_RENDER_INTERVAL_MS / 1000.0, goals=goal_engine
         )
-        log_message("✅ Configuration overlays réinitialisée aux valeurs par défaut", level="info")
-    except NameError:
-        log_message("❌ overlay_config non initialisé", level="error")
+    text_renderer.clear_bindings()
+    for source_name, counter, kind in bindings:
+        text_renderer.bind(source_name, counter, kind)
+    
+    if not native_overlay_active:
+        if not ensure_counter_feed():
+            log_message("⚠️ websocket-client manquant - rendu texte natif indisponible", level="warning")
+            return
+        native_render_timer.start()
+        native_overlay_active = True
+        log_message(f"📝 Rendu texte natif actif ({len(bindings)} source(s))", level="info")
+
+def stop_native_overlay():
+    """Arrête le timer de rendu natif (et le flux s'il n'est plus utilisé)"""
+    global native_overlay_active
+    
+    if native_overlay_active:
+        native_render_timer.stop()
+        native_overlay_active = False
+    release_counter_feed()
+
+def ensure_counter_feed():
+    """Démarre le flux WebSocket des compteurs s'il ne tourne pas (partagé)
+    
+    Returns:
+        bool: True si le flux est actif
+    """
+    global counter_feed
+    
+    if counter_feed is not None:
+        return True
+    if not NATIVE_OVERLAY_AVAILABLE:
         return False
+    
+    feed = CounterFeed(WS_COUNTER_URL)
+    if not feed.start():
+        return False
+    counter_feed = feed
     return True
 
+def release_counter_feed(force=False):
+    """Arrête le flux des compteurs quand plus personne ne l'utilise"""
+    global counter_feed
+    
+    if counter_feed is None:
+        return
+    if not force and (native_overlay_active or session_series is not None):
+        return
+    counter_feed.stop()
+    counter_feed = None
+
+def list_text_sources():
+    """Retourne les noms des sources Texte (GDI+ / FreeType) de la collection"""
+    names = []
+    sources = obs.obs_enum_sources()
+    if not sources:
+        return names
+    try:
+        for source in sources:
+            source_id = obs.obs_source_get_unversioned_id(source)
+            if source_id in ("text_gdiplus", "text_ft2_source"):
+                names.append(obs.obs_source_get_name(source))
+    finally:
+        obs.source_list_release(sources)
+    return sorted(names, key=str.lower)
+
 # ============================================================================
-# FIN PHASE 1
+# PRESETS OVERLAY
 # ============================================================================
 
+def apply_overlay_preset(preset, trigger):
+    """Applique un preset en une seule requête sans bloquer OBS
+    
+    Args:
+        preset: OverlayPreset à appliquer
+        trigger: Origine ("scene", "button") pour les métriques
+    
+    Returns:
+        concurrent.futures.Future: Résultat par instance ({nom: bool ou exception})
+    """
+    global active_preset
+    active_preset = preset.name
+    started = time.perf_counter()
+    
+    def on_done(future):
+        global active_preset
+        elapsed = time.perf_counter() - started
+        METRICS.histogram(
+            'subcount_preset_apply_seconds', "Latence d'application des presets overlay", trigger=trigger
+        ).observe(elapsed)
+        try:
+            result = all(outcome is True for outcome in future.result().values())
+        except Exception as e:
+            result = False
+            log_message(f"❌ Erreur preset '{preset.name}': {e}", level="error")
+        if result:
+            log_message(f"🎭 Preset '{preset.name}' appliqué en {elapsed * 1000:.0f} ms ({trigger})", level="info")
+        else:
+            # Permettre une nouvelle tentative au prochain changement de scène
+            if active_preset == preset.name:
+                active_preset = None
+            log_message(f"⚠️ Échec application preset '{preset.name}' (serveur non accessible?)", level="warning")
+    
+    future = server_instances.submit(lambda instance: instance.overlay_config.apply_preset(preset), get_action_target())
+    future.add_done_callback(on_done)
+    return future
+
+def on_frontend_event(event):
+    """Événements OBS : preset de la scène, profil d'activité, fermeture"""
+    if event == obs.OBS_FRONTEND_EVENT_SCENE_CHANGED:
+        if PRESETS_AVAILABLE:
+            apply_scene_preset()
+    elif event in ACTIVITY_EVENTS:
+        update_activity_profile(ACTIVITY_EVENTS[event])
+    elif event == obs.OBS_FRONTEND_EVENT_EXIT:
+        on_obs_exit()
+
+def apply_scene_preset():
+    """Applique le preset lié à la scène courante"""
+    scene = obs.obs_frontend_get_current_scene()
+    if scene is None:
+        return
+    try:
+        scene_name = obs.obs_source_get_name(scene)
+    finally:
+        obs.obs_source_release(scene)
+    
+    preset = preset_store.preset_for_scene(scene_name)
+    # Même preset déjà affiché : pas de requête ni de rafraîchissement overlay
+    if preset is not None and preset.name != active_preset:
+        apply_overlay_preset(preset, "scene")
+
+def _fill_preset_lists(props):
+    """(Re)remplit la liste des presets dans les propriétés"""
+    preset_list = obs.obs_properties_get(props, "overlay_preset")
+    if not preset_list:
+        return
+    obs.obs_property_list_clear(preset_list)
+    for name in preset_store.names():
+        obs.obs_property_list_add_string(preset_list, name, name)
+    
+    bindings = preset_store.scene_bindings()
+    description = "\n".join(f"{scene} → {name}" for scene, name in sorted(bindings.items())) or "Aucune scène liée"
+    obs.obs_property_set_long_description(obs.obs_properties_get(props, "preset_scene"), description)
+
+def _selected_preset():
+    """Preset sélectionné dans la liste (None si aucun)"""
+    if global_settings is None:
+        return None
+    return preset_store.get(obs.obs_data_get_string(global_settings, "overlay_preset"))
+
+def apply_selected_preset(props, prop):
+    """Applique le preset sélectionné (callback du bouton)"""
+    preset = _selected_preset()
+    if preset is None:
+        log_message("⚠️ Aucun preset sélectionné", level="warning")
+        return False
+    apply_overlay_preset(preset, "button")
+    return False
+
+def save_current_as_preset(props, prop):
+    """Enregistre la police et la couleur actuelles comme preset nommé"""
+    if global_settings is None:
+        log_message("❌ Settings non disponibles", level="error")
+        return False
+    
+    name = obs.obs_data_get_string(global_settings, "preset_name").strip()
+    if not name:
+        log_message("⚠️ Veuillez saisir un nom de preset", level="warning")
+        return False
+    
+    font_config, colors_config = get_overlay_style(global_settings)
+    try:
+        preset = OverlayPreset(name, font=font_config, colors=colors_config)
+    except ValueError as e:
+        log_message(f"❌ Preset invalide: {e}", level="error")
+        return False
+    
+    preset_store.add(preset)
+    obs.obs_data_set_string(global_settings, "overlay_preset", name)
+    log_message(f"💾 Preset '{name}' enregistré ({', '.join(sorted(preset.updates))})", level="info")
+    _fill_preset_lists(props)
+    return True
+
+def delete_selected_preset(props, prop):
+    """Supprime le preset sélectionné (et ses liaisons de scènes)"""
+    preset = _selected_preset()
+    if preset is None or not preset_store.remove(preset.name):
+        log_message("⚠️ Aucun preset sélectionné", level="warning")
+        return False
+    log_message(f"🗑️ Preset '{preset.name}' supprimé", level="info")
+    _fill_preset_lists(props)
+    return True
+
+def bind_selected_preset(props, prop):
+    """Lie le preset sélectionné à la scène choisie"""
+    preset = _selected_preset()
+    scene = obs.obs_data_get_string(global_settings, "preset_scene") if global_settings else ""
+    if preset is None or not scene:
+        log_message("⚠️ Sélectionnez un preset et une scène", level="warning")
+        return False
+    preset_store.bind_scene(scene, preset.name)
+    log_message(f"🔗 Scène '{scene}' → preset '{preset.name}'", level="info")
+    _fill_preset_lists(props)
+    return True
+
+def unbind_selected_scene(props, prop):
+    """Retire le preset lié à la scène choisie"""
+    scene = obs.obs_data_get_string(global_settings, "preset_scene") if global_settings else ""
+    if not scene:
+        return False
+    preset_store.bind_scene(scene, None)
+    log_message(f"✂️ Scène '{scene}' déliée", level="info")
+    _fill_preset_lists(props)
+    return True
+
+# ============================================================================
+# SÉRIE DE SESSION
+# ============================================================================
+
+def start_session_series():
+    """Démarre l'enregistrement des compteurs de la session"""
+    global session_series
+    
+    if not ensure_counter_feed():
+        log_message("⚠️ websocket-client manquant - statistiques de session indisponibles", level="warning")
+        return
+    session_series = SessionSeries()
+    counter_feed.add_listener(session_series.on_counter_update)
+
+def format_duration(seconds):
+    """Durée lisible (ex: 1h05, 12min, 40s)"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}"
+    if seconds >= 60:
+        return f"{seconds // 60}min"
+    return f"{seconds}s"
+
+def log_session_stats(props=None, prop=None):
+    """Affiche débits, ETA et pic de rafale de la session (callback du bouton)"""
+    if session_series is None:
+        log_message("⚠️ Statistiques de session indisponibles", level="warning")
+        return False
+    
+    summary = session_series.summary()
+    if not summary:
+        log_message("📈 Aucune donnée de session pour l'instant", level="info", force_display=True)
+        return False
+    
+    for counter, stats in summary.items():
+        rates = ", ".join(f"{rate:+.1f}/min ({window})" for window, rate in stats['rates_per_min'].items())
+        eta = "—" if stats['eta_s'] is None else format_duration(stats['eta_s'])
+        peak = stats['peak_burst']
+        peak_text = f"+{peak['delta']} en {peak['end'] - peak['start']:.0f}s" if peak else "—"
+        log_message(
+            f"📈 {counter}: {stats['current']}/{stats['target']} | {rates} | objectif dans {eta} | pic {peak_text}",
+            level="info", force_display=True
+        )
+    return False
+
+def export_session_series():
+    """Sauvegarde la série de la session dans obs/data/sessions/"""
+    if session_series is None or not session_series.summary():
+        return None
+    try:
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        path = os.path.join(SESSIONS_DIR, time.strftime("session-%Y%m%d-%H%M%S.scsr"))
+        size = session_series.save(path)
+        log_message(f"💾 Session exportée: {path} ({size / 1024:.0f} Ko)", level="info")
+        return path
+    except Exception as e:
+        log_message(f"⚠️ Export de la session impossible: {e}", level="warning")
+        return None
+
+# ============================================================================
+# SAUVEGARDES
+# ============================================================================
+
+def run_backup(reason):
+    """Instantané des données utilisateur puis rétention
+    
+    Returns:
+        str: Identifiant de l'instantané (le précédent si rien n'a changé), None si échec
+    """
+    try:
+        result = backup_store.snapshot(reason)
+        if not result['unchanged']:
+            log_message(
+                f"💾 Sauvegarde {result['id']} ({reason}): {result['read_files']} fichier(s) modifié(s), "
+                f"{result['stored_bytes'] / 1024:.1f} Ko ajoutés",
+                level="info"
+            )
+            backup_store.prune()
+        return result['id']
+    except Exception as e:
+        log_message(f"⚠️ Sauvegarde ({reason}) impossible: {e}", level="warning")
+        return None
+
+def backup_loop():
+    """Tâche de fond : instantané au chargement puis toutes les BACKUP_INTERVAL s"""
+    token = current_token()
+    reason = "startup"
+    while True:
+        run_backup(reason)
+        reason = "schedule"
+        if token.wait(BACKUP_INTERVAL):
+            return
+
+def _fill_backup_list(props):
+    """(Re)remplit la liste des sauvegardes dans les propriétés"""
+    backup_list = obs.obs_properties_get(props, "backup_snapshot")
+    if not backup_list:
+        return
+    obs.obs_property_list_clear(backup_list)
+    for summary in backup_store.snapshots():
+        created = time.strftime("%d/%m %H:%M", time.localtime(summary['created']))
+        obs.obs_property_list_add_string(backup_list, f"{created} ({summary['reason']})", summary['id'])
+
+def backup_now(props, prop):
+    """Bouton : instantané immédiat"""
+    run_backup("manual")
+    _fill_backup_list(props)
+    return True
+
+def restore_selected_backup(props, prop):
+    """Bouton : restaure la sauvegarde choisie pour l'instance principale"""
+    snapshot_id = obs.obs_data_get_string(global_settings, "backup_snapshot") if global_settings else ""
+    if not snapshot_id:
+        log_message("⚠️ Sélectionnez une sauvegarde", level="warning")
+        return False
+    services.spawn("server", _restore_backup, snapshot_id)
+    return False
+
+def _restore_backup(snapshot_id):
+    """Restaure les fichiers de l'instance principale (état, paliers, config Twitch)
+    
+    Les fichiers des instances nommées présents dans la sauvegarde ne sont
+    pas touchés. L'instance principale est arrêtée pendant l'écriture et
+    relancée seulement si elle tournait.
+    """
+    global server_process, is_server_running
+    
+    was_running = primary_instance.running
+    if was_running:
+        # Le serveur réécrit app_state.json à l'arrêt : restaurer seulement après
+        primary_instance.stop()
+        server_process = None
+        is_server_running = False
+    try:
+        # L'état actuel reste récupérable si la restauration était une erreur
+        run_backup("pre-restore")
+        result = backup_store.restore(snapshot_id, paths=PRIMARY_FILES)
+        log_message(
+            f"♻️ Sauvegarde {snapshot_id} restaurée pour l'instance principale "
+            f"({len(result['restored'])} fichier(s), instances nommées inchangées)",
+            level="info", force_display=True
+        )
+    except (BackupError, OSError) as e:
+        log_message(f"❌ Restauration de {snapshot_id} impossible: {e}", level="error")
+    if was_running and not current_token().cancelled:
+        _start_primary_instance()
+
+def _start_primary_instance():
+    """Relance la seule instance principale et reprend sa supervision"""
+    global server_process, is_server_running
+    
+    report_instance_startup(server_instances.start_all(launch_instance, SERVER_START_TIMEOUT, target=[PRIMARY_INSTANCE]))
+    server_process = primary_instance.process
+    is_server_running = primary_instance.running
+    if is_server_running:
+        primary_instance.supervise(
+            on_exit=_on_instance_exit, health_check=lambda _: is_server_healthy(), interval=supervise_interval
+        )
+        push_activity_profile(targets=[PRIMARY_INSTANCE])
+
+# ============================================================================
+# MÉTRIQUES
+# ============================================================================
+
+def configure_metrics_endpoint(settings):
+    """Démarre/arrête l'endpoint Prometheus localhost selon les paramètres"""
+    global metrics_server
+    
+    enabled = obs.obs_data_get_bool(settings, "metrics_endpoint")
+    port = obs.obs_data_get_int(settings, "metrics_port") or DEFAULT_METRICS_PORT
+    
+    if metrics_server is not None and (not enabled or metrics_server.port != port):
+        stop_metrics_endpoint()
+    
+    if enabled and metrics_server is None:
+        server = MetricsServer(METRICS, port=port)
+        if server.start():
+            metrics_server = server
+            log_message(f"📊 Métriques exposées sur http://127.0.0.1:{port}/metrics", level="info", force_display=True)
+        else:
+            log_message(f"⚠️ Port {port} indisponible pour les métriques", level="warning")
+
+def stop_metrics_endpoint():
+    """Arrête l'endpoint Prometheus s'il est actif"""
+    global metrics_server
+    
+    if metrics_server is not None:
+        metrics_server.stop()
+        metrics_server = None
+
+def configure_memory_watchdog(settings):
+    """Démarre/arrête la surveillance mémoire selon les paramètres"""
+    global memory_watchdog, memory_watchdog_interval
+    
+    enabled = obs.obs_data_get_bool(settings, "memory_watchdog")
+    interval = obs.obs_data_get_int(settings, "memory_watchdog_interval") or MEMORY_WATCHDOG_INTERVAL
+    
+    if memory_watchdog is not None and (not enabled or memory_watchdog_interval != interval):
+        stop_memory_watchdog()
+    
+    if enabled and memory_watchdog is None:
+        memory_watchdog_interval = interval
+        watchdog = MemoryWatchdog(interval=activity.interval(interval))
+        watchdog.watch_size('polices', lambda: len(CACHED_FONTS or ()))
+        watchdog.watch_size('font_metadata', lambda: len(font_metadata))
+        watchdog.watch_size('services', lambda: len(services.tasks()))
+        watchdog.watch_size('sync_schedulers', lambda: len(sync_schedulers))
+        watchdog.watch_size('session_series', lambda: len(session_series) if session_series is not None else 0)
+        memory_watchdog = watchdog
+        services.spawn("memory-watchdog", watchdog.run)
+        log_message(f"🩺 Surveillance mémoire activée (relevé toutes les {interval} s)", level="info", force_display=True)
+
+def stop_memory_watchdog():
+    """Arrête la surveillance mémoire (tracemalloc est arrêté avec elle)"""
+    global memory_watchdog
+    
+    if memory_watchdog is not None:
+        services.cancel("memory-watchdog")
+        memory_watchdog = None
+
+def log_server_output(props=None, prop=None):
+    """Affiche les dernières lignes du serveur Node de chaque instance (callback du bouton)"""
+    for instance in server_instances:
+        lines = instance.output_tail(30)
+        if not lines:
+            log_message(f"ℹ️ [{instance.name}] Aucune sortie serveur capturée", level="info", force_display=True)
+            continue
+        log_message(f"📜 [{instance.name}] Dernières lignes du serveur :", level="info", force_display=True)
+        for line in lines:
+            log_message(f"   {line}", level="info", force_display=True)
+    return False
+
+def log_metrics_summary():
+    """Callback du timer OBS : résumé des latences dans le log"""
+    log_message(METRICS.summary(), level="info", force_display=True)
+
+# Résumé périodique en direct seulement (un résumé est écrit à chaque bascule)
+metrics_summary_timer = ProfiledTimer(obs, log_metrics_summary, activity, METRICS_SUMMARY_INTERVAL_MS, PAUSED)
+
+# ============================================================================
+# PROFIL D'ACTIVITÉ (EN DIRECT / AU REPOS)
+# ============================================================================
+
+# Événements frontend qui peuvent changer le profil -> raison journalisée
+ACTIVITY_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_STREAMING_STARTED: "stream démarré",
+    obs.OBS_FRONTEND_EVENT_STREAMING_STOPPED: "stream arrêté",
+    obs.OBS_FRONTEND_EVENT_RECORDING_STARTED: "enregistrement démarré",
+    obs.OBS_FRONTEND_EVENT_RECORDING_STOPPED: "enregistrement arrêté",
+}
+
+def update_activity_profile(reason=None):
+    """Profil d'après l'état réel d'OBS (un enregistrement peut survivre à la fin du stream)"""
+    streaming = bool(obs.obs_frontend_streaming_active())
+    recording = bool(obs.obs_frontend_recording_active())
+    return activity.update(streaming, recording, reason)
+
+def apply_activity_profile(profile):
+    """Abonné du profil : superviseurs, synchros, watchdog et serveurs
+    
+    Les timers OBS (rendu natif, résumé des métriques) suivent le profil
+    d'eux-mêmes (ProfiledTimer). Appelé sur le thread OBS.
+    """
+    log_metrics_summary()
+    for instance in server_instances:
+        instance.wake_supervisor()
+    if memory_watchdog is not None:
+        memory_watchdog.interval = activity.interval(memory_watchdog_interval)
+    if obs_exiting:
+        return
+    
+    if global_settings is not None:
+        configure_sync_schedulers(global_settings)
+        # Compteurs à jour dès le début du stream
+        if profile == LIVE and is_server_running and obs.obs_data_get_bool(global_settings, "auto_sync"):
+            for instance in server_instances:
+                if instance.running:
+                    get_sync_scheduler(instance).request_sync("live")
+    if is_server_running:
+        services.spawn("activity-profile", push_activity_profile)
+
+def push_activity_profile(targets=None):
+    """Envoie le profil courant aux serveurs lancés (hors direct : polling Twitch ralenti)
+    
+    Args:
+        targets: Noms des instances (défaut: toutes celles qui tournent)
+    """
+    profile = activity.current
+    names = [instance.name for instance in server_instances
+             if instance.running and (targets is None or instance.name in targets)]
+    if not names:
+        return
+    results = server_instances.fan_out(lambda instance: instance.set_activity_profile(profile), names)
+    failed = [name for name, ok in results.items() if ok is not True]
+    if failed:
+        log_message(f"⚠️ Profil '{profile}' non transmis à: {', '.join(failed)}", level="warning")
+
+def on_obs_exit():
+    """OBS se ferme : plus de synchros ni de requêtes d'ici script_unload"""
+    global obs_exiting
+    obs_exiting = True
+    stop_sync_schedulers()
+    activity.set(IDLE, "fermeture d'OBS")
+
 # Fonctions OBS
 def script_description():
     """Description du script pour OBS"""
     return """<h2>🎮 SubCount Auto v3.1.1</h2>"""
 
+@METRICS.track_callback('script_load')
 def script_load(settings):
     """Appelé quand le script est chargé dans OBS"""
-    global global_settings, _refresh_attempts
+    global global_settings, _refresh_attempts, obs_exiting
     global_settings = settings  # Sauvegarder les settings pour les réappliquer plus tard
     _refresh_attempts = 0  # Reset le compteur de tentatives
     
@@ -1285,21 +2129,35 @@ def script_load(settings):
     
     log_message("🎬 Script OBS SubCount Auto v3.1.2 avec Auto-Update chargé", level="info")
     log_message(f"📂 Répertoire: {SCRIPT_DIR}", level="info")
-    log_message(f"🚀 Fichier serveur: {START_SERVER_BAT}", level="info")
+    log_message(f"🚀 Fichier serveur: {os.path.join(SERVER_DIR, SERVER_SCRIPT)}", level="info")
     log_message(f"📦 Version: {VERSION}", level="info")
     
     # Vérifier les mises à jour en arrière-plan
-    update_thread = threading.Thread(target=check_for_updates_async, daemon=True)
-    update_thread.start()
+    services.spawn("update-check", check_for_updates_async)
     
-    # Démarrer le serveur automatiquement
-    global server_thread
-    server_thread = threading.Thread(target=start_server, daemon=True)
-    server_thread.start()
+    # Sauvegarde des données au chargement puis périodique
+    services.spawn("backups", backup_loop)
     
-    # Démarrer la surveillance
-    monitor_thread = threading.Thread(target=monitor_server, daemon=True)
-    monitor_thread.start()
+    # Raccourcis clavier (Paramètres > Raccourcis clavier) et file des actions
+    start_hotkeys(settings)
+    
+    # Profil d'activité initial (OBS diffuse déjà si le script est rechargé)
+    obs_exiting = False
+    update_activity_profile("chargement du script")
+    activity.on_change(apply_activity_profile)
+    
+    # Instances supplémentaires déclarées dans les paramètres
+    configure_server_instances(settings)
+    configure_sync_schedulers(settings)
+    
+    # Démarrer le serveur automatiquement (la surveillance démarre avec lui)
+    services.spawn("server", start_server)
+    
+    # Arrêts exécutés en parallèle par script_unload
+    services.on_shutdown("sync-schedulers", stop_sync_schedulers)
+    services.on_shutdown("server", lambda: stop_server(timeout=SERVER_STOP_TIMEOUT))
+    services.on_shutdown("counter-feed", lambda: release_counter_feed(force=True))
+    services.on_shutdown("metrics-endpoint", stop_metrics_endpoint)
     
     # La configuration overlay sera appliquée automatiquement par le timer
     # juste avant le rafraîchissement des sources navigateur
@@ -1308,8 +2166,18 @@ def script_load(settings):
     # Le timer s'exécute toutes les 3 secondes jusqu'à ce que le refresh réussisse
     log_message("⏰ Démarrage du timer de rafraîchissement automatique (3s)", level="info")
     obs.timer_add(try_refresh_browser_sources, 3000)
+    
+    # Résumé périodique des métriques dans le log (en pause hors direct)
+    metrics_summary_timer.start()
+    
+    # Presets liés aux scènes, profil d'activité (stream / enregistrement), fermeture
+    obs.obs_frontend_add_event_callback(on_frontend_event)
+    
+    # Historique des compteurs de la session
+    start_session_series()
 
 
+@METRICS.timed('subcount_browser_refresh_seconds', "Durée du rafraîchissement des sources navigateur")
 def refresh_overlay_browser_sources():
     """Rafraîchit toutes les sources navigateur qui contiennent overlay.html"""
     global _refresh_attempts
@@ -1321,40 +2189,50 @@ def refresh_overlay_browser_sources():
             return False
         
         refresh_count = 0
-        for source in sources:
-            source_id = obs.obs_source_get_id(source)
-            
-            # Vérifier si c'est une source navigateur
-            if source_id == "browser_source":
-                settings = obs.obs_source_get_settings(source)
-                url = obs.obs_data_get_string(settings, "url")
-                source_name = obs.obs_source_get_name(source)
+        # Libérations dans des finally : une erreur d'un appel OBS (rattrapée
+        # plus bas) ne doit pas laisser la liste ou les settings en mémoire
+        try:
+            for source in sources:
+                source_id = obs.obs_source_get_id(source)
                 
-                # Si l'URL contient overlay.html, rafraîchir
-                if url and "overlay.html" in url:
-                    log_message(f"🔄 Rafraîchissement source: {source_name}", level="info")
-                    
-                    # Méthode plus agressive: Changer temporairement l'URL puis la remettre
-                    # Cela force OBS à recharger complètement la page
-                    temp_url = url + ("&" if "?" in url else "?") + f"_refresh={int(time.time())}"
-                    obs.obs_data_set_string(settings, "url", temp_url)
-                    obs.obs_source_update(source, settings)
-                    
-                    # Remettre l'URL originale après un court délai (via le timer)
-                    # Pour l'instant, on garde l'URL avec le paramètre de cache-bust
-                    
-                    # Méthode alternative: proc_handler refresh
-                    proc_handler = obs.obs_source_get_proc_handler(source)
-                    if proc_handler:
-                        call_data = obs.calldata_create()
-                        obs.proc_handler_call(proc_handler, "refresh", call_data)
-                        obs.calldata_destroy(call_data)
-                    
-                    refresh_count += 1
+                # Vérifier si c'est une source navigateur
+                if source_id != "browser_source":
+                    continue
                 
-                obs.obs_data_release(settings)
-        
-        obs.source_list_release(sources)
+                settings = obs.obs_source_get_settings(source)
+                try:
+                    url = obs.obs_data_get_string(settings, "url")
+                    source_name = obs.obs_source_get_name(source)
+                    
+                    # Si l'URL contient overlay.html, rafraîchir
+                    if url and "overlay.html" in url:
+                        log_message(f"🔄 Rafraîchissement source: {source_name}", level="info")
+                        
+                        # Méthode plus agressive: Changer temporairement l'URL puis la remettre
+                        # Cela force OBS à recharger complètement la page
+                        # (le paramètre du refresh précédent est remplacé, pas empilé)
+                        url = REFRESH_PARAM_PATTERN.sub(r'\1', url).rstrip('?&')
+                        temp_url = url + ("&" if "?" in url else "?") + f"_refresh={int(time.time())}"
+                        obs.obs_data_set_string(settings, "url", temp_url)
+                        obs.obs_source_update(source, settings)
+                        
+                        # Remettre l'URL originale après un court délai (via le timer)
+                        # Pour l'instant, on garde l'URL avec le paramètre de cache-bust
+                        
+                        # Méthode alternative: proc_handler refresh
+                        proc_handler = obs.obs_source_get_proc_handler(source)
+                        if proc_handler:
+                            call_data = obs.calldata_create()
+                            try:
+                                obs.proc_handler_call(proc_handler, "refresh", call_data)
+                            finally:
+                                obs.calldata_destroy(call_data)
+                        
+                        refresh_count += 1
+                finally:
+                    obs.obs_data_release(settings)
+        finally:
+            obs.source_list_release(sources)
         
         if refresh_count > 0:
             log_message(f"✅ {refresh_count} source(s) navigateur rafraîchie(s)", level="info")
@@ -1369,6 +2247,7 @@ def refresh_overlay_browser_sources():
         return False
 
 
+@METRICS.track_callback('try_refresh_browser_sources')
 def try_refresh_browser_sources(user_data=None):
     """Callback du timer OBS pour tenter de rafraîchir les sources navigateur"""
     global _refresh_timer, _refresh_attempts
@@ -1421,6 +2300,38 @@ def try_refresh_browser_sources(user_data=None):
         obs.timer_remove(try_refresh_browser_sources)
 
 
+def get_overlay_style(settings):
+    """Police et couleurs overlay définies dans les paramètres du script
+    
+    Returns:
+        tuple: (font_config ou None, colors_config ou None)
+    """
+    font_family = obs.obs_data_get_string(settings, "overlay_font")
+    font_size = obs.obs_data_get_int(settings, "overlay_font_size")
+    text_color = obs.obs_data_get_string(settings, "overlay_text_color")
+    custom_color = obs.obs_data_get_string(settings, "overlay_custom_color")
+    
+    log_message(f"📋 Config sauvegardée - Police: '{font_family}' @ {font_size}px, Couleur: '{text_color}', Custom: '{custom_color}'", level="info")
+    
+    font_config = None
+    colors_config = None
+    
+    # Police
+    if font_family and font_family.strip():
+        font_config = {
+            'family': font_family.strip(),
+            'size': f"{font_size}px" if font_size > 0 else "64px"
+        }
+    
+    # Couleur - priorité à la couleur personnalisée
+    if custom_color and custom_color.strip() and custom_color.upper() != "#FFFFFF":
+        colors_config = {'text': custom_color.strip()}
+    elif text_color and text_color.strip():
+        final_color = COLOR_MAP.get(text_color, text_color)
+        colors_config = {'text': final_color}
+    
+    return font_config, colors_config
+
 def apply_saved_overlay_config(settings):
     """Applique la configuration overlay sauvegardée après le démarrage du serveur - EN UNE SEULE REQUÊTE"""
     
@@ -1429,52 +2340,21 @@ def apply_saved_overlay_config(settings):
         return False
     
     try:
-        # Récupérer TOUTES les valeurs sauvegardées
-        font_family = obs.obs_data_get_string(settings, "overlay_font")
-        font_size = obs.obs_data_get_int(settings, "overlay_font_size")
-        text_color = obs.obs_data_get_string(settings, "overlay_text_color")
-        custom_color = obs.obs_data_get_string(settings, "overlay_custom_color")
+        font_config, colors_config = get_overlay_style(settings)
         
-        log_message(f"📋 Config sauvegardée - Police: '{font_family}' @ {font_size}px, Couleur: '{text_color}', Custom: '{custom_color}'", level="info")
-        
-        # Préparer les mises à jour
-        font_config = None
-        colors_config = None
-        
-        # Police
-        if font_family and font_family.strip():
-            font_config = {
-                'family': font_family.strip(),
-                'size': f"{font_size}px" if font_size > 0 else "64px"
-            }
-        
-        # Couleur - priorité à la couleur personnalisée
-        if custom_color and custom_color.strip() and custom_color.upper() != "#FFFFFF":
-            colors_config = {'text': custom_color.strip()}
-        elif text_color and text_color.strip():
-            final_color = COLOR_MAP.get(text_color, text_color)
-            colors_config = {'text': final_color}
-        
-        # Appliquer tout en une seule requête
+        # Appliquer tout en une seule requête (update_full_config)
         if font_config or colors_config:
-            # Vider le cache pour forcer l'envoi
-            overlay_config.clear_cache()
-            
-            # Utiliser update_full_config pour envoyer tout d'un coup
-            result = overlay_config.update_full_config(
-                font=font_config,
-                colors=colors_config
+            submit_overlay_update(
+                f"restauration config - Police: {font_config}, Couleurs: {colors_config}", 'update_full_config',
+                font=font_config, colors=colors_config
             )
-            
-            if result:
-                log_message(f"✅ Config restaurée - Police: {font_config}, Couleurs: {colors_config}", level="info")
-                return True
-            else:
-                log_message("⚠️ Échec de l'application de la config (serveur non accessible?)", level="warning")
-                return False
         else:
             log_message("ℹ️ Configuration overlay par défaut (aucune personnalisation)", level="info")
-            return True
+        
+        # Le preset lié à la scène courante a priorité (envoyé après, même ordre)
+        if PRESETS_AVAILABLE:
+            on_frontend_event(obs.OBS_FRONTEND_EVENT_SCENE_CHANGED)
+        return True
             
     except Exception as e:
         log_message(f"⚠️ Erreur restauration config: {e}", level="warning")
@@ -1482,6 +2362,7 @@ def apply_saved_overlay_config(settings):
         log_message(f"Traceback: {traceback.format_exc()}", level="error")
         return False
 
+@METRICS.track_callback('script_unload')
 def script_unload():
     """Appelé quand le script est déchargé ou OBS se ferme"""
     global is_server_running, _refresh_attempts
@@ -1496,21 +2377,62 @@ def script_unload():
     except:
         pass
     
-    # Arrêter le serveur
-    stop_server()
+    obs.obs_frontend_remove_event_callback(on_frontend_event)
+    activity.remove_listener(apply_activity_profile)
+    
+    # Plus de nouveaux appuis ; les actions en attente partent avec l'arrêt
+    global hotkey_bindings
+    if hotkey_bindings is not None:
+        hotkey_bindings.unregister()
+        hotkey_bindings = None
+    
+    # Dernier résumé des métriques
+    metrics_summary_timer.stop()
+    log_metrics_summary()
+    
+    # Arrêter le rendu natif (timer OBS) puis exporter la session
+    stop_native_overlay()
+    export_session_series()
+    
+    # Annuler les tâches, arrêter serveur, synchro, flux et endpoint en
+    # parallèle, puis joindre les threads dans un délai ferme
+    started = time.monotonic()
+    report = services.shutdown(UNLOAD_DEADLINE)
+    
+    # Synchroniser le journal hors-ligne sur disque
+    if action_journal is not None:
+        action_journal.close()
     
-    log_message("👋 Arrêt complet du script OBS SubCount Auto", level="info")
+    # Fermer les connexions overlay puis arrêter la boucle d'arrière-plan
+    if OVERLAY_CONFIG_AVAILABLE:
+        server_instances.close_overlay_managers(timeout=0.5)
+        get_background_loop().stop(timeout=0.5)
+    
+    log_message(
+        f"👋 Arrêt complet du script OBS SubCount Auto en {time.monotonic() - started:.2f}s "
+        f"({report['tasks']} tâche(s), {report['stop_hooks']} arrêt(s) en parallèle)",
+        level="info"
+    )
 
+@METRICS.track_callback('script_update')
 def script_update(settings):
     """Appelé quand les paramètres changent"""
     global global_settings
     global_settings = settings
+    configure_server_instances(settings)
+    configure_sync_schedulers(settings)
+    configure_native_overlay(settings)
+    configure_metrics_endpoint(settings)
+    configure_memory_watchdog(settings)
 
 def script_save(settings):
     """Appelé lors de la sauvegarde - stocke les settings"""
     global global_settings
     global_settings = settings
+    if hotkey_bindings is not None:
+        hotkey_bindings.save(settings)
 
+@METRICS.track_callback('script_defaults')
 def script_defaults(settings):
     """Définit les valeurs par défaut"""
     if OVERLAY_CONFIG_AVAILABLE:
@@ -1522,7 +2444,17 @@ def script_defaults(settings):
     # Charger le mode compteur actuel depuis le serveur
     current_mode = get_current_sub_counter_mode()
     obs.obs_data_set_default_string(settings, "sub_counter_mode", current_mode)
+    
+    obs.obs_data_set_default_bool(settings, "auto_sync", True)
+    obs.obs_data_set_default_int(settings, "auto_sync_interval", AUTO_SYNC_DEFAULT_INTERVAL)
+    
+    obs.obs_data_set_default_bool(settings, "metrics_endpoint", False)
+    obs.obs_data_set_default_int(settings, "metrics_port", DEFAULT_METRICS_PORT)
+    
+    obs.obs_data_set_default_bool(settings, "memory_watchdog", False)
+    obs.obs_data_set_default_int(settings, "memory_watchdog_interval", MEMORY_WATCHDOG_INTERVAL)
 
+@METRICS.track_callback('script_properties')
 def script_properties():
     """Propriétés configurables du script"""
     props = obs.obs_properties_create()
@@ -1557,6 +2489,14 @@ def script_properties():
         lambda props, prop: sync_with_twitch()
     )
     
+    # Synchro automatique (ralentit d'elle-même quand rien ne change)
+    obs.obs_properties_add_bool(
+        props, "auto_sync", "  🔁  Synchro automatique"
+    )
+    obs.obs_properties_add_int(
+        props, "auto_sync_interval", "  ⏱️  Intervalle de synchro (s)", 30, 3600, 30
+    )
+    
     obs.obs_properties_add_button(
         props, "restart_server", "⚙️\tRedémarrer le Serveur", 
         lambda props, prop: restart_server()
@@ -1566,6 +2506,33 @@ def script_properties():
         props, "stop_server", "🔴\tArrêter le Serveur", 
         lambda props, prop: stop_server()
     )
+    
+    # Instances supplémentaires (double chaîne, co-stream)
+    instances_text = obs.obs_properties_add_text(
+        props, "server_instances", "  🧩  Instances supplémentaires", 
+        obs.OBS_TEXT_MULTILINE
+    )
+    obs.obs_property_set_long_description(
+        instances_text,
+        "Une instance par ligne : nom:port\nEx: duo:8092 (WebSockets sur 8093 et 8094)\n"
+        "Nom : lettres ASCII, chiffres, _ et - ; chaque instance se connecte à son propre compte Twitch"
+    )
+    
+    target_list = obs.obs_properties_add_list(
+        props, "action_target", "  🎯  Instance ciblée",
+        obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_STRING
+    )
+    obs.obs_property_list_add_string(target_list, f"{PRIMARY_INSTANCE} ({SERVER_URL})", "")
+    for instance in server_instances:
+        if instance is not primary_instance:
+            obs.obs_property_list_add_string(target_list, f"{instance.name} ({instance.url})", instance.name)
+    if len(server_instances) > 1:
+        obs.obs_property_list_add_string(target_list, "Toutes les instances", ALL_INSTANCES)
+    
+    obs.obs_properties_add_button(
+        props, "overlay_urls", "🖼️\tURLs des overlays (instance ciblée)", 
+        lambda props, prop: log_overlay_urls()
+    )
 
     # ========== CONFIGURATION OVERLAYS ==========
     if OVERLAY_CONFIG_AVAILABLE:
@@ -1669,6 +2636,88 @@ def script_properties():
             reset_overlay_config
         )
 
+    # ========== PRESETS OVERLAY ==========
+    if PRESETS_AVAILABLE:
+        obs.obs_properties_add_text(
+            props, "separator_presets", 
+            "\n─ 🎭 PRESETS OVERLAY 🎭 ─", 
+            obs.OBS_TEXT_INFO
+        )
+        
+        obs.obs_properties_add_list(
+            props,
+            "overlay_preset",
+            "  🎭  Preset",
+            obs.OBS_COMBO_TYPE_LIST,
+            obs.OBS_COMBO_FORMAT_STRING
+        )
+        obs.obs_properties_add_button(
+            props, "apply_preset_btn", "  ▶️  Appliquer le preset", 
+            apply_selected_preset
+        )
+        obs.obs_properties_add_button(
+            props, "delete_preset_btn", "  🗑️  Supprimer le preset", 
+            delete_selected_preset
+        )
+        
+        obs.obs_properties_add_text(
+            props,
+            "preset_name",
+            "  🏷️  Nom du preset",
+            obs.OBS_TEXT_DEFAULT
+        )
+        obs.obs_properties_add_button(
+            props, "save_preset_btn", "  💾  Enregistrer le style actuel", 
+            save_current_as_preset
+        )
+        
+        # Liaison scène -> preset (appliqué au changement de scène)
+        scene_list = obs.obs_properties_add_list(
+            props,
+            "preset_scene",
+            "  🎬  Scène",
+            obs.OBS_COMBO_TYPE_LIST,
+            obs.OBS_COMBO_FORMAT_STRING
+        )
+        for scene_name in obs.obs_frontend_get_scene_names() or []:
+            obs.obs_property_list_add_string(scene_list, scene_name, scene_name)
+        obs.obs_properties_add_button(
+            props, "bind_preset_btn", "  🔗  Lier le preset à la scène", 
+            bind_selected_preset
+        )
+        obs.obs_properties_add_button(
+            props, "unbind_preset_btn", "  ✂️  Délier la scène", 
+            unbind_selected_scene
+        )
+        _fill_preset_lists(props)
+
+    # ========== RENDU TEXTE NATIF ==========
+    if NATIVE_OVERLAY_AVAILABLE:
+        obs.obs_properties_add_text(
+            props, "separator_native", 
+            "\n─ 📝 TEXTES NATIFS (sans navigateur) 📝 ─", 
+            obs.OBS_TEXT_INFO
+        )
+        
+        text_sources = list_text_sources()
+        native_labels = [
+            ("native_follow_source", "  👥  Follows / objectif"),
+            ("native_follow_milestone_source", "  👥  Message palier follows"),
+            ("native_sub_source", "  ⭐  Subs / objectif"),
+            ("native_sub_milestone_source", "  ⭐  Message palier subs"),
+        ]
+        for key, label in native_labels:
+            source_list = obs.obs_properties_add_list(
+                props,
+                key,
+                label,
+                obs.OBS_COMBO_TYPE_LIST,
+                obs.OBS_COMBO_FORMAT_STRING
+            )
+            obs.obs_property_list_add_string(source_list, "(aucune)", "")
+            for name in text_sources:
+                obs.obs_property_list_add_string(source_list, name, name)
+    
     # ========== CONTRÔLES RAPIDES ==========
     obs.obs_properties_add_text(
         props, "section_controls", 
@@ -1685,12 +2734,12 @@ def script_properties():
     
     obs.obs_properties_add_button(
         props, "add_follow", "  ➕  Ajouter 1 Follow", 
-        lambda props, prop: add_follow()
+        lambda props, prop: queue_action('follows', 1)
     )
     
     obs.obs_properties_add_button(
         props, "remove_follow", "  ➖  Retirer 1 Follow", 
-        lambda props, prop: remove_follow()
+        lambda props, prop: queue_action('follows', -1)
     )
     
     # ========== SUBS ==========
@@ -1702,12 +2751,12 @@ def script_properties():
     
     obs.obs_properties_add_button(
         props, "add_sub", "  ➕  Ajouter 1 Sub (Tier 1)", 
-        lambda props, prop: add_sub()
+        lambda props, prop: queue_action('subs', 1)
     )
     
     obs.obs_properties_add_button(
         props, "remove_sub", "  ➖  Retirer 1 Sub", 
-        lambda props, prop: remove_sub()
+        lambda props, prop: queue_action('subs', -1)
     )
     
     # ========== MODE COMPTEUR SUBS ==========
@@ -1748,29 +2797,92 @@ def script_properties():
         lambda props, prop: open_admin()
     )
     
+    # ========== SAUVEGARDES ==========
+    obs.obs_properties_add_text(
+        props, "separator_backups", 
+        "\n─ 💾 SAUVEGARDES 💾 ─", 
+        obs.OBS_TEXT_INFO
+    )
+    
+    obs.obs_properties_add_list(
+        props,
+        "backup_snapshot",
+        "  🗂️  Sauvegarde",
+        obs.OBS_COMBO_TYPE_LIST,
+        obs.OBS_COMBO_FORMAT_STRING
+    )
+    _fill_backup_list(props)
+    
+    obs.obs_properties_add_button(
+        props, "backup_now_btn", "  💾  Sauvegarder maintenant", 
+        backup_now
+    )
+    
+    obs.obs_properties_add_button(
+        props, "restore_backup_btn", "  ♻️  Restaurer la sauvegarde (instance principale)", 
+        restore_selected_backup
+    )
+    
+    # ========== DIAGNOSTIC ==========
+    obs.obs_properties_add_text(
+        props, "separator_metrics", 
+        "\n─ 📊 DIAGNOSTIC 📊 ─", 
+        obs.OBS_TEXT_INFO
+    )
+    
+    obs.obs_properties_add_bool(
+        props, "metrics_endpoint", "  📊  Exposer les métriques (Prometheus, localhost)"
+    )
+    
+    obs.obs_properties_add_int(
+        props, "metrics_port", "  🔌  Port des métriques", 1024, 65535, 1
+    )
+    
+    obs.obs_properties_add_bool(
+        props, "memory_watchdog", "  🩺  Surveillance mémoire (longues sessions, ralentit le script)"
+    )
+    
+    obs.obs_properties_add_int(
+        props, "memory_watchdog_interval", "  ⏱️  Intervalle des relevés mémoire (s)", 30, 3600, 30
+    )
+    
+    obs.obs_properties_add_button(
+        props, "session_stats_btn", "  📈  Statistiques de session (débits, ETA)", 
+        log_session_stats
+    )
+    
+    obs.obs_properties_add_button(
+        props, "server_output_btn", "  📜  Dernières lignes du serveur Node", 
+        log_server_output
+    )
+    
     return props
 
 def restart_server():
-    """Redémarre le serveur manuellement"""
-    log_message("🔄 Redémarrage manuel du serveur...", level="info")
-    stop_server()
-    time.sleep(2)
-    
-    global server_thread
-    server_thread = threading.Thread(target=start_server, daemon=True)
-    server_thread.start()
+    """Redémarre le serveur manuellement (sans bloquer OBS)
     
+    Un démarrage encore en cours est annulé et attendu avant l'arrêt.
+    """
+    log_message("🔄 Redémarrage manuel du serveur...", level="info")
+    services.spawn("server", _restart_server)
     return True
 
+def _restart_server():
+    stop_server()
+    if current_token().wait(2):
+        return
+    start_server()
+
 # Point d'entrée principal
 if __name__ == "__main__":
     # Test en dehors d'OBS
     print("🧪 Test du script SubCount Auto en dehors d'OBS")
     print(f"📂 Répertoire: {SCRIPT_DIR}")
-    print(f"🚀 Fichier serveur: {START_SERVER_BAT}")
+    server_script = os.path.join(SERVER_DIR, SERVER_SCRIPT)
+    print(f"🚀 Fichier serveur: {server_script}")
     
-    if os.path.exists(START_SERVER_BAT):
-        print("✅ START_SERVER.bat trouvé")
+    if os.path.exists(server_script):
+        print(f"✅ {SERVER_SCRIPT} trouvé")
         
         # Test de démarrage
         if start_server():
@@ -1781,4 +2893,4 @@ if __name__ == "__main__":
         else:
             print("❌ Échec du démarrage du serveur")
     else:
-        print("❌ START_SERVER.bat introuvable")
+        print(f"❌ {SERVER_SCRIPT} introuvable")
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration pytest : modules partagés (app/scripts) et paquets du
+script OBS (obs/) importables comme dans OBS.
+
+    python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "app", "scripts"), os.path.join(ROOT, "obs")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def loop():
+    """Boucle asyncio propre à chaque test (code 3.6 : get_event_loop)"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def obs_script():
+    """Script OBS importé avec le module obspython simulé : (stub, module)"""
+    from bench.leak_check import build_stub, load_script
+    stub = build_stub()
+    return stub, load_script()
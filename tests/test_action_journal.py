@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Journal hors-ligne : clés d'idempotence et rejeu"""
+
+import pytest
+
+from action_journal import ActionJournal
+
+
+def make_journal(tmp_path):
+    return ActionJournal(str(tmp_path / "journal.jsonl"), fsync_interval=0)
+
+
+def test_compacted_counters_replay_with_new_key(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_counter('follows', 1)
+    journal.record_counter('follows', 1)
+    journal.record_counter('follows', -1)
+
+    sent = []
+    assert journal.replay(lambda op: sent.append(op) or True) == (2, 0)
+    assert [(op['counter'], op['delta']) for op in sent] == [('follows', 2), ('follows', -1)]
+    assert all(op['key'] for op in sent) and sent[0]['key'] != sent[1]['key']
+    assert not journal.has_pending()
+
+
+def test_opposite_deltas_keep_server_clamping(tmp_path):
+    journal = make_journal(tmp_path)
+    for counter, delta in (('follows', -5), ('subs', 1), ('follows', 3), ('follows', 2), ('subs', 1)):
+        journal.record_counter(counter, delta)
+
+    # Serveur borné à 0 : -5 puis +3 depuis 1 donne 3, un net de -2 donnerait 0
+    operations = journal.pending_operations()
+    assert [(op['counter'], op['delta'], op['seqs']) for op in operations] == [
+        ('follows', -5, [1]), ('follows', 5, [3, 4]), ('subs', 2, [2, 5]),
+    ]
+
+    follows = 1
+    for op in operations:
+        if op['counter'] == 'follows':
+            follows = max(0, follows + op['delta'])
+    assert follows == 5
+
+
+def test_live_attempt_is_replayed_under_its_key(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_counter('subs', 1, key="cle-directe")
+    journal.record_counter('subs', 1)
+
+    operations = journal.pending_operations()
+    # L'essai en direct n'est pas fusionné avec les actions suivantes
+    assert [(op.get('key'), op['delta']) for op in operations] == [("cle-directe", 1), (None, 1)]
+    assert journal.pending_count() == 2
+
+    sent = []
+    journal.replay(lambda op: sent.append(op['key']) or True)
+    assert sent[0] == "cle-directe"
+    assert len(set(sent)) == 2
+
+
+def test_failed_replay_keeps_key_across_restart(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_counter('follows', 2, key="cle-timeout")
+    assert journal.replay(lambda op: False) == (0, 1)
+    journal.close()
+
+    reloaded = make_journal(tmp_path)
+    keys = []
+    assert reloaded.replay(lambda op: keys.append(op['key']) or True) == (1, 0)
+    assert keys == ["cle-timeout"]
+
+
+@pytest.mark.parametrize('outcome, journaled', [(None, True), (False, False), (True, False)])
+def test_adjust_counter_journals_every_undelivered_action(obs_script, tmp_path, monkeypatch, outcome, journaled):
+    pytest.importorskip("requests")
+    _, script = obs_script
+    journal = make_journal(tmp_path)
+    monkeypatch.setattr(script, 'action_journal', journal)
+    monkeypatch.setattr(script, '_post_counter_delta', lambda *args, **kwargs: outcome)
+    script.server_breaker.reset()
+
+    # Premier échec : le disjoncteur reste fermé, l'action ne doit pas être perdue
+    assert script.adjust_counter('follows', 1) is bool(outcome)
+    assert not script.server_breaker.is_open()
+    assert [(op['counter'], op['delta']) for op in journal.pending_operations()] == (
+        [('follows', 1)] if journaled else []
+    )
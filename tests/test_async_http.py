@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Client HTTP asyncio : renvoi après fermeture d'une connexion keep-alive
+réservé aux requêtes idempotentes
+"""
+import asyncio
+
+import pytest
+
+from async_http import HttpConnection, HttpError, encode_message, read_message
+
+
+class ClosingServer:
+    """Répond à la première requête de chaque connexion, puis lit la
+    suivante et ferme sans répondre (serveur qui a pu l'appliquer)"""
+
+    def __init__(self):
+        self.received = []
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            for index in range(2):
+                message = await read_message(reader)
+                if message is None:
+                    return
+                self.received.append(message[0])
+                if index == 0:
+                    writer.write(encode_message("HTTP/1.1 200 OK", {'Content-Type': 'application/json'}, b'{}'))
+                    await writer.drain()
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+def server(loop):
+    server = ClosingServer()
+    loop.run_until_complete(server.start())
+    yield server
+    loop.run_until_complete(server.stop())
+
+
+def second_request(loop, server, method, headers=None):
+    """Première requête pour ouvrir la connexion, puis la requête testée"""
+    connection = HttpConnection(f"http://127.0.0.1:{server.port}", timeout=2)
+
+    async def run():
+        try:
+            assert (await connection.request('GET', '/api/current')).status_code == 200
+            return await connection.request(method, '/admin/add-follows', {'amount': 1}, headers)
+        finally:
+            connection.close()
+    return loop.run_until_complete(run())
+
+
+def test_post_without_key_is_not_resent(loop, server):
+    with pytest.raises((HttpError, ConnectionError, asyncio.IncompleteReadError)):
+        second_request(loop, server, 'POST')
+    assert server.received.count("POST /admin/add-follows HTTP/1.1") == 1
+
+
+def test_post_with_idempotency_key_is_resent(loop, server):
+    response = second_request(loop, server, 'POST', {'Idempotency-Key': 'cle'})
+    assert response.status_code == 200
+    assert server.received.count("POST /admin/add-follows HTTP/1.1") == 2
+
+
+def test_get_is_resent(loop, server):
+    assert second_request(loop, server, 'GET').status_code == 200
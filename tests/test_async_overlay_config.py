@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+AsyncOverlayConfigManager contre le serveur stub (boucle d'arrière-plan
+dédiée, soumissions depuis le thread du test comme depuis OBS)
+"""
+import socket
+
+import pytest
+
+from async_overlay_config_manager import AsyncOverlayConfigManager
+from background_loop import BackgroundLoop
+from bench.overlay_storm import fold_sections, generate_storm, run_async_storm
+from bench.stub_server import StubServer
+from server_resilience import RetryPolicy
+
+
+@pytest.fixture
+def background():
+    background = BackgroundLoop(name="test-async")
+    yield background
+    background.stop()
+
+
+@pytest.fixture
+def stub(background):
+    server = StubServer(latency=0.02)
+    background.submit(server.start()).result(5)
+    yield server
+    background.submit(server.stop()).result(5)
+
+
+def manager_for(url, background, **kwargs):
+    kwargs.setdefault('enable_cache', False)
+    return AsyncOverlayConfigManager(server_url=url, background_loop=background, **kwargs)
+
+
+def test_pending_update_is_merged_with_the_next(stub, background):
+    manager = manager_for(stub.url, background, max_in_flight=1)
+
+    futures = [manager.submit(manager.update_font(size=f"{size}px")) for size in range(10, 30)]
+    assert all(future.result(5) for future in futures)
+
+    # Le premier POST part seul, les suivants en attente sont fusionnés
+    assert 2 <= len(stub.overlay_posts) < len(futures)
+    assert manager.updates_superseded >= len(futures) - len(stub.overlay_posts)
+    assert stub.overlay_config['font']['size'] == "29px"
+
+
+def test_storm_keeps_last_writer_per_section(stub, background):
+    storm = generate_storm(200, seed=3)
+    report = run_async_storm(stub, storm, background, max_in_flight=2)
+
+    assert report['failures'] == 0
+    assert report['consistent']
+    assert report['posts'] < report['calls']
+    # Le serveur remplace la config à chaque POST : rejouer les POST dans
+    # l'ordre d'arrivée doit donner la dernière valeur de chaque appel
+    assert fold_sections(stub.overlay_posts) == fold_sections([sections for _, _, sections in storm])
+
+
+def test_identical_section_update_is_cached(stub, background):
+    manager = manager_for(stub.url, background, enable_cache=True)
+
+    assert manager.submit(manager.update_colors(text="#112233")).result(5)
+    assert manager.submit(manager.update_colors(text="#112233")).result(5)
+    assert len(stub.overlay_posts) == 1
+
+
+def test_unreachable_server_resolves_false(background):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    policy = RetryPolicy(attempts=1)
+    manager = manager_for(url, background, retry_policy=policy, timeout=1)
+
+    assert manager.submit(manager.update_layout(gap="4px")).result(5) is False
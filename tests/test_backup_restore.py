@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Restauration d'une sauvegarde depuis le script OBS (instance principale)
+"""
+import pytest
+
+from backup_store import BackupStore
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "projet"
+    (root / "app" / "config").mkdir(parents=True)
+    (root / "obs" / "data").mkdir(parents=True)
+    return root
+
+
+def write_state(root, primary, named):
+    (root / "app" / "config" / "app_state.json").write_text(primary, encoding='utf-8')
+    (root / "app" / "config" / "app_state.duo.json").write_text(named, encoding='utf-8')
+
+
+@pytest.fixture
+def script(obs_script, project, tmp_path, monkeypatch):
+    _, script = obs_script
+    monkeypatch.setattr(script, 'backup_store', BackupStore(str(tmp_path / "backups"), str(project)))
+    restarts = []
+    monkeypatch.setattr(script, '_start_primary_instance', lambda: restarts.append(True))
+    script.restarts = restarts
+    yield script
+    del script.restarts
+    script.primary_instance.breaker.reset()
+
+
+def test_restore_only_touches_primary_files(script, project, monkeypatch):
+    write_state(project, '{"follows": 10}', '{"follows": 99}')
+    snapshot_id = script.run_backup("manual")
+    write_state(project, '{"follows": 0}', '{"follows": 100}')
+    monkeypatch.setattr(script.primary_instance, 'running', False)
+
+    script._restore_backup(snapshot_id)
+
+    assert (project / "app" / "config" / "app_state.json").read_text(encoding='utf-8') == '{"follows": 10}'
+    assert (project / "app" / "config" / "app_state.duo.json").read_text(encoding='utf-8') == '{"follows": 100}'
+    # Le serveur ne tournait pas : il n'est pas démarré par la restauration
+    assert script.restarts == []
+
+
+def test_restore_restarts_a_running_primary(script, project, monkeypatch):
+    write_state(project, '{"follows": 1}', '{}')
+    snapshot_id = script.run_backup("manual")
+    monkeypatch.setattr(script.primary_instance, 'running', True)
+    monkeypatch.setattr(script.primary_instance, 'process', None)
+
+    script._restore_backup(snapshot_id)
+
+    assert not script.primary_instance.running
+    assert script.restarts == [True]
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Découverte des polices sur des arborescences générées"""
+
+import os
+
+import pytest
+
+from font_discovery import (
+    DirectoryFontBackend, _write_font_tree, default_backends, discover_font_families, order_families,
+)
+from font_metadata import FontMetadataCache, build_fixture_collection, build_fixture_font
+
+
+def write_font(directory, name, data):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(data)
+
+
+@pytest.fixture
+def font_tree(tmp_path):
+    root = str(tmp_path / "fonts")
+    _write_font_tree(root, 12, 10)
+    return root
+
+
+def relative_paths(font_files, root):
+    return sorted(os.path.relpath(font_file.path, root) for font_file in font_files)
+
+
+def test_parallel_scan_matches_sequential(font_tree):
+    write_font(os.path.join(font_tree, "foundry0"), "README.txt", b"pas une police")
+
+    sequential = DirectoryFontBackend([font_tree], max_workers=1)
+    parallel = DirectoryFontBackend([font_tree], max_workers=4)
+    files = sequential.files()
+    assert len(files) == 12 * 10
+    assert relative_paths(parallel.files(), font_tree) == relative_paths(files, font_tree)
+    assert parallel.directories_scanned == sequential.directories_scanned
+    assert all(font_file.stat is not None for font_file in files)
+
+
+def test_non_recursive_scan_and_missing_roots(font_tree, tmp_path):
+    write_font(font_tree, "top.ttf", build_fixture_font("Top Sans"))
+    backend = DirectoryFontBackend([str(tmp_path / "absent"), font_tree], recursive=False)
+    assert backend.available()
+    assert relative_paths(backend.files(), font_tree) == ["top.ttf"]
+    assert not DirectoryFontBackend([str(tmp_path / "absent")]).available()
+
+
+def test_each_file_read_once_across_backends(font_tree):
+    cache = FontMetadataCache()
+    nested = os.path.join(font_tree, "foundry0")
+    backends = [
+        DirectoryFontBackend([font_tree]),
+        DirectoryFontBackend([font_tree, nested], max_workers=1),
+    ]
+
+    families = discover_font_families(backends, cache)
+    assert cache.misses == 12 * 10 and cache.hits == 0
+    assert len(families) == len({family.lower() for family in families})
+
+    # Second scan : tout vient du cache (même taille, même mtime)
+    assert discover_font_families(backends, cache) == families
+    assert (cache.hits, cache.misses) == (12 * 10, 12 * 10)
+
+
+def test_families_deduped_and_ordered_by_priority(tmp_path):
+    root = str(tmp_path / "fonts")
+    write_font(root, "zeta.otf", build_fixture_font("Zeta Sans", cff=True))
+    write_font(root, "georgia.ttf", build_fixture_font("Georgia"))
+    write_font(root, "arial.ttf", build_fixture_font("Arial"))
+    write_font(os.path.join(root, "bold"), "arialbd.ttf", build_fixture_font("Arial", "Bold"))
+    write_font(root, "segoeuisb.ttf", build_fixture_font("Segoe UI Semibold", "Regular", "Segoe UI", "Semibold"))
+    write_font(root, "cambria.ttc", build_fixture_collection([
+        {'family': "Cambria"}, {'family': "Cambria Math"},
+    ]))
+    write_font(root, "vgaoem.ttf", build_fixture_font("VGA OEM"))
+    # Illisibles : repli sur le nom du fichier, suffixe de variante retiré
+    write_font(root, "Impact.ttf", b'\x00\x01\x00\x00' + b'\xff' * 32)
+    write_font(root, "Impact-Bold.ttf", b'')
+
+    stats = {}
+    families = discover_font_families([DirectoryFontBackend([root])], FontMetadataCache(), stats=stats)
+    assert families == ["Arial", "Georgia", "Impact", "Cambria", "Cambria Math", "Segoe UI", "Zeta Sans"]
+    assert stats == {'dossiers': 9}
+
+
+def test_order_families():
+    assert order_families(["zeta", "Verdana", "ARIAL", "arial", "Beta"]) == ["ARIAL", "Verdana", "Beta", "zeta"]
+    assert order_families(["Zeta", "Beta"], priority=["Zeta"]) == ["Arial", "Zeta", "Beta"]
+
+
+def test_linux_backends_follow_xdg(tmp_path):
+    environ = {'XDG_DATA_HOME': str(tmp_path / "data"), 'XDG_DATA_DIRS': "/usr/share:/opt/share:/usr/share"}
+    backend, = default_backends('linux', environ)
+    assert backend.roots == [
+        str(tmp_path / "data" / "fonts"),
+        os.path.join(os.path.expanduser('~'), '.fonts'),
+        "/usr/share/fonts",
+        "/opt/share/fonts",
+    ]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Noms lus dans la table 'name' des polices de test générées"""
+
+import os
+
+import pytest
+
+from font_metadata import (
+    FontFace, FontFormatError, FontMetadataCache, build_fixture_collection, build_fixture_font,
+    parse_font_names, preferred_family, read_font_names, write_fixture_fonts,
+)
+
+
+def write_font(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+@pytest.mark.parametrize('cff', [False, True])
+def test_name_ids_1_2_16_17(cff):
+    data = build_fixture_font("Segoe UI Semibold", "Regular", "Segoe UI", "Semibold", cff=cff, padding=4096)
+
+    faces = parse_font_names(data)
+    assert faces == [FontFace("Segoe UI Semibold", "Regular", "Segoe UI", "Semibold")]
+    assert preferred_family(faces[0]) == "Segoe UI"
+
+
+def test_family_without_typographic_names():
+    face, = parse_font_names(build_fixture_font("Arial", "Bold"))
+    assert face == FontFace("Arial", "Bold", None, None)
+    assert preferred_family(face) == "Arial"
+
+
+def test_collection_gives_one_face_per_font(tmp_path):
+    data = build_fixture_collection([
+        {'family': "Cambria", 'subfamily': 'Regular'},
+        {'family': "Cambria Math", 'subfamily': 'Regular'},
+        {'family': "Cambria Light", 'typographic_family': "Cambria", 'typographic_subfamily': 'Light'},
+    ], padding=1024)
+    path = write_font(tmp_path / "cambria.ttc", data)
+
+    faces = read_font_names(path)
+    assert [face.family for face in faces] == ["Cambria", "Cambria Math", "Cambria Light"]
+    assert faces[2].typographic_subfamily == 'Light'
+    assert FontMetadataCache().families(path) == ["Cambria", "Cambria Math"]
+
+
+@pytest.mark.parametrize('data', [b'', b'\x00\x01\x00\x00' + b'\xff' * 32, b'not a font at all'])
+def test_unreadable_files(tmp_path, data):
+    path = write_font(tmp_path / "broken.ttf", data)
+    with pytest.raises(FontFormatError):
+        read_font_names(path)
+    assert FontMetadataCache().get(path) == []
+
+
+def test_cache_reused_until_size_or_mtime_change(tmp_path):
+    path = write_font(tmp_path / "font.ttf", build_fixture_font("Verdana"))
+    cache = FontMetadataCache()
+
+    assert cache.families(path) == ["Verdana"]
+    assert cache.families(path) == ["Verdana"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Même chemin, autre taille
+    write_font(path, build_fixture_font("Georgia", padding=512))
+    assert cache.families(path) == ["Georgia"]
+    assert cache.misses == 2
+
+    # Même taille, autre date de modification
+    write_font(path, build_fixture_font("Impact", padding=512))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.families(path) == ["Impact"]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_cache_persisted_and_reloaded(tmp_path):
+    fonts = tmp_path / "fonts"
+    expected = write_fixture_fonts(str(fonts), 20, padding=1024)
+    cache_path = str(tmp_path / "cache" / "fonts.json")
+
+    cache = FontMetadataCache(cache_path)
+    for name, families in expected.items():
+        assert cache.families(str(fonts / name)) == families
+    cache.save()
+    assert cache.misses == 20
+
+    reloaded = FontMetadataCache(cache_path)
+    assert len(reloaded) == 20
+    for name, families in expected.items():
+        assert reloaded.families(str(fonts / name)) == families
+    assert (reloaded.hits, reloaded.misses) == (20, 0)
+
+
+def test_cache_ignores_other_version(tmp_path):
+    cache_path = tmp_path / "fonts.json"
+    cache_path.write_text('{"version": 0, "fonts": {"x.ttf": [1, 2, [["X", "Regular", null, null]]]}}',
+                          encoding='utf-8')
+    assert len(FontMetadataCache(str(cache_path))) == 0
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur d'objectifs : conformité à goals-factory.js et rechargement à chaud
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from bench.obs_stub import ObsStub
+from goal_engine import GOAL_FILES, GoalEngine, GoalTrack, check, parse_goals
+from native_overlay import TextSourceRenderer
+from native_overlay.text_renderer import KIND_MILESTONE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOALS_FACTORY = os.path.join(ROOT, "app", "server", "core", "factories", "goals-factory.js")
+
+# getCurrentGoalInfo() exécuté par node sur un StateManager minimal
+NODE_PROBE = """
+const { createGoalsService } = require(process.argv[1]);
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const results = input.cases.map(({ goals, value }) => {
+    const map = new Map(goals);
+    const service = createGoalsService({
+        stateManager: { getFollowGoals: () => map, getFollows: () => value },
+        logger: { logEvent: () => {} },
+        ROOT_DIR: '.',
+    });
+    return service.getCurrentGoalInfo('follow');
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def test_track_matches_reference_transcription():
+    assert check(cases=500) == []
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+def test_track_matches_goals_factory():
+    contents = [
+        "",
+        "0: zéro\n5: cinq",
+        "10: Dix\r\n20:\r\n20: Vingt bis\r\n  \r\nx30: invalide",
+        "100: Cent\n50: Cinquante\n75:   Trois quarts  ",
+    ]
+    cases = []
+    for content in contents:
+        goals = parse_goals(content)
+        for value in (0, 1, 4, 5, 6, 10, 19, 20, 21, 49, 50, 99, 100, 150):
+            cases.append((goals, value))
+
+    result = subprocess.run(
+        ["node", "-e", NODE_PROBE, GOALS_FACTORY],
+        input=json.dumps({'cases': [{'goals': sorted(g.items()), 'value': v} for g, v in cases]}),
+        stdout=subprocess.PIPE, universal_newlines=True, check=True, timeout=30,
+    )
+    expected = json.loads(result.stdout)
+    for (goals, value), reference in zip(cases, expected):
+        assert GoalTrack(goals, 100).goal_info(value) == reference, (goals, value)
+
+
+def test_goal_file_reloads_only_when_modified(tmp_path):
+    path = tmp_path / GOAL_FILES['follow']
+    path.parent.mkdir(parents=True)
+    path.write_text("10: Dix\n", encoding='utf-8')
+    engine = GoalEngine(str(tmp_path))
+
+    assert engine.refresh()
+    assert not engine.refresh()
+    assert engine.goal_info('follow', 3)['goal']['message'] == "Dix"
+
+    path.write_text("10: Dix\n20: Vingt\n", encoding='utf-8')
+    assert engine.refresh()
+    assert engine.milestones('follow', 12) == ((10, "Dix"), (20, "Vingt"))
+
+    path.unlink()
+    assert engine.refresh()
+    assert len(engine.track('follow')) == 0
+
+
+def test_renderer_takes_milestone_from_goal_files(tmp_path):
+    path = tmp_path / GOAL_FILES['follow']
+    path.parent.mkdir(parents=True)
+    path.write_text("10: Dix\n20: Vingt\n", encoding='utf-8')
+
+    obs = ObsStub()
+    obs.add_source("Palier", "text_gdiplus")
+    renderer = TextSourceRenderer(obs, min_interval=0, goals=GoalEngine(str(tmp_path)))
+    renderer.bind("Palier", "follows", KIND_MILESTONE)
+
+    state = {'follows': {'current': 12, 'target': 20, 'message': "Message du serveur", 'isMaxReached': False}}
+    assert renderer.render(state, version=1) == 1
+    assert obs.sources["Palier"].settings["text"] == "Vingt"
+
+    # Fichier modifié sans nouvel état : le tick suivant recharge et réapplique
+    path.write_text("10: Dix\n20: Vingt mis à jour\n", encoding='utf-8')
+    os.utime(str(path), ns=(0, 10 ** 9))
+    assert renderer.render(state, version=1) == 1
+    assert obs.sources["Palier"].settings["text"] == "Vingt mis à jour"
+    assert renderer.render(state, version=1) == 0
+
+    # Aucun palier local : message du serveur
+    path.unlink()
+    assert renderer.render(state, version=1) == 1
+    assert obs.sources["Palier"].settings["text"] == "Message du serveur"
+    assert obs.outstanding() == {}
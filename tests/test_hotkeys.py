@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Raccourcis clavier : regroupement d'ActionSender et persistance des
+touches (HotkeyBindings) sur le module obspython simulé
+"""
+import time
+
+import pytest
+
+from bench.obs_stub import ObsStub
+from hotkeys import HOTKEYS, ActionSender, HotkeyBindings
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, action, amount):
+        self.sent.append((action, amount))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture
+def send():
+    return Recorder()
+
+
+def flush(sender):
+    """Lance le thread sur ce qui est déjà déposé puis l'arrête"""
+    sender.start()
+    sender.stop()
+
+
+def test_counter_deltas_net_to_one_request(send):
+    sender = ActionSender(send)
+    for amount in (1, 1, -1):
+        sender.submit('follows', amount)
+    sender.submit('subs', -1)
+    flush(sender)
+
+    assert send.sent == [('follows', 1), ('subs', -1)]
+    assert sender.stats['requests'] == 2 and sender.stats['batches'] == 1
+
+
+def test_zero_total_sends_nothing(send):
+    sender = ActionSender(send)
+    sender.submit('follows', 1)
+    sender.submit('follows', -1)
+    flush(sender)
+
+    assert send.sent == []
+    assert sender.stats['cancelled_out'] == 1
+
+
+def test_sync_and_preset_are_deduplicated(send):
+    sender = ActionSender(send)
+    for action in ('sync', 'preset', 'sync', 'sync', 'preset'):
+        sender.submit(action)
+    flush(sender)
+
+    assert send.sent == [('sync', None), ('preset', None)]
+
+
+def test_stop_flushes_pending_actions(send):
+    sender = ActionSender(send, window=30, min_interval=30)
+    sender.start()
+    sender.submit('subs', 2)
+    sender.submit('sync')
+
+    started = time.monotonic()
+    sender.stop()
+    assert time.monotonic() - started < 1.0
+    assert send.sent == [('subs', 2), ('sync', None)]
+
+
+class FakeSender:
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, action, amount=None):
+        self.calls.append((action, amount))
+
+
+def test_bindings_save_and_reload_through_settings():
+    obs = ObsStub()
+    settings = obs.obs_data_create()
+    bindings = HotkeyBindings(obs, FakeSender())
+    assert bindings.register(settings) == len(HOTKEYS)
+
+    obs.bind_key("subcount_follow_add", {'key': "OBS_KEY_F1"})
+    obs.bind_key("subcount_sync", {'key': "OBS_KEY_F5", 'control': True})
+    bindings.save(settings)
+    bindings.unregister()
+    assert obs.hotkeys == {}
+
+    # Rechargement du script : les touches reviennent des paramètres
+    reloaded = ObsStub()
+    HotkeyBindings(reloaded, FakeSender()).register(settings)
+    keys = {name: keys for name, _, _, keys in reloaded.hotkeys.values()}
+    assert keys["subcount_follow_add"] == [{'key': "OBS_KEY_F1"}]
+    assert keys["subcount_sync"] == [{'key': "OBS_KEY_F5", 'control': True}]
+    assert keys["subcount_sub_add"] == []
+
+    obs.obs_data_release(settings)
+    assert obs.outstanding() == {} and reloaded.outstanding() == {}
+
+
+def test_bindings_route_presses_to_sender():
+    obs = ObsStub()
+    sender = FakeSender()
+    settings = obs.obs_data_create()
+    HotkeyBindings(obs, sender).register(settings)
+
+    obs.press("subcount_follow_remove")
+    obs.press("subcount_follow_remove", pressed=False)
+    obs.press("subcount_apply_preset")
+    obs.press("subcount_apply_preset", pressed=False)
+
+    assert sender.calls == [('follows', -1), ('preset', None)]
+
+
+def test_held_key_counts_one_press(send):
+    """Maintien ou relâchement perdu : un seul +1, rien ne continue ensuite"""
+    obs = ObsStub()
+    sender = ActionSender(send, window=0.01, min_interval=0.01)
+    settings = obs.obs_data_create()
+    HotkeyBindings(obs, sender).register(settings)
+    sender.start()
+    try:
+        obs.press("subcount_follow_add")
+        time.sleep(0.3)  # Touche maintenue, relâchement jamais reçu
+        assert wait_for(sender.idle)
+        obs.press("subcount_follow_add")
+        obs.press("subcount_follow_add", pressed=False)
+        time.sleep(0.1)
+    finally:
+        sender.stop()
+
+    assert sum(amount for _, amount in send.sent) == 2
+    assert sender.stats['submitted'] == 2
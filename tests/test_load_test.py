@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur de charge (bench.load_test) contre le serveur stub
+"""
+from bench.load_test import PROFILES, LoadTester, latency_summary, percentile
+from bench.stub_server import StubServer
+
+
+class LossyStubServer(StubServer):
+    """Perd un incrément sur cinq (acquitté mais jamais appliqué)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = 0
+
+    def _apply(self, counter, value, absolute=False, traces=None):
+        if not absolute:
+            self.received += 1
+            if self.received % 5 == 0:
+                return
+        super()._apply(counter, value, absolute, traces)
+
+
+def run_profile(loop, server, phases):
+    loop.run_until_complete(server.start())
+    try:
+        tester = LoadTester(server.url, settle_timeout=0.5)
+        return loop.run_until_complete(tester.run(phases))
+    finally:
+        loop.run_until_complete(server.stop())
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) is None
+    assert latency_summary([0.002, 0.001])['p50'] == 1.0
+
+
+def test_smoke_profile_is_consistent_and_restores_counters(loop):
+    server = StubServer(batch_delay=0.01)
+    server.follows, server.subs = 7, 3
+    report = run_profile(loop, server, PROFILES['smoke'])
+
+    summary = report['summary']
+    assert summary['ok'] == summary['requests'] == 60
+    assert summary['consistent']
+    assert summary['lost'] == summary['double_counted'] == 0
+    assert report['phases'][0]['consistency']['after'] == 27
+    assert (server.follows, server.subs) == (7, 3)
+
+
+def test_lost_increments_are_reported(loop):
+    phases = [{'endpoint': 'add-follows', 'requests': 20, 'concurrency': 4}]
+    report = run_profile(loop, LossyStubServer(), phases)
+
+    consistency = report['phases'][0]['consistency']
+    assert not report['summary']['consistent']
+    assert consistency['lost'] == 4
+    assert consistency['after'] == consistency['expected'] - 4
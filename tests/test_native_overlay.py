@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Rendu natif des compteurs (native_overlay) sur le module obspython simulé
+"""
+import json
+
+import pytest
+
+from bench.obs_stub import ObsStub, ObsStubError
+from native_overlay import CounterFeed, TextSourceRenderer
+from native_overlay.text_renderer import KIND_MILESTONE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def goal(current, target=50, message="Palier"):
+    return {'current': current, 'target': target, 'message': message, 'isMaxReached': False}
+
+
+@pytest.fixture
+def obs():
+    stub = ObsStub()
+    stub.add_source("Follows", "text_gdiplus")
+    stub.add_source("Palier", "text_gdiplus")
+    return stub
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def renderer_for(obs, clock, min_interval=0.25):
+    renderer = TextSourceRenderer(obs, min_interval=min_interval, clock=clock)
+    renderer.bind("Follows", "follows")
+    renderer.bind("Palier", "follows", KIND_MILESTONE)
+    return renderer
+
+
+def test_render_updates_only_on_change(obs, clock):
+    renderer = renderer_for(obs, clock)
+
+    assert renderer.render({'follows': goal(12)}, version=1) == 2
+    assert obs.sources["Follows"].settings["text"] == "12/50 : Palier"
+    assert obs.sources["Palier"].settings["text"] == "Palier"
+
+    # Même version : aucun appel à OBS
+    lookups = obs.calls['obs_get_source_by_name']
+    clock.now += 1
+    assert renderer.render({'follows': goal(12)}, version=1) == 0
+    assert obs.calls['obs_get_source_by_name'] == lookups
+
+    # Nouvelle version, seul le texte du compteur change
+    assert renderer.render({'follows': goal(13)}, version=2) == 1
+    assert obs.sources["Follows"].updates == 2
+    assert obs.sources["Palier"].updates == 1
+    assert renderer.updates_applied == 3
+
+
+def test_render_rate_limits_each_source(obs, clock):
+    renderer = renderer_for(obs, clock, min_interval=0.5)
+    renderer.render({'follows': goal(1)}, version=1)
+
+    clock.now += 0.1
+    assert renderer.render({'follows': goal(2)}, version=2) == 0
+    assert obs.sources["Follows"].settings["text"] == "1/50 : Palier"
+
+    # Limité : la même version est réappliquée une fois l'intervalle écoulé
+    clock.now += 0.5
+    assert renderer.render({'follows': goal(2)}, version=2) == 1
+    assert obs.sources["Follows"].settings["text"] == "2/50 : Palier"
+    clock.now += 1
+    assert renderer.render({'follows': goal(2)}, version=2) == 0
+
+
+def test_render_retries_missing_source(obs, clock):
+    renderer = renderer_for(obs, clock)
+    renderer.bind("Subs", "subs")
+
+    renderer.render({'follows': goal(1), 'subs': goal(3)}, version=1)
+    assert "Subs" not in obs.sources
+
+    # La source apparaît : la même version doit l'atteindre
+    obs.add_source("Subs", "text_gdiplus")
+    clock.now += 1
+    assert renderer.render({'follows': goal(1), 'subs': goal(3)}, version=1) == 1
+    assert obs.sources["Subs"].settings["text"] == "3/50 : Palier"
+
+
+def test_render_releases_every_reference(obs, clock):
+    renderer = renderer_for(obs, clock, min_interval=0)
+    for version in range(1, 20):
+        renderer.render({'follows': goal(version)}, version=version)
+
+    obs.fail_on('obs_source_update')
+    with pytest.raises(ObsStubError):
+        renderer.render({'follows': goal(99)}, version=99)
+
+    assert obs.outstanding() == {}
+    assert obs.double_releases == []
+
+
+def test_counter_feed_versions_only_real_changes():
+    feed = CounterFeed()
+    seen = []
+    feed.add_listener(lambda counter, value: seen.append((counter, value['current'])))
+
+    message = json.dumps({'type': 'follow_update', 'goal': goal(5)})
+    assert feed.handle_message(message)
+    assert not feed.handle_message(message)
+    assert not feed.handle_message("pas du json")
+    assert not feed.handle_message(json.dumps({'type': 'autre', 'goal': goal(1)}))
+    assert feed.handle_message(json.dumps({'type': 'sub_update', 'goal': goal(2)}))
+
+    version, state = feed.snapshot()
+    assert version == 2
+    assert state == {'follows': goal(5), 'subs': goal(2)}
+    assert seen == [('follows', 5), ('subs', 2)]
+
+
+def test_counter_feed_drives_renderer(obs, clock):
+    feed = CounterFeed()
+    renderer = renderer_for(obs, clock, min_interval=0)
+
+    for current in (1, 1, 2):
+        feed.handle_message(json.dumps({'type': 'follow_update', 'goal': goal(current)}))
+        version, state = feed.snapshot()
+        renderer.render(state, version)
+        clock.now += 1
+
+    assert obs.sources["Follows"].updates == 2
+    assert obs.outstanding() == {}
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Lancement direct du serveur : bannière de server.js reconnue par
+READY_PATTERNS et capture de la sortie dans le tampon circulaire
+"""
+import os
+import re
+import socket
+import sys
+
+import pytest
+
+from node_launcher import READY_PATTERNS, OutputBuffer, ServerProcess, launch_node_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_JS = os.path.join(ROOT, "app", "server", "server.js")
+FAKE_NODE = os.path.join(ROOT, "obs", "bench", "fake_node.py")
+
+
+def banner_lines():
+    """console.log() du callback app.listen() de start(), ${...} remplacés"""
+    with open(SERVER_JS, encoding='utf-8') as f:
+        source = f.read()
+    start = source.index("app.listen(PORT")
+    end = source.index("});", start)
+    lines = re.findall(r"console\.log\(([`'])(.*?)\1\)", source[start:end])
+    return [re.sub(r"\$\{[^}]*\}", "8082", text) for _, text in lines]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_server_banner_matches_ready_patterns():
+    lines = banner_lines()
+    assert lines, "bannière d'écoute introuvable dans server.js"
+    for pattern in READY_PATTERNS:
+        assert [line for line in lines if pattern.search(line)], pattern.pattern
+
+
+def test_output_buffer_keeps_last_lines():
+    buffer = OutputBuffer(max_lines=3)
+    for index in range(5):
+        buffer.append(f"ligne {index}")
+
+    assert buffer.lines() == ["ligne 2", "ligne 3", "ligne 4"]
+    assert buffer.tail(2) == ["ligne 3", "ligne 4"]
+    assert len(buffer) == 3 and buffer.total == 5
+
+
+def test_server_process_captures_output_in_ring():
+    script = "import sys\nfor i in range(50): print(i)\nprint('erreur', file=sys.stderr)"
+    process = ServerProcess([sys.executable, "-c", script], ready_patterns=(), output_lines=10)
+
+    assert process.wait(10) == 0
+    assert process.wait_output_closed(5)
+    assert process.output.lines() == [str(i) for i in range(41, 50)] + ["erreur"]
+    assert process.output.total == 51
+
+
+@pytest.fixture
+def server_dir(tmp_path):
+    (tmp_path / "server.js").write_text("", encoding='utf-8')
+    return str(tmp_path)
+
+
+def fake_env(**extra):
+    env = dict(os.environ, SUBCOUNT_HTTP_PORT=str(free_port()), FAKE_NODE_STARTUP="0")
+    env.update(extra)
+    return env
+
+
+def test_fake_node_banner_makes_process_ready(server_dir):
+    seen = []
+    process = launch_node_server(server_dir, fake_env(), node=[sys.executable, FAKE_NODE], on_line=seen.append)
+    try:
+        assert process.wait_ready(10)
+        assert process.startup_seconds is not None
+        assert any("Serveur HTTP" in line for line in process.output.lines())
+    finally:
+        process.terminate()
+        process.wait(5)
+    assert process.wait_output_closed(5)
+    assert seen == process.output.lines()
+
+
+def test_crashing_server_keeps_its_output_tail(server_dir):
+    env = fake_env(FAKE_NODE_CRASH="1")
+    process = launch_node_server(server_dir, env, node=[sys.executable, FAKE_NODE])
+
+    assert not process.wait_ready(10)
+    assert process.wait(5) == 1
+    assert process.wait_output_closed(5)
+    tail = process.output.tail(3)
+    assert tail[0].startswith("Error: listen EADDRINUSE")
+    assert "at listenInCluster" in tail[-1]
+    assert process.startup_seconds is None
+
+
+def test_missing_script_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        launch_node_server(str(tmp_path), node=[sys.executable, FAKE_NODE])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Schéma de configuration overlay : validateurs, OverlayConfig et fuzzing
+"""
+import pytest
+
+from overlay_config_schema import COMPILED_SCHEMA, OverlayConfig, fuzz, is_valid_color
+
+
+@pytest.mark.parametrize("color", [
+    "white", " Black ", "#fff", "#A1b2C3", "#11223344", "rgb(0, 128, 255)", "rgba(255,255,255,0.5)",
+])
+def test_valid_colors(color):
+    assert is_valid_color(color)
+
+
+@pytest.mark.parametrize("color", [
+    "", None, 42, "#ff", "#12345", "rgb(256,0,0)", "rgba(0,0,0,1.5)", "rgb(1,2,3,0.5)",
+    "rgba(1,2,3)", "blanc", "red; background: url(x)",
+])
+def test_invalid_colors(color):
+    assert not is_valid_color(color)
+
+
+def test_config_is_canonical_and_immutable():
+    config = OverlayConfig({'font': {'size': '64px', 'family': 'Arial'}, 'colors': {'text': '#fff'}})
+    same = OverlayConfig({'colors': {'text': '#fff'}, 'font': {'family': 'Arial', 'size': '64px'}})
+
+    assert config == same and hash(config) == hash(same)
+    assert config.body == b'{"colors":{"text":"#fff"},"font":{"family":"Arial","size":"64px"}}'
+    assert COMPILED_SCHEMA.config(config.updates) == config
+    with pytest.raises(AttributeError):
+        config.extra = 1
+
+
+@pytest.mark.parametrize("updates", [
+    {'animation': {'easing': 'cubic-bezier(1.5, 0, 0, 1)'}},
+    {'animation': {'easing': 'steps(0)'}},
+    {'layout': {'gap': '10'}},
+    {'font': {'family': 'Arial; } body {'}},
+    {'inconnue': {}},
+    {'font': {'inconnu': 'x'}},
+])
+def test_config_rejects_invalid_updates(updates):
+    with pytest.raises(ValueError):
+        OverlayConfig(updates)
+
+
+def test_merge_keeps_other_fields():
+    merged = OverlayConfig({'font': {'family': 'Arial', 'size': '64px'}}).merge(OverlayConfig({'font': {'size': '48px'}}))
+    assert merged.section('font') == {'family': 'Arial', 'size': '48px'}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_fuzz_invariants(seed):
+    report = fuzz(iterations=3000, seed=seed)
+    assert report['values_accepted'] and report['values_rejected']
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Registre des instances serveur et appels ciblés (action_target)
+"""
+import threading
+import time
+
+import pytest
+
+from background_loop import get_background_loop
+from bench.stub_server import StubServer
+from server_instances import (
+    ALL_INSTANCES, PRIMARY_INSTANCE, InstancePorts, InstanceRegistry, ServerInstance, parse_instance_specs
+)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def stub_server():
+    loop = get_background_loop()
+    server = StubServer()
+    loop.submit(server.start()).result(5)
+    yield server
+    loop.submit(server.stop()).result(5)
+
+
+def test_parse_instance_specs():
+    instances = parse_instance_specs("# co-stream\n\nduo:8092\n  solo_2 : 8095 \n")
+    assert [(i.name, i.ports.as_tuple()) for i in instances] == [
+        ("duo", (8092, 8093, 8094)),
+        ("solo_2", (8095, 8096, 8097)),
+    ]
+    assert instances[0].environment({})['SUBCOUNT_INSTANCE'] == "duo"
+
+
+@pytest.mark.parametrize("text", [
+    "duo", "duo:abc", "duo:80", "duo:8092:maChaine", "duo:8092:a:b", f"{PRIMARY_INSTANCE}:8092", f"{ALL_INSTANCES}:8092",
+    "çà:8092", "duo é:8092", "duo.test:8092", "../duo:8092",
+])
+def test_parse_instance_specs_rejects(text):
+    with pytest.raises(ValueError):
+        parse_instance_specs(text)
+
+
+def test_page_urls_carry_instance_ports():
+    duo = ServerInstance("duo", InstancePorts(8092))
+    assert duo.page_url("/admin") == "http://localhost:8092/admin?wsCounterPort=8093&wsConfigPort=8094"
+    assert duo.overlay_url("sub", "right") == (
+        "http://localhost:8092/obs/overlays/overlay.html?type=sub&align=right&wsCounterPort=8093&wsConfigPort=8094"
+    )
+
+
+def test_registry_targets_and_port_clashes():
+    registry = InstanceRegistry()
+    registry.add(ServerInstance(PRIMARY_INSTANCE, InstancePorts(8082, 8083, 8084)))
+    registry.add(ServerInstance("duo", InstancePorts(8092)))
+
+    with pytest.raises(ValueError):
+        registry.add(ServerInstance("autre", InstancePorts(8093)))
+    with pytest.raises(ValueError):
+        registry.add(ServerInstance("duo", InstancePorts(9000)))
+
+    assert [i.name for i in registry.targets()] == [PRIMARY_INSTANCE]
+    assert [i.name for i in registry.targets("duo")] == ["duo"]
+    assert [i.name for i in registry.targets(ALL_INSTANCES)] == [PRIMARY_INSTANCE, "duo"]
+    with pytest.raises(KeyError):
+        registry.targets("inconnue")
+
+
+def test_fan_out_runs_in_parallel_and_keeps_exceptions():
+    registry = InstanceRegistry()
+    for index, name in enumerate(("a", "b", "c")):
+        registry.add(ServerInstance(name, InstancePorts(9100 + index * 3)))
+    barrier = threading.Barrier(3, timeout=2)
+
+    def action(instance):
+        barrier.wait()  # Bloque si les actions ne tournent pas en même temps
+        if instance.name == "b":
+            raise RuntimeError("échec")
+        return instance.name.upper()
+
+    results = registry.fan_out(action)
+    assert list(results) == ["a", "b", "c"]
+    assert results["a"] == "A" and results["c"] == "C"
+    assert isinstance(results["b"], RuntimeError)
+
+
+def test_request_async_uses_instance_breaker(stub_server):
+    instance = ServerInstance("test", InstancePorts(stub_server.port), host="127.0.0.1")
+    loop = get_background_loop()
+
+    response = loop.submit(instance.request_async('GET', '/api/sub-counter-mode')).result(5)
+    assert response.status_code == 200 and response.body['mode'] == 'realtime'
+
+    instance.breaker.report_health(False)
+    try:
+        handled = stub_server.requests_handled
+        assert loop.submit(instance.request_async('GET', '/api/current')).result(5) is None
+        assert stub_server.requests_handled == handled
+    finally:
+        instance.breaker.reset()
+
+
+def test_script_server_calls_follow_action_target(obs_script, stub_server):
+    stub, script = obs_script
+    duo = ServerInstance("duo-test", InstancePorts(stub_server.port), host="127.0.0.1")
+    script.server_instances.add(duo)
+    settings = stub.obs_data_create()
+    stub.obs_data_set_string(settings, "action_target", "duo-test")
+    stub.obs_data_set_string(settings, "sub_counter_mode", "session")
+    previous, script.global_settings = script.global_settings, settings
+    try:
+        assert script.target_url() == duo.url
+        assert script.target_page("/admin").startswith(f"{duo.url}/admin?wsCounterPort=")
+        assert script.get_current_sub_counter_mode() == "realtime"
+
+        # Callback du dropdown : rend la main avant la réponse du serveur
+        assert script.apply_sub_counter_mode(None, None, settings) is False
+        assert wait_for(lambda: stub_server.sub_counter_mode == "session")
+        assert script.get_current_sub_counter_mode() == "session"
+    finally:
+        script.global_settings = previous
+        script.server_instances.remove("duo-test")
+        stub.obs_data_release(settings)
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    """Trois serveurs stub dans des processus séparés, un jeu de ports chacun"""
+    from bench.multi_instance import build_registry
+    registry, launcher = build_registry(3, startup_delay=0.2)
+    try:
+        assert list(registry.start_all(launcher, timeout=20).values()) == [True, True, True]
+        yield registry
+    finally:
+        registry.close_overlay_managers()
+        registry.stop_all()
+
+
+def follows(instance):
+    response = get_background_loop().submit(instance.request_async('GET', '/api/current', attempts=1)).result(5)
+    return response.body['follows']
+
+
+def test_fleet_runs_on_distinct_ports(fleet):
+    ports = [port for instance in fleet for port in instance.ports.as_tuple()]
+    assert len(set(ports)) == len(ports) == 9
+    assert list(fleet.fan_out(lambda instance: instance.check_health()).values()) == [True, True, True]
+
+
+def test_fan_out_reaches_each_instance_separately(fleet):
+    before = {instance.name: follows(instance) for instance in fleet}
+    amounts = {name: index + 1 for index, name in enumerate(fleet.names())}
+
+    def add(instance):
+        return instance.request_async('POST', '/admin/add-follows', {'amount': amounts[instance.name]})
+
+    results = fleet.submit(add).result(10)
+    assert all(response.status_code == 200 for response in results.values())
+    assert {instance.name: follows(instance) - before[instance.name] for instance in fleet} == amounts
+
+
+def test_script_action_target_reaches_only_the_chosen_instance(obs_script, fleet):
+    stub, script = obs_script
+    for instance in fleet:
+        script.server_instances.add(instance)
+    settings = stub.obs_data_create()
+    previous, script.global_settings = script.global_settings, settings
+    try:
+        for target in fleet:
+            before = {instance.name: follows(instance) for instance in fleet}
+            stub.obs_data_set_string(settings, "action_target", target.name)
+            results = script.submit_server_call('POST', '/admin/add-follows', {'amount': 2}).result(10)
+
+            assert list(results) == [target.name]
+            assert {instance.name: follows(instance) - before[instance.name] for instance in fleet} == {
+                instance.name: 2 if instance is target else 0 for instance in fleet
+            }
+    finally:
+        script.global_settings = previous
+        for instance in fleet:
+            script.server_instances.remove(instance.name)
+        stub.obs_data_release(settings)
+
+
+def test_stopped_instance_fails_alone(fleet):
+    victim = list(fleet)[-1]
+    victim.stop()
+    try:
+        health = fleet.fan_out(lambda instance: instance.check_health(timeout=1.0))
+        assert list(health.values()) == [True, True, False]
+    finally:
+        victim.breaker.reset()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Politique de retry et disjoncteur : seuls les échecs de transport et
+les 502/503/504 comptent comme serveur indisponible
+"""
+import pytest
+
+from server_resilience import CircuitBreaker, RetryPolicy
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class Sender:
+    """send() qui rejoue une suite de statuts (Exception = erreur réseau)"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Response(outcome)
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(sleep=lambda delay: None)
+
+
+@pytest.mark.parametrize('status', [200, 400, 404, 500])
+def test_application_status_is_returned_without_retry(policy, status):
+    breaker = CircuitBreaker("test")
+    send = Sender(status)
+
+    response = policy.run(send, breaker=breaker)
+
+    assert response.status_code == status
+    assert send.calls == 1
+    assert not breaker.is_open()
+
+
+def test_repeated_500_never_opens_the_breaker(policy):
+    breaker = CircuitBreaker("test")
+    for _ in range(5):
+        assert policy.run(Sender(500), breaker=breaker).status_code == 500
+    assert breaker.state == "closed"
+
+
+@pytest.mark.parametrize('failure', [502, 503, 504, ConnectionError("refusée")])
+def test_unavailable_server_is_retried_then_opens_breaker(policy, failure):
+    breaker = CircuitBreaker("test")
+    send = Sender(failure)
+
+    assert policy.run(send, breaker=breaker) is None
+    assert send.calls == 3
+    assert breaker.is_open()
+
+
+def test_retry_recovers_after_transient_failure(policy):
+    breaker = CircuitBreaker("test")
+    send = Sender(503, ConnectionError("reset"), 200)
+
+    assert policy.run(send, breaker=breaker).status_code == 200
+    assert send.calls == 3
+    assert breaker.state == "closed"
+
+
+def test_run_async_follows_the_same_rules(policy, loop):
+    async def send_500():
+        return Response(500)
+
+    async def send_503():
+        return Response(503)
+
+    breaker = CircuitBreaker("test")
+    assert loop.run_until_complete(policy.run_async(send_500, breaker=breaker)).status_code == 500
+    assert not breaker.is_open()
+    assert loop.run_until_complete(policy.run_async(send_503, breaker=breaker, attempts=1)) is None
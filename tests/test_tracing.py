@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Traces de bout en bout contre le serveur stub : X-Trace-Id envoyé,
+recopié dans le broadcast et découpé en étapes par TraceListener
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from async_overlay_config_manager import AsyncOverlayConfigManager
+from background_loop import get_background_loop
+from bench import ws_protocol
+from bench.stub_server import StubServer
+from tracing import REQUEST_SPAN, SEND_MARK, STAGES, TRACE_HEADER, TRACER, TraceListener, summarize
+
+BATCH_DELAY = 0.05
+
+
+class Capture:
+    """Écoute les deux WebSockets du stub et ferme les traces reçues"""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.listener = TraceListener(TRACER)
+        self.messages = []
+        self._lock = threading.Lock()
+        self._connections = []
+        self._readers = []
+
+    async def start(self):
+        loop = asyncio.get_event_loop()
+        for url in self.urls:
+            connection = await ws_protocol.connect(url)
+            self._connections.append(connection)
+            self._readers.append(loop.create_task(self._read(connection)))
+
+    async def _read(self, connection):
+        try:
+            while True:
+                raw = await connection.recv()
+                with self._lock:
+                    self.messages.append(raw)
+                self.listener.handle_message(raw)
+        except ws_protocol.WebSocketClosed:
+            pass
+
+    async def stop(self):
+        for connection in self._connections:
+            connection.close()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+
+    def broadcast_for(self, trace_id):
+        with self._lock:
+            messages = [json.loads(raw) for raw in self.messages]
+        return [
+            message for message in messages
+            if any(echo.get('id') == trace_id for echo in message.get('traces') or ())
+        ]
+
+
+@pytest.fixture
+def stub():
+    loop = get_background_loop()
+    server = StubServer(batch_delay=BATCH_DELAY, ws_counter_port=0, ws_config_port=0)
+    loop.submit(server.start()).result(5)
+    capture = Capture([server.ws_counter_url, server.ws_config_url])
+    loop.submit(capture.start()).result(5)
+    yield server, capture
+    loop.submit(capture.stop()).result(5)
+    loop.submit(server.stop()).result(5)
+
+
+def assert_complete_trace(capture, trace_id, message_type, root=None):
+    assert capture.listener.wait(trace_id, 5)
+    assert [message['type'] for message in capture.broadcast_for(trace_id)] == [message_type]
+
+    spans = TRACER.spans(trace_id)
+    names = {span.name for span in spans}
+    assert set(STAGES[1:]) | {REQUEST_SPAN, SEND_MARK} <= names
+    assert all(span.end >= span.start for span in spans)
+
+    summary = summarize(spans)
+    assert summary['complete'] == 1 and summary['incomplete'] == 0
+    assert set(STAGES[1:]) <= set(summary['stages'])
+    if root is not None:
+        assert list(summary['by_action']) == [root]
+    return summary
+
+
+def test_api_call_with_retry_is_traced_to_the_broadcast(obs_script, stub):
+    pytest.importorskip("requests")
+    _, script = obs_script
+    server, capture = stub
+
+    with TRACER.trace("obs.add_follow") as trace_id:
+        response = script.api_call_with_retry(f"{server.url}/admin/add-follows", method='POST', json={'amount': 1})
+
+    assert response.status_code == 200
+    assert response.headers[TRACE_HEADER] == trace_id
+    summary = assert_complete_trace(capture, trace_id, 'follow_update', root="obs.add_follow")
+    # Le batching du serveur se retrouve dans server.queue
+    assert summary['stages']['server.queue']['max_ms'] >= BATCH_DELAY * 1000 * 0.8
+
+
+def test_overlay_config_update_is_traced_to_the_broadcast(stub):
+    pytest.importorskip("requests")
+    from overlay_config_manager import OverlayConfigManager
+    server, capture = stub
+    manager = OverlayConfigManager(server_url=server.url, enable_cache=False)
+
+    with TRACER.trace("obs.update_font") as trace_id:
+        assert manager._send_update({'font': {'family': 'Arial', 'size': '48px'}})
+
+    assert server.overlay_config['font']['size'] == '48px'
+    assert_complete_trace(capture, trace_id, 'config_update', root="obs.update_font")
+
+
+def test_async_overlay_manager_traces_from_the_post(stub):
+    server, capture = stub
+    manager = AsyncOverlayConfigManager(server_url=server.url, background_loop=get_background_loop(),
+                                        enable_cache=False)
+    before = {span.trace_id for span in TRACER.spans()}
+
+    assert manager.submit(manager.update_colors(text="#112233")).result(5)
+
+    trace_ids = {span.trace_id for span in TRACER.spans() if span.name == SEND_MARK} - before
+    assert len(trace_ids) == 1
+    assert_complete_trace(capture, trace_ids.pop(), 'config_update')
+    get_background_loop().submit(manager.close()).result(5)